@@ -0,0 +1,100 @@
+import asyncio
+import json
+
+import pytest
+from aiohttp import web
+
+# Importing the data acquisition package pulls in the geospatial stack
+pytest.importorskip("geopandas")
+
+from app.data_acquisition.utils.boundaries_catalog import BoundariesCatalog
+from app.data_acquisition.utils.coordinates import BoundingBox
+from app.data_acquisition.utils.http import get_http_client
+
+
+def _square(name, west, south, size):
+    ring = [[west, south], [west + size, south], [west + size, south + size], [west, south + size], [west, south]]
+    return {
+        "type": "Feature",
+        "properties": {"name": name, "url": f"https://example.com/{name}/ept.json", "count": 1000},
+        "geometry": {"type": "Polygon", "coordinates": [ring]},
+    }
+
+
+def test_catalog_revalidates_with_etag_and_works_offline(tmp_path):
+    body = json.dumps({
+        "type": "FeatureCollection",
+        "features": [_square("CO_Denver", -105.5, 39.5, 1.0), _square("WA_Seattle", -123.0, 47.0, 1.0)],
+    })
+    statuses = []
+
+    async def boundaries(request):
+        if request.headers.get("If-None-Match") == '"v1"':
+            statuses.append(304)
+            return web.Response(status=304)
+        statuses.append(200)
+        return web.Response(text=body, headers={"ETag": '"v1"'})
+
+    async def scenario():
+        app = web.Application()
+        app.router.add_get("/resources.geojson", boundaries)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        url = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}/resources.geojson"
+
+        catalog = BoundariesCatalog(tmp_path, url=url, max_age=0)
+        assert await catalog.ensure_loaded()
+        hits = catalog.query(BoundingBox(west=-105.1, south=39.7, east=-105.0, north=39.8))
+        assert [d["name"] for d in hits] == ["CO_Denver"]
+        assert catalog.query(BoundingBox(west=-90.0, south=30.0, east=-89.9, north=30.1)) == []
+
+        # Stale copy is revalidated, not downloaded again
+        assert await catalog.ensure_loaded()
+        await runner.cleanup()
+
+        # A fresh process with the server gone still answers from disk
+        offline = BoundariesCatalog(tmp_path, url=url, max_age=0)
+        assert await offline.ensure_loaded()
+        hits = offline.query(BoundingBox(west=-122.5, south=47.5, east=-122.4, north=47.6))
+        assert [d["name"] for d in hits] == ["WA_Seattle"]
+        await get_http_client().close()
+
+    asyncio.run(scenario())
+    assert statuses == [200, 304]
+
+
+def test_failed_refresh_backs_off(tmp_path):
+    statuses = []
+
+    async def unavailable(request):
+        statuses.append(503)
+        return web.Response(status=503)
+
+    async def scenario():
+        app = web.Application()
+        app.router.add_get("/resources.geojson", unavailable)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        url = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}/resources.geojson"
+
+        catalog = BoundariesCatalog(tmp_path, url=url, max_age=0)
+        assert not await catalog.ensure_loaded()
+        attempts = len(statuses)
+        assert attempts >= 1
+        # The failure is remembered, so the next query does not go back to the network
+        assert not await catalog.ensure_loaded()
+        assert len(statuses) == attempts
+
+        # Once the retry interval has passed the network is tried again
+        catalog.retry_interval = 0
+        await catalog.ensure_loaded()
+        assert len(statuses) > attempts
+        await runner.cleanup()
+        await get_http_client().close()
+
+    asyncio.run(scenario())
+    assert json.loads((tmp_path / "3dep_boundaries.meta.json").read_text())["last_attempt"] > 0
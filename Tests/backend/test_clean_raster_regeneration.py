@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+
+rasterio = pytest.importorskip("rasterio")
+pytest.importorskip("pdal")  # imported by the app.processing package
+
+from rasterio.transform import from_origin
+
+from app.processing import dsm as dsm_module
+from app.processing import dtm as dtm_module
+from app.processing.density_analysis import DensityAnalyzer
+from app.processing.terrain_derivatives import aspect_from_gradients, hillshade_from_gradients, horn_gradients
+
+
+def _write(path, data, transform):
+    with rasterio.open(path, "w", driver="GTiff", width=data.shape[1], height=data.shape[0], count=1,
+                       dtype="float32", crs="EPSG:32633", transform=transform, nodata=-9999) as dst:
+        dst.write(data.astype(np.float32), 1)
+    return str(path)
+
+
+def test_products_are_derived_from_one_dtm_and_dsm(tmp_path, monkeypatch):
+    # Plane rising 1 m per 2 m cell towards the east: slope 26.57°, facing west
+    terrain = np.tile(np.arange(60, dtype=np.float64) * 1.0, (40, 1))
+    calls = []
+
+    def fake_dtm(laz_path, region_name):
+        calls.append("DTM")
+        return _write(tmp_path / "dtm.tif", terrain, from_origin(500000, 4500080, 2, 2))
+
+    def fake_dsm(laz_path, region_name):
+        calls.append("DSM")
+        # Coarser grid: the DTM has to be resampled onto it for the CHM
+        return _write(tmp_path / "dsm.tif", terrain[::2, ::2] + 0.5 + 5, from_origin(500000, 4500080, 4, 4))
+
+    monkeypatch.setattr(dtm_module, "dtm", fake_dtm)
+    monkeypatch.setattr(dsm_module, "dsm", fake_dsm)
+
+    result = DensityAnalyzer()._regenerate_rasters_from_clean_laz("clean.las", str(tmp_path), "tile")
+
+    assert sorted(calls) == ["DSM", "DTM"]
+    assert result["processing_errors"] == []
+    paths = {r["type"]: r["path"] for r in result["regenerated_rasters"]}
+    assert set(paths) == {"DTM", "DSM", "CHM", "Hillshade", "Slope", "Aspect"}
+
+    def interior(raster_type):
+        with rasterio.open(paths[raster_type]) as src:
+            return src.read(1)[2:-2, 2:-2]
+
+    np.testing.assert_allclose(interior("CHM"), 5, atol=1e-4)
+    np.testing.assert_allclose(interior("Slope"), np.degrees(np.arctan(0.5)), atol=1e-4)
+    np.testing.assert_allclose(interior("Aspect"), 270, atol=1e-4)
+    hillshade = interior("Hillshade")
+    assert hillshade.dtype == np.uint8 and (hillshade == hillshade[0, 0]).all()
+
+
+def test_hillshade_is_lit_from_the_azimuth():
+    # Rows run south, so rising with row + col faces north-west
+    rows, cols = np.mgrid[0:10, 0:10].astype(np.float64)
+    shades = {}
+    for facing, elevation in (("flat", 0 * rows), ("NW", rows + cols), ("SE", -rows - cols)):
+        dx, dy = horn_gradients(elevation, 1.0, 1.0)
+        shades[facing] = hillshade_from_gradients(dx, dy, azimuth=315.0)[5, 5]
+        if facing != "flat":
+            assert aspect_from_gradients(dx, dy)[5, 5] == {"NW": 315.0, "SE": 135.0}[facing]
+
+    assert shades["NW"] > shades["flat"] > shades["SE"]
@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+rasterio = pytest.importorskip("rasterio")
+pytest.importorskip("pdal")  # imported by the app.processing package
+
+from rasterio.transform import from_origin
+
+from app.processing import composites
+from app.processing.color_relief import COLOR_RAMPS
+from app.processing.composites import BlendVariant, CompositeEngine
+
+
+@pytest.fixture
+def dtm_path(tmp_path):
+    rows, cols = np.mgrid[0:300, 0:200]
+    dtm = 100 + 20 * np.sin(rows / 25.0) + 0.3 * cols
+    dtm[140:150, 90:100] = -9999  # nodata hole
+    path = tmp_path / "dtm.tif"
+    with rasterio.open(path, "w", driver="GTiff", width=200, height=300, count=1, dtype="float32",
+                       crs="EPSG:32633", transform=from_origin(500000, 4500300, 1, 1), nodata=-9999) as dst:
+        dst.write(dtm.astype(np.float32), 1)
+    return str(path)
+
+
+def _read(path):
+    with rasterio.open(path) as src:
+        assert src.count == 3 and src.profile["tiled"]
+        return src.read()
+
+
+def test_windowed_blend_matches_single_window(dtm_path, tmp_path):
+    variant = BlendVariant(azimuth=225, z_factor=2.0, blend_factor=0.5)
+    CompositeEngine(dtm_path, block_size=64).render({str(tmp_path / "tiled.tif"): variant})
+    CompositeEngine(dtm_path, block_size=1024).render({str(tmp_path / "whole.tif"): variant})
+
+    tiled = _read(tmp_path / "tiled.tif")
+    np.testing.assert_array_equal(tiled, _read(tmp_path / "whole.tif"))
+    assert (tiled[:, 140:150, 90:100] == 0).all()
+
+
+def test_variants_share_hillshade_per_window(dtm_path, tmp_path, monkeypatch):
+    shades = []
+    original = composites.hillshade_from_gradients
+    monkeypatch.setattr(composites, "hillshade_from_gradients", lambda *args: shades.append(args[2:]) or original(*args))
+
+    engine = CompositeEngine(dtm_path, block_size=128)
+    engine.render({
+        str(tmp_path / "color.tif"): BlendVariant(blend_factor=1.0, ramp_name="terrain"),
+        str(tmp_path / "shaded.tif"): BlendVariant(blend_factor=0.3, ramp_name="terrain"),
+    })
+
+    windows = 3 * 2
+    assert len(shades) == windows
+    color = _read(tmp_path / "color.tif")
+    with rasterio.open(dtm_path) as src:
+        dtm = src.read(1, masked=True)
+    low = np.unravel_index(dtm.argmin(), dtm.shape)
+    np.testing.assert_array_equal(color[:, low[0], low[1]], COLOR_RAMPS["terrain"][0][1])
+    assert (_read(tmp_path / "shaded.tif") <= color).all()
+
+
+def test_blend_is_lit_from_the_variant_azimuth(tmp_path):
+    # Elevation rises towards the south-east, so the slope faces north-west
+    rows, cols = np.mgrid[0:128, 0:128]
+    path = tmp_path / "nw_facing.tif"
+    with rasterio.open(path, "w", driver="GTiff", width=128, height=128, count=1, dtype="float32",
+                       crs="EPSG:32633", transform=from_origin(500000, 4500128, 1, 1), nodata=-9999) as dst:
+        dst.write((rows + cols).astype(np.float32), 1)
+
+    engine = CompositeEngine(str(path), block_size=64)
+    lit = {azimuth: str(tmp_path / f"az{azimuth}.tif") for azimuth in (315, 135)}
+    engine.render({output: BlendVariant(azimuth=azimuth, blend_factor=0.0) for azimuth, output in lit.items()})
+
+    assert _read(lit[315])[:, 64, 64].sum() > _read(lit[135])[:, 64, 64].sum()
@@ -0,0 +1,74 @@
+import json
+import pickle
+import threading
+import time
+from datetime import datetime
+
+import pytest
+
+# Importing the data acquisition package pulls in the geospatial stack
+pytest.importorskip("geopandas")
+
+from app.data_acquisition.utils.cache import DataCache
+
+
+def test_lru_eviction_within_entry_and_byte_budgets(tmp_path):
+    cache = DataCache(str(tmp_path), max_entries=3, max_size_mb=1)
+
+    for i in range(3):
+        cache.put(f"key{i}", {"value": i})
+        time.sleep(0.01)
+    assert cache.get("key0") == {"value": 0}  # key0 becomes most recently used
+    cache.put("key3", {"value": 3})
+
+    assert cache.get("key1") is None
+    assert {e["key"] for e in cache.get_history()} == {"key0", "key2", "key3"}
+
+    blob = tmp_path / "blob.bin"
+    blob.write_bytes(b"x" * 900_000)
+    cached = cache.put_file("blob", blob, metadata={"source": "test"})
+    assert cached.read_bytes() == blob.read_bytes()
+    assert cache.get_file("blob") == cached
+    assert cache.get("blob")["metadata"] == {"source": "test"}
+
+    blob.write_bytes(b"y" * 900_000)
+    cache.put_file("blob2", blob)
+    # The byte budget only fits one blob; the older one is evicted
+    assert cache.get_file("blob") is None and not cached.exists()
+    assert cache.get_stats()["total_size_mb"] <= 1
+
+
+def test_ttl_payload_types_and_concurrent_writers(tmp_path):
+    cache = DataCache(str(tmp_path))
+    cache.put("short", {"a": 1}, ttl_hours=0.5 / 3600)
+    cache.put("obj", {"when": datetime(2024, 1, 1)})
+    assert (tmp_path / f"{cache._generate_cache_key_hash('short')}.json").exists()
+    assert cache.get("obj") == {"when": datetime(2024, 1, 1)}
+    time.sleep(0.6)
+    assert cache.get("short") is None
+
+    def writer(n):
+        for i in range(25):
+            cache.put(f"w{n}_{i}", {"n": n, "i": i})
+            assert cache.get(f"w{n}_{i}") == {"n": n, "i": i}
+
+    threads = [threading.Thread(target=writer, args=(n,)) for n in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert cache.get_stats()["total_entries"] == 101
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_legacy_json_index_is_migrated(tmp_path):
+    legacy = DataCache(str(tmp_path))
+    key_hash = legacy._generate_cache_key_hash("old")
+    (tmp_path / f"{key_hash}.pkl").write_bytes(pickle.dumps({"files": ["a.tif"]}))
+    now = datetime.now().isoformat()
+    (tmp_path / "cache_metadata.json").write_text(json.dumps({
+        "entries": {key_hash: {"original_key": "old", "created": now, "last_accessed": now, "file_size": 10}}
+    }))
+
+    assert DataCache(str(tmp_path)).get("old") == {"files": ["a.tif"]}
+    assert not (tmp_path / "cache_metadata.json").exists()
@@ -0,0 +1,44 @@
+import json
+
+import numpy as np
+import pytest
+
+pdal = pytest.importorskip("pdal")
+rasterio = pytest.importorskip("rasterio")
+
+from app.processing.density_analysis import DensityAnalyzer
+
+
+def _write_las(path, x, y):
+    points = np.zeros(x.size, dtype=[("X", "f8"), ("Y", "f8"), ("Z", "f8")])
+    points["X"], points["Y"] = x, y
+    pipeline = pdal.Pipeline(json.dumps({"pipeline": [{
+        "type": "writers.las", "filename": str(path), "scale_x": 0.01, "scale_y": 0.01, "scale_z": 0.01,
+        "a_srs": "EPSG:32633"
+    }]}), arrays=[points])
+    pipeline.execute()
+
+
+def test_density_counts_mask_and_statistics_in_one_pass(tmp_path):
+    # 4 points in each cell of the left half, 1 point in each cell of the right half
+    xs, ys = np.meshgrid(np.arange(20) + 0.5, np.arange(10) + 0.5)
+    left = xs < 10
+    x = np.concatenate([np.repeat(xs[left], 4), xs[~left]])
+    y = np.concatenate([np.repeat(ys[left], 4), ys[~left]])
+    laz_path = tmp_path / "tile.las"
+    _write_las(laz_path, 500000 + x, 4500000 + y)
+
+    result = DensityAnalyzer(resolution=1.0, mask_threshold=2.0).generate_density_raster(
+        str(laz_path), str(tmp_path / "out"), region_name="tile"
+    )
+
+    assert result["success"], result.get("error")
+    with rasterio.open(result["tiff_path"]) as src:
+        density = src.read(1)
+        assert src.profile["tiled"]
+    assert density.sum() == x.size
+
+    stats = result["metadata"]["statistics"]
+    assert (stats["min"], stats["max"]) == (1.0, 4.0)
+    assert sum(stats["histogram"]["counts"]) == stats["valid_cells"]
+    assert result["mask_results"]["statistics"]["valid_pixels"] == left.sum()
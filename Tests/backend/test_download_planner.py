@@ -0,0 +1,51 @@
+import asyncio
+import time
+
+import pytest
+
+# Importing the data acquisition package pulls in the geospatial stack
+pytest.importorskip("geopandas")
+
+from app.data_acquisition.utils.download_planner import DownloadAsset, DownloadPlanner
+
+
+def _asset(name, duration, result="ok", steps=4):
+    async def fetch(callback):
+        for step in range(1, steps + 1):
+            await asyncio.sleep(duration / steps)
+            if callback:
+                await callback({"type": "download_progress", "band": name, "progress": 100 * step / steps})
+        return result
+    return DownloadAsset(name, fetch)
+
+
+def test_assets_download_concurrently_with_combined_progress():
+    updates = []
+
+    async def callback(update):
+        updates.append(update)
+
+    async def scenario():
+        planner = DownloadPlanner("test_source", callback, max_concurrency=2)
+        start = time.monotonic()
+        results = await planner.run([_asset("Red", 0.2), _asset("NIR", 0.2)])
+        return results, time.monotonic() - start
+
+    results, elapsed = asyncio.run(scenario())
+    assert results == {"Red": "ok", "NIR": "ok"}
+    # Wall-clock tracks the slowest asset, not the sum
+    assert elapsed < 0.35
+    assert {u["asset"] for u in updates} == {"Red", "NIR"}
+    assert updates[-1]["overall_progress"] == 100.0
+    assert max(u["overall_progress"] for u in updates[:2]) <= 50.0
+
+
+def test_failed_asset_cancels_the_rest():
+    async def scenario():
+        planner = DownloadPlanner("test_source_fail", max_concurrency=2)
+        return await planner.run([_asset("Red", 0.05, result=None), _asset("NIR", 5.0)])
+
+    start = time.monotonic()
+    results = asyncio.run(scenario())
+    assert results == {"Red": None, "NIR": None}
+    assert time.monotonic() - start < 1.0
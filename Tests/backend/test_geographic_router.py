@@ -0,0 +1,83 @@
+import asyncio
+import time
+
+import pytest
+
+# Importing the data acquisition package pulls in the geospatial stack
+pytest.importorskip("geopandas")
+
+from app.data_acquisition.geographic_router import GeographicRouter
+from app.data_acquisition.sources.base import DataType, DownloadRequest, DownloadResult
+from app.data_acquisition.utils.coordinates import BoundingBox
+
+
+class FakeSource:
+    def __init__(self, name, probe_delay, available=True, succeed=True):
+        self.name = name
+        self.probe_delay = probe_delay
+        self.available = available
+        self.succeed = succeed
+        self.probe_cancelled = False
+        self.downloads = 0
+
+    async def check_availability(self, request):
+        try:
+            await asyncio.sleep(self.probe_delay)
+        except asyncio.CancelledError:
+            self.probe_cancelled = True
+            raise
+        return self.available
+
+    async def download(self, request, progress_callback=None):
+        self.downloads += 1
+        await asyncio.sleep(0.05)
+        if self.succeed:
+            return DownloadResult(success=True, file_path=f"/tmp/{self.name}.tif")
+        return DownloadResult(success=False, error_message=f"{self.name} failed")
+
+
+def _router(sources):
+    router = GeographicRouter(probe_timeout=1.0)
+    router.sources = {source.name: source for source in sources}
+    router.get_optimal_sources = lambda bbox, data_type: [source.name for source in sources]
+    return router
+
+
+def _request():
+    return DownloadRequest(bbox=BoundingBox(west=-47.9, south=-15.8, east=-47.8, north=-15.7), data_type=DataType.ELEVATION)
+
+
+def test_downloads_from_best_source_while_slow_probes_are_cancelled():
+    best = FakeSource("best", probe_delay=0.05)
+    slow = FakeSource("slow", probe_delay=10.0)
+    router = _router([best, slow])
+
+    started = time.monotonic()
+    result = asyncio.run(router.download_with_routing(_request()))
+
+    assert result.success
+    assert result.metadata["selected_source"] == "best"
+    assert time.monotonic() - started < 1.0
+    assert slow.probe_cancelled
+    assert slow.downloads == 0
+
+
+def test_probes_run_concurrently_and_fall_back_by_priority():
+    unavailable = FakeSource("unavailable", probe_delay=0.3, available=False)
+    broken = FakeSource("broken", probe_delay=0.3, succeed=False)
+    hanging = FakeSource("hanging", probe_delay=5.0)
+    fallback = FakeSource("fallback", probe_delay=0.3)
+    router = _router([unavailable, broken, hanging, fallback])
+
+    started = time.monotonic()
+    result = asyncio.run(router.download_with_routing(_request()))
+
+    assert result.success
+    assert result.metadata["selected_source"] == "fallback"
+    assert result.metadata["source_priority"] == 4
+    assert broken.downloads == 1 and hanging.downloads == 0
+    # Probes overlap and the hanging one is cut off at the probe timeout
+    assert time.monotonic() - started < 1.6
+
+    availability = asyncio.run(router.check_availability_all(_request()))
+    assert availability == {"unavailable": False, "broken": True, "hanging": False, "fallback": True}
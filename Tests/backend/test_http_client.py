@@ -0,0 +1,116 @@
+import asyncio
+import hashlib
+
+import pytest
+from aiohttp import web
+
+# Importing the data acquisition package pulls in the geospatial stack
+pytest.importorskip("geopandas")
+
+from app.data_acquisition.utils.errors import NetworkError
+from app.data_acquisition.utils.http import AsyncHttpClient
+
+
+async def _serve(routes):
+    app = web.Application()
+    for path, handler in routes.items():
+        app.router.add_get(path, handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}"
+
+
+def test_retries_transient_errors_and_streams_downloads(tmp_path):
+    calls = {"flaky": 0}
+
+    async def flaky(request):
+        calls["flaky"] += 1
+        if calls["flaky"] < 3:
+            return web.Response(status=503)
+        return web.json_response({"ok": True})
+
+    async def large(request):
+        return web.Response(body=b"x" * 3_000_000)
+
+    async def scenario():
+        runner, base = await _serve({"/flaky": flaky, "/large": large})
+        client = AsyncHttpClient(backoff_factor=0.01)
+        try:
+            response = await client.get(f"{base}/flaky")
+            progress = []
+            written = await client.download(
+                f"{base}/large", tmp_path / "large.bin",
+                on_chunk=lambda done, total: progress.append((done, total))
+            )
+            return response, written, progress
+        finally:
+            await client.close()
+            await runner.cleanup()
+
+    response, written, progress = asyncio.run(scenario())
+    assert response.json() == {"ok": True}
+    assert calls["flaky"] == 3
+    assert written == 3_000_000 == (tmp_path / "large.bin").stat().st_size
+    assert progress[-1] == (3_000_000, 3_000_000)
+
+
+def test_gives_up_after_retries():
+    async def broken(request):
+        return web.Response(status=502)
+
+    async def scenario():
+        runner, base = await _serve({"/broken": broken})
+        client = AsyncHttpClient(backoff_factor=0.01)
+        try:
+            await client.get(f"{base}/broken", retries=1)
+        finally:
+            await client.close()
+            await runner.cleanup()
+
+    with pytest.raises(NetworkError):
+        asyncio.run(scenario())
+
+
+def test_download_resumes_with_range_after_dropped_connection(tmp_path):
+    body = bytes(range(256)) * 8192  # 2 MB
+    ranges = []
+
+    async def flaky_file(request):
+        range_header = request.headers.get("Range")
+        ranges.append(range_header)
+        if range_header:
+            assert request.headers.get("If-Range") == '"v1"'
+            start = int(range_header.split("=")[1].rstrip("-"))
+            response = web.StreamResponse(status=206, headers={
+                "ETag": '"v1"', "Content-Range": f"bytes {start}-{len(body) - 1}/{len(body)}"
+            })
+            response.content_length = len(body) - start
+            await response.prepare(request)
+            await response.write(body[start:])
+            return response
+        response = web.StreamResponse(headers={"ETag": '"v1"'})
+        response.content_length = len(body)
+        await response.prepare(request)
+        await response.write(body[:700_000])
+        request.transport.close()
+        return response
+
+    async def scenario():
+        runner, base = await _serve({"/file": flaky_file})
+        client = AsyncHttpClient(backoff_factor=0.01)
+        try:
+            return await client.download(
+                f"{base}/file", tmp_path / "band.tif",
+                expected_sha256=hashlib.sha256(body).hexdigest()
+            )
+        finally:
+            await client.close()
+            await runner.cleanup()
+
+    assert asyncio.run(scenario()) == len(body)
+    assert (tmp_path / "band.tif").read_bytes() == body
+    assert ranges[0] is None and ranges[-1].startswith("bytes=") and ranges[-1] != "bytes=0-"
+    assert not list(tmp_path.glob("*.part*"))
@@ -0,0 +1,95 @@
+import os
+
+import pytest
+
+pytest.importorskip("pdal")  # imported by the app.processing package
+
+from app.processing.laz_cropping import LAZCropper
+
+
+@pytest.fixture
+def cropper(monkeypatch, tmp_path):
+    cropper = LAZCropper(use_spatial_index=True, index_dir=str(tmp_path / "copc_index"), index_max_mb=1)
+    executed = []
+
+    def execute(pipeline_config):
+        executed.append(pipeline_config)
+        for stage in pipeline_config["pipeline"]:
+            if stage["type"].startswith("writers."):
+                with open(stage["filename"], "w") as f:
+                    f.write("points")
+        return {"metadata": {"stages": {"filters.stats": {"statistic": [
+            {"name": "X", "count": 42, "minimum": 1.0, "maximum": 2.0},
+            {"name": "Y", "count": 42, "minimum": 3.0, "maximum": 4.0},
+        ]}}}}
+
+    monkeypatch.setattr(cropper, "_execute_pdal_pipeline", execute)
+    cropper.executed = executed
+    return cropper
+
+
+def test_crop_reads_through_copc_index_built_once(cropper, tmp_path):
+    source = tmp_path / "input" / "tile.laz"
+    source.parent.mkdir()
+    source.write_text("points")
+
+    first = cropper._create_bbox_crop_pipeline(str(source), [0, 0, 1, 1], str(tmp_path / "a.las"))
+    second = cropper._create_bbox_crop_pipeline(str(source), [0, 0, 1, 1], str(tmp_path / "b.las"))
+
+    assert len(cropper.executed) == 1
+    assert cropper.executed[0]["pipeline"][-1]["type"] == "writers.copc"
+    for pipeline in (first, second):
+        reader = pipeline["pipeline"][0]
+        assert reader["type"] == "readers.copc"
+        assert reader["bounds"] == "([0, 1], [0, 1])"
+        assert [s["type"] for s in pipeline["pipeline"][1:]] == ["filters.stats", "writers.las"]
+    # The copy lives outside the input tree
+    assert sorted(p.name for p in source.parent.rglob("*")) == ["tile.laz"]
+    assert first["pipeline"][0]["filename"].startswith(str(tmp_path / "copc_index"))
+
+
+def test_direct_read_by_default(tmp_path):
+    source = tmp_path / "tile.laz"
+    source.write_text("points")
+
+    pipeline = LAZCropper()._create_bbox_crop_pipeline(str(source), [0, 0, 1, 1], str(tmp_path / "a.las"))
+
+    assert pipeline["pipeline"][0]["type"] == "readers.las"
+    assert not (tmp_path / "copc_index").exists()
+
+
+def test_least_recently_used_indexes_are_evicted(cropper, tmp_path):
+    index_dir = tmp_path / "copc_index"
+    index_dir.mkdir()
+    stale = index_dir / "0_old.copc.laz"
+    stale.write_bytes(bytes(1024 * 1024))
+    os.utime(stale, (1, 1))
+    source = tmp_path / "tile.laz"
+    source.write_text("points")
+
+    cropper._create_bbox_crop_pipeline(str(source), [0, 0, 1, 1], str(tmp_path / "a.las"))
+
+    assert not stale.exists()
+    assert len(list(index_dir.glob("*.copc.laz"))) == 1
+
+
+def test_outside_crop_reads_source_directly(cropper, tmp_path):
+    source = tmp_path / "tile.laz"
+    source.write_text("points")
+    polygon = tmp_path / "polygon.geojson"
+    polygon.write_text('{"features": [{"geometry": {"type": "Polygon", "coordinates": [[[0, 0], [1, 0], [1, 1], [0, 0]]]}}]}')
+
+    pipeline = cropper._create_crop_pipeline(str(source), str(polygon), str(tmp_path / "out.las"), "outside")
+
+    assert [s["type"] for s in pipeline["pipeline"]] == ["readers.las", "filters.crop", "filters.stats", "writers.las"]
+    assert cropper.executed == []
+
+
+def test_cropped_statistics_come_from_the_write(cropper, tmp_path):
+    output = tmp_path / "out.las"
+    output.write_text("points")
+
+    stats = cropper._cropped_statistics(str(output), cropper._execute_pdal_pipeline({"pipeline": []}))
+
+    assert stats["point_count"] == 42
+    assert stats["bounds"] == {"minx": 1.0, "maxx": 2.0, "miny": 3.0, "maxy": 4.0}
@@ -0,0 +1,98 @@
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("pdal")  # imported by the app.processing package
+
+from app.processing import laz_density_service
+from app.processing.laz_classifier import LAZClassifier
+from app.processing.laz_density_service import LAZDensityService
+
+
+def _write(path, content):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(content)
+    old = path.stat().st_mtime - 3600
+    os.utime(path, (old, old))
+    return path
+
+
+def _fake_analysis(self, laz_file_path, output_base_dir, region_name):
+    density_dir = Path(output_base_dir) / region_name / "lidar" / "density"
+    density_dir.mkdir(parents=True, exist_ok=True)
+    tiff = density_dir / f"{region_name}_density.tif"
+    tiff.write_bytes(b"tif")
+    metadata = {"input": {"file_path": laz_file_path}, "output": {"tiff_path": str(tiff)},
+                "parameters": {"resolution": self.resolution, "mask_threshold": self.mask_threshold}}
+    (density_dir / f"{region_name}_density_metadata.json").write_text(json.dumps(metadata))
+    return {"success": True, "region_name": region_name}
+
+
+def test_classification_from_header(tmp_path):
+    las = _write(tmp_path / "input" / "site" / "tile.laz", b"LASF" + bytes(4000))
+    placeholder = _write(tmp_path / "input" / "site" / "fake.laz", b"# placeholder for coordinates\n" + b"0" * 2000)
+
+    is_loaded, reason, file_stat = LAZClassifier.classify(str(las))
+    assert is_loaded and "LAZ/LAS header" in reason
+    assert file_stat.st_size == 4004
+    assert LAZClassifier.is_loaded_laz(str(placeholder))[0] is False
+    assert LAZClassifier.classify(str(tmp_path / "missing.laz")) == (False, "File does not exist", None)
+
+
+def test_only_stale_files_are_processed(tmp_path, monkeypatch):
+    search = tmp_path / "input"
+    for region in ("north", "south"):
+        _write(search / region / "lidar" / f"{region}.laz", b"LASF" + bytes(20000))
+    output = tmp_path / "output"
+
+    monkeypatch.setattr(LAZDensityService, "_analyze_loaded_laz", _fake_analysis)
+    monkeypatch.setattr(laz_density_service, "ProcessPoolExecutor", ThreadPoolExecutor)
+
+    updates = []
+    summary = LAZDensityService().process_loaded_laz_files(str(search), str(output), progress_callback=updates.append)
+    assert (summary["files_processed"], summary["successful_count"], summary["skipped_count"]) == (2, 2, 0)
+    assert sorted(u["file_name"] for u in updates) == ["north.laz", "south.laz"]
+    assert updates[-1]["completed"] == 2
+
+    # Re-uploaded after the last run
+    uploaded = (output / "south" / "lidar" / "density" / "south_density_metadata.json").stat().st_mtime + 10
+    os.utime(search / "south" / "lidar" / "south.laz", (uploaded, uploaded))
+    summary = LAZDensityService().process_loaded_laz_files(str(search), str(output))
+    assert (summary["files_processed"], summary["skipped_count"]) == (1, 1)
+    assert summary["results"][-1]["file_info"]["file_name"] == "south.laz"
+
+    summary = LAZDensityService(resolution=0.5).process_loaded_laz_files(str(search), str(output))
+    assert summary["files_processed"] == 2
+
+
+def test_files_in_one_folder_get_their_own_outputs(tmp_path, monkeypatch):
+    search = tmp_path / "input"
+    for name in ("alpha", "beta", "gamma"):
+        _write(search / "LAZ" / f"{name}.laz", b"LASF" + bytes(20000))
+    _write(search / "site" / "lidar" / "tile_1.laz", b"LASF" + bytes(20000))
+    _write(search / "site" / "lidar" / "tile_2.laz", b"LASF" + bytes(20000))
+    output = tmp_path / "output"
+    analyzed = []
+
+    def analyze(self, laz_file_path, output_base_dir, region_name):
+        analyzed.append(region_name)
+        return _fake_analysis(self, laz_file_path, output_base_dir, region_name)
+
+    monkeypatch.setattr(LAZDensityService, "_analyze_loaded_laz", analyze)
+    monkeypatch.setattr(laz_density_service, "ProcessPoolExecutor", ThreadPoolExecutor)
+
+    summary = LAZDensityService().process_loaded_laz_files(str(search), str(output))
+    assert sorted(analyzed) == ["alpha", "beta", "gamma", "tile_1", "tile_2"]
+    assert {r["file_info"]["input_region"] for r in summary["results"]} == {"LAZ", "site"}
+
+    summary = LAZDensityService().process_loaded_laz_files(str(search), str(output))
+    assert (summary["files_processed"], summary["skipped_count"]) == (0, 5)
+
+    uploaded = (output / "beta" / "lidar" / "density" / "beta_density_metadata.json").stat().st_mtime + 10
+    os.utime(search / "LAZ" / "beta.laz", (uploaded, uploaded))
+    summary = LAZDensityService().process_loaded_laz_files(str(search), str(output))
+    assert (summary["files_processed"], summary["skipped_count"]) == (1, 4)
+    assert summary["results"][-1]["region_name"] == "beta"
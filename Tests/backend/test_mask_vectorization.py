@@ -0,0 +1,59 @@
+import json
+
+import numpy as np
+import pytest
+
+rasterio = pytest.importorskip("rasterio")
+pytest.importorskip("scipy")
+pytest.importorskip("pdal")  # imported by the app.processing package
+
+from rasterio.transform import from_origin
+from shapely.geometry import shape
+
+from app.processing import vector_operations
+from app.processing.vector_operations import VectorProcessor
+
+
+@pytest.fixture
+def speckled_mask(tmp_path):
+    rng = np.random.default_rng(0)
+    mask = np.zeros((300, 400), dtype=np.uint8)
+    mask[20:200, 30:250] = 1
+    mask[100:110, 100:110] = 0  # 400 m² hole, kept
+    mask[250:290, 300:390] = 1
+    noise = rng.random(mask.shape) < 0.02
+    mask[noise] = 1 - mask[noise]
+
+    path = tmp_path / "mask.tif"
+    with rasterio.open(path, "w", driver="GTiff", width=400, height=300, count=1, dtype="uint8",
+                       crs="EPSG:32633", transform=from_origin(500000, 4500000, 2, 2)) as dst:
+        dst.write(mask, 1)
+    return path
+
+
+def _polygons(path):
+    with open(path) as f:
+        return [shape(feature["geometry"]) for feature in json.load(f)["features"]]
+
+
+def test_speckle_is_removed_before_tracing(speckled_mask, tmp_path):
+    output = tmp_path / "footprint.geojson"
+    VectorProcessor(simplify_tolerance=0.5, min_area=100)._mask_to_polygon_python(
+        str(speckled_mask), str(output), "GeoJSON"
+    )
+
+    polygons = sorted(_polygons(output), key=lambda p: -p.area)
+    assert len(polygons) == 2
+    assert [len(p.interiors) for p in polygons] == [1, 0]
+    assert polygons[0].area == pytest.approx(39500 * 4, rel=0.01)
+
+
+def test_tiled_tracing_matches_single_tile(speckled_mask, tmp_path, monkeypatch):
+    processor = VectorProcessor(simplify_tolerance=0.5, min_area=100)
+    processor._mask_to_polygon_python(str(speckled_mask), str(tmp_path / "whole.geojson"), "GeoJSON")
+    monkeypatch.setattr(vector_operations, "VECTORIZE_TILE_SIZE", 37)
+    processor._mask_to_polygon_python(str(speckled_mask), str(tmp_path / "tiled.geojson"), "GeoJSON")
+
+    whole, tiled = _polygons(tmp_path / "whole.geojson"), _polygons(tmp_path / "tiled.geojson")
+    assert len(tiled) == len(whole)
+    assert sum(p.area for p in tiled) == pytest.approx(sum(p.area for p in whole), rel=1e-3)
@@ -0,0 +1,123 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+gdal = pytest.importorskip("osgeo.gdal")
+
+from app.processing.ndvi_processing import (
+    NDVI_NODATA,
+    NDVIProcessor,
+    compute_ndvi_block,
+    process_ndvi_batch,
+    region_ndvi_composite_path,
+)
+
+
+def _write_band(path, data, nodata=None):
+    ds = gdal.GetDriverByName("GTiff").Create(str(path), data.shape[1], data.shape[0], 1, gdal.GDT_UInt16)
+    ds.SetGeoTransform([500000, 10, 0, 4500000, 0, -10])
+    ds.SetProjection("EPSG:32633")
+    band = ds.GetRasterBand(1)
+    if nodata is not None:
+        band.SetNoDataValue(nodata)
+    band.WriteArray(data)
+    ds = None
+
+
+def test_block_handles_nodata_and_zero_denominator():
+    red = np.array([[0, 10], [3, 2]], dtype=np.uint16)
+    nir = np.array([[0, 30], [3, 0]], dtype=np.uint16)
+
+    ndvi = compute_ndvi_block(red, nir, nir_nodata=0)
+
+    assert ndvi.dtype == np.float32
+    assert ndvi[0, 0] == NDVI_NODATA
+    assert ndvi[0, 1] == pytest.approx(0.5)
+    assert ndvi[1, 0] == 0
+    assert ndvi[1, 1] == NDVI_NODATA
+
+
+def test_blockwise_ndvi_matches_full_scene(tmp_path):
+    # Not a multiple of the block size, so edge windows are exercised
+    rng = np.random.default_rng(0)
+    red = rng.integers(1, 10000, (700, 1100), dtype=np.uint16)
+    nir = rng.integers(1, 10000, (700, 1100), dtype=np.uint16)
+    _write_band(tmp_path / "red.tif", red)
+    _write_band(tmp_path / "nir.tif", nir)
+    output = tmp_path / "out" / "ndvi.tif"
+
+    assert NDVIProcessor().calculate_ndvi(str(tmp_path / "red.tif"), str(tmp_path / "nir.tif"), str(output))
+
+    ds = gdal.Open(str(output))
+    band = ds.GetRasterBand(1)
+    expected = (nir.astype(np.float64) - red) / (nir.astype(np.float64) + red)
+    np.testing.assert_allclose(band.ReadAsArray(), expected, atol=1e-6)
+    assert band.DataType == gdal.GDT_Float32
+    assert band.GetBlockSize() == [512, 512]
+    assert ds.GetMetadata("IMAGE_STRUCTURE").get("COMPRESSION") == "DEFLATE"
+    assert band.GetMetadataItem("STATISTICS_MEAN") is not None
+
+
+def test_composite_masks_clouds_and_reduces_per_pixel(tmp_path):
+    red = np.full((600, 600), 1000, dtype=np.uint16)
+    _write_band(tmp_path / "red.tif", red)
+    # Scene 1: NDVI 0.5 everywhere; scene 2: NDVI 0.8 but cloudy on the left half
+    _write_band(tmp_path / "nir1.tif", np.full_like(red, 3000))
+    _write_band(tmp_path / "nir2.tif", np.full_like(red, 9000))
+    scl = np.full_like(red, 4)
+    scl[:, :300] = 9
+    _write_band(tmp_path / "scl2.tif", scl)
+    scenes = [
+        {"red": str(tmp_path / "red.tif"), "nir": str(tmp_path / "nir1.tif")},
+        {"red": str(tmp_path / "red.tif"), "nir": str(tmp_path / "nir2.tif"), "scl": str(tmp_path / "scl2.tif")},
+    ]
+
+    output = tmp_path / "max.tif"
+    assert NDVIProcessor().composite_ndvi(scenes, str(output), "max")
+    ndvi = gdal.Open(str(output)).GetRasterBand(1).ReadAsArray()
+    np.testing.assert_allclose(ndvi[:, :300], 0.5, atol=1e-6)
+    np.testing.assert_allclose(ndvi[:, 300:], 0.8, atol=1e-6)
+
+    output = tmp_path / "median.tif"
+    assert NDVIProcessor().composite_ndvi(scenes, str(output), "median")
+    ndvi = gdal.Open(str(output)).GetRasterBand(1).ReadAsArray()
+    np.testing.assert_allclose(ndvi[:, :300], 0.5, atol=1e-6)
+    np.testing.assert_allclose(ndvi[:, 300:], 0.65, atol=1e-6)
+
+
+def test_batch_processes_pending_regions_once(tmp_path):
+    rng = np.random.default_rng(1)
+    for region in ("1.00S_50.00W", "2.00S_51.00W"):
+        sentinel2_dir = tmp_path / region / "sentinel2"
+        sentinel2_dir.mkdir(parents=True)
+        _write_band(sentinel2_dir / f"{region}_20250101_sentinel2_RED_B04.tif", rng.integers(1, 5000, (64, 64), dtype=np.uint16))
+        _write_band(sentinel2_dir / f"{region}_20250101_sentinel2_NIR_B08.tif", rng.integers(1, 5000, (64, 64), dtype=np.uint16))
+    (tmp_path / "no_bands" / "sentinel2").mkdir(parents=True)
+
+    updates = []
+    summary = process_ndvi_batch(str(tmp_path), max_workers=2, progress_callback=updates.append)
+    assert (summary["total_regions"], summary["processed"], summary["failed"]) == (2, 2, 0)
+    assert [u["completed"] for u in updates] == [1, 2]
+    assert all(Path(r["ndvi_path"]).exists() for r in summary["results"])
+
+    summary = process_ndvi_batch(str(tmp_path), max_workers=2)
+    assert (summary["skipped"], summary["processed"]) == (2, 0)
+
+
+def test_region_composite_replaces_single_scene_ndvi(tmp_path):
+    region = "3.10S_57.70W"
+    sentinel2_dir = tmp_path / region / "sentinel2"
+    sentinel2_dir.mkdir(parents=True)
+    _write_band(sentinel2_dir / f"{region}_20250101_sentinel2_RED_B04.tif", np.full((64, 64), 1000, dtype=np.uint16))
+    _write_band(sentinel2_dir / f"{region}_20250101_sentinel2_NIR_B08.tif", np.full((64, 64), 3000, dtype=np.uint16))
+    composite = region_ndvi_composite_path(sentinel2_dir, region, "20250301")
+    _write_band(composite, np.zeros((64, 64), dtype=np.uint16))
+
+    result = NDVIProcessor().process_region_ndvi(region, str(tmp_path))
+    assert result["composite"] and result["ndvi_path"] == str(composite)
+
+    summary = process_ndvi_batch(str(tmp_path), max_workers=1, force=True)
+    assert summary["processed"] == 1
+    assert summary["results"][0]["ndvi_path"] == str(composite)
+    assert not list(sentinel2_dir.glob("*_sentinel2_NDVI.tif"))
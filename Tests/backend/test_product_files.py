@@ -0,0 +1,67 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.endpoints import product_files
+from app.services.product_files import ProductFileIndex
+
+
+def make_client(tmp_path, monkeypatch):
+    index = ProductFileIndex(tmp_path)
+    monkeypatch.setattr(product_files, "get_product_file_index", lambda: index)
+    app = FastAPI()
+    app.include_router(product_files.router)
+    return TestClient(app), index
+
+
+def write_overlay(tmp_path):
+    png_dir = tmp_path / "region" / "lidar" / "png_outputs"
+    png_dir.mkdir(parents=True)
+    png_path = png_dir / "Hillshade.png"
+    png_path.write_bytes(bytes(range(256)) * 4)
+    return png_path
+
+
+def test_versioned_url_is_immutable_and_revalidates(tmp_path, monkeypatch):
+    client, index = make_client(tmp_path, monkeypatch)
+    png_path = write_overlay(tmp_path)
+
+    url = index.url_for(png_path)
+    assert url.startswith("/api/products/files/region/lidar/png_outputs/Hillshade.png?v=")
+
+    response = client.get(url)
+    assert response.status_code == 200
+    assert response.content == png_path.read_bytes()
+    assert response.headers["content-type"] == "image/png"
+    assert "immutable" in response.headers["cache-control"]
+
+    etag = response.headers["etag"]
+    not_modified = client.get(url, headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+
+
+def test_range_requests(tmp_path, monkeypatch):
+    client, index = make_client(tmp_path, monkeypatch)
+    png_path = write_overlay(tmp_path)
+    data = png_path.read_bytes()
+    path = "/api/products/files/region/lidar/png_outputs/Hillshade.png"
+
+    partial = client.get(path, headers={"Range": "bytes=10-19"})
+    assert partial.status_code == 206
+    assert partial.content == data[10:20]
+    assert partial.headers["content-range"] == f"bytes 10-19/{len(data)}"
+
+    suffix = client.get(path, headers={"Range": "bytes=-5"})
+    assert suffix.content == data[-5:]
+
+    unsatisfiable = client.get(path, headers={"Range": f"bytes={len(data)}-"})
+    assert unsatisfiable.status_code == 416
+
+
+def test_rejects_paths_outside_output(tmp_path, monkeypatch):
+    client, index = make_client(tmp_path / "output", monkeypatch)
+    (tmp_path / "secret.txt").write_text("nope")
+    (tmp_path / "output").mkdir()
+
+    assert client.get("/api/products/files/../secret.txt").status_code == 404
+    assert index.resolve("../secret.txt") is None
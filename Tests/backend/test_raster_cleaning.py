@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+rasterio = pytest.importorskip("rasterio")
+pytest.importorskip("pdal")  # imported by the app.processing package
+
+from rasterio.transform import from_origin
+
+from app.processing import raster_cleaning
+from app.processing.raster_cleaning import RasterCleaner
+
+
+def _write(path, data, transform):
+    data = data if data.ndim == 3 else data[None]
+    with rasterio.open(path, "w", driver="GTiff", width=data.shape[2], height=data.shape[1], count=data.shape[0],
+                       dtype=data.dtype, crs="EPSG:32633", transform=transform) as dst:
+        dst.write(data)
+
+
+def test_region_is_cleaned_blockwise_with_one_mask_load(tmp_path, monkeypatch):
+    mask = np.zeros((700, 900), dtype=np.uint8)
+    mask[100:600, 200:800] = 1
+    _write(tmp_path / "mask.tif", mask, from_origin(0, 700, 1, 1))
+
+    region = tmp_path / "lidar"
+    (region / "DTM").mkdir(parents=True)
+    (region / "Slope").mkdir()
+    _write(region / "DTM" / "tile_DTM.tif", np.full((700, 900), 5, dtype=np.float32), from_origin(0, 700, 1, 1))
+    # A coarser grid: the mask has to be resampled to it
+    _write(region / "Slope" / "tile_Slope.tif", np.full((3, 350, 450), 7, dtype=np.uint8), from_origin(0, 700, 2, 2))
+
+    loads = []
+    original_init = raster_cleaning.AlignedMask.__init__
+    monkeypatch.setattr(raster_cleaning.AlignedMask, "__init__",
+                        lambda self, path: loads.append(path) or original_init(self, path))
+
+    result = RasterCleaner(method="python").clean_region_rasters(str(region), str(tmp_path / "mask.tif"), ["DTM", "Slope"])
+
+    assert result["successful_count"] == 2
+    assert len(loads) == 1
+    with rasterio.open(region / "cleaned" / "tile_DTM_cleaned.tif") as src:
+        assert src.profile["tiled"]
+        np.testing.assert_array_equal(src.read(1), np.where(mask > 0, 5, 0))
+    with rasterio.open(region / "cleaned" / "tile_Slope_cleaned.tif") as src:
+        cleaned = src.read()
+    assert cleaned.shape == (3, 350, 450)
+    assert (cleaned[0] > 0).sum() == mask.sum() // 4
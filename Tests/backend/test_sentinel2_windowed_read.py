@@ -0,0 +1,79 @@
+import os
+import re
+import threading
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pytest
+
+gdal = pytest.importorskip("osgeo.gdal")
+pytest.importorskip("pystac_client")
+pytest.importorskip("planetary_computer")
+
+from app.data_acquisition.sources.sentinel2 import Sentinel2Source
+from app.data_acquisition.utils.coordinates import BoundingBox
+
+
+class RangeRequestHandler(SimpleHTTPRequestHandler):
+    """Static file handler with single-range support, recording bytes served."""
+
+    bytes_served = 0
+
+    def do_GET(self):
+        range_header = self.headers.get("Range")
+        path = self.translate_path(self.path.split("?", 1)[0])
+        if not range_header or not os.path.isfile(path):
+            return super().do_GET()
+
+        size = os.path.getsize(path)
+        start, end = re.match(r"bytes=(\d+)-(\d*)", range_header).groups()
+        start, end = int(start), min(int(end) if end else size - 1, size - 1)
+        with open(path, "rb") as f:
+            f.seek(start)
+            body = f.read(end - start + 1)
+        self.send_response(206)
+        self.send_header("Content-Type", "image/tiff")
+        self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Accept-Ranges", "bytes")
+        self.end_headers()
+        self.wfile.write(body)
+        type(self).bytes_served += len(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def _write_synthetic_cog(path):
+    # 10 m pixels in UTM 33N, 4096 x 4096 (about 41 km across), noise so it doesn't compress away
+    mem = gdal.GetDriverByName("MEM").Create("", 4096, 4096, 1, gdal.GDT_UInt16)
+    mem.SetGeoTransform([500000, 10, 0, 4500000, 0, -10])
+    mem.SetProjection("EPSG:32633")
+    rng = np.random.default_rng(0)
+    mem.GetRasterBand(1).WriteArray(rng.integers(0, 10000, (4096, 4096), dtype=np.uint16))
+    gdal.Translate(str(path), mem, format="COG", creationOptions=["BLOCKSIZE=512", "COMPRESS=DEFLATE"])
+
+
+def test_windowed_read_fetches_only_intersecting_blocks(tmp_path):
+    cog_path = tmp_path / "B04.tif"
+    _write_synthetic_cog(cog_path)
+
+    handler = partial(RangeRequestHandler, directory=str(tmp_path))
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        # A roughly 1 km box inside the synthetic tile (UTM 33N origin is at 15°E)
+        bbox = BoundingBox(west=15.10, south=40.500, east=15.112, north=40.509)
+        output_path = tmp_path / "Red.tif"
+        url = f"http://127.0.0.1:{server.server_address[1]}/B04.tif?sig=token"
+
+        Sentinel2Source()._read_cog_window_sync(url, output_path, bbox)
+    finally:
+        server.shutdown()
+
+    ds = gdal.Open(str(output_path))
+    assert 80 <= ds.RasterXSize <= 130
+    assert 80 <= ds.RasterYSize <= 130
+    assert RangeRequestHandler.bytes_served < cog_path.stat().st_size / 20
@@ -0,0 +1,67 @@
+import asyncio
+
+import pytest
+
+# Importing the data acquisition package pulls in the geospatial stack
+pytest.importorskip("geopandas")
+
+from app.data_acquisition.sources.base import DataResolution, DataType, DownloadRequest
+from app.data_acquisition.utils.coordinates import BoundingBox
+from app.data_acquisition.utils.single_flight import SingleFlight, request_flight_key
+
+
+def test_identical_requests_share_one_run_and_its_progress():
+    flights = SingleFlight()
+    runs = []
+    updates = {"a": [], "b": []}
+
+    async def work(callback):
+        runs.append(1)
+        await asyncio.sleep(0.05)
+        await callback({"type": "download_progress", "progress": 50})
+        return {"success": True}
+
+    def collector(name):
+        async def callback(update):
+            updates[name].append(update["type"])
+        return callback
+
+    async def scenario():
+        return await asyncio.gather(
+            flights.run("key", work, collector("a")),
+            flights.run("key", work, collector("b")),
+        )
+
+    first, second = asyncio.run(scenario())
+    assert first is second and len(runs) == 1
+    assert updates["a"] == ["download_progress"]
+    assert updates["b"] == ["acquisition_joined", "download_progress"]
+    assert not flights.in_flight("key")
+
+
+def test_shared_run_survives_one_caller_cancelling():
+    flights = SingleFlight()
+
+    async def work(callback):
+        await asyncio.sleep(0.1)
+        return "done"
+
+    async def scenario():
+        impatient = asyncio.create_task(flights.run("key", work))
+        patient = asyncio.create_task(flights.run("key", work))
+        await asyncio.sleep(0.01)
+        impatient.cancel()
+        return await patient
+
+    assert asyncio.run(scenario()) == "done"
+
+
+def test_flight_key_normalizes_bbox():
+    def request(west):
+        return DownloadRequest(
+            bbox=BoundingBox(west=west, south=-15.8, east=-47.8, north=-15.7),
+            data_type=DataType.ELEVATION, resolution=DataResolution.MEDIUM
+        )
+
+    assert request_flight_key("s", request(-47.9)) == request_flight_key("s", request(-47.9000000001))
+    assert request_flight_key("s", request(-47.9)) != request_flight_key("other", request(-47.9))
@@ -0,0 +1,58 @@
+import json
+import os
+import numpy as np
+import pytest
+gdal = pytest.importorskip('osgeo.gdal')
+osr = pytest.importorskip('osgeo.osr')
+from app.overlay_optimization import OverlayOptimizer, _downsample_2x, load_pyramid_manifest, select_pyramid_level
+
+
+def create_test_tiff(path, width, height):
+    driver = gdal.GetDriverByName('GTiff')
+    ds = driver.Create(path, width, height, 1, gdal.GDT_Float32)
+    ds.SetGeoTransform((500000, 1, 0, 4000000, 0, -1))
+    srs = osr.SpatialReference()
+    srs.ImportFromEPSG(32618)
+    ds.SetProjection(srs.ExportToWkt())
+    band = ds.GetRasterBand(1)
+    band.SetNoDataValue(-9999)
+    data = np.tile(np.arange(width, dtype=np.float32), (height, 1))
+    data[0, 0] = -9999
+    band.WriteArray(data)
+    ds = None
+
+
+def test_downsample_ignores_invalid_pixels():
+    data = np.arange(15, dtype=np.float32).reshape(3, 5)
+    valid = np.ones_like(data, dtype=bool)
+    valid[0, 0] = False
+    out, out_valid = _downsample_2x(data, valid)
+    assert out.shape == (2, 3)
+    assert out[0, 0] == pytest.approx((1 + 5 + 6) / 3)
+    assert out_valid.all()
+
+
+def test_generate_overlay_pyramid(tmp_path):
+    tiff_path = str(tmp_path / "region_LRM.tif")
+    create_test_tiff(tiff_path, 2000, 1200)
+
+    optimizer = OverlayOptimizer()
+    analysis = {'target_max_dim': 1024}
+    manifest = optimizer.generate_overlay_pyramid(tiff_path, analysis, str(tmp_path / "png_outputs"))
+    assert manifest
+
+    sizes = [(level['width'], level['height']) for level in manifest['levels']]
+    assert sizes == [(2000, 1200), (1000, 600), (500, 300), (250, 150)]
+    assert manifest['default_file'] == "region_LRM_overlays.png"
+    assert manifest['levels'][1]['file'] == "region_LRM_overlays.png"
+    # Only the default level sits in png_outputs; the rest and the manifest are in the pyramid subfolder
+    assert sorted(p.name for p in (tmp_path / "png_outputs").glob("*.png")) == ["region_LRM_overlays.png"]
+    assert (tmp_path / "png_outputs" / "overlay_pyramid" / "region_LRM_overlays_L0.png").exists()
+
+    with open(tmp_path / "png_outputs" / "overlay_pyramid" / "region_LRM_overlays.json") as f:
+        assert json.load(f)['levels'][0]['downsample'] == 1.0
+
+    loaded = load_pyramid_manifest(str(tmp_path / "png_outputs" / "region_LRM_overlays.png"))
+    assert all(os.path.exists(level['path']) for level in loaded['levels'])
+    assert select_pyramid_level(loaded, 600)['width'] == 1000
+    assert select_pyramid_level(loaded, 5000)['width'] == 2000
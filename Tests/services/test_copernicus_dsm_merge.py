@@ -0,0 +1,43 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+rasterio = pytest.importorskip("rasterio")
+from rasterio.transform import from_origin
+
+from app.services.copernicus_dsm_service import CopernicusDSMService
+
+
+def _write_tile(path, west, north, value):
+    # 1°x1° tile at 0.01° pixels
+    profile = {
+        "driver": "GTiff", "height": 100, "width": 100, "count": 1, "dtype": "float32",
+        "crs": "EPSG:4326", "transform": from_origin(west, north, 0.01, 0.01), "nodata": -9999.0,
+    }
+    with rasterio.open(path, "w", **profile) as dst:
+        dst.write(np.full((1, 100, 100), value, dtype=np.float32))
+
+
+def test_merge_crops_to_bbox_across_tile_corner(tmp_path, monkeypatch):
+    monkeypatch.setattr("app.services.copernicus_dsm_service.MERGE_STRIP_ROWS", 7)
+    tiles = []
+    for i, (west, north) in enumerate([(-48, -15), (-47, -15), (-48, -16), (-47, -16)]):
+        path = tmp_path / f"tile_{i}.tif"
+        _write_tile(path, west, north, i + 1)
+        tiles.append(str(path))
+
+    output = tmp_path / "dsm.tif"
+    bbox = [-47.2, -16.15, -46.85, -15.9]
+    asyncio.run(CopernicusDSMService()._merge_and_crop_tiles(tiles, bbox, output))
+
+    with rasterio.open(output) as src:
+        assert (src.width, src.height) == (35, 25)
+        assert src.bounds.left == pytest.approx(-47.2)
+        assert src.bounds.top == pytest.approx(-15.9)
+        data = src.read(1)
+
+    # Top rows come from the northern tiles, the left columns from the western ones
+    assert data[0, 0] == 1 and data[0, -1] == 2
+    assert data[-1, 0] == 3 and data[-1, -1] == 4
+    assert (data[:10, :20] == 1).all() and (data[10:, 20:] == 4).all()
@@ -0,0 +1,55 @@
+import asyncio
+import hashlib
+
+import pytest
+
+from app.services.dem_tile_store import DEMTileStore
+
+
+def test_concurrent_requests_fetch_a_tile_once_and_reuse_it(tmp_path):
+    store = DEMTileStore(tmp_path)
+    fetches = []
+
+    async def fetch(path):
+        fetches.append(path)
+        await asyncio.sleep(0.05)
+        path.write_bytes(b"tile-bytes")
+
+    async def scenario():
+        return await asyncio.gather(*[
+            store.get_or_fetch("cop-dem-glo-30", "S16_W048", "2021_1", fetch) for _ in range(3)
+        ])
+
+    tiles = asyncio.run(scenario())
+    assert len(fetches) == 1
+    assert {t.path for t in tiles} == {tiles[0].path}
+    assert tiles[0].path.read_bytes() == b"tile-bytes"
+    assert tiles[0].sha256 == hashlib.sha256(b"tile-bytes").hexdigest()
+
+    # A new store instance over the same directory is served from disk
+    again = asyncio.run(DEMTileStore(tmp_path).get_or_fetch("cop-dem-glo-30", "S16_W048", "2021_1", fetch))
+    assert again.path == tiles[0].path and len(fetches) == 1
+
+    # Truncated files are not served
+    tiles[0].path.write_bytes(b"tile")
+    assert store.get("cop-dem-glo-30", "S16_W048", "2021_1") is None
+
+
+def test_checksum_mismatch_and_size_eviction(tmp_path):
+    store = DEMTileStore(tmp_path, max_size_mb=2.5 / 1024)  # 2.5 KB
+
+    def writer(data):
+        async def fetch(path):
+            path.write_bytes(data)
+        return fetch
+
+    with pytest.raises(ValueError):
+        asyncio.run(store.get_or_fetch("p", "bad", "1", writer(b"x"), expected_sha256="0" * 64))
+    assert store.get("p", "bad", "1") is None
+    assert not list(tmp_path.rglob("*.part"))
+
+    for name in ("a", "b", "c"):
+        asyncio.run(store.get_or_fetch("p", name, "1", writer(b"x" * 1024)))
+    assert store.get("p", "a", "1") is None
+    assert store.get("p", "c", "1") is not None
+    assert store.get_stats()["tiles"] == 2
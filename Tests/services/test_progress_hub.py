@@ -0,0 +1,92 @@
+import asyncio
+import json
+
+from app.services.progress_hub import ProgressHub, coalesce_key, message_topics
+
+
+class FakeWebSocket:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.sent = []
+        self.closed = False
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text):
+        await asyncio.sleep(self.delay)
+        self.sent.append(json.loads(text))
+
+    async def close(self):
+        self.closed = True
+
+
+def test_message_topics_and_coalesce_key():
+    message = {"type": "download_progress", "download_id": "abc", "region_name": "r1", "band": "B04"}
+    assert message_topics(message) == {"download:abc", "region:r1"}
+    assert coalesce_key(message) == coalesce_key(dict(message, progress=80))
+    assert coalesce_key(message) != coalesce_key(dict(message, band="B08"))
+    assert coalesce_key({"type": "download_completed", "download_id": "abc"}) is None
+
+
+def test_subscriptions_filter_topics():
+    async def scenario():
+        hub = ProgressHub(heartbeat_interval=0)
+        everything, region_only = FakeWebSocket(), FakeWebSocket()
+        await hub.connect(everything)
+        await hub.connect(region_only)
+        hub.subscribe(region_only, ["region:r1"])
+
+        hub.publish({"type": "acquisition_started", "region_name": "r1"})
+        hub.publish({"type": "acquisition_started", "region_name": "r2"})
+        hub.publish({"type": "log", "message": "general"})
+        await asyncio.sleep(0.05)
+        return everything.sent, region_only.sent
+
+    everything, region_only = asyncio.run(scenario())
+    assert len(everything) == 3
+    assert [m.get("region_name") for m in region_only] == ["r1", None]
+
+
+def test_slow_subscriber_coalesces_without_blocking_others():
+    async def scenario():
+        hub = ProgressHub(heartbeat_interval=0)
+        fast, slow = FakeWebSocket(), FakeWebSocket(delay=0.2)
+        await hub.connect(fast)
+        await hub.connect(slow)
+
+        hub.publish({"type": "download_progress", "download_id": "d", "progress": 0})
+        await asyncio.sleep(0.01)  # slow socket is now busy sending the first update
+        for progress in range(1, 51):
+            hub.publish({"type": "download_progress", "download_id": "d", "progress": progress})
+        hub.publish({"type": "download_completed", "download_id": "d"})
+        await asyncio.sleep(0.05)
+        fast_sent, slow_sent_early = list(fast.sent), list(slow.sent)
+        await asyncio.sleep(0.6)
+        return fast_sent, slow_sent_early, slow.sent
+
+    fast_sent, slow_sent_early, slow_sent = asyncio.run(scenario())
+    # The fast client finished while the slow one was still sending its first message
+    assert fast_sent[-1]["type"] == "download_completed"
+    assert slow_sent_early == []
+    # The slow client only sees the latest progress value followed by completion
+    assert [m.get("progress") for m in slow_sent] == [0, 50, None]
+    assert slow_sent[-1]["type"] == "download_completed"
+
+
+def test_failed_socket_is_dropped():
+    class BrokenWebSocket(FakeWebSocket):
+        async def send_text(self, text):
+            raise RuntimeError("connection reset")
+
+    async def scenario():
+        hub = ProgressHub(heartbeat_interval=0)
+        broken = BrokenWebSocket()
+        await hub.connect(broken)
+        hub.publish({"type": "log", "message": "hello"})
+        await asyncio.sleep(0.01)
+        return hub, broken
+
+    hub, broken = asyncio.run(scenario())
+    assert hub.subscribers == {}
+    assert broken.closed
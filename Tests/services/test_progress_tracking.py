@@ -0,0 +1,45 @@
+import asyncio
+import threading
+
+from app.services.progress_tracking import ProgressTracker, StageTimingHistory
+
+
+def test_history_estimates_from_recorded_timings(tmp_path):
+    history = StageTimingHistory(tmp_path)
+    assert history.estimate("raster_slope", 4.0, product="slope") is None
+
+    history.record("raster_slope", 4.0, 2.0, product="slope")
+    history.record("raster_slope", 4.0, 4.0, product="slope")
+    assert history.estimate("raster_slope", 4.0, product="slope") == 3.0
+    # Unknown products fall back to the stage's other samples
+    assert history.estimate("raster_slope", 8.0, product="other") == 6.0
+
+
+def test_tracker_reports_eta_from_history_and_worker_threads(tmp_path):
+    history = StageTimingHistory(tmp_path)
+    history.record("pdal_read", 1000, 10.0, product="laz")
+    updates = []
+
+    async def callback(update):
+        updates.append(update)
+
+    async def scenario():
+        tracker = ProgressTracker(
+            callback, "pdal_read", total=1000, start=50, end=90,
+            product="laz", history=history, min_interval=0
+        )
+        assert 9.0 < tracker.eta_seconds <= 10.0
+
+        worker = threading.Thread(target=tracker.update, args=(500,))
+        worker.start()
+        worker.join()
+        await asyncio.sleep(0.01)
+        tracker.finish()
+        await asyncio.sleep(0.01)
+
+    asyncio.run(scenario())
+    assert [u["progress"] for u in updates] == [70, 90]
+    assert updates[0]["stage"] == "pdal_read"
+    assert updates[0]["eta_seconds"] is not None
+    # The fast finished run is recorded and pulls the estimate down
+    assert history.estimate("pdal_read", 1000, product="laz") < 10.0
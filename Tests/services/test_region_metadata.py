@@ -0,0 +1,74 @@
+import os
+from app.services.region_metadata import RegionMetadataStore, MetadataSection, parse_metadata_text
+
+
+LEGACY_METADATA = """# REQUESTED BOUNDS (WGS84 - EPSG:4326)
+# These bounds represent the REQUESTED AREA for LAZ acquisition
+North Bound: -9.5
+South Bound: -9.6
+East Bound: -36.1
+West Bound: -36.2
+# 
+# Additional Information
+Region Name: test_region
+Center Latitude: -9.55
+Center Longitude: -36.15
+NDVI Enabled: true
+"""
+
+
+def test_parse_legacy_metadata_text():
+    sections = parse_metadata_text(LEGACY_METADATA)
+    assert len(sections) == 2
+    assert sections[0].fields["North Bound"] == "-9.5"
+    assert "Additional Information" in sections[1].comments
+
+
+def test_load_legacy_metadata_txt(tmp_path):
+    region_dir = tmp_path / "test_region"
+    region_dir.mkdir()
+    (region_dir / "metadata.txt").write_text(LEGACY_METADATA)
+
+    store = RegionMetadataStore(tmp_path)
+    metadata = store.load("test_region")
+    assert metadata.bounds == {"north": -9.5, "south": -9.6, "east": -36.1, "west": -36.2}
+    assert metadata.center == {"lat": -9.55, "lng": -36.15}
+    assert metadata.ndvi_enabled is True
+    # Unchanged files are served from the in-process cache
+    assert store.load(str(region_dir / "metadata.txt")) is metadata
+
+
+def test_save_writes_json_and_text(tmp_path):
+    store = RegionMetadataStore(tmp_path)
+    store.save("saved", [
+        MetadataSection(comments=["Region Metadata"], fields={
+            "Center Lat": 1.5,
+            "Center Lng": 2.5,
+            "NDVI Enabled": False,
+            "Source CRS": None,
+        }),
+    ])
+
+    assert (tmp_path / "saved" / "metadata.json").exists()
+    text = (tmp_path / "saved" / "metadata.txt").read_text()
+    assert "# Region Metadata" in text
+    assert "NDVI Enabled: false" in text
+    assert "Source CRS: N/A" in text
+
+    reloaded = RegionMetadataStore(tmp_path).load("saved")
+    assert reloaded.center == {"lat": 1.5, "lng": 2.5}
+    assert reloaded.ndvi_enabled is False
+    assert reloaded.bounds is None
+
+
+def test_newer_text_edit_invalidates_cache(tmp_path):
+    store = RegionMetadataStore(tmp_path)
+    store.save("edited", [MetadataSection(fields={"Center Latitude": 1.0, "Center Longitude": 2.0})])
+    assert store.load("edited").center == {"lat": 1.0, "lng": 2.0}
+
+    txt_path = tmp_path / "edited" / "metadata.txt"
+    txt_path.write_text("Center Latitude: 3.0\nCenter Longitude: 4.0\n")
+    json_mtime = os.stat(tmp_path / "edited" / "metadata.json").st_mtime_ns
+    os.utime(txt_path, ns=(json_mtime + 1_000_000_000, json_mtime + 1_000_000_000))
+
+    assert store.load("edited").center == {"lat": 3.0, "lng": 4.0}
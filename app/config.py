@@ -46,7 +46,24 @@ class Settings(BaseSettings):
     default_buffer_km: float = 12.5
     max_file_size_mb: float = 500.0
     cache_expiry_days: int = 30
+    # Acquisition cache budgets: entries expire after the TTL and the least
+    # recently used ones are evicted beyond the size or entry limits
+    cache_entry_ttl_hours: float = 24.0
+    cache_max_size_mb: float = 10240.0
+    cache_max_entries: int = 50000
+    # Shared store of downloaded DEM source tiles (e.g. Copernicus 1° tiles)
+    dem_tile_store_dir: str = "data/dem_tiles"
+    dem_tile_store_max_mb: float = 20480.0
+    # COPC copies of LAZ sources used as spatial indexes for repeated crops
+    copc_index_dir: str = "data/copc_index"
+    copc_index_max_mb: float = 20480.0
     max_concurrent_downloads: int = 3
+    # Number of Sentinel-2 scenes reduced into a cloud-masked NDVI composite
+    # ("max" or "median" per pixel); 1 downloads the single best scene only
+    sentinel2_composite_scenes: int = 4
+    sentinel2_composite_method: str = "max"
+    # Per-source overrides for simultaneous asset downloads (defaults to max_concurrent_downloads)
+    source_download_concurrency: dict = {}
     
     # Data source priorities (higher number = higher priority)
     source_priorities: dict = {
@@ -14,6 +14,8 @@ import matplotlib.colors as mcolors
 from mpl_toolkits.axes_grid1 import make_axes_locatable
 from PIL import Image
 
+from app.services.region_metadata import get_region_metadata_store
+
 logger = logging.getLogger(__name__)
 
 # Configure GDAL to prevent auxiliary file creation for PNG files
@@ -49,29 +51,16 @@ def create_wgs84_world_file(original_world_file: str, tiff_path: str, png_path:
             print(f"❌ Could not extract region name from path: {tiff_path}")
             return False
             
-        # Read metadata.txt for original request bounds
-        metadata_path = os.path.join("output", region_name, "metadata.txt")
-        if not os.path.exists(metadata_path):
-            print(f"❌ No metadata.txt found at: {metadata_path}")
+        # Read original request bounds from the region metadata store
+        metadata = get_region_metadata_store().load(region_name)
+        if metadata is None:
+            print(f"❌ No metadata found for region: {region_name}")
             return False
             
-        print(f"📄 Reading original request bounds from: {metadata_path}")
-        
-        # Parse metadata.txt for bounds
-        bounds = {}
-        with open(metadata_path, 'r') as f:
-            for line in f:
-                line = line.strip()
-                if 'North Bound:' in line:
-                    bounds['north'] = float(line.split(':')[1].strip())
-                elif 'South Bound:' in line:
-                    bounds['south'] = float(line.split(':')[1].strip())
-                elif 'East Bound:' in line:
-                    bounds['east'] = float(line.split(':')[1].strip())
-                elif 'West Bound:' in line:
-                    bounds['west'] = float(line.split(':')[1].strip())
-        
-        if len(bounds) != 4:
+        print(f"📄 Using original request bounds from: {metadata.region_dir}")
+        
+        bounds = metadata.bounds
+        if not bounds:
             print(f"❌ Could not parse all bounds from metadata.txt")
             return False
             
@@ -418,6 +407,23 @@ def convert_geotiff_to_png_base64(
             except OSError as e_remove:
                 logger.warning(f"Could not remove temporary PNG or worldfile for {temp_png_path}: {e_remove}")
 
+def ndvi_png_name(ndvi_tif_path: Path) -> str:
+    """Gallery PNG name of an NDVI GeoTIFF; composites get the single-scene name so they replace it in the gallery."""
+    name = Path(ndvi_tif_path).stem
+    if name.endswith("_NDVI_composite"):
+        name = name[:-len("_composite")]
+    return f"{name}.png"
+
+def convert_ndvi_composite_to_png(composite_path: str, region_name: str) -> Optional[str]:
+    """Render a region's NDVI composite into its png_outputs gallery folder."""
+    try:
+        png_outputs_dir = Path("output") / region_name / "lidar" / "png_outputs"
+        png_outputs_dir.mkdir(parents=True, exist_ok=True)
+        return convert_geotiff_to_png(composite_path, str(png_outputs_dir / ndvi_png_name(composite_path)))
+    except Exception as e:
+        logger.error(f"NDVI composite PNG conversion failed for {composite_path}: {e}", exc_info=True)
+        return None
+
 def convert_sentinel2_to_png(data_dir: str, region_name: str) -> dict:
     print(f"\n🛰️ SENTINEL-2 TO PNG: Starting conversion")
     logger.info(f"Starting Sentinel-2 to PNG conversion for region {region_name} in {data_dir}")
@@ -501,12 +507,20 @@ def convert_sentinel2_to_png(data_dir: str, region_name: str) -> dict:
                 if ndvi_enabled:
                     print(f"🌱 NDVI is enabled - proceeding with NDVI calculation for {region_name}")
                     from .processing.ndvi_processing import NDVIProcessor
-                    ndvi_tif_path = output_dir / f"{latest_tif.stem}_NDVI.tif"
-                    if NDVIProcessor().calculate_ndvi(extracted_band_paths["RED_B04"], extracted_band_paths["NIR_B08"], str(ndvi_tif_path)) and os.path.exists(ndvi_tif_path):
+                    processor = NDVIProcessor()
+                    # A multi-scene composite replaces the single-scene NDVI of the newest download
+                    composite_path = processor.find_ndvi_composite(str(output_dir.parent))
+                    if composite_path:
+                        ndvi_tif_path = Path(composite_path)
+                        ndvi_ready = True
+                    else:
+                        ndvi_tif_path = output_dir / f"{latest_tif.stem}_NDVI.tif"
+                        ndvi_ready = processor.calculate_ndvi(extracted_band_paths["RED_B04"], extracted_band_paths["NIR_B08"], str(ndvi_tif_path))
+                    if ndvi_ready and os.path.exists(ndvi_tif_path):
                         # Create NDVI PNG in png_outputs directory for consistency
                         png_outputs_dir = Path("output") / region_name / "lidar" / "png_outputs"
                         png_outputs_dir.mkdir(parents=True, exist_ok=True)
-                        ndvi_png_path = png_outputs_dir / f"{latest_tif.stem}_NDVI.png"
+                        ndvi_png_path = png_outputs_dir / ndvi_png_name(ndvi_tif_path)
                         
                         actual_ndvi_png = convert_geotiff_to_png(str(ndvi_tif_path), str(ndvi_png_path))
                         if os.path.exists(actual_ndvi_png):
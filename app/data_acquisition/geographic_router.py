@@ -1,8 +1,10 @@
 """Geographic routing system for automatic data source selection."""
 
+import asyncio
 from typing import List, Optional, Dict, Any
 from dataclasses import dataclass
 from enum import Enum
+import logging
 
 from .sources import (
     OpenTopographySource, 
@@ -12,6 +14,8 @@ from .sources import (
 from .sources.base import DownloadRequest, DownloadResult, DataType
 from .utils.coordinates import BoundingBox
 
+logger = logging.getLogger(__name__)
+
 
 class GeographicRegion(Enum):
     """Geographic regions for data source routing."""
@@ -35,9 +39,15 @@ class RegionBounds:
 class GeographicRouter:
     """Routes data requests to optimal sources based on geographic location."""
     
-    def __init__(self, api_key: Optional[str] = None, cache_dir: str = "data/cache"):
+    def __init__(self, api_key: Optional[str] = None, cache_dir: str = "data/cache",
+                 probe_timeout: float = 30.0, eager_download: bool = True):
         self.api_key = api_key
         self.cache_dir = cache_dir
+        # Availability checks that take longer than this count as unavailable
+        self.probe_timeout = probe_timeout
+        # Start downloading from the best available source without waiting
+        # for the lower-priority probes to finish
+        self.eager_download = eager_download
         
         # Initialize data sources
         self.sources = {
@@ -122,8 +132,42 @@ class GeographicRouter:
         # Ultimate fallback - try all available sources
         return list(self.sources.keys())
     
+    async def _probe(self, source_name: str, request: DownloadRequest) -> bool:
+        """Check one source's availability, treating errors and timeouts as unavailable."""
+        try:
+            return bool(await asyncio.wait_for(
+                self.sources[source_name].check_availability(request), self.probe_timeout
+            ))
+        except asyncio.TimeoutError:
+            logger.warning(f"{source_name} availability check timed out after {self.probe_timeout}s")
+            return False
+        except Exception as e:
+            logger.warning(f"{source_name} availability check failed: {e}")
+            return False
+    
+    def _start_probes(self, source_names: List[str], request: DownloadRequest) -> Dict[str, asyncio.Task]:
+        """Start availability checks for all known sources at once."""
+        return {
+            name: asyncio.create_task(self._probe(name, request))
+            for name in source_names if name in self.sources
+        }
+    
+    @staticmethod
+    async def _cancel_probes(probes: Dict[str, asyncio.Task]):
+        pending = [task for task in probes.values() if not task.done()]
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+    
     async def download_with_routing(self, request: DownloadRequest, progress_callback=None) -> DownloadResult:
-        """Download data using geographic routing to optimal sources."""
+        """Download data using geographic routing to optimal sources.
+        
+        All candidate sources are probed concurrently. Sources are tried in
+        priority order as soon as every higher-priority probe has answered, so
+        a download can start while lower-priority probes are still running;
+        those are kept as fallbacks and cancelled once a download succeeds.
+        """
         
         # Get optimal sources in priority order
         source_names = self.get_optimal_sources(request.bbox, request.data_type)
@@ -138,74 +182,83 @@ class GeographicRouter:
             })
         
         last_error = None
+        probes = self._start_probes(source_names, request)
         
-        # Try each source in priority order
-        for i, source_name in enumerate(source_names):
-            if source_name not in self.sources:
-                continue
-                
-            source = self.sources[source_name]
+        try:
+            if not self.eager_download and probes:
+                await asyncio.gather(*probes.values())
             
-            try:
-                # Check availability first
-                if not await source.check_availability(request):
-                    if progress_callback:
-                        await progress_callback({
-                            "type": "source_unavailable",
-                            "source": source_name,
-                            "message": f"{source_name} not available for this area"
-                        })
+            # Try each source in priority order
+            for i, source_name in enumerate(source_names):
+                if source_name not in probes:
                     continue
+                    
+                source = self.sources[source_name]
                 
-                if progress_callback:
-                    await progress_callback({
-                        "type": "source_selected",
-                        "source": source_name,
-                        "priority": i + 1,
-                        "message": f"Trying {source_name} (priority {i + 1})"
-                    })
-                
-                # Attempt download
-                result = await source.download(request, progress_callback)
-                
-                if result.success:
-                    # Add routing metadata
-                    if result.metadata is None:
-                        result.metadata = {}
-                    result.metadata.update({
-                        "routing_region": region.value,
-                        "selected_source": source_name,
-                        "source_priority": i + 1,
-                        "tried_sources": source_names[:i+1]
-                    })
+                try:
+                    # Wait for this source's probe; lower-priority probes keep running
+                    if not await probes[source_name]:
+                        if progress_callback:
+                            await progress_callback({
+                                "type": "source_unavailable",
+                                "source": source_name,
+                                "message": f"{source_name} not available for this area"
+                            })
+                        continue
                     
                     if progress_callback:
                         await progress_callback({
-                            "type": "routing_success",
+                            "type": "source_selected",
                             "source": source_name,
-                            "message": f"Successfully downloaded from {source_name}"
+                            "priority": i + 1,
+                            "message": f"Trying {source_name} (priority {i + 1})"
                         })
                     
-                    return result
-                else:
-                    last_error = result.error_message
+                    # Attempt download
+                    result = await source.download(request, progress_callback)
+                    
+                    if result.success:
+                        await self._cancel_probes(probes)
+                        
+                        # Add routing metadata
+                        if result.metadata is None:
+                            result.metadata = {}
+                        result.metadata.update({
+                            "routing_region": region.value,
+                            "selected_source": source_name,
+                            "source_priority": i + 1,
+                            "tried_sources": source_names[:i+1]
+                        })
+                        
+                        if progress_callback:
+                            await progress_callback({
+                                "type": "routing_success",
+                                "source": source_name,
+                                "message": f"Successfully downloaded from {source_name}"
+                            })
+                        
+                        return result
+                    else:
+                        last_error = result.error_message
+                        if progress_callback:
+                            await progress_callback({
+                                "type": "source_failed",
+                                "source": source_name,
+                                "error": result.error_message,
+                                "message": f"{source_name} failed: {result.error_message}"
+                            })
+                        
+                except Exception as e:
+                    last_error = str(e)
                     if progress_callback:
                         await progress_callback({
-                            "type": "source_failed",
+                            "type": "source_error",
                             "source": source_name,
-                            "error": result.error_message,
-                            "message": f"{source_name} failed: {result.error_message}"
+                            "error": str(e),
+                            "message": f"{source_name} error: {str(e)}"
                         })
-                    
-            except Exception as e:
-                last_error = str(e)
-                if progress_callback:
-                    await progress_callback({
-                        "type": "source_error",
-                        "source": source_name,
-                        "error": str(e),
-                        "message": f"{source_name} error: {str(e)}"
-                    })
+        finally:
+            await self._cancel_probes(probes)
         
         # All sources failed
         return DownloadResult(
@@ -219,21 +272,16 @@ class GeographicRouter:
         )
     
     async def check_availability_all(self, request: DownloadRequest) -> Dict[str, bool]:
-        """Check availability across all relevant sources."""
+        """Check availability across all relevant sources concurrently."""
         source_names = self.get_optimal_sources(request.bbox, request.data_type)
-        availability = {}
+        probes = self._start_probes(source_names, request)
         
-        for source_name in source_names:
-            if source_name in self.sources:
-                try:
-                    available = await self.sources[source_name].check_availability(request)
-                    availability[source_name] = available
-                except Exception:
-                    availability[source_name] = False
-            else:
-                availability[source_name] = False
+        try:
+            results = dict(zip(probes, await asyncio.gather(*probes.values())))
+        finally:
+            await self._cancel_probes(probes)
         
-        return availability
+        return {name: results.get(name, False) for name in source_names}
     
     def get_region_info(self, bbox: BoundingBox) -> Dict[str, Any]:
         """Get detailed information about the detected region."""
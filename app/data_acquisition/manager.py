@@ -20,6 +20,8 @@ from .sources.brazilian_elevation import BrazilianElevationSource
 from .utils.coordinates import CoordinateValidator, CoordinateConverter
 from .utils.cache import DataCache
 from .utils.file_manager import FileManager
+from .utils.single_flight import SingleFlight, request_flight_key
+from ..services.region_metadata import get_region_metadata_store, MetadataSection
 from .utils.errors import (
     DataAcquisitionError, CoordinateError, DataNotAvailableError,
     setup_logging, log_error, log_acquisition_attempt, log_acquisition_success,
@@ -97,8 +99,15 @@ class DataAcquisitionManager:
         # Initialize components
         self.coordinate_validator = CoordinateValidator()
         self.coordinate_converter = CoordinateConverter()
-        self.cache = DataCache(cache_dir)
+        self.cache = DataCache(
+            cache_dir,
+            ttl_hours=getattr(settings, 'cache_entry_ttl_hours', 24.0),
+            max_size_mb=getattr(settings, 'cache_max_size_mb', None),
+            max_entries=getattr(settings, 'cache_max_entries', None)
+        )
         self.file_manager = FileManager(output_dir)
+        # Identical concurrent requests share one download
+        self._flights = SingleFlight()
         
         # Initialize data sources with API keys from settings
         self.sources = {}
@@ -416,74 +425,77 @@ class DataAcquisitionManager:
                 output_format="tiff"
             )
         
-        try:
-            # Use the new source interface with progress callback
-            download_result = await source.download(request, progress_callback=progress_callback)
+        async def fetch(progress_callback):
+            try:
+                # Use the new source interface with progress callback
+                download_result = await source.download(request, progress_callback=progress_callback)
             
-            if download_result.success:
-                # Determine file type based on data type
-                if request.data_type == DataType.LAZ:
-                    file_type = 'laz'
-                elif request.data_type == DataType.ELEVATION:
-                    file_type = 'elevation'
-                else:
-                    file_type = 'imagery'
+                if download_result.success:
+                    # Determine file type based on data type
+                    if request.data_type == DataType.LAZ:
+                        file_type = 'laz'
+                    elif request.data_type == DataType.ELEVATION:
+                        file_type = 'elevation'
+                    else:
+                        file_type = 'imagery'
                 
-                result = {
-                    'success': True,
-                    'files': {file_type: download_result.file_path},
-                    'metadata': download_result.metadata or {},
-                    'size_mb': download_result.file_size_mb
-                }
+                    result = {
+                        'success': True,
+                        'files': {file_type: download_result.file_path},
+                        'metadata': download_result.metadata or {},
+                        'size_mb': download_result.file_size_mb
+                    }
                 
-                # Cache the result
-                self.cache.put(cache_key, result)
+                    # Cache the result
+                    self.cache.put(cache_key, result)
                 
-                if progress_callback:
-                    await progress_callback({
-                        "type": "acquisition_completed",
-                        "message": f"Data acquisition completed from {source_name}",
-                        "source": source_name,
-                        "progress": 100,
-                        "file_size_mb": download_result.file_size_mb
-                    })
+                    if progress_callback:
+                        await progress_callback({
+                            "type": "acquisition_completed",
+                            "message": f"Data acquisition completed from {source_name}",
+                            "source": source_name,
+                            "progress": 100,
+                            "file_size_mb": download_result.file_size_mb
+                        })
                 
-                return result
-            else:
+                    return result
+                else:
+                    if progress_callback:
+                        await progress_callback({
+                            "type": "acquisition_error",
+                            "message": f"Download failed from {source_name}: {download_result.error_message}",
+                            "source": source_name,
+                            "error": download_result.error_message
+                        })
+                
+                    return {
+                        'success': False,
+                        'error': download_result.error_message,
+                        'files': {},
+                        'metadata': {},
+                        'size_mb': 0.0
+                    }
+                
+            except Exception as e:
+                logger.error(f"Error acquiring data from {source_name}: {e}")
+            
                 if progress_callback:
                     await progress_callback({
                         "type": "acquisition_error",
-                        "message": f"Download failed from {source_name}: {download_result.error_message}",
+                        "message": f"Error acquiring data from {source_name}: {str(e)}",
                         "source": source_name,
-                        "error": download_result.error_message
+                        "error": str(e)
                     })
-                
+            
                 return {
                     'success': False,
-                    'error': download_result.error_message,
+                    'error': str(e),
                     'files': {},
                     'metadata': {},
                     'size_mb': 0.0
                 }
-                
-        except Exception as e:
-            logger.error(f"Error acquiring data from {source_name}: {e}")
-            
-            if progress_callback:
-                await progress_callback({
-                    "type": "acquisition_error",
-                    "message": f"Error acquiring data from {source_name}: {str(e)}",
-                    "source": source_name,
-                    "error": str(e)
-                })
-            
-            return {
-                'success': False,
-                'error': str(e),
-                'files': {},
-                'metadata': {},
-                'size_mb': 0.0
-            }
+        
+        return await self._flights.run(request_flight_key(source_name, request), fetch, progress_callback)
     
     def estimate_download_size(self, lat: float, lng: float, buffer_km: float = 12.5) -> Dict[str, float]:
         """
@@ -542,6 +554,9 @@ class DataAcquisitionManager:
         """
         Download LiDAR data for a specific location
         
+        Concurrent calls for the same location and output folder share a
+        single download instead of writing the same files twice.
+        
         Args:
             lat: Latitude in decimal degrees
             lng: Longitude in decimal degrees
@@ -552,11 +567,21 @@ class DataAcquisitionManager:
         Returns:
             AcquisitionResult with information about acquired LiDAR data
         """
-        from .sources.base import DownloadRequest, DataType, DataResolution
-        
         if output_dir is None:
             output_dir = self.output_dir
         
+        key = ("lidar", round(lat, 6), round(lng, 6), float(buffer_km), str(Path(output_dir).resolve()))
+        
+        async def fetch(progress_callback):
+            return await self._download_lidar_data(lat, lng, buffer_km, output_dir, progress_callback)
+        
+        return await self._flights.run(key, fetch, progress_callback)
+    
+    async def _download_lidar_data(self, lat: float, lng: float, buffer_km: float,
+                                   output_dir: str, progress_callback=None) -> AcquisitionResult:
+        """Download LiDAR data for a specific location (see download_lidar_data)"""
+        from .sources.base import DownloadRequest, DataType, DataResolution
+        
         # Create simplified coordinate-based region name (e.g. 12.53S_53.02W)
         lat_dir = 'S' if lat < 0 else 'N'
         lng_dir = 'W' if lng < 0 else 'E'
@@ -585,18 +610,25 @@ class DataAcquisitionManager:
         
         # ✅ IMMEDIATE BOUNDS SAVING - Create metadata.txt with requested bounds immediately
         metadata_path = region_dir / "metadata.txt"
-        with open(metadata_path, 'w') as f:
-            f.write(f"# REQUESTED BOUNDS (WGS84 - EPSG:4326)\n")
-            f.write(f"# These bounds represent the REQUESTED AREA for LAZ acquisition\n")
-            f.write(f"North Bound: {bbox.north}\n")
-            f.write(f"South Bound: {bbox.south}\n") 
-            f.write(f"East Bound: {bbox.east}\n")
-            f.write(f"West Bound: {bbox.west}\n")
-            f.write(f"Center Lat: {lat}\n")
-            f.write(f"Center Lng: {lng}\n")
-            f.write(f"Buffer (km): {buffer_km}\n")
-            f.write(f"Data Type: LAZ (LiDAR point cloud)\n")
-            f.write(f"# Generated by DataAcquisitionManager.download_lidar_data()\n")
+        get_region_metadata_store().save(region_dir, [
+            MetadataSection(
+                comments=[
+                    "REQUESTED BOUNDS (WGS84 - EPSG:4326)",
+                    "These bounds represent the REQUESTED AREA for LAZ acquisition",
+                ],
+                fields={
+                    "North Bound": bbox.north,
+                    "South Bound": bbox.south,
+                    "East Bound": bbox.east,
+                    "West Bound": bbox.west,
+                    "Center Lat": lat,
+                    "Center Lng": lng,
+                    "Buffer (km)": buffer_km,
+                    "Data Type": "LAZ (LiDAR point cloud)",
+                },
+            ),
+            MetadataSection(comments=["Generated by DataAcquisitionManager.download_lidar_data()"]),
+        ])
         logger.info(f"Created immediate metadata.txt with requested bounds at: {metadata_path}")
         
         # Download from USGS 3DEP first (if available)
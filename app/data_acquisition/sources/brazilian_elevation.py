@@ -11,7 +11,7 @@ import os
 from enum import Enum
 from dataclasses import dataclass
 
-import requests
+import aiohttp
 import geopandas as gpd
 from shapely.geometry import Point, Polygon
 
@@ -20,6 +20,8 @@ from .base import (
     DownloadRequest, DownloadResult
 )
 from ..utils.coordinates import BoundingBox
+from ..utils.errors import NetworkError
+from ..utils.http import get_http_client
 
 
 class TerrainType(Enum):
@@ -421,12 +423,18 @@ class BrazilianElevationSource(BaseDataSource):
                     "progress": 40
                 })
             
-            response = requests.get(self.OPENTOPO_BASE_URL, params=params, auth=auth, timeout=300)
+            response = await get_http_client().get(
+                self.OPENTOPO_BASE_URL,
+                params={key: str(value) for key, value in params.items()},
+                auth=aiohttp.BasicAuth(*auth) if auth else None,
+                timeout=aiohttp.ClientTimeout(total=300),
+                raise_for_status=False
+            )
             
             # Check if response contains valid elevation data
             # OpenTopography returns GeoTIFF files which may have various content-types
             is_valid_response = (
-                response.status_code == 200 and (
+                response.status == 200 and (
                     response.headers.get('content-type', '').startswith('image/') or
                     response.headers.get('content-type', '').startswith('application/') or
                     # Check for GeoTIFF file signature in the response content
@@ -440,8 +448,10 @@ class BrazilianElevationSource(BaseDataSource):
                 # Success! Save the file
                 cache_path.parent.mkdir(parents=True, exist_ok=True)
                 
-                with open(cache_path, 'wb') as f:
+                part_path = cache_path.with_name(cache_path.name + ".part")
+                with open(part_path, 'wb') as f:
                     f.write(response.content)
+                os.replace(part_path, cache_path)
                 
                 file_size = cache_path.stat().st_size / (1024 * 1024)
                 
@@ -487,16 +497,21 @@ class BrazilianElevationSource(BaseDataSource):
                     }
                 )
             else:
-                error_text = response.text[:500] if response.text else f"HTTP {response.status_code}"
+                error_text = response.text[:500] if response.text else f"HTTP {response.status}"
                 return DownloadResult(
                     success=False,
                     error_message=f"{dataset_type.value} API request failed: {error_text}"
                 )
                 
-        except requests.exceptions.Timeout:
+        except NetworkError as e:
+            if isinstance(e.__cause__, asyncio.TimeoutError):
+                return DownloadResult(
+                    success=False,
+                    error_message=f"{dataset_type.value} request timeout - try again later"
+                )
             return DownloadResult(
                 success=False,
-                error_message=f"{dataset_type.value} request timeout - try again later"
+                error_message=f"{dataset_type.value} request failed: {str(e)}"
             )
         except Exception as e:
             return DownloadResult(
@@ -522,9 +537,9 @@ class BrazilianElevationSource(BaseDataSource):
             
             # Get elevation for center point
             url = f"https://api.open-elevation.com/api/v1/lookup?locations={center_lat},{center_lng}"
-            response = requests.get(url, timeout=30)
+            response = await get_http_client().get(url, timeout=aiohttp.ClientTimeout(total=30), raise_for_status=False)
             
-            if response.status_code == 200:
+            if response.status == 200:
                 data = response.json()
                 if data.get('results'):
                     elevation = data['results'][0]['elevation']
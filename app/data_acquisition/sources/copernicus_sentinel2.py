@@ -9,19 +9,15 @@ import os
 import json
 import math
 import asyncio
-import aiohttp
 import aiofiles
 import logging
 from datetime import datetime, timedelta
 from typing import Optional, Callable, Dict, Any, List
 from pathlib import Path
 
-# OAuth2 imports for CDSE authentication
-from oauthlib.oauth2 import BackendApplicationClient
-from requests_oauthlib import OAuth2Session
-
 from .base import BaseDataSource, DownloadRequest, DownloadResult, DataType, DataSourceCapability, DataResolution
 from ..utils.coordinates import BoundingBox
+from ..utils.http import get_http_client
 
 logger = logging.getLogger(__name__)
 
@@ -30,6 +26,8 @@ class CopernicusSentinel2Source(BaseDataSource):
     Sentinel-2 data source using Copernicus Data Space Ecosystem
     """
     
+    TOKEN_URL = "https://identity.dataspace.copernicus.eu/auth/realms/CDSE/protocol/openid-connect/token"
+    
     def __init__(self, 
                  token: Optional[str] = None,
                  client_id: Optional[str] = None,
@@ -56,7 +54,7 @@ class CopernicusSentinel2Source(BaseDataSource):
         self.progress_callback = progress_callback
         
         # OAuth2 authentication setup
-        self.oauth_session = None
+        self.oauth_token = None
         self.token_expires_at = None
         
         # Session for HTTP requests (for async operations)
@@ -66,10 +64,7 @@ class CopernicusSentinel2Source(BaseDataSource):
         self.is_cancelled = False
         self.current_task = None
         
-        # Initialize OAuth2 session if credentials are available
-        if self.client_id and self.client_secret:
-            self._initialize_oauth_session()
-        elif not self.legacy_token:
+        if not (self.client_id and self.client_secret) and not self.legacy_token:
             logger.warning("No CDSE credentials found. Set CDSE_CLIENT_ID/CDSE_CLIENT_SECRET or CDSE_TOKEN environment variables.")
     
     @property
@@ -97,10 +92,9 @@ class CopernicusSentinel2Source(BaseDataSource):
         return min(estimated_mb, 100.0)  # Cap at 100MB due to processing limitations
     
     async def _get_session(self):
-        """Get or create aiohttp session"""
-        if self.session is None:
-            timeout = aiohttp.ClientTimeout(total=300)  # 5 minute timeout
-            self.session = aiohttp.ClientSession(timeout=timeout)
+        """Get the shared pooled aiohttp session"""
+        if self.session is None or self.session.closed:
+            self.session = await get_http_client().session()
         return self.session
     
     async def __aenter__(self):
@@ -113,43 +107,27 @@ class CopernicusSentinel2Source(BaseDataSource):
         await self.close()
     
     async def close(self):
-        """Close the HTTP session and clean up resources"""
-        if self.session:
-            await self.session.close()
-            self.session = None
+        """Release the HTTP session (the pooled connections stay open for other sources)"""
+        self.session = None
         logger.info("CopernicusSentinel2Source closed")
     
-    def _initialize_oauth_session(self):
-        """Initialize OAuth2 session for client credentials flow"""
-        try:
-            client = BackendApplicationClient(client_id=self.client_id)
-            self.oauth_session = OAuth2Session(client=client)
-            logger.info("OAuth2 session initialized successfully")
-        except Exception as e:
-            logger.error(f"Failed to initialize OAuth2 session: {e}")
-            self.oauth_session = None
-    
     async def _authenticate_oauth2_async(self) -> Optional[str]:
         """Authenticate using OAuth2 client credentials (async version)"""
-        if not self.oauth_session:
-            logger.error("OAuth2 session not initialized")
+        if not (self.client_id and self.client_secret):
+            logger.error("OAuth2 client credentials not configured")
             return None
         
         try:
-            # Use requests-oauthlib in a thread since it's synchronous
-            import concurrent.futures
-            
-            def fetch_token():
-                return self.oauth_session.fetch_token(
-                    token_url="https://identity.dataspace.copernicus.eu/auth/realms/CDSE/protocol/openid-connect/token",
-                    client_id=self.client_id,
-                    client_secret=self.client_secret
-                )
-            
-            # Run the synchronous OAuth2 call in a thread
-            loop = asyncio.get_event_loop()
-            with concurrent.futures.ThreadPoolExecutor() as executor:
-                token = await loop.run_in_executor(executor, fetch_token)
+            response = await get_http_client().post(
+                self.TOKEN_URL,
+                data={
+                    "grant_type": "client_credentials",
+                    "client_id": self.client_id,
+                    "client_secret": self.client_secret
+                }
+            )
+            token = response.json()
+            self.oauth_token = token
             
             access_token = token.get('access_token')
             expires_in = token.get('expires_in', 3600)
@@ -169,24 +147,10 @@ class CopernicusSentinel2Source(BaseDataSource):
         # Try OAuth2 first
         if self.client_id and self.client_secret:
             # Check if token needs refresh
-            if not self.token_expires_at or datetime.now() >= self.token_expires_at:
+            if not self.token_expires_at or datetime.now() >= self.token_expires_at or not self.oauth_token:
                 logger.info("Refreshing OAuth2 access token")
                 return await self._authenticate_oauth2_async()
-            else:
-                # Get current token from oauth session
-                if self.oauth_session and hasattr(self.oauth_session, 'token') and self.oauth_session.token:
-                    # Handle both dict and string token formats
-                    token = self.oauth_session.token
-                    if isinstance(token, dict):
-                        return token.get('access_token')
-                    elif isinstance(token, str):
-                        # If token is a string, it might be the access token itself
-                        return token
-                    else:
-                        logger.warning(f"Unexpected token type: {type(token)}")
-                        return await self._authenticate_oauth2_async()
-                else:
-                    return await self._authenticate_oauth2_async()
+            return self.oauth_token.get('access_token')
         
         # Fallback to legacy token
         return self.legacy_token
@@ -590,7 +554,9 @@ class CopernicusSentinel2Source(BaseDataSource):
                     file_size = int(response.headers.get('content-length', 0))
                     downloaded = 0
                     
-                    async with aiofiles.open(output_path, 'wb') as f:
+                    # Stream to a part file so an interrupted transfer never looks complete
+                    part_path = Path(f"{output_path}.part")
+                    async with aiofiles.open(part_path, 'wb') as f:
                         async for chunk in response.content.iter_chunked(8192):
                             self._check_cancelled()
                             await f.write(chunk)
@@ -607,6 +573,11 @@ class CopernicusSentinel2Source(BaseDataSource):
                                     "band": "Sentinel-2"
                                 })
                     
+                    if file_size and downloaded != file_size:
+                        part_path.unlink(missing_ok=True)
+                        raise IOError(f"Sentinel-2 download truncated: {downloaded} of {file_size} bytes")
+                    os.replace(part_path, output_path)
+                    
                     logger.info(f"Downloaded Sentinel-2 data to: {output_path}")
                     if self.progress_callback:
                         await self.progress_callback({"message": "Download completed!", "type": "download_complete", "band": "Sentinel-2"})
@@ -4,10 +4,9 @@ import asyncio
 from typing import Optional, List, Dict
 from pathlib import Path
 import json
-import tempfile
+import os
 import time
 from datetime import datetime
-import os
 
 try:
     import pdal
@@ -15,29 +14,30 @@ try:
 except ImportError:
     PDAL_AVAILABLE = False
 
-import requests
 import geopandas as gpd
-from shapely.geometry import Point, Polygon
+from shapely import wkt as shapely_wkt
+from shapely.geometry import Point, Polygon, box
 
 from .base import (
     BaseDataSource, DataSourceCapability, DataType, DataResolution,
     DownloadRequest, DownloadResult
 )
 from ..utils.coordinates import BoundingBox
+from ..utils.boundaries_catalog import BoundariesCatalog, get_boundaries_catalog
+from ...services.region_metadata import get_region_metadata_store, MetadataSection
+from ...services.progress_tracking import ProgressTracker
+
+# Points per chunk when streaming PDAL readers for progress reporting
+PDAL_STREAM_CHUNK_SIZE = 500_000
 
 class OpenTopographySource(BaseDataSource):
     """OpenTopography client using PDAL pipelines for 3DEP data access."""
     
-    # GitHub repository with 3DEP dataset boundaries
-    BOUNDARIES_URL = 'https://raw.githubusercontent.com/hobuinc/usgs-lidar/master/boundaries/resources.geojson'
-    
     # AWS S3 EPT bucket base URL
     EPT_BASE_URL = "https://s3-us-west-2.amazonaws.com/usgs-lidar-public"
     
     def __init__(self, api_key: Optional[str] = None, cache_dir: str = "data/cache"):
         super().__init__(api_key, cache_dir)
-        self._boundaries_df = None
-        self._boundaries_cache_time = None
         
     @property
     def capabilities(self) -> DataSourceCapability:
@@ -63,12 +63,12 @@ class OpenTopographySource(BaseDataSource):
         
         # Get 3DEP boundaries
         try:
-            boundaries_df = await self._get_3dep_boundaries()
-            if boundaries_df is None:
+            catalog = await self._get_boundaries_catalog()
+            if catalog is None:
                 return False
             
             # Check if any datasets intersect with the request area
-            datasets = await self._find_intersecting_datasets(request.bbox, boundaries_df)
+            datasets = await self._find_intersecting_datasets(request.bbox, catalog)
             return len(datasets) > 0
             
         except Exception:
@@ -153,8 +153,13 @@ class OpenTopographySource(BaseDataSource):
                 })
             
             # Get available datasets
-            boundaries_df = await self._get_3dep_boundaries()
-            datasets = await self._find_intersecting_datasets(request.bbox, boundaries_df)
+            catalog = await self._get_boundaries_catalog()
+            if catalog is None:
+                return DownloadResult(
+                    success=False,
+                    error_message="3DEP dataset boundaries are unavailable"
+                )
+            datasets = await self._find_intersecting_datasets(request.bbox, catalog)
             
             if not datasets:
                 return DownloadResult(
@@ -182,63 +187,20 @@ class OpenTopographySource(BaseDataSource):
                 error_message=f"OpenTopography download failed: {str(e)}"
             )
     
-    async def _get_3dep_boundaries(self) -> Optional[gpd.GeoDataFrame]:
-        """Download and cache 3DEP dataset boundaries."""
+    async def _get_boundaries_catalog(self) -> Optional[BoundariesCatalog]:
+        """Local 3DEP boundaries catalog, refreshed when stale and indexed once per process."""
+        catalog = get_boundaries_catalog(self.cache_dir)
         try:
-            # Run in thread pool to avoid blocking
-            loop = asyncio.get_event_loop()
-            return await loop.run_in_executor(None, self._fetch_boundaries_sync)
+            if await catalog.ensure_loaded():
+                return catalog
         except Exception as e:
-            print(f"Error fetching 3DEP boundaries: {e}")
-            return None
+            print(f"Error loading 3DEP boundaries: {e}")
+        return None
     
-    def _fetch_boundaries_sync(self) -> Optional[gpd.GeoDataFrame]:
-        """Synchronous boundary fetching (run in thread pool)."""
-        try:
-            response = requests.get(self.BOUNDARIES_URL, timeout=30)
-            response.raise_for_status()
-            
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.geojson', delete=False) as f:
-                f.write(response.text)
-                temp_path = f.name
-            
-            try:
-                df = gpd.read_file(temp_path)
-                return df
-            finally:
-                os.unlink(temp_path)
-                
-        except Exception as e:
-            print(f"Error in _fetch_boundaries_sync: {e}")
-            return None
-    
-    async def _find_intersecting_datasets(self, bbox: BoundingBox, boundaries_df: gpd.GeoDataFrame) -> List[Dict]:
+    async def _find_intersecting_datasets(self, bbox: BoundingBox, catalog: BoundariesCatalog) -> List[Dict]:
         """Find 3DEP datasets that intersect with the bounding box."""
         try:
-            # Create bounding box polygon
-            bbox_polygon = Polygon([
-                (bbox.west, bbox.south),
-                (bbox.east, bbox.south),
-                (bbox.east, bbox.north),
-                (bbox.west, bbox.north),
-                (bbox.west, bbox.south)
-            ])
-            
-            # Find intersecting datasets
-            intersecting = boundaries_df[boundaries_df.geometry.intersects(bbox_polygon)]
-            
-            datasets = []
-            for idx, row in intersecting.iterrows():
-                dataset_info = {
-                    'name': row['name'],
-                    'url': row['url'],
-                    'points': row.get('points', 'Unknown'),
-                    'geometry': row['geometry']
-                }
-                datasets.append(dataset_info)
-            
-            return datasets
-            
+            return catalog.query(bbox)
         except Exception as e:
             print(f"Error finding intersecting datasets: {e}")
             return []
@@ -274,7 +236,7 @@ class OpenTopographySource(BaseDataSource):
             
             # Execute pipeline with progress monitoring
             start_time = time.time()
-            await self._execute_pipeline_with_progress(pipeline, progress_callback, 50, 90)
+            await self._execute_pipeline_with_progress(pipeline, progress_callback, 50, 90, product="laz")
             execution_time = time.time() - start_time
             
             if not cache_path.exists():
@@ -370,7 +332,7 @@ class OpenTopographySource(BaseDataSource):
             
             # Execute pipeline with progress monitoring
             start_time = time.time()
-            await self._execute_pipeline_with_progress(pipeline, progress_callback, 50, 90)
+            await self._execute_pipeline_with_progress(pipeline, progress_callback, 50, 90, product=dem_type)
             execution_time = time.time() - start_time
             
             if not cache_path.exists():
@@ -580,37 +542,33 @@ class OpenTopographySource(BaseDataSource):
         loop = asyncio.get_event_loop()
         await loop.run_in_executor(None, self._execute_pipeline_sync, pipeline)
     
-    async def _execute_pipeline_with_progress(self, pipeline: Dict, progress_callback=None, start_progress=50, end_progress=90):
-        """Execute PDAL pipeline with progress updates."""
+    async def _execute_pipeline_with_progress(self, pipeline: Dict, progress_callback=None, start_progress=50, end_progress=90, product: str = ""):
+        """Execute PDAL pipeline, reporting points read against the readers' header counts."""
         try:
-            # Send initial progress update
-            if progress_callback:
-                await progress_callback({
-                    "type": "download_progress",
-                    "message": "Executing PDAL pipeline...",
-                    "progress": start_progress
-                })
-            
-            # Execute in thread pool with periodic progress updates
+            # Reading from EPT dominates; filters and writers get the remaining range
+            split_progress = start_progress + (end_progress - start_progress) * 0.8
+            read_tracker = ProgressTracker(
+                progress_callback, "pdal_read", start=start_progress, end=split_progress,
+                product=product, unit_label="points"
+            )
+            write_tracker = ProgressTracker(
+                progress_callback, "pdal_write", start=split_progress, end=end_progress,
+                product=product, unit_label="points"
+            )
+            read_tracker.update(0, message="Executing PDAL pipeline...", force=True)
+
+            # Writers target part files that only replace the outputs once the pipeline succeeds,
+            # so an interrupted export never leaves a truncated file at the cache path
+            pipeline, part_outputs = self._with_part_outputs(pipeline)
             loop = asyncio.get_event_loop()
-            
-            # Create a simple progress tracker
-            progress_steps = 5
-            for i in range(progress_steps):
-                if i > 0:  # Don't sleep on first iteration
-                    await asyncio.sleep(1)  # Simulate processing time
-                
-                current_progress = start_progress + (end_progress - start_progress) * (i + 1) / progress_steps
-                
-                if progress_callback:
-                    await progress_callback({
-                        "type": "download_progress",
-                        "message": f"Processing LIDAR data... step {i+1}/{progress_steps}",
-                        "progress": int(current_progress)
-                    })
-            
-            # Execute the actual pipeline
-            await loop.run_in_executor(None, self._execute_pipeline_sync, pipeline)
+            try:
+                await loop.run_in_executor(None, self._execute_pipeline_sync, pipeline, read_tracker, write_tracker)
+                for part_path, output_path in part_outputs:
+                    if part_path.exists():
+                        os.replace(part_path, output_path)
+            finally:
+                for part_path, _ in part_outputs:
+                    part_path.unlink(missing_ok=True)
             
         except Exception as e:
             if progress_callback:
@@ -620,7 +578,22 @@ class OpenTopographySource(BaseDataSource):
                 })
             raise
 
-    def _execute_pipeline_sync(self, pipeline: Dict):
+    @staticmethod
+    def _with_part_outputs(pipeline: Dict):
+        """Copy of the pipeline whose writers write to part files, plus (part, final) path pairs."""
+        stages, part_outputs = [], []
+        for stage in pipeline.get('pipeline', []):
+            if isinstance(stage, dict) and stage.get('type', '').startswith('writers.') and 'filename' in stage:
+                output_path = Path(stage['filename'])
+                part_path = output_path.with_name(f"{output_path.stem}.part{output_path.suffix}")
+                part_path.unlink(missing_ok=True)
+                stage = {**stage, 'filename': str(part_path)}
+                part_outputs.append((part_path, output_path))
+            stages.append(stage)
+        return {**pipeline, 'pipeline': stages}, part_outputs
+
+    def _execute_pipeline_sync(self, pipeline: Dict, read_tracker: Optional[ProgressTracker] = None,
+                               write_tracker: Optional[ProgressTracker] = None):
         """Execute PDAL pipeline synchronously."""
         # Ensure output directories exist before execution
         pipeline_json = json.dumps(pipeline)
@@ -632,6 +605,13 @@ class OpenTopographySource(BaseDataSource):
                     output_path = Path(stage['filename'])
                     output_path.parent.mkdir(parents=True, exist_ok=True)
         
+        if read_tracker is not None and hasattr(pdal.Pipeline, 'iterator'):
+            try:
+                return self._execute_pipeline_streaming(pipeline, read_tracker, write_tracker)
+            except Exception as e:
+                # Not every reader/PDAL build can stream; fall back to a plain execute
+                print(f"Warning: Streaming PDAL execution unavailable, running pipeline directly: {e}")
+
         p = pdal.Pipeline(pipeline_json)
         try:
             # Try to validate, but don't fail if validation method doesn't exist
@@ -642,7 +622,95 @@ class OpenTopographySource(BaseDataSource):
             print(f"Warning: Pipeline validation failed: {e}")
         
         p.execute()
+        if write_tracker is not None:
+            write_tracker.finish("PDAL pipeline completed", record=False)
+        return p
+
+    def _execute_pipeline_streaming(self, pipeline: Dict, read_tracker: ProgressTracker,
+                                    write_tracker: Optional[ProgressTracker] = None):
+        """Stream the readers in chunks to count points, then run the remaining stages on the arrays."""
+        import numpy as np
+
+        stages = [s if isinstance(s, dict) else {"type": "readers.las", "filename": s} for s in pipeline['pipeline']]
+        readers = [s for s in stages if s.get('type', '').startswith('readers.')]
+        remaining = [s for s in stages if not s.get('type', '').startswith('readers.')]
+        if not readers or not remaining:
+            raise ValueError("pipeline has no reader/writer split")
+
+        expected_points, srs_wkt = self._reader_header_estimate(readers)
+        read_tracker.update(0, expected_points or None, force=True)
+
+        arrays = []
+        processed = 0
+        for reader in readers:
+            chunks = []
+            reader_pipeline = pdal.Pipeline(json.dumps({"pipeline": [reader]}))
+            for chunk in reader_pipeline.iterator(chunk_size=PDAL_STREAM_CHUNK_SIZE):
+                chunks.append(chunk)
+                processed += len(chunk)
+                # Header estimates are approximate; never report the read as finished early
+                total = max(expected_points, processed / 0.95) if expected_points else None
+                read_tracker.update(processed, total)
+            if chunks:
+                arrays.append(np.concatenate(chunks))
+
+        read_tracker.update(processed, processed)
+        read_tracker.finish(f"Read {processed:,} points")
+        if not arrays:
+            raise ValueError("readers returned no points")
+
+        if write_tracker is not None:
+            write_tracker.update(0, processed, message="Filtering and writing points...", force=True)
+        p = pdal.Pipeline(json.dumps({"pipeline": self._with_source_srs(remaining, srs_wkt)}), arrays=arrays)
+        p.execute()
+        if write_tracker is not None:
+            write_tracker.finish("PDAL pipeline completed")
         return p
+
+    def _reader_header_estimate(self, readers: List[Dict]):
+        """Expected point count for the readers' AOI from header counts, and the source SRS."""
+        expected = 0
+        srs_wkt = None
+        for reader in readers:
+            try:
+                info = pdal.Pipeline(json.dumps({"pipeline": [reader]})).quickinfo
+                stage_info = next(iter(info.values()))
+            except Exception as e:
+                print(f"Warning: Could not read header for {reader.get('filename')}: {e}")
+                continue
+
+            num_points = stage_info.get('num_points') or 0
+            srs_wkt = srs_wkt or (stage_info.get('srs') or {}).get('wkt')
+            bounds = stage_info.get('bounds') or {}
+            # The header counts the whole dataset; scale by the share the AOI polygon covers
+            if reader.get('polygon') and {'minx', 'maxx', 'miny', 'maxy'} <= set(bounds):
+                try:
+                    dataset_box = box(bounds['minx'], bounds['miny'], bounds['maxx'], bounds['maxy'])
+                    aoi = shapely_wkt.loads(reader['polygon'])
+                    if dataset_box.area > 0:
+                        num_points *= aoi.intersection(dataset_box).area / dataset_box.area
+                except Exception:
+                    pass
+            expected += num_points
+        return int(expected), srs_wkt
+
+    @staticmethod
+    def _with_source_srs(stages: List[Dict], srs_wkt: Optional[str]) -> List[Dict]:
+        """In-memory arrays carry no SRS, so pass the readers' SRS to the stages that need it."""
+        if not srs_wkt:
+            return stages
+        stages = [dict(s) for s in stages]
+        reprojected = False
+        for stage in stages:
+            stage_type = stage.get('type', '')
+            if stage_type == 'filters.reprojection':
+                stage.setdefault('in_srs', srs_wkt)
+                reprojected = True
+            elif not reprojected and stage_type == 'writers.las':
+                stage.setdefault('a_srs', srs_wkt)
+            elif not reprojected and stage_type == 'writers.gdal':
+                stage.setdefault('override_srs', srs_wkt)
+        return stages
     
     def _get_resolution_meters(self, resolution: DataResolution) -> float:
         """Get resolution in meters."""
@@ -700,29 +768,37 @@ class OpenTopographySource(BaseDataSource):
         # Create metadata.txt with REQUESTED BOUNDS in the region's root directory
         # This ensures the bounds represent the REQUESTED AREA, not the actual file bounds
         region_root_dir = input_folder.parent  # Go up one level from lidar subfolder to region root
-        metadata_path = region_root_dir / "metadata.txt"
+        # Calculate center coordinates for reference
+        center_lat = (request.bbox.north + request.bbox.south) / 2
+        center_lng = (request.bbox.east + request.bbox.west) / 2
         
-        with open(metadata_path, 'w') as f:
-            f.write(f"# REQUESTED BOUNDS (WGS84 - EPSG:4326)\n")
-            f.write(f"# These bounds represent the REQUESTED AREA for LAZ acquisition\n")
-            f.write(f"North Bound: {request.bbox.north}\n")
-            f.write(f"South Bound: {request.bbox.south}\n")
-            f.write(f"East Bound: {request.bbox.east}\n")
-            f.write(f"West Bound: {request.bbox.west}\n")
-            f.write(f"# \n")
-            f.write(f"# Additional Information\n")
-            f.write(f"Region Name: {request.region_name if request.region_name else base_file_name}\n")
-            f.write(f"Data Type: {'LIDAR Point Cloud' if request.data_type == DataType.LAZ else 'Elevation DTM'}\n")
-            f.write(f"Resolution: {self._get_resolution_meters(request.resolution)}m\n")
-            f.write(f"Source: USGS 3DEP via OpenTopography/PDAL\n")
-            f.write(f"Downloaded: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-            
-            # Calculate center coordinates for reference
-            center_lat = (request.bbox.north + request.bbox.south) / 2
-            center_lng = (request.bbox.east + request.bbox.west) / 2
-            f.write(f"Center Latitude: {center_lat:.6f}\n")
-            f.write(f"Center Longitude: {center_lng:.6f}\n")
-            f.write(f"File: {filename}\n")
+        get_region_metadata_store().save(region_root_dir, [
+            MetadataSection(
+                comments=[
+                    "REQUESTED BOUNDS (WGS84 - EPSG:4326)",
+                    "These bounds represent the REQUESTED AREA for LAZ acquisition",
+                ],
+                fields={
+                    "North Bound": request.bbox.north,
+                    "South Bound": request.bbox.south,
+                    "East Bound": request.bbox.east,
+                    "West Bound": request.bbox.west,
+                },
+            ),
+            MetadataSection(
+                comments=["", "Additional Information"],
+                fields={
+                    "Region Name": request.region_name if request.region_name else base_file_name,
+                    "Data Type": 'LIDAR Point Cloud' if request.data_type == DataType.LAZ else 'Elevation DTM',
+                    "Resolution": f"{self._get_resolution_meters(request.resolution)}m",
+                    "Source": "USGS 3DEP via OpenTopography/PDAL",
+                    "Downloaded": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                    "Center Latitude": round(center_lat, 6),
+                    "Center Longitude": round(center_lng, 6),
+                    "File": filename,
+                },
+            ),
+        ])
         
         return input_file_path
     
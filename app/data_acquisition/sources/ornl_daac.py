@@ -11,6 +11,8 @@ from .base import (
     DownloadRequest, DownloadResult
 )
 from ..utils.coordinates import BoundingBox
+from ..utils.errors import NetworkError
+from ..utils.http import get_http_client
 
 class ORNLDAACSource(BaseDataSource):
     """ORNL DAAC (Oak Ridge National Laboratory Distributed Active Archive Center) data source."""
@@ -36,9 +38,9 @@ class ORNLDAACSource(BaseDataSource):
         return "ornl_daac"
     
     async def _get_session(self) -> aiohttp.ClientSession:
-        """Get or create HTTP session."""
+        """Get the shared pooled HTTP session."""
         if self._session is None or self._session.closed:
-            self._session = aiohttp.ClientSession()
+            self._session = await get_http_client().session()
         return self._session
     
     async def check_availability(self, request: DownloadRequest) -> bool:
@@ -103,43 +105,36 @@ class ORNLDAACSource(BaseDataSource):
                     error_message="No suitable dataset found for request"
                 )
             
-            # Download the data
-            session = await self._get_session()
+            # Download the data (resumable, renamed into place once complete)
             download_url = self._build_download_url(dataset_info, request.bbox)
             
-            async with session.get(download_url) as response:
-                if response.status == 200:
-                    cache_path.parent.mkdir(parents=True, exist_ok=True)
-                    
-                    with open(cache_path, 'wb') as f:
-                        async for chunk in response.content.iter_chunked(8192):
-                            f.write(chunk)
-                    
-                    file_size = cache_path.stat().st_size / (1024 * 1024)
-                    
-                    return DownloadResult(
-                        success=True,
-                        file_path=str(cache_path),
-                        file_size_mb=file_size,
-                        resolution_m=self._get_resolution_meters(request.resolution, request.data_type),
-                        metadata={
-                            'dataset': dataset_info['name'],
-                            'source': 'ORNL DAAC',
-                            'description': dataset_info.get('description', ''),
-                            'bbox': {
-                                'west': request.bbox.west,
-                                'south': request.bbox.south,
-                                'east': request.bbox.east,
-                                'north': request.bbox.north
-                            }
-                        }
-                    )
-                else:
-                    error_text = await response.text()
-                    return DownloadResult(
-                        success=False,
-                        error_message=f"ORNL DAAC API error {response.status}: {error_text}"
-                    )
+            try:
+                await get_http_client().download(download_url, cache_path)
+            except NetworkError as e:
+                return DownloadResult(
+                    success=False,
+                    error_message=f"ORNL DAAC API error: {e}"
+                )
+            
+            file_size = cache_path.stat().st_size / (1024 * 1024)
+            
+            return DownloadResult(
+                success=True,
+                file_path=str(cache_path),
+                file_size_mb=file_size,
+                resolution_m=self._get_resolution_meters(request.resolution, request.data_type),
+                metadata={
+                    'dataset': dataset_info['name'],
+                    'source': 'ORNL DAAC',
+                    'description': dataset_info.get('description', ''),
+                    'bbox': {
+                        'west': request.bbox.west,
+                        'south': request.bbox.south,
+                        'east': request.bbox.east,
+                        'north': request.bbox.north
+                    }
+                }
+            )
                     
         except Exception as e:
             return DownloadResult(
@@ -234,6 +229,5 @@ class ORNLDAACSource(BaseDataSource):
             return 100.0  # Typical SAR resolution
     
     async def close(self):
-        """Close HTTP session."""
-        if self._session and not self._session.closed:
-            await self._session.close()
+        """Release the HTTP session (the pooled connections stay open for other sources)."""
+        self._session = None
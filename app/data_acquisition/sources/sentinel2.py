@@ -6,7 +6,6 @@ from typing import Optional, List, Dict, Any, Tuple, Callable, Callable
 from pathlib import Path
 import json
 from datetime import datetime, timedelta
-import requests
 
 try:
     from pystac_client import Client
@@ -24,10 +23,20 @@ from .base import (
     DownloadRequest, DownloadResult
 )
 from ..utils.coordinates import BoundingBox
+from ..utils.download_planner import DownloadAsset, DownloadPlanner
+from ..utils.http import get_http_client
+from ...services.progress_tracking import ProgressTracker
 from app.config import get_settings
 
 logger = logging.getLogger(__name__)
 
+# GDAL settings for reading remote COGs with as few range requests as possible
+COG_READ_CONFIG = {
+    'GDAL_DISABLE_READDIR_ON_OPEN': 'EMPTY_DIR',  # don't list the container for sidecar files
+    'GDAL_HTTP_MERGE_CONSECUTIVE_RANGES': 'YES',
+    'VSI_CACHE': 'TRUE',
+}
+
 class Sentinel2Source(BaseDataSource):
     """Sentinel-2 satellite imagery data source using STAC APIs."""
     
@@ -138,7 +147,9 @@ class Sentinel2Source(BaseDataSource):
             
             # Search for the best available item
             print(f"\n🔍 Searching for optimal Sentinel-2 scenes...")
-            item = await self._find_best_item(request)
+            candidates = await self._find_candidate_items(request)
+            item = candidates[0] if candidates else None
+            composite_count = min(self.settings.sentinel2_composite_scenes, len(candidates))
             
             if not item:
                 print(f"❌ No suitable Sentinel-2 items found")
@@ -168,13 +179,14 @@ class Sentinel2Source(BaseDataSource):
             
             logger.info(f"📁 Saving Sentinel-2 data to: {output_dir}")
             
-            # Download red and NIR bands with cropping to reduce file size
+            # Download red and NIR bands concurrently, cropped to reduce file size
             print(f"\n📥 Starting band downloads with cropping...")
-            print(f"🔴 Downloading and cropping Red band (B04)...")
-            red_path = await self._download_band(item, "B04", "Red", output_dir, request.bbox, effective_callback)
-            
-            print(f"🌿 Downloading and cropping NIR band (B08)...")
-            nir_path = await self._download_band(item, "B08", "NIR", output_dir, request.bbox, effective_callback)
+            print(f"🔴 Red band (B04) and 🌿 NIR band (B08) downloading in parallel...")
+            # The scene classification is only needed to mask clouds when compositing
+            bands = await self._download_scene_bands(
+                item, output_dir, request.bbox, effective_callback, with_scl=composite_count > 1
+            )
+            red_path, nir_path = bands["Red"], bands["NIR"]
             
             if not red_path or not nir_path:
                 print(f"❌ Failed to download required bands")
@@ -196,6 +208,15 @@ class Sentinel2Source(BaseDataSource):
             
             total_size_mb = total_size / (1024 * 1024)
             
+            composite = None
+            if composite_count > 1:
+                # The composite becomes the NDVI product of the requested region
+                ndvi_region = request.region_name or region_name
+                composite = await self._build_ndvi_composite(
+                    candidates[:composite_count], bands, output_dir, request.bbox, ndvi_region,
+                    acquisition_date_folder, effective_callback
+                )
+            
             print(f"\n🎉 SENTINEL-2 DOWNLOAD COMPLETED SUCCESSFULLY!")
             print(f"📊 Total download size: {total_size_mb:.2f} MB")
             print(f"📁 Files saved to: {output_dir}")
@@ -216,6 +237,7 @@ class Sentinel2Source(BaseDataSource):
                     'red_band_path': str(red_path),
                     'nir_band_path': str(nir_path),
                     'region_name': region_name,
+                    **(composite or {}),
                     'bbox': {
                         'west': request.bbox.west,
                         'south': request.bbox.south,
@@ -232,8 +254,8 @@ class Sentinel2Source(BaseDataSource):
                 error_message=f"Sentinel-2 download failed: {str(e)}"
             )
     
-    async def _find_best_item(self, request: DownloadRequest):
-        """Find the best Sentinel-2 item for the request."""
+    async def _find_candidate_items(self, request: DownloadRequest) -> List:
+        """Search Sentinel-2 items for the request, best first (lowest cloud cover, most recent)."""
         try:
             client = self._get_client()
             
@@ -255,7 +277,7 @@ class Sentinel2Source(BaseDataSource):
             
             if not items:
                 print(f"❌ No Sentinel-2 scenes found for the specified area and time range")
-                return None
+                return []
             
             # Display information about available scenes
             print(f"\n📋 Analyzing available scenes:")
@@ -280,18 +302,96 @@ class Sentinel2Source(BaseDataSource):
             print(f"\n🎯 Selecting optimal scene (lowest cloud cover, most recent)...")
             items.sort(key=sort_key)
             
-            best_item = items[0]
-            best_cloud_cover = best_item.properties.get('eo:cloud_cover', 'unknown')
-            best_date = best_item.datetime.strftime("%Y-%m-%d") if best_item.datetime else "unknown"
-            
-            print(f"✅ Selected scene: {best_date} with {best_cloud_cover}% cloud cover")
-            
-            return best_item
+            return items
             
         except Exception as e:
             logger.error(f"Error finding Sentinel-2 item: {e}")
             print(f"❌ Error during scene search: {e}")
+            return []
+    
+    async def _download_scene_bands(self, item, output_dir: Path, bbox: BoundingBox,
+                                    progress_callback=None, with_scl: bool = False) -> Dict[str, Optional[Path]]:
+        """Download the red and NIR bands (and optionally SCL) of one scene concurrently."""
+        band_names = [("B04", "Red"), ("B08", "NIR")]
+        if with_scl:
+            band_names.append(("SCL", "SCL"))
+        planner = DownloadPlanner(self.name, progress_callback)
+        return await planner.run([
+            DownloadAsset(
+                human_name,
+                lambda callback, band=band, human_name=human_name: self._download_band(
+                    item, band, human_name, output_dir, bbox, callback
+                )
+            )
+            for band, human_name in band_names
+        ])
+    
+    async def _build_ndvi_composite(self, items: List, primary_bands: Dict[str, Optional[Path]], output_dir: Path,
+                                    bbox: BoundingBox, ndvi_region: str, timestamp: str,
+                                    progress_callback=None) -> Optional[Dict[str, Any]]:
+        """Download the remaining candidate scenes and reduce all of them into one cloud-masked NDVI.
+        
+        The first item is the scene already downloaded into ``output_dir``; the
+        others go to ``output_dir/composite/<item id>``. Scenes whose bands fail
+        to download are left out of the composite.
+        
+        The composite is written to ``<output>/<ndvi_region>/sentinel2``, where
+        region NDVI processing and the Sentinel-2 conversion use it in place of
+        a single-scene NDVI, and its gallery PNG is rendered.
+        
+        Returns:
+            Metadata entries describing the composite, or None if it could not be built
+        """
+        from ...convert import convert_ndvi_composite_to_png
+        from ...processing.ndvi_processing import NDVIProcessor, region_ndvi_composite_path
+        
+        method = self.settings.sentinel2_composite_method
+        print(f"\n🧩 Building {method} NDVI composite from {len(items)} scenes...")
+        
+        scenes = [{
+            'red': str(primary_bands["Red"]),
+            'nir': str(primary_bands["NIR"]),
+            'scl': str(primary_bands["SCL"]) if primary_bands.get("SCL") else None,
+        }]
+        scene_ids = [items[0].id]
+        for item in items[1:]:
+            scene_dir = output_dir / "composite" / item.id
+            scene_dir.mkdir(parents=True, exist_ok=True)
+            bands = await self._download_scene_bands(item, scene_dir, bbox, progress_callback, with_scl=True)
+            if not bands["Red"] or not bands["NIR"]:
+                logger.warning(f"Leaving scene {item.id} out of the NDVI composite, band download failed")
+                continue
+            scenes.append({
+                'red': str(bands["Red"]),
+                'nir': str(bands["NIR"]),
+                'scl': str(bands["SCL"]) if bands["SCL"] else None,
+            })
+            scene_ids.append(item.id)
+        
+        sentinel2_dir = Path(self.settings.output_dir) / ndvi_region / "sentinel2"
+        composite_path = region_ndvi_composite_path(sentinel2_dir, ndvi_region, timestamp)
+        loop = asyncio.get_event_loop()
+        success = await loop.run_in_executor(
+            None, NDVIProcessor().composite_ndvi, scenes, str(composite_path), method
+        )
+        if not success:
+            logger.error("NDVI composite could not be built")
             return None
+        png_path = await loop.run_in_executor(None, convert_ndvi_composite_to_png, str(composite_path), ndvi_region)
+        
+        if progress_callback:
+            await progress_callback({
+                "type": "ndvi_composite_complete",
+                "scenes": len(scenes),
+                "method": method,
+                "message": f"NDVI composite ({method}) built from {len(scenes)} scenes"
+            })
+        return {
+            'ndvi_composite_path': str(composite_path),
+            'ndvi_composite_png_path': png_path,
+            'composite_method': method,
+            'composite_scene_ids': scene_ids,
+        }
     
     async def _download_band(self, item, band_name: str, human_name: str, output_dir: Path, bbox: BoundingBox, progress_callback=None) -> Optional[Path]:
         """Download a specific band and crop it to the requested bounding box."""
@@ -314,7 +414,16 @@ class Sentinel2Source(BaseDataSource):
             temp_path = output_dir / temp_filename
             output_path = output_dir / final_filename
 
-            # Download the full tile first
+            # Bands are COGs: read only the blocks covering the bbox over HTTP range requests
+            try:
+                logger.info(f"🛰️ Reading {human_name} window from remote COG")
+                await self._read_cog_window(signed_url, output_path, bbox, progress_callback)
+                if output_path.exists():
+                    return output_path
+            except Exception as e:
+                logger.warning(f"Windowed COG read failed for {human_name}, downloading full tile: {e}")
+
+            # Fall back to downloading the full tile and cropping it locally
             logger.info(f"🛰️ Downloading full Sentinel-2 {human_name} tile")
             await self._download_band_direct(signed_url, temp_path, progress_callback)
 
@@ -338,6 +447,69 @@ class Sentinel2Source(BaseDataSource):
             logger.error(f"Error downloading band {band_name} ({human_name}): {e}")
             return None
     
+    async def _read_cog_window(self, url: str, output_path: Path, bbox: BoundingBox, progress_callback=None):
+        """Crop a remote Cloud Optimized GeoTIFF to the bbox, fetching only the intersecting blocks."""
+        print(f"\n🛰️ SENTINEL-2 WINDOWED READ: {output_path.name}")
+        print(f"📐 Target area: {bbox.west:.6f}°W, {bbox.south:.6f}°S, {bbox.east:.6f}°E, {bbox.north:.6f}°N")
+
+        if progress_callback:
+            await progress_callback({
+                "type": "download_start",
+                "band": output_path.stem,
+                "message": f"Reading {output_path.stem} window from remote COG"
+            })
+
+        # Approximate output pixels at 10 m, so timings scale with the request size
+        expected_pixels = max(bbox.area_km2() * 10_000, 1.0)
+        tracker = ProgressTracker(
+            progress_callback, "cog_window_read", total=expected_pixels, product=self.name,
+            unit_label="pixels", extra={"band": output_path.stem}
+        )
+
+        loop = asyncio.get_event_loop()
+        await loop.run_in_executor(None, self._read_cog_window_sync, url, output_path, bbox, tracker)
+
+        tracker.finish(f"{output_path.stem} window read")
+        final_size_mb = output_path.stat().st_size / (1024 * 1024)
+        print(f"✅ Windowed read complete! Size: {final_size_mb:.2f} MB")
+        if progress_callback:
+            await progress_callback({
+                "type": "download_complete",
+                "band": output_path.stem,
+                "final_size_mb": final_size_mb,
+                "message": f"Download complete: {final_size_mb:.2f} MB"
+            })
+
+    def _read_cog_window_sync(self, url: str, output_path: Path, bbox: BoundingBox, tracker: Optional[ProgressTracker] = None):
+        """Run the windowed GDAL translate against /vsicurl/ (blocking)."""
+        def on_progress(complete, message, user_data):
+            if tracker is not None:
+                tracker.update(complete * tracker.total)
+            return 1
+
+        translate_options = gdal.TranslateOptions(
+            projWin=[bbox.west, bbox.north, bbox.east, bbox.south],  # [ulx, uly, lrx, lry]
+            projWinSRS='EPSG:4326',
+            format='GTiff',
+            creationOptions=['COMPRESS=LZW', 'TILED=YES'],
+            callback=on_progress
+        )
+
+        tmp_path = output_path.with_name(f".{output_path.name}.part")
+        for key, value in COG_READ_CONFIG.items():
+            gdal.SetThreadLocalConfigOption(key, value)
+        try:
+            result = gdal.Translate(str(tmp_path), f"/vsicurl/{url}", options=translate_options)
+            if result is None:
+                raise RuntimeError(f"GDAL could not read window from {output_path.stem} COG")
+            result = None
+            tmp_path.replace(output_path)
+        finally:
+            for key in COG_READ_CONFIG:
+                gdal.SetThreadLocalConfigOption(key, None)
+            if tmp_path.exists():
+                tmp_path.unlink()
+
     async def _download_band_direct(self, url: str, output_path: Path, progress_callback=None):
         """Download a band directly with progress tracking."""
         try:
@@ -353,9 +525,11 @@ class Sentinel2Source(BaseDataSource):
                     "message": f"Starting download of {output_path.name}"
                 })
             
+            http = get_http_client()
+
             # Get file size first for progress tracking
-            head_response = requests.head(url, allow_redirects=True)
-            total_size = int(head_response.headers.get('content-length', 0))
+            head_response = await http.head(url, raise_for_status=False)
+            total_size = int(head_response.headers.get('Content-Length', 0))
             total_size_mb = total_size / (1024 * 1024)
             
             if total_size > 0:
@@ -370,52 +544,50 @@ class Sentinel2Source(BaseDataSource):
             else:
                 print(f"📊 File size: Unknown (streaming)")
             
-            # Download the file with progress tracking
-            response = requests.get(url, stream=True)
-            response.raise_for_status()
-            
-            downloaded = 0
-            chunk_size = 8192
+            # Byte-level tracker for the ETA; messages below keep their existing shape
+            tracker = ProgressTracker(None, "download", total=total_size or None, product=self.name, unit_label="bytes")
             last_progress = 0
-            
+
+            async def on_chunk(downloaded, content_length):
+                nonlocal last_progress
+                tracker.update(downloaded)
+                # Update progress every 5% or every 5MB (whichever is smaller)
+                if total_size > 0:
+                    progress = (downloaded / total_size) * 100
+                    if progress - last_progress >= 5:
+                        downloaded_mb = downloaded / (1024 * 1024)
+                        print(f"📊 Progress: {progress:.1f}% ({downloaded_mb:.2f}/{total_size_mb:.2f} MB)")
+                        if progress_callback:
+                            await progress_callback({
+                                "type": "download_progress",
+                                "band": output_path.stem,
+                                "progress": progress,
+                                "downloaded_mb": downloaded_mb,
+                                "total_mb": total_size_mb,
+                                "eta_seconds": tracker.eta_seconds,
+                                "message": f"Progress: {progress:.1f}%"
+                            })
+                        last_progress = progress
+                else:
+                    # Unknown size - show downloaded amount every 5MB
+                    downloaded_mb = downloaded / (1024 * 1024)
+                    if downloaded_mb - last_progress >= 5:
+                        print(f"📊 Downloaded: {downloaded_mb:.2f} MB")
+                        if progress_callback:
+                            await progress_callback({
+                                "type": "download_progress",
+                                "band": output_path.stem,
+                                "downloaded_mb": downloaded_mb,
+                                "message": f"Downloaded: {downloaded_mb:.2f} MB"
+                            })
+                        last_progress = downloaded_mb
+
+            # Stream to a resumable part file, checked against the HEAD size before it is renamed into place
             print(f"⬇️ Downloading...")
+            downloaded = await http.download(url, output_path, on_chunk=on_chunk, expected_size=total_size or None)
             
-            with open(output_path, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=chunk_size):
-                    if chunk:
-                        f.write(chunk)
-                        downloaded += len(chunk)
-                        
-                        # Update progress every 5% or every 5MB (whichever is smaller)
-                        if total_size > 0:
-                            progress = (downloaded / total_size) * 100
-                            if progress - last_progress >= 5:
-                                downloaded_mb = downloaded / (1024 * 1024)
-                                print(f"📊 Progress: {progress:.1f}% ({downloaded_mb:.2f}/{total_size_mb:.2f} MB)")
-                                if progress_callback:
-                                    await progress_callback({
-                                        "type": "download_progress",
-                                        "band": output_path.stem,
-                                        "progress": progress,
-                                        "downloaded_mb": downloaded_mb,
-                                        "total_mb": total_size_mb,
-                                        "message": f"Progress: {progress:.1f}%"
-                                    })
-                                last_progress = progress
-                        else:
-                            # Unknown size - show downloaded amount every 5MB
-                            downloaded_mb = downloaded / (1024 * 1024)
-                            if downloaded_mb - last_progress >= 5:
-                                print(f"📊 Downloaded: {downloaded_mb:.2f} MB")
-                                if progress_callback:
-                                    await progress_callback({
-                                        "type": "download_progress",
-                                        "band": output_path.stem,
-                                        "downloaded_mb": downloaded_mb,
-                                        "message": f"Downloaded: {downloaded_mb:.2f} MB"
-                                    })
-                                last_progress = downloaded_mb
-            
+            tracker.update(downloaded, downloaded)
+            tracker.finish()
             final_size_mb = output_path.stat().st_size / (1024 * 1024)
             print(f"✅ Download complete! Final size: {final_size_mb:.2f} MB")
             print(f"📄 Saved to: {output_path}")
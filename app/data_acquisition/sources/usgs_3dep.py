@@ -12,6 +12,8 @@ from .base import (
     DownloadRequest, DownloadResult
 )
 from ..utils.coordinates import BoundingBox
+from ..utils.http import get_http_client
+from ...services.region_metadata import get_region_metadata_store, MetadataSection
 
 class USGS3DEPSource(BaseDataSource):
     """USGS 3D Elevation Program (3DEP) data source for LiDAR point clouds."""
@@ -39,9 +41,9 @@ class USGS3DEPSource(BaseDataSource):
         return "usgs_3dep"
     
     async def _get_session(self) -> aiohttp.ClientSession:
-        """Get or create HTTP session."""
+        """Get the shared pooled HTTP session."""
         if self._session is None or self._session.closed:
-            self._session = aiohttp.ClientSession()
+            self._session = await get_http_client().session()
         return self._session
     
     async def check_availability(self, request: DownloadRequest) -> bool:
@@ -249,31 +251,39 @@ class USGS3DEPSource(BaseDataSource):
         # Also create a standardized metadata.txt file in the region root directory
         # This ensures consistency with other data sources for PNG overlay scaling
         region_root_dir = input_folder.parent  # Go up one level from lidar subfolder to region root
-        metadata_path = region_root_dir / "metadata.txt"
+        lat_dir = 'S' if center_lat < 0 else 'N'
+        lng_dir = 'W' if center_lng < 0 else 'E'
+        region_name = f"{abs(center_lat):.2f}{lat_dir}_{abs(center_lng):.2f}{lng_dir}"
         
-        with open(metadata_path, 'w') as f:
-            f.write(f"# REQUESTED BOUNDS (WGS84 - EPSG:4326)\n")
-            f.write(f"# These bounds represent the REQUESTED AREA for LAZ acquisition\n")
-            f.write(f"North Bound: {request.bbox.north}\n")
-            f.write(f"South Bound: {request.bbox.south}\n")
-            f.write(f"East Bound: {request.bbox.east}\n")
-            f.write(f"West Bound: {request.bbox.west}\n")
-            f.write(f"# \n")
-            f.write(f"# Additional Information\n")
-            lat_dir = 'S' if center_lat < 0 else 'N'
-            lng_dir = 'W' if center_lng < 0 else 'E'
-            region_name = f"{abs(center_lat):.2f}{lat_dir}_{abs(center_lng):.2f}{lng_dir}"
-            f.write(f"Region Name: {request.region_name if request.region_name else region_name}\n")
-            f.write(f"Data Type: Instructions for {request.data_type.value}\n")
-            f.write(f"Instructions File: {info_file_name}\n")
-            f.write(f"Source: USGS 3DEP\n")
-            f.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-            f.write(f"Center Latitude: {center_lat:.6f}\n")
-            f.write(f"Center Longitude: {center_lng:.6f}\n")
+        get_region_metadata_store().save(region_root_dir, [
+            MetadataSection(
+                comments=[
+                    "REQUESTED BOUNDS (WGS84 - EPSG:4326)",
+                    "These bounds represent the REQUESTED AREA for LAZ acquisition",
+                ],
+                fields={
+                    "North Bound": request.bbox.north,
+                    "South Bound": request.bbox.south,
+                    "East Bound": request.bbox.east,
+                    "West Bound": request.bbox.west,
+                },
+            ),
+            MetadataSection(
+                comments=["", "Additional Information"],
+                fields={
+                    "Region Name": request.region_name if request.region_name else region_name,
+                    "Data Type": f"Instructions for {request.data_type.value}",
+                    "Instructions File": info_file_name,
+                    "Source": "USGS 3DEP",
+                    "Generated": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                    "Center Latitude": round(center_lat, 6),
+                    "Center Longitude": round(center_lng, 6),
+                },
+            ),
+        ])
         
         return info_file
     
     async def close(self):
-        """Close HTTP session."""
-        if self._session and not self._session.closed:
-            await self._session.close()
+        """Release the HTTP session (the pooled connections stay open for other sources)."""
+        self._session = None
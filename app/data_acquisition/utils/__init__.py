@@ -2,6 +2,10 @@
 from .coordinates import CoordinateValidator, CoordinateConverter, BoundingBox
 from .cache import DataCache
 from .file_manager import FileManager, FileInfo
+from .http import AsyncHttpClient, HttpResponse, get_http_client
+from .download_planner import DownloadAsset, DownloadPlanner
+from .boundaries_catalog import BoundariesCatalog, get_boundaries_catalog
+from .single_flight import SingleFlight, request_flight_key
 
 __all__ = [
     'CoordinateValidator',
@@ -9,5 +13,14 @@ __all__ = [
     'BoundingBox', 
     'DataCache',
     'FileManager',
-    'FileInfo'
+    'FileInfo',
+    'AsyncHttpClient',
+    'HttpResponse',
+    'get_http_client',
+    'DownloadAsset',
+    'DownloadPlanner',
+    'BoundariesCatalog',
+    'get_boundaries_catalog',
+    'SingleFlight',
+    'request_flight_key'
 ]
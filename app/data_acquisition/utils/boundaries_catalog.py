@@ -0,0 +1,205 @@
+"""
+Local, spatially indexed catalog of USGS 3DEP dataset boundaries.
+
+The boundaries GeoJSON is kept in the cache directory together with the ETag
+and Last-Modified headers it was served with. Once it is older than
+``max_age`` it is revalidated with a conditional request; a 304 only bumps the
+timestamp. If the refresh fails the local copy keeps being used, so
+availability checks also work offline, and the failed attempt is recorded so
+the next refresh waits ``retry_interval`` instead of hitting the network on
+every query. The polygons are parsed once per
+process into an STR-tree, so bbox queries cost a tree lookup instead of a
+download plus a scan over every dataset.
+"""
+
+import asyncio
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+import logging
+
+from shapely.geometry import box, shape
+from shapely.strtree import STRtree
+
+from .coordinates import BoundingBox
+from .http import get_http_client
+
+logger = logging.getLogger(__name__)
+
+BOUNDARIES_URL = 'https://raw.githubusercontent.com/hobuinc/usgs-lidar/master/boundaries/resources.geojson'
+DEFAULT_MAX_AGE = 7 * 24 * 3600
+DEFAULT_RETRY_INTERVAL = 15 * 60
+
+
+class BoundariesCatalog:
+    """3DEP dataset boundaries stored on disk and queried through an STR-tree."""
+
+    def __init__(self, cache_dir: Union[str, Path] = "data/cache", url: str = BOUNDARIES_URL,
+                 max_age: float = DEFAULT_MAX_AGE, retry_interval: float = DEFAULT_RETRY_INTERVAL):
+        self.cache_dir = Path(cache_dir)
+        self.url = url
+        self.max_age = max_age
+        self.retry_interval = retry_interval
+        self.data_path = self.cache_dir / "3dep_boundaries.geojson"
+        self.meta_path = self.cache_dir / "3dep_boundaries.meta.json"
+        self._datasets: List[Dict[str, Any]] = []
+        self._tree: Optional[STRtree] = None
+        self._loaded_signature = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._tree is not None
+
+    async def ensure_loaded(self) -> bool:
+        """Refresh the local copy if it is stale and (re)build the index if needed.
+
+        Returns:
+            True if boundaries are available for queries
+        """
+        async with self._lock:
+            if self._is_stale():
+                await self._refresh()
+            signature = self._signature()
+            if signature is None:
+                return self.loaded
+            if signature != self._loaded_signature:
+                loop = asyncio.get_event_loop()
+                datasets, tree = await loop.run_in_executor(None, self._build_index)
+                self._datasets, self._tree, self._loaded_signature = datasets, tree, signature
+                logger.info(f"Indexed {len(datasets)} 3DEP dataset boundaries")
+            return self.loaded
+
+    def query(self, bbox: BoundingBox) -> List[Dict[str, Any]]:
+        """Datasets whose boundary intersects the bounding box."""
+        if self._tree is None:
+            return []
+        polygon = box(bbox.west, bbox.south, bbox.east, bbox.north)
+        try:
+            indices = self._tree.query(polygon, predicate="intersects")
+        except TypeError:
+            # Shapely < 2 returns geometries and has no predicate argument
+            by_id = {id(d['geometry']): i for i, d in enumerate(self._datasets)}
+            indices = [by_id[id(g)] for g in self._tree.query(polygon) if g.intersects(polygon)]
+        return [self._datasets[i] for i in sorted(int(i) for i in indices)]
+
+    def _signature(self):
+        try:
+            stat = self.data_path.stat()
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _read_meta(self) -> Dict[str, Any]:
+        try:
+            with open(self.meta_path, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_meta(self, meta: Dict[str, Any]) -> None:
+        _atomic_write(self.meta_path, json.dumps(meta).encode())
+
+    def _is_stale(self) -> bool:
+        meta = self._read_meta()
+        now = time.time()
+        if now - meta.get("last_attempt", 0) < self.retry_interval:
+            return False
+        if not self.data_path.exists():
+            return True
+        return now - meta.get("fetched_at", 0) > self.max_age
+
+    def _record_failed_attempt(self, meta: Dict[str, Any]) -> None:
+        meta["last_attempt"] = time.time()
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            self._write_meta(meta)
+        except OSError as e:
+            logger.warning(f"Could not record failed 3DEP boundaries refresh: {e}")
+
+    async def _refresh(self) -> None:
+        meta = self._read_meta()
+        headers = {}
+        if self.data_path.exists():
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+
+        try:
+            response = await get_http_client().get(self.url, headers=headers, retries=1, raise_for_status=False)
+        except Exception as e:
+            logger.warning(f"Could not refresh 3DEP boundaries, using local copy: {e}")
+            self._record_failed_attempt(meta)
+            return
+
+        if response.status == 304:
+            meta["fetched_at"] = time.time()
+            meta.pop("last_attempt", None)
+            self._write_meta(meta)
+            return
+        if not response.ok:
+            logger.warning(f"3DEP boundaries refresh failed with HTTP {response.status}, using local copy")
+            self._record_failed_attempt(meta)
+            return
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        _atomic_write(self.data_path, response.content)
+        self._write_meta({
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "fetched_at": time.time(),
+        })
+        logger.info(f"Downloaded 3DEP boundaries ({len(response.content) / (1024 * 1024):.1f} MB)")
+
+    def _build_index(self):
+        with open(self.data_path, "r") as f:
+            collection = json.load(f)
+
+        datasets = []
+        for feature in collection.get("features", []):
+            geometry = feature.get("geometry")
+            properties = feature.get("properties") or {}
+            if not geometry or "name" not in properties:
+                continue
+            datasets.append({
+                'name': properties['name'],
+                'url': properties.get('url'),
+                'points': properties.get('count', properties.get('points', 'Unknown')),
+                'geometry': shape(geometry),
+            })
+        tree = STRtree([d['geometry'] for d in datasets]) if datasets else None
+        return datasets, tree
+
+
+def _atomic_write(path: Path, content: bytes) -> None:
+    fd, tmp_path = tempfile.mkstemp(dir=str(path.parent), prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+    except Exception:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+# Global catalog instances by cache directory
+_catalog_instances: Dict[Path, BoundariesCatalog] = {}
+
+
+def get_boundaries_catalog(cache_dir: Union[str, Path] = "data/cache") -> BoundariesCatalog:
+    """Get the boundaries catalog for a cache directory.
+
+    Returns:
+        BoundariesCatalog instance
+    """
+    key = Path(cache_dir).resolve()
+    if key not in _catalog_instances:
+        _catalog_instances[key] = BoundariesCatalog(cache_dir)
+    return _catalog_instances[key]
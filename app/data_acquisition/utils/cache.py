@@ -1,263 +1,460 @@
 """
 Caching utilities for data acquisition
+
+Entries are indexed in a SQLite database next to the payload files, so a
+lookup or an access-time bump touches one row instead of rewriting a metadata
+file that grows with the cache. Payloads are written to a temporary file and
+renamed into place before their row is committed, so readers never see a
+partial entry. JSON-serializable data is stored as JSON (only other objects
+fall back to pickle) and whole files can be cached as-is and served by path.
+Entries expire after a TTL and the least recently used ones are evicted once
+the cache exceeds its byte or entry budget.
 """
 
 import os
 import json
 import pickle
+import shutil
+import sqlite3
 import hashlib
-from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
 import logging
 
 logger = logging.getLogger(__name__)
 
+KIND_JSON = "json"
+KIND_PICKLE = "pickle"
+KIND_FILE = "file"
+
+
 class DataCache:
     """Handles caching of downloaded and processed data"""
-    
-    def __init__(self, cache_dir: str):
+
+    def __init__(self, cache_dir: str, ttl_hours: Optional[float] = 24,
+                 max_size_mb: Optional[float] = None, max_entries: Optional[int] = None):
         """
         Initialize the cache
-        
+
         Args:
             cache_dir: Directory to store cache files
+            ttl_hours: Default lifetime of an entry (None keeps entries until evicted)
+            max_size_mb: Total payload budget; least recently used entries are evicted beyond it
+            max_entries: Maximum number of entries
         """
         self.cache_dir = cache_dir
-        self.metadata_file = os.path.join(cache_dir, "cache_metadata.json")
-        
-        # Note: Cache directory will be created only when actually needed
-        
-        # Load existing metadata
-        self.metadata = self._load_metadata()
-    
-    def _load_metadata(self) -> Dict[str, Any]:
-        """Load cache metadata from file"""
-        if os.path.exists(self.metadata_file):
-            try:
-                with open(self.metadata_file, 'r') as f:
-                    return json.load(f)
-            except Exception as e:
-                logger.warning(f"Failed to load cache metadata: {e}")
-        
-        return {
-            "entries": {},
-            "created": datetime.now().isoformat(),
-            "last_cleanup": datetime.now().isoformat()
-        }
-    
-    def _save_metadata(self):
-        """Save cache metadata to file"""
-        try:
-            # Create cache directory only when actually saving metadata
+        self.db_path = os.path.join(cache_dir, "cache_index.db")
+        self.legacy_metadata_file = os.path.join(cache_dir, "cache_metadata.json")
+        self.ttl_seconds = ttl_hours * 3600 if ttl_hours else None
+        self.max_bytes = int(max_size_mb * 1024 * 1024) if max_size_mb else None
+        self.max_entries = max_entries
+
+        # Note: Cache directory and index will be created only when actually needed
+        self._initialized = False
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the index, creating it (and migrating a legacy JSON index) on first use"""
+        if not self._initialized:
             os.makedirs(self.cache_dir, exist_ok=True)
-            
-            with open(self.metadata_file, 'w') as f:
-                json.dump(self.metadata, f, indent=2)
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        # With WAL this only risks the last commits on power loss, never corruption
+        conn.execute("PRAGMA synchronous=NORMAL")
+        if not self._initialized:
+            self._init_database(conn)
+            self._initialized = True
+        return conn
+
+    def _init_database(self, conn: sqlite3.Connection):
+        """Initialize SQLite database for the cache index"""
+        # WAL lets lookups proceed while another request is writing
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS cache_entries (
+                key_hash TEXT PRIMARY KEY,
+                original_key TEXT,
+                kind TEXT,
+                file_name TEXT,
+                file_size INTEGER,
+                created REAL,
+                last_accessed REAL,
+                expires_at REAL,
+                metadata TEXT
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_last_accessed ON cache_entries(last_accessed)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_expires_at ON cache_entries(expires_at)")
+        conn.execute("CREATE TABLE IF NOT EXISTS cache_info (name TEXT PRIMARY KEY, value TEXT)")
+        conn.execute(
+            "INSERT OR IGNORE INTO cache_info (name, value) VALUES ('created', ?)",
+            (datetime.now().isoformat(),)
+        )
+        conn.commit()
+        self._migrate_legacy_metadata(conn)
+
+    def _migrate_legacy_metadata(self, conn: sqlite3.Connection):
+        """Import entries from the old JSON metadata file, if there is one"""
+        if not os.path.exists(self.legacy_metadata_file):
+            return
+        try:
+            with open(self.legacy_metadata_file, 'r') as f:
+                legacy = json.load(f)
+            rows = []
+            for key_hash, entry in legacy.get("entries", {}).items():
+                file_name = f"{key_hash}.pkl"
+                if not os.path.exists(os.path.join(self.cache_dir, file_name)):
+                    continue
+                created = datetime.fromisoformat(entry["created"]).timestamp()
+                accessed = datetime.fromisoformat(entry.get("last_accessed", entry["created"])).timestamp()
+                rows.append((
+                    key_hash, entry.get("original_key"), KIND_PICKLE, file_name,
+                    entry.get("file_size", 0), created, accessed,
+                    created + self.ttl_seconds if self.ttl_seconds else None,
+                    json.dumps(entry.get("metadata", {}))
+                ))
+            conn.executemany("INSERT OR IGNORE INTO cache_entries VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            conn.commit()
+            os.replace(self.legacy_metadata_file, self.legacy_metadata_file + ".migrated")
+            logger.info(f"Migrated {len(rows)} cache entries to the SQLite index")
         except Exception as e:
-            logger.error(f"Failed to save cache metadata: {e}")
-    
+            logger.warning(f"Failed to migrate legacy cache metadata: {e}")
+
     def _generate_cache_key_hash(self, cache_key: str) -> str:
         """Generate a hash for the cache key to use as filename"""
         return hashlib.md5(cache_key.encode()).hexdigest()
-    
+
+    def _payload_path(self, file_name: str) -> str:
+        return os.path.join(self.cache_dir, file_name)
+
+    def _lookup(self, cache_key: str) -> Optional[sqlite3.Row]:
+        """Find a live entry and bump its access time; expired entries are dropped"""
+        key_hash = self._generate_cache_key_hash(cache_key)
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM cache_entries WHERE key_hash = ?", (key_hash,)).fetchone()
+            if row is None:
+                return None
+            if row["expires_at"] is not None and row["expires_at"] < now:
+                logger.info(f"Cache entry expired for key: {cache_key}")
+                self._delete_rows(conn, [row])
+                return None
+            if not os.path.exists(self._payload_path(row["file_name"])):
+                self._delete_rows(conn, [row])
+                return None
+            conn.execute("UPDATE cache_entries SET last_accessed = ? WHERE key_hash = ?", (now, key_hash))
+        return row
+
     def get(self, cache_key: str) -> Optional[Dict[str, Any]]:
         """
         Retrieve data from cache
-        
+
         Args:
             cache_key: Unique key for the cached data
-            
+
         Returns:
-            Cached data if found and valid, None otherwise
+            Cached data if found and valid, None otherwise. File entries are
+            returned as ``{"file_path": ..., "metadata": ...}``.
         """
-        key_hash = self._generate_cache_key_hash(cache_key)
-        
-        # Check if entry exists in metadata
-        if key_hash not in self.metadata["entries"]:
+        try:
+            row = self._lookup(cache_key)
+        except sqlite3.Error as e:
+            logger.error(f"Cache index lookup failed for {cache_key}: {e}")
             return None
-        
-        entry = self.metadata["entries"][key_hash]
-        
-        # Check if entry has expired (24 hours by default)
-        created_time = datetime.fromisoformat(entry["created"])
-        if datetime.now() - created_time > timedelta(hours=24):
-            logger.info(f"Cache entry expired for key: {cache_key}")
-            self.invalidate(cache_key)
+        if row is None:
             return None
-        
-        # Load cached data
-        cache_file = os.path.join(self.cache_dir, f"{key_hash}.pkl")
-        if os.path.exists(cache_file):
-            try:
-                with open(cache_file, 'rb') as f:
+
+        path = self._payload_path(row["file_name"])
+        try:
+            if row["kind"] == KIND_FILE:
+                data = {"file_path": path, "metadata": json.loads(row["metadata"] or "{}")}
+            elif row["kind"] == KIND_JSON:
+                with open(path, 'r') as f:
+                    data = json.load(f)
+            else:
+                with open(path, 'rb') as f:
                     data = pickle.load(f)
-                
-                # Update access time
-                entry["last_accessed"] = datetime.now().isoformat()
-                self._save_metadata()
-                
-                logger.info(f"Cache hit for key: {cache_key}")
-                return data
-                
-            except Exception as e:
-                logger.error(f"Failed to load cached data for {cache_key}: {e}")
-                self.invalidate(cache_key)
-        
-        return None
-    
-    def store(self, cache_key: str, data: Dict[str, Any], 
+        except Exception as e:
+            logger.error(f"Failed to load cached data for {cache_key}: {e}")
+            self.invalidate(cache_key)
+            return None
+
+        logger.info(f"Cache hit for key: {cache_key}")
+        return data
+
+    def get_file(self, cache_key: str) -> Optional[Path]:
+        """
+        Path of a cached file payload, without reading it
+
+        Args:
+            cache_key: Unique key for the cached file
+
+        Returns:
+            Path to the cached file if found and valid, None otherwise
+        """
+        try:
+            row = self._lookup(cache_key)
+        except sqlite3.Error as e:
+            logger.error(f"Cache index lookup failed for {cache_key}: {e}")
+            return None
+        if row is None or row["kind"] != KIND_FILE:
+            return None
+        return Path(self._payload_path(row["file_name"]))
+
+    def store(self, cache_key: str, data: Dict[str, Any],
               metadata: Optional[Dict[str, Any]] = None):
         """
         Store data in cache (alias for put method)
-        
+
         Args:
             cache_key: Unique key for the data
             data: Data to cache
             metadata: Optional metadata about the cached data
         """
         return self.put(cache_key, data, metadata)
-    
-    def put(self, cache_key: str, data: Dict[str, Any], 
-            metadata: Optional[Dict[str, Any]] = None):
+
+    def put(self, cache_key: str, data: Dict[str, Any],
+            metadata: Optional[Dict[str, Any]] = None, ttl_hours: Optional[float] = None):
         """
         Store data in cache
-        
+
         Args:
             cache_key: Unique key for the data
             data: Data to cache
             metadata: Optional metadata about the cached data
+            ttl_hours: Lifetime of this entry (defaults to the cache TTL)
         """
         key_hash = self._generate_cache_key_hash(cache_key)
-        cache_file = os.path.join(self.cache_dir, f"{key_hash}.pkl")
-        
         try:
-            # Create cache directory only when actually storing data
-            os.makedirs(self.cache_dir, exist_ok=True)
-            
-            # Save data to pickle file
-            with open(cache_file, 'wb') as f:
-                pickle.dump(data, f)
-            
-            # Update metadata
-            self.metadata["entries"][key_hash] = {
-                "original_key": cache_key,
-                "created": datetime.now().isoformat(),
-                "last_accessed": datetime.now().isoformat(),
-                "file_size": os.path.getsize(cache_file),
-                "metadata": metadata or {}
-            }
-            
-            self._save_metadata()
+            payload, kind, extension = json.dumps(data).encode(), KIND_JSON, "json"
+        except (TypeError, ValueError):
+            payload, kind, extension = pickle.dumps(data), KIND_PICKLE, "pkl"
+
+        def write(tmp_file):
+            tmp_file.write(payload)
+
+        self._commit_entry(cache_key, key_hash, kind, f"{key_hash}.{extension}", write, metadata, ttl_hours)
+
+    def put_file(self, cache_key: str, source_path: Union[str, Path],
+                 metadata: Optional[Dict[str, Any]] = None, ttl_hours: Optional[float] = None,
+                 move: bool = False) -> Optional[Path]:
+        """
+        Store a file in cache as-is
+
+        Args:
+            cache_key: Unique key for the file
+            source_path: File to cache
+            metadata: Optional metadata about the cached file
+            ttl_hours: Lifetime of this entry (defaults to the cache TTL)
+            move: Move the file into the cache instead of copying it
+
+        Returns:
+            Path of the cached copy, or None if caching failed
+        """
+        key_hash = self._generate_cache_key_hash(cache_key)
+        file_name = f"{key_hash}{Path(source_path).suffix}"
+
+        def write(tmp_file):
+            if move:
+                tmp_file.close()
+                shutil.move(str(source_path), tmp_file.name)
+            else:
+                with open(source_path, 'rb') as src:
+                    shutil.copyfileobj(src, tmp_file, 1024 * 1024)
+
+        if self._commit_entry(cache_key, key_hash, KIND_FILE, file_name, write, metadata, ttl_hours):
+            return Path(self._payload_path(file_name))
+        return None
+
+    def _commit_entry(self, cache_key: str, key_hash: str, kind: str, file_name: str,
+                      write, metadata: Optional[Dict[str, Any]], ttl_hours: Optional[float]) -> bool:
+        """Write a payload atomically, then index it and enforce the budgets"""
+        tmp_path = None
+        try:
+            conn = self._connect()
+            with tempfile.NamedTemporaryFile('wb', dir=self.cache_dir, prefix=f".{key_hash}.",
+                                             suffix=".tmp", delete=False) as tmp_file:
+                tmp_path = tmp_file.name
+                write(tmp_file)
+            file_path = self._payload_path(file_name)
+            os.replace(tmp_path, file_path)
+            tmp_path = None
+
+            now = time.time()
+            ttl_seconds = ttl_hours * 3600 if ttl_hours is not None else self.ttl_seconds
+            with conn:
+                previous = conn.execute(
+                    "SELECT file_name FROM cache_entries WHERE key_hash = ?", (key_hash,)
+                ).fetchone()
+                conn.execute(
+                    "INSERT OR REPLACE INTO cache_entries VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (key_hash, cache_key, kind, file_name, os.path.getsize(file_path), now, now,
+                     now + ttl_seconds if ttl_seconds else None, json.dumps(metadata or {}))
+                )
+                self._evict(conn, keep=key_hash)
+            conn.close()
+
+            # The key may previously have been stored under a different payload type
+            if previous is not None and previous["file_name"] != file_name:
+                self._remove_payload(previous["file_name"])
+
             logger.info(f"Data cached for key: {cache_key}")
-            
+            return True
+
         except Exception as e:
             logger.error(f"Failed to cache data for {cache_key}: {e}")
             # Clean up partial file
-            if os.path.exists(cache_file):
-                os.remove(cache_file)
-    
+            if tmp_path and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return False
+
+    def _evict(self, conn: sqlite3.Connection, keep: Optional[str] = None):
+        """Drop expired entries, then least recently used ones until within budget"""
+        expired = conn.execute(
+            "SELECT key_hash, file_name FROM cache_entries WHERE expires_at < ?", (time.time(),)
+        ).fetchall()
+        self._delete_rows(conn, expired)
+
+        if self.max_bytes is None and self.max_entries is None:
+            return
+        count, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(file_size), 0) FROM cache_entries").fetchone()
+        excess_entries = count - self.max_entries if self.max_entries is not None else 0
+        excess_bytes = total - self.max_bytes if self.max_bytes is not None else 0
+        if excess_entries <= 0 and excess_bytes <= 0:
+            return
+
+        victims = []
+        cursor = conn.execute(
+            "SELECT key_hash, file_name, file_size FROM cache_entries "
+            "WHERE key_hash != ? ORDER BY last_accessed ASC", (keep or "",)
+        )
+        for row in cursor:
+            if excess_entries <= 0 and excess_bytes <= 0:
+                break
+            victims.append(row)
+            excess_entries -= 1
+            excess_bytes -= row["file_size"] or 0
+        self._delete_rows(conn, victims)
+        logger.info(f"Evicted {len(victims)} least recently used cache entries")
+
+    def _delete_rows(self, conn: sqlite3.Connection, rows):
+        if not rows:
+            return
+        conn.executemany("DELETE FROM cache_entries WHERE key_hash = ?", [(row["key_hash"],) for row in rows])
+        for row in rows:
+            self._remove_payload(row["file_name"])
+
+    def _remove_payload(self, file_name: str):
+        try:
+            os.remove(self._payload_path(file_name))
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"Failed to remove cache file {file_name}: {e}")
+
     def invalidate(self, cache_key: str):
         """
         Remove data from cache
-        
+
         Args:
             cache_key: Key of data to remove
         """
         key_hash = self._generate_cache_key_hash(cache_key)
-        
-        # Remove from metadata
-        if key_hash in self.metadata["entries"]:
-            del self.metadata["entries"][key_hash]
-            self._save_metadata()
-        
-        # Remove cache file
-        cache_file = os.path.join(self.cache_dir, f"{key_hash}.pkl")
-        if os.path.exists(cache_file):
-            os.remove(cache_file)
-        
+
+        try:
+            with self._connect() as conn:
+                rows = conn.execute(
+                    "SELECT key_hash, file_name FROM cache_entries WHERE key_hash = ?", (key_hash,)
+                ).fetchall()
+                self._delete_rows(conn, rows)
+        except sqlite3.Error as e:
+            logger.error(f"Failed to invalidate cache entry {cache_key}: {e}")
+
         logger.info(f"Cache invalidated for key: {cache_key}")
-    
+
     def cleanup(self, older_than_days: int = 30):
         """
-        Clean up old cache entries
-        
+        Clean up old and expired cache entries
+
         Args:
             older_than_days: Remove entries older than this many days
         """
-        cutoff_date = datetime.now() - timedelta(days=older_than_days)
-        keys_to_remove = []
-        
-        for key_hash, entry in self.metadata["entries"].items():
-            created_time = datetime.fromisoformat(entry["created"])
-            if created_time < cutoff_date:
-                keys_to_remove.append(key_hash)
-        
-        # Remove old entries
-        for key_hash in keys_to_remove:
-            cache_file = os.path.join(self.cache_dir, f"{key_hash}.pkl")
-            if os.path.exists(cache_file):
-                os.remove(cache_file)
-            del self.metadata["entries"][key_hash]
-        
-        # Update cleanup timestamp
-        self.metadata["last_cleanup"] = datetime.now().isoformat()
-        self._save_metadata()
-        
-        logger.info(f"Cache cleanup completed. Removed {len(keys_to_remove)} entries.")
-    
+        cutoff = time.time() - older_than_days * 86400
+
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT key_hash, file_name FROM cache_entries WHERE created < ? OR expires_at < ?",
+                (cutoff, time.time())
+            ).fetchall()
+            self._delete_rows(conn, rows)
+
+            # Update cleanup timestamp
+            conn.execute(
+                "INSERT OR REPLACE INTO cache_info (name, value) VALUES ('last_cleanup', ?)",
+                (datetime.now().isoformat(),)
+            )
+
+        logger.info(f"Cache cleanup completed. Removed {len(rows)} entries.")
+
     def get_stats(self) -> Dict[str, Any]:
         """
         Get cache statistics
-        
+
         Returns:
             Dictionary with cache statistics
         """
-        total_entries = len(self.metadata["entries"])
-        total_size = sum(entry.get("file_size", 0) for entry in self.metadata["entries"].values())
-        
-        # Calculate age distribution
-        now = datetime.now()
-        age_buckets = {"<1h": 0, "1h-1d": 0, "1d-7d": 0, ">7d": 0}
-        
-        for entry in self.metadata["entries"].values():
-            created_time = datetime.fromisoformat(entry["created"])
-            age = now - created_time
-            
-            if age < timedelta(hours=1):
-                age_buckets["<1h"] += 1
-            elif age < timedelta(days=1):
-                age_buckets["1h-1d"] += 1
-            elif age < timedelta(days=7):
-                age_buckets["1d-7d"] += 1
-            else:
-                age_buckets[">7d"] += 1
-        
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute("""
+                SELECT COUNT(*) AS total_entries,
+                       COALESCE(SUM(file_size), 0) AS total_size,
+                       COALESCE(SUM(created >= :now - 3600), 0) AS under_hour,
+                       COALESCE(SUM(created < :now - 3600 AND created >= :now - 86400), 0) AS under_day,
+                       COALESCE(SUM(created < :now - 86400 AND created >= :now - 604800), 0) AS under_week,
+                       COALESCE(SUM(created < :now - 604800), 0) AS older
+                FROM cache_entries
+            """, {"now": now}).fetchone()
+            last_cleanup = conn.execute("SELECT value FROM cache_info WHERE name = 'last_cleanup'").fetchone()
+
         return {
-            "total_entries": total_entries,
-            "total_items": total_entries,  # Alias for compatibility
-            "total_size_mb": total_size / (1024 * 1024),
-            "age_distribution": age_buckets,
+            "total_entries": row["total_entries"],
+            "total_items": row["total_entries"],  # Alias for compatibility
+            "total_size_mb": row["total_size"] / (1024 * 1024),
+            "max_size_mb": self.max_bytes / (1024 * 1024) if self.max_bytes else None,
+            "max_entries": self.max_entries,
+            "age_distribution": {
+                "<1h": row["under_hour"],
+                "1h-1d": row["under_day"],
+                "1d-7d": row["under_week"],
+                ">7d": row["older"]
+            },
             "cache_dir": self.cache_dir,
-            "last_cleanup": self.metadata.get("last_cleanup")
+            "last_cleanup": last_cleanup["value"] if last_cleanup else None
         }
-    
+
     def get_history(self) -> List[Dict[str, Any]]:
         """
         Get list of all cached entries
-        
+
         Returns:
             List of cache entry information
         """
-        history = []
-        for key_hash, entry in self.metadata["entries"].items():
-            history.append({
-                "key": entry.get("original_key", "unknown"),
-                "created": entry["created"],
-                "last_accessed": entry["last_accessed"],
-                "size_mb": entry.get("file_size", 0) / (1024 * 1024),
-                "metadata": entry.get("metadata", {})
-            })
-        
-        # Sort by creation time (newest first)
-        history.sort(key=lambda x: x["created"], reverse=True)
-        return history
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT original_key, created, last_accessed, file_size, metadata "
+                "FROM cache_entries ORDER BY created DESC"
+            ).fetchall()
+
+        # Sorted by creation time (newest first)
+        return [
+            {
+                "key": row["original_key"] or "unknown",
+                "created": datetime.fromtimestamp(row["created"]).isoformat(),
+                "last_accessed": datetime.fromtimestamp(row["last_accessed"]).isoformat(),
+                "size_mb": (row["file_size"] or 0) / (1024 * 1024),
+                "metadata": json.loads(row["metadata"] or "{}")
+            }
+            for row in rows
+        ]
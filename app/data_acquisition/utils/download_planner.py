@@ -0,0 +1,123 @@
+"""
+Concurrent asset downloads for a single acquisition.
+
+A request often needs several assets from one source (e.g. Sentinel-2 red and
+NIR bands). ``DownloadPlanner`` starts them together instead of one after the
+other, bounded by a per-source concurrency limit that is shared by every
+request to that source, so wall-clock time tracks the slowest asset rather
+than the sum. Each asset's progress messages are forwarded unchanged with an
+``overall_progress`` field added that combines all assets of the request.
+"""
+
+import asyncio
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+ProgressCallback = Callable[[Dict[str, Any]], Awaitable[None]]
+
+_source_semaphores: Dict[Tuple[asyncio.AbstractEventLoop, str], asyncio.Semaphore] = {}
+
+
+def source_concurrency_limit(source_name: str) -> int:
+    """Configured number of simultaneous downloads for a source."""
+    from ...config import get_settings
+    settings = get_settings()
+    return max(1, int(settings.source_download_concurrency.get(source_name, settings.max_concurrent_downloads)))
+
+
+def _source_semaphore(source_name: str, limit: int) -> asyncio.Semaphore:
+    key = (asyncio.get_running_loop(), source_name)
+    semaphore = _source_semaphores.get(key)
+    if semaphore is None:
+        semaphore = _source_semaphores[key] = asyncio.Semaphore(limit)
+    return semaphore
+
+
+@dataclass
+class DownloadAsset:
+    """One asset of a request.
+
+    ``fetch`` receives the progress callback to use for this asset and returns
+    the asset's result. A result of None counts as a failure.
+    """
+    name: str
+    fetch: Callable[[Optional[ProgressCallback]], Awaitable[Any]]
+    weight: float = 1.0
+
+
+class DownloadPlanner:
+    """Runs the assets of one request concurrently under the source's limit."""
+
+    def __init__(
+        self,
+        source_name: str,
+        progress_callback: Optional[ProgressCallback] = None,
+        max_concurrency: Optional[int] = None,
+        fail_fast: bool = True,
+    ):
+        self.source_name = source_name
+        self.progress_callback = progress_callback
+        self.max_concurrency = max_concurrency or source_concurrency_limit(source_name)
+        self.fail_fast = fail_fast
+        self._asset_progress: Dict[str, float] = {}
+        self._weights: Dict[str, float] = {}
+
+    @property
+    def overall_progress(self) -> float:
+        total_weight = sum(self._weights.values()) or 1.0
+        return sum(self._asset_progress[name] * weight for name, weight in self._weights.items()) / total_weight
+
+    async def run(self, assets: List[DownloadAsset]) -> Dict[str, Any]:
+        """Fetch all assets and return their results by name.
+
+        Failed assets map to None. With ``fail_fast`` the remaining assets are
+        cancelled as soon as one fails, since the request cannot complete.
+        """
+        self._weights = {asset.name: asset.weight for asset in assets}
+        self._asset_progress = {asset.name: 0.0 for asset in assets}
+        semaphore = _source_semaphore(self.source_name, self.max_concurrency)
+
+        async def fetch(asset: DownloadAsset):
+            async with semaphore:
+                try:
+                    result = await asset.fetch(self._asset_callback(asset.name))
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.error(f"{self.source_name} asset {asset.name} failed: {e}")
+                    result = None
+            if result is not None:
+                self._asset_progress[asset.name] = 100.0
+            return asset.name, result
+
+        tasks = [asyncio.create_task(fetch(asset)) for asset in assets]
+        results: Dict[str, Any] = {asset.name: None for asset in assets}
+        try:
+            for finished in asyncio.as_completed(tasks):
+                name, result = await finished
+                results[name] = result
+                if result is None and self.fail_fast:
+                    logger.warning(f"Cancelling remaining {self.source_name} downloads after {name} failed")
+                    break
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        return results
+
+    def _asset_callback(self, name: str) -> Optional[ProgressCallback]:
+        if self.progress_callback is None:
+            return None
+
+        async def callback(update: Dict[str, Any]):
+            progress = update.get("progress")
+            if isinstance(progress, (int, float)) and update.get("type") == "download_progress":
+                self._asset_progress[name] = min(float(progress), 100.0)
+            elif update.get("type") in ("download_complete", "download_completed"):
+                self._asset_progress[name] = 100.0
+            await self.progress_callback({**update, "asset": name, "overall_progress": round(self.overall_progress, 1)})
+
+        return callback
@@ -0,0 +1,350 @@
+"""
+Shared non-blocking HTTP transport for data acquisition sources.
+
+All sources go through one pooled ``aiohttp`` session per event loop, so
+connections to the same host are kept alive and reused, the number of
+connections per host is bounded, and no source blocks the event loop with a
+synchronous ``requests`` call. Transient failures (connection errors,
+timeouts, 429 and 5xx responses) are retried with exponential backoff, and
+large files are streamed to a part file that resumes where it left off and
+is only renamed into place once complete.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import random
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Mapping, Optional, Tuple, Union
+import logging
+
+import aiofiles
+import aiohttp
+from multidict import CIMultiDict
+
+from .errors import NetworkError, RateLimitError
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+ChunkCallback = Callable[[int, Optional[int]], Optional[Awaitable[None]]]
+
+
+@dataclass
+class HttpResponse:
+    """A fully read HTTP response."""
+    status: int
+    headers: Mapping[str, str]  # case-insensitive
+    content: bytes
+    url: str
+
+    @property
+    def ok(self) -> bool:
+        return 200 <= self.status < 400
+
+    @property
+    def text(self) -> str:
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self) -> Any:
+        return json.loads(self.content)
+
+
+class _RetryableStatus(Exception):
+    def __init__(self, status: int, retry_after: Optional[str] = None):
+        super().__init__(f"HTTP {status}")
+        self.status = status
+        self.retry_after = retry_after
+
+
+def _check_retryable(response: aiohttp.ClientResponse) -> None:
+    if response.status in RETRY_STATUSES:
+        raise _RetryableStatus(response.status, response.headers.get("Retry-After"))
+
+
+def _parse_content_range(value: Optional[str]) -> Tuple[Optional[int], Optional[int]]:
+    """Start offset and complete length from a ``bytes start-end/total`` header."""
+    match = re.match(r"bytes (\d+)-\d+/(\d+|\*)", value or "")
+    if not match:
+        return None, None
+    start, total = match.groups()
+    return int(start), None if total == "*" else int(total)
+
+
+def _read_part_state(state_path: Path, url: str) -> Optional[str]:
+    """Validator (ETag or Last-Modified) the part file was started with, if it was for this URL."""
+    try:
+        with open(state_path, "r") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return state.get("validator") if state.get("url") == url else None
+
+
+def _write_part_state(state_path: Path, url: str, validator: Optional[str]) -> None:
+    if validator is None:
+        state_path.unlink(missing_ok=True)
+        return
+    with open(state_path, "w") as f:
+        json.dump({"url": url, "validator": validator}, f)
+
+
+def _sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(DOWNLOAD_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class AsyncHttpClient:
+    """Pooled HTTP client with bounded per-host concurrency and retries."""
+
+    def __init__(
+        self,
+        limit: int = 64,
+        limit_per_host: int = 8,
+        keepalive_timeout: float = 30.0,
+        connect_timeout: float = 30.0,
+        read_timeout: float = 300.0,
+        max_retries: int = 3,
+        backoff_factor: float = 0.5,
+    ):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.timeout = aiohttp.ClientTimeout(total=None, sock_connect=connect_timeout, sock_read=read_timeout)
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self._sessions: Dict[asyncio.AbstractEventLoop, aiohttp.ClientSession] = {}
+
+    async def session(self) -> aiohttp.ClientSession:
+        """The pooled session for the running event loop (sessions are loop-bound)."""
+        loop = asyncio.get_running_loop()
+        session = self._sessions.get(loop)
+        if session is None or session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                keepalive_timeout=self.keepalive_timeout,
+                ttl_dns_cache=300,
+            )
+            session = aiohttp.ClientSession(connector=connector, timeout=self.timeout)
+            self._sessions[loop] = session
+        return session
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        retries: Optional[int] = None,
+        raise_for_status: bool = True,
+        **kwargs,
+    ) -> HttpResponse:
+        """Send a request and read the whole body, retrying transient failures.
+
+        Args:
+            method: HTTP method
+            url: Request URL
+            retries: Retry attempts after the first (defaults to the client setting)
+            raise_for_status: Raise NetworkError for other 4xx responses too
+            **kwargs: Passed through to aiohttp (params, data, json, headers, auth...)
+
+        Returns:
+            HttpResponse with status, headers and body
+        """
+        async def send(session: aiohttp.ClientSession) -> HttpResponse:
+            async with session.request(method, url, **kwargs) as response:
+                _check_retryable(response)
+                return HttpResponse(
+                    status=response.status,
+                    headers=CIMultiDict(response.headers),
+                    content=await response.read(),
+                    url=str(response.url),
+                )
+
+        response = await self._with_retries(method, url, send, retries)
+        if raise_for_status and not response.ok:
+            raise NetworkError(
+                f"{method} {url} failed with HTTP {response.status}",
+                details={"status": response.status, "body": response.text[:500]},
+            )
+        return response
+
+    async def get(self, url: str, **kwargs) -> HttpResponse:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> HttpResponse:
+        return await self.request("POST", url, **kwargs)
+
+    async def head(self, url: str, **kwargs) -> HttpResponse:
+        kwargs.setdefault("allow_redirects", True)
+        return await self.request("HEAD", url, **kwargs)
+
+    async def download(
+        self,
+        url: str,
+        output_path: Union[str, Path],
+        on_chunk: Optional[ChunkCallback] = None,
+        chunk_size: int = DOWNLOAD_CHUNK_SIZE,
+        retries: Optional[int] = None,
+        method: str = "GET",
+        expected_size: Optional[int] = None,
+        expected_sha256: Optional[str] = None,
+        **kwargs,
+    ) -> int:
+        """Stream a response body to a file, resuming interrupted transfers.
+
+        The body is written to ``<output_path>.part``. When a transfer breaks
+        off, the retry asks for the remaining bytes with an HTTP Range request
+        (guarded by If-Range, so a changed remote file is fetched again from
+        the start), including on a later call after a restart. The part file
+        is only renamed to ``output_path`` once its size matches the announced
+        length and the optional expected size and checksum.
+
+        Args:
+            url: Request URL
+            output_path: Destination file
+            on_chunk: Optional ``(downloaded_bytes, total_bytes)`` callback, sync or async
+            chunk_size: Read size per chunk
+            retries: Retry attempts after the first (defaults to the client setting)
+            method: HTTP method
+            expected_size: Reject the download unless it has this many bytes
+            expected_sha256: Reject the download unless it has this SHA-256 digest
+
+        Returns:
+            Number of bytes written
+        """
+        output_path = Path(output_path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        part_path = output_path.with_name(output_path.name + ".part")
+        state_path = output_path.with_name(output_path.name + ".part.json")
+        resumable = method == "GET"
+        if not resumable:
+            part_path.unlink(missing_ok=True)
+        base_headers = dict(kwargs.pop("headers", None) or {})
+
+        async def send(session: aiohttp.ClientSession) -> int:
+            offset = part_path.stat().st_size if part_path.exists() else 0
+            validator = _read_part_state(state_path, url) if offset else None
+            headers = dict(base_headers)
+            # Byte offsets only line up with the unencoded body
+            headers.setdefault("Accept-Encoding", "identity")
+            if resumable and offset and validator:
+                headers["Range"] = f"bytes={offset}-"
+                headers["If-Range"] = validator
+
+            async with session.request(method, url, headers=headers, **kwargs) as response:
+                if response.status == 416:
+                    # The part file no longer fits the remote file; start over
+                    part_path.unlink(missing_ok=True)
+                    raise _RetryableStatus(response.status)
+                _check_retryable(response)
+                if response.status >= 400:
+                    raise NetworkError(
+                        f"{method} {url} failed with HTTP {response.status}",
+                        details={"status": response.status},
+                    )
+
+                if response.status == 206 and "Range" in headers:
+                    start, total = _parse_content_range(response.headers.get("Content-Range"))
+                    if start != offset:
+                        part_path.unlink(missing_ok=True)
+                        raise aiohttp.ClientPayloadError(f"Server resumed at byte {start}, expected {offset}")
+                    mode = "ab"
+                    logger.info(f"Resuming download of {output_path.name} at {offset / (1024 * 1024):.1f} MB")
+                else:
+                    offset, total, mode = 0, response.content_length, "wb"
+                    state = response.headers.get("ETag") or response.headers.get("Last-Modified")
+                    _write_part_state(state_path, url, state if resumable else None)
+
+                downloaded = offset
+                async with aiofiles.open(part_path, mode) as f:
+                    async for chunk in response.content.iter_chunked(chunk_size):
+                        await f.write(chunk)
+                        downloaded += len(chunk)
+                        if on_chunk is not None:
+                            result = on_chunk(downloaded, total)
+                            if asyncio.iscoroutine(result):
+                                await result
+
+                if total is not None and downloaded != total:
+                    # Retried like any broken connection, resuming from here
+                    raise aiohttp.ClientPayloadError(f"Received {downloaded} of {total} bytes")
+                return downloaded
+
+        downloaded = await self._with_retries(method, url, send, retries)
+
+        problem = None
+        if expected_size is not None and downloaded != expected_size:
+            problem = f"size {downloaded} != expected {expected_size}"
+        elif expected_sha256:
+            digest = await asyncio.get_running_loop().run_in_executor(None, _sha256, part_path)
+            if digest != expected_sha256.lower():
+                problem = f"sha256 {digest} != expected {expected_sha256}"
+        if problem:
+            part_path.unlink(missing_ok=True)
+            state_path.unlink(missing_ok=True)
+            raise NetworkError(f"Downloaded {url} failed verification: {problem}")
+
+        os.replace(part_path, output_path)
+        state_path.unlink(missing_ok=True)
+        return downloaded
+
+    async def _with_retries(self, method: str, url: str, send, retries: Optional[int]):
+        retries = self.max_retries if retries is None else retries
+        for attempt in range(retries + 1):
+            retry_after = None
+            try:
+                return await send(await self.session())
+            except _RetryableStatus as e:
+                failure, retry_after = f"HTTP {e.status}", e.retry_after
+                error_class = RateLimitError if e.status == 429 else NetworkError
+                error = error_class(f"{method} {url} failed with HTTP {e.status}", details={"status": e.status})
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                failure = f"{type(e).__name__}: {e}"
+                error = NetworkError(f"{method} {url} failed: {failure}")
+                error.__cause__ = e
+
+            if attempt >= retries:
+                raise error
+            delay = self._backoff_delay(attempt, retry_after)
+            logger.warning(f"{method} {url} failed ({failure}), retrying in {delay:.1f}s ({attempt + 1}/{retries})")
+            await asyncio.sleep(delay)
+
+    def _backoff_delay(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        if retry_after:
+            try:
+                return min(float(retry_after), 60.0)
+            except ValueError:
+                pass
+        # Exponential backoff with jitter so concurrent retries don't line up
+        return self.backoff_factor * (2 ** attempt) * (0.5 + random.random())
+
+    async def close(self) -> None:
+        """Close the session belonging to the running event loop."""
+        session = self._sessions.pop(asyncio.get_running_loop(), None)
+        if session is not None and not session.closed:
+            await session.close()
+
+
+# Global client instance
+_client_instance = None
+
+
+def get_http_client() -> AsyncHttpClient:
+    """Get the global HTTP client instance.
+
+    Returns:
+        AsyncHttpClient instance
+    """
+    global _client_instance
+    if _client_instance is None:
+        _client_instance = AsyncHttpClient()
+    return _client_instance
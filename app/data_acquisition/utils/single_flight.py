@@ -0,0 +1,115 @@
+"""
+Coalescing of identical in-flight acquisitions.
+
+When two callers ask for the same data at the same time (two browser tabs, or
+a client retrying), ``SingleFlight`` runs the work once and every caller
+awaits the same result, so the transfer is not duplicated and two writers
+never race on the same output files. Progress messages of the shared run are
+forwarded to every caller's callback. The shared work is only cancelled once
+all of its callers have gone away.
+"""
+
+import asyncio
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+ProgressCallback = Callable[[Dict[str, Any]], Awaitable[None]]
+
+
+def _rounded(value: Optional[float], digits: int = 6) -> Optional[float]:
+    return None if value is None else round(float(value), digits)
+
+
+def request_flight_key(source_name: str, request) -> Tuple:
+    """Key identifying a download request: source, normalized bbox, resolution and date window."""
+    bbox = request.bbox
+    return (
+        source_name,
+        tuple(_rounded(v) for v in (bbox.west, bbox.south, bbox.east, bbox.north)),
+        getattr(request.data_type, "value", request.data_type),
+        getattr(request.resolution, "value", request.resolution),
+        request.output_format,
+        str(getattr(request, "start_date", None) or ""),
+        str(getattr(request, "end_date", None) or ""),
+    )
+
+
+@dataclass
+class _Flight:
+    task: Optional[asyncio.Task] = None
+    callbacks: List[ProgressCallback] = field(default_factory=list)
+    waiters: int = 0
+
+
+class SingleFlight:
+    """Runs at most one coroutine per key at a time and shares its result."""
+
+    def __init__(self):
+        self._flights: Dict[Hashable, _Flight] = {}
+
+    def in_flight(self, key: Hashable) -> bool:
+        return key in self._flights
+
+    async def run(
+        self,
+        key: Hashable,
+        work: Callable[[Optional[ProgressCallback]], Awaitable[Any]],
+        progress_callback: Optional[ProgressCallback] = None,
+    ) -> Any:
+        """Run ``work`` for ``key``, or join the run already in progress.
+
+        Args:
+            key: Identity of the work; equal keys are coalesced
+            work: Coroutine function receiving the progress callback to report through
+            progress_callback: This caller's progress callback
+
+        Returns:
+            The shared result (exceptions are raised to every caller)
+        """
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = self._flights[key] = _Flight()
+            flight.task = asyncio.create_task(work(self._broadcaster(flight)))
+            flight.task.add_done_callback(lambda _: self._forget(key, flight))
+        else:
+            logger.info(f"Joining in-flight acquisition for {key}")
+            if progress_callback:
+                await progress_callback({
+                    "type": "acquisition_joined",
+                    "message": "An identical request is already downloading, waiting for its result"
+                })
+
+        if progress_callback:
+            flight.callbacks.append(progress_callback)
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            if flight.task.done():
+                raise
+            # This caller went away; stop the shared work only if nobody else waits for it
+            if progress_callback in flight.callbacks:
+                flight.callbacks.remove(progress_callback)
+            if flight.waiters == 1:
+                flight.task.cancel()
+            raise
+        finally:
+            flight.waiters -= 1
+
+    def _forget(self, key: Hashable, flight: _Flight):
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+    @staticmethod
+    def _broadcaster(flight: _Flight) -> ProgressCallback:
+        async def broadcast(update: Dict[str, Any]):
+            for callback in list(flight.callbacks):
+                try:
+                    await callback(update)
+                except Exception as e:
+                    # One disconnected listener must not fail the shared download
+                    logger.warning(f"Progress callback failed: {e}")
+        return broadcast
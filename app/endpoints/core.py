@@ -23,6 +23,7 @@ from ..processing import laz_to_dem, dtm, dsm, chm, hillshade, hillshade_315_45_
 from ..data_acquisition import DataAcquisitionManager
 from ..lidar_acquisition import LidarAcquisitionManager
 from ..config import get_settings, validate_api_keys, get_data_source_config
+from ..services.progress_hub import get_progress_hub
 
 # Get application settings
 settings = get_settings()
@@ -44,43 +45,36 @@ lidar_manager = LidarAcquisitionManager(
 
 # WebSocket connection manager for progress updates
 class ConnectionManager:
+    """Adapter over the shared progress hub, which owns sockets and fan-out."""
+
     def __init__(self):
-        self.active_connections: List[WebSocket] = []
-        self.active_downloads: Dict[str, Any] = {}  # Store active download tasks
+        self.hub = get_progress_hub()
+
+    @property
+    def active_connections(self) -> List[WebSocket]:
+        return list(self.hub.subscribers)
+
+    @property
+    def active_downloads(self) -> Dict[str, Any]:
+        return self.hub.active_downloads
 
     async def connect(self, websocket: WebSocket):
-        await websocket.accept()
-        self.active_connections.append(websocket)
+        await self.hub.connect(websocket)
 
     def disconnect(self, websocket: WebSocket):
-        if websocket in self.active_connections:
-            self.active_connections.remove(websocket)
+        self.hub.disconnect(websocket)
 
     async def send_progress_update(self, message: dict):
-        """Send progress update to all connected clients."""
-        for connection in self.active_connections:
-            try:
-                await connection.send_text(json.dumps(message))
-            except:
-                # Remove disconnected clients
-                try:
-                    self.active_connections.remove(connection)
-                except ValueError:
-                    pass
+        """Queue a progress update for every subscribed client."""
+        self.hub.publish(message)
     
     def add_download_task(self, download_id: str, source_instance):
         """Add a download task that can be cancelled."""
-        self.active_downloads[download_id] = source_instance
+        self.hub.add_download_task(download_id, source_instance)
     
     def cancel_download(self, download_id: str):
         """Cancel a specific download task."""
-        if download_id in self.active_downloads:
-            source_instance = self.active_downloads[download_id]
-            if hasattr(source_instance, 'cancel'):
-                source_instance.cancel()
-            del self.active_downloads[download_id]
-            return True
-        return False
+        return self.hub.cancel_download(download_id)
 
 manager = ConnectionManager()
 
@@ -152,19 +146,30 @@ async def websocket_endpoint(websocket: WebSocket):
         while True:
             # Listen for messages from client
             message = await websocket.receive_text()
+            manager.hub.touch(websocket)
             try:
                 data = json.loads(message)
-                
+                message_type = data.get("type")
+
+                # Topic subscriptions, e.g. {"type": "subscribe", "topics": ["region:foo", "download:abc"]}
+                if message_type == "subscribe":
+                    manager.hub.subscribe(websocket, data.get("topics", []))
+                elif message_type == "unsubscribe":
+                    manager.hub.unsubscribe(websocket, data.get("topics", []))
+
+                elif message_type == "pong":
+                    pass
+
                 # Handle cancellation messages
-                if data.get("type") == "cancel_download":
+                elif message_type == "cancel_download":
                     download_id = data.get("download_id")
                     if download_id:
                         success = manager.cancel_download(download_id)
-                        await websocket.send_text(json.dumps({
+                        manager.hub.send_to(websocket, {
                             "type": "cancellation_response",
                             "download_id": download_id,
                             "success": success
-                        }))
+                        })
                         
                         # Broadcast cancellation to all clients
                         await manager.send_progress_update({
@@ -179,6 +184,8 @@ async def websocket_endpoint(websocket: WebSocket):
                 pass
                 
     except WebSocketDisconnect:
+        pass
+    finally:
         manager.disconnect(websocket)
 
 @router.get("/", response_class=HTMLResponse)
@@ -421,31 +421,56 @@ async def download_elevation_coordinates(request: CoordinateRequest):
             output_dir = Path("output") / request.region_name
             output_dir.mkdir(parents=True, exist_ok=True)
             
-            # Create metadata.txt with the REQUESTED bounds immediately
-            metadata_path = output_dir / "metadata.txt"
-            with open(metadata_path, 'w') as f:
-                f.write(f"# LAZ Region Metadata\n")
-                f.write(f"# Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-                f.write(f"# Source: Elevation API coordinate request\n\n")
-                f.write(f"Region Name: {request.region_name}\n")
-                f.write(f"Source: Elevation API\n")
-                f.write(f"Request Type: coordinate-based\n\n")
-                f.write(f"# REQUESTED COORDINATES (Original user request)\n")
-                f.write(f"Requested Latitude: {request.lat}\n")
-                f.write(f"Requested Longitude: {request.lng}\n")
-                f.write(f"Buffer Distance (km): {request.buffer_km}\n\n")
-                f.write(f"# REQUESTED BOUNDS (WGS84 - EPSG:4326)\n")
-                f.write(f"# These bounds represent the REQUESTED AREA for LAZ acquisition\n")
-                f.write(f"North Bound: {bbox.north}\n")
-                f.write(f"South Bound: {bbox.south}\n")
-                f.write(f"East Bound: {bbox.east}\n")
-                f.write(f"West Bound: {bbox.west}\n\n")
-                f.write(f"# CENTER COORDINATES (Calculated from requested bounds)\n")
-                f.write(f"Center Latitude: {(bbox.north + bbox.south) / 2}\n")
-                f.write(f"Center Longitude: {(bbox.east + bbox.west) / 2}\n\n")
-                f.write(f"# Area Information\n")
-                f.write(f"Area (sq km): {bbox.area_km2():.4f}\n")
-                f.write(f"Download ID: {download_id}\n")
+            # Create metadata.json/metadata.txt with the REQUESTED bounds immediately
+            from ..services.region_metadata import get_region_metadata_store, MetadataSection
+            get_region_metadata_store().save(output_dir, [
+                MetadataSection(
+                    comments=[
+                        "LAZ Region Metadata",
+                        f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
+                        "Source: Elevation API coordinate request",
+                    ],
+                ),
+                MetadataSection(fields={
+                    "Region Name": request.region_name,
+                    "Source": "Elevation API",
+                    "Request Type": "coordinate-based",
+                }),
+                MetadataSection(
+                    comments=["REQUESTED COORDINATES (Original user request)"],
+                    fields={
+                        "Requested Latitude": request.lat,
+                        "Requested Longitude": request.lng,
+                        "Buffer Distance (km)": request.buffer_km,
+                    },
+                ),
+                MetadataSection(
+                    comments=[
+                        "REQUESTED BOUNDS (WGS84 - EPSG:4326)",
+                        "These bounds represent the REQUESTED AREA for LAZ acquisition",
+                    ],
+                    fields={
+                        "North Bound": bbox.north,
+                        "South Bound": bbox.south,
+                        "East Bound": bbox.east,
+                        "West Bound": bbox.west,
+                    },
+                ),
+                MetadataSection(
+                    comments=["CENTER COORDINATES (Calculated from requested bounds)"],
+                    fields={
+                        "Center Latitude": (bbox.north + bbox.south) / 2,
+                        "Center Longitude": (bbox.east + bbox.west) / 2,
+                    },
+                ),
+                MetadataSection(
+                    comments=["Area Information"],
+                    fields={
+                        "Area (sq km)": f"{bbox.area_km2():.4f}",
+                        "Download ID": download_id,
+                    },
+                ),
+            ])
             
             print(f"✅ IMMEDIATE BOUNDS SAVED to metadata.txt for region '{request.region_name}'")
             print(f"   Bounds: N={bbox.north:.6f}, S={bbox.south:.6f}, E={bbox.east:.6f}, W={bbox.west:.6f}")
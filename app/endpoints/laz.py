@@ -25,6 +25,7 @@ from osgeo import osr, ogr
 
 # Import LAZ metadata caching
 from services.laz_metadata_cache import get_metadata_cache
+from ..services.region_metadata import get_region_metadata_store, MetadataSection
 
 
 
@@ -68,41 +69,54 @@ def _create_laz_metadata_file(file_name: str, response_data: Dict[str, Any], sou
         center = response_data.get("center", {})
         debug_info = response_data.get("_debug_info", {})
         
-        # Create metadata content
-        metadata_content = f"""# LAZ Region Metadata
-# Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-# Source: LAZ file coordinate extraction
-
-Region Name: {region_name}
-Source: LAZ
-File Path: {file_name}
-
-# Coordinate Information (WGS84 - EPSG:4326)
-Center Latitude: {center.get('lat', 'N/A')}
-Center Longitude: {center.get('lng', 'N/A')}
-
-# Bounds Information (WGS84 - EPSG:4326)
-North Bound: {bounds.get('max_lat', 'N/A')}
-South Bound: {bounds.get('min_lat', 'N/A')}
-East Bound: {bounds.get('max_lng', 'N/A')}
-West Bound: {bounds.get('min_lng', 'N/A')}
-
-# Source CRS Information
-Source CRS: {source_crs_info or debug_info.get('source_crs_wkt', 'N/A')}
-
-# Native Bounds (Original CRS)
-Native Bounds: {debug_info.get('native_bounds', 'N/A')}
-
-# Processing Information
-NDVI Enabled: {str(ndvi_enabled).lower()}
-PDAL Command: {debug_info.get('pdal_command', 'N/A')}
-Extraction Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-"""
-        
-        # Write metadata file
+        # Write metadata.json and the derived metadata.txt
         metadata_path = output_dir / "metadata.txt"
-        with open(metadata_path, 'w') as f:
-            f.write(metadata_content)
+        get_region_metadata_store().save(output_dir, [
+            MetadataSection(
+                comments=[
+                    "LAZ Region Metadata",
+                    f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
+                    "Source: LAZ file coordinate extraction",
+                ],
+            ),
+            MetadataSection(fields={
+                "Region Name": region_name,
+                "Source": "LAZ",
+                "File Path": file_name,
+            }),
+            MetadataSection(
+                comments=["Coordinate Information (WGS84 - EPSG:4326)"],
+                fields={
+                    "Center Latitude": center.get('lat'),
+                    "Center Longitude": center.get('lng'),
+                },
+            ),
+            MetadataSection(
+                comments=["Bounds Information (WGS84 - EPSG:4326)"],
+                fields={
+                    "North Bound": bounds.get('max_lat'),
+                    "South Bound": bounds.get('min_lat'),
+                    "East Bound": bounds.get('max_lng'),
+                    "West Bound": bounds.get('min_lng'),
+                },
+            ),
+            MetadataSection(
+                comments=["Source CRS Information"],
+                fields={"Source CRS": source_crs_info or debug_info.get('source_crs_wkt')},
+            ),
+            MetadataSection(
+                comments=["Native Bounds (Original CRS)"],
+                fields={"Native Bounds": debug_info.get('native_bounds')},
+            ),
+            MetadataSection(
+                comments=["Processing Information"],
+                fields={
+                    "NDVI Enabled": bool(ndvi_enabled),
+                    "PDAL Command": debug_info.get('pdal_command'),
+                    "Extraction Time": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                },
+            ),
+        ])
         
         logger.info(f"Created LAZ metadata file: {metadata_path}")
         return True
@@ -7,11 +7,26 @@ import io
 import glob
 from PIL import Image, ImageDraw
 
+from ..services.region_metadata import get_region_metadata_store
+from ..services.product_files import product_file_url
+
 router = APIRouter()
 
+def _finalize_overlay_payload(overlay_data: dict, include_image_data: bool = False) -> dict:
+    """Drop the internal image path and optionally inline the image for legacy clients.
+
+    Overlay images are served from the product file route via ``image_url``;
+    base64 ``image_data`` is only embedded when explicitly requested.
+    """
+    image_path = overlay_data.pop('image_path', None)
+    if include_image_data and image_path:
+        with open(image_path, 'rb') as f:
+            overlay_data['image_data'] = base64.b64encode(f.read()).decode('utf-8')
+    return overlay_data
+
 @router.get("/api/overlay/sentinel2/{region_band}")
-async def get_sentinel2_overlay_data(region_band: str):
-    """Get overlay data for a Sentinel-2 image including bounds and base64 encoded image"""
+async def get_sentinel2_overlay_data(region_band: str, include_image_data: bool = False):
+    """Get overlay data for a Sentinel-2 image including bounds and image URL"""
     print(f"\n🛰️ API CALL: /api/overlay/sentinel2/{region_band}")
     
     try:
@@ -99,7 +114,7 @@ async def get_sentinel2_overlay_data(region_band: str):
         print(f"✅ Sentinel-2 overlay data retrieved successfully")
         print(f"📍 Bounds: {overlay_data['bounds']}")
         
-        return overlay_data
+        return _finalize_overlay_payload(overlay_data, include_image_data)
         
     except Exception as e:
         print(f"❌ Error in get_sentinel2_overlay_data: {str(e)}")
@@ -111,8 +126,8 @@ async def get_sentinel2_overlay_data(region_band: str):
         )
 
 @router.get("/api/overlay/{processing_type}/{filename}")
-async def get_overlay_data(processing_type: str, filename: str):
-    """Get overlay data for a processed image including bounds and base64 encoded image"""
+async def get_overlay_data(processing_type: str, filename: str, include_image_data: bool = False):
+    """Get overlay data for a processed image including bounds and image URL"""
     print(f"\n🗺️  API CALL: /api/overlay/{processing_type}/{filename}")
     
     try:
@@ -170,7 +185,7 @@ async def get_overlay_data(processing_type: str, filename: str):
         print(f"✅ Overlay data retrieved successfully")
         print(f"📍 Bounds: {overlay_data['bounds']}")
         
-        return overlay_data
+        return _finalize_overlay_payload(overlay_data, include_image_data)
         
     except Exception as e:
         print(f"❌ Error getting overlay data: {str(e)}")
@@ -182,8 +197,8 @@ async def get_overlay_data(processing_type: str, filename: str):
         )
 
 @router.get("/api/overlay/raster/{region_name}/{processing_type}")
-async def get_raster_overlay_data(region_name: str, processing_type: str):
-    """Get overlay data for raster-processed images from regions including bounds and base64 encoded image"""
+async def get_raster_overlay_data(region_name: str, processing_type: str, include_image_data: bool = False):
+    """Get overlay data for raster-processed images from regions including bounds and image URL"""
     print(f"\n🗺️  API CALL: /api/overlay/raster/{region_name}/{processing_type}")
     
     try:
@@ -226,7 +241,8 @@ async def get_raster_overlay_data(region_name: str, processing_type: str):
             result = {
                 'success': True,
                 'bounds': overlay_data['bounds'],
-                'image_data': overlay_data['image_data'],
+                'image_url': overlay_data['image_url'],
+                'image_path': overlay_data['image_path'],
                 'processing_type': processing_type,
                 'region_name': region_name,
                 'filename': overlay_data.get('filename', f"{region_name}_{band_type}"),
@@ -236,8 +252,10 @@ async def get_raster_overlay_data(region_name: str, processing_type: str):
             # Add optimization metadata if available
             if overlay_data.get('optimization_info'):
                 result['optimization_info'] = overlay_data['optimization_info']
+            if overlay_data.get('pyramid'):
+                result['pyramid'] = overlay_data['pyramid']
             
-            return result
+            return _finalize_overlay_payload(result, include_image_data)
         
         # Handle LIDAR/elevation processing types - NEW APPROACH
         # First, try direct PNG file lookup in png_outputs folder
@@ -273,56 +291,28 @@ async def get_raster_overlay_data(region_name: str, processing_type: str):
                     break
             
             if png_file_path:
-                # Read bounds from metadata.txt
-                metadata_path = f"output/{region_name}/metadata.txt"
-                bounds = None
-                
-                if os.path.exists(metadata_path):
-                    try:
-                        with open(metadata_path, 'r') as f:
-                            content = f.read()
-                        
-                        # Extract bounds from metadata
-                        bounds_dict = {}
-                        for line in content.split('\n'):
-                            line = line.strip()
-                            if line.startswith('North Bound:'):
-                                bounds_dict['north'] = float(line.split(':')[1].strip())
-                            elif line.startswith('South Bound:'):
-                                bounds_dict['south'] = float(line.split(':')[1].strip())
-                            elif line.startswith('East Bound:'):
-                                bounds_dict['east'] = float(line.split(':')[1].strip())
-                            elif line.startswith('West Bound:'):
-                                bounds_dict['west'] = float(line.split(':')[1].strip())
-                        
-                        if all(k in bounds_dict for k in ['north', 'south', 'east', 'west']):
-                            bounds = bounds_dict
-                            print(f"✅ Found bounds in metadata: {bounds}")
-                    except Exception as e:
-                        print(f"⚠️ Error reading bounds from metadata: {e}")
-                
+                # Read bounds from the region metadata
+                metadata = get_region_metadata_store().load(region_name)
+                bounds = metadata.bounds if metadata else None
                 if bounds:
-                    # Read and encode PNG image
-                    try:
-                        with open(png_file_path, 'rb') as f:
-                            image_data = base64.b64encode(f.read()).decode('utf-8')
-                        
-                        result = {
-                            'success': True,
-                            'bounds': bounds,
-                            'image_data': image_data,
-                            'processing_type': processing_type,
-                            'region_name': region_name,
-                            'filename': os.path.basename(png_file_path),
-                            'is_optimized': False
-                        }
-                        
-                        print(f"✅ Successfully prepared PNG overlay data from png_outputs")
-                        return result
-                        
-                    except Exception as e:
-                        print(f"❌ Error reading PNG file: {e}")
-                else:
+                    print(f"✅ Found bounds in metadata: {bounds}")
+                
+                image_url = product_file_url(png_file_path) if bounds else None
+                if image_url:
+                    result = {
+                        'success': True,
+                        'bounds': bounds,
+                        'image_url': image_url,
+                        'image_path': png_file_path,
+                        'processing_type': processing_type,
+                        'region_name': region_name,
+                        'filename': os.path.basename(png_file_path),
+                        'is_optimized': False
+                    }
+                    
+                    print(f"✅ Successfully prepared PNG overlay data from png_outputs")
+                    return _finalize_overlay_payload(result, include_image_data)
+                elif not bounds:
                     print(f"❌ No bounds found in metadata for region {region_name}")
         
         # Fallback to original approach if PNG files not found in png_outputs
@@ -382,7 +372,8 @@ async def get_raster_overlay_data(region_name: str, processing_type: str):
         result = {
             'success': True,
             'bounds': overlay_data['bounds'],
-            'image_data': overlay_data['image_data'],
+            'image_url': overlay_data['image_url'],
+            'image_path': overlay_data['image_path'],
             'processing_type': processing_type,
             'region_name': region_name,
             'filename': overlay_data.get('filename', region_name),
@@ -392,8 +383,10 @@ async def get_raster_overlay_data(region_name: str, processing_type: str):
         # Add optimization metadata if available
         if overlay_data.get('optimization_info'):
             result['optimization_info'] = overlay_data['optimization_info']
+        if overlay_data.get('pyramid'):
+            result['pyramid'] = overlay_data['pyramid']
         
-        return result
+        return _finalize_overlay_payload(result, include_image_data)
         
     except Exception as e:
         print(f"❌ Error getting raster overlay data: {str(e)}")
@@ -0,0 +1,140 @@
+"""
+Product file serving for map overlays.
+
+Serves files from the output directory with strong content-hash ETags,
+conditional (If-None-Match) and byte-range requests, and immutable caching
+for versioned URLs. When the ASGI server supports the zero-copy send
+extension the file body is handed to sendfile instead of being copied
+through Python.
+"""
+
+import os
+import re
+from typing import Optional, Tuple
+
+import anyio
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import Response
+from starlette.concurrency import run_in_threadpool
+from starlette.types import Receive, Scope, Send
+
+from ..services.product_files import PRODUCT_FILES_ROUTE, get_product_file_index
+
+router = APIRouter()
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+CHUNK_SIZE = 256 * 1024
+_RANGE_PATTERN = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class ProductFileResponse(Response):
+    """Stream a byte range of a file, using zero-copy send when the server offers it."""
+
+    def __init__(self, path: str, start: int, end: int, status_code: int, headers: dict, media_type: str, send_body: bool = True):
+        self.path = path
+        self.start = start
+        self.length = end - start + 1
+        self.send_body = send_body
+        super().__init__(status_code=status_code, headers={**headers, "content-length": str(self.length)}, media_type=media_type)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if not self.send_body or self.length <= 0:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+
+        if "http.response.zerocopysend" in scope.get("extensions", {}):
+            with open(self.path, "rb") as f:
+                await send({
+                    "type": "http.response.zerocopysend",
+                    "file": f.fileno(),
+                    "offset": self.start,
+                    "count": self.length,
+                    "more_body": False,
+                })
+            return
+
+        async with await anyio.open_file(self.path, mode="rb") as f:
+            await f.seek(self.start)
+            remaining = self.length
+            while remaining > 0:
+                chunk = await f.read(min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+            if remaining > 0:
+                await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+
+def _parse_range(range_header: str, size: int) -> Optional[Tuple[int, int]]:
+    """Parse a single ``bytes=`` range. Returns (start, end) or None if unsatisfiable."""
+    match = _RANGE_PATTERN.match(range_header.strip())
+    if not match or size == 0:
+        return None
+    first, last = match.groups()
+    if first == "" and last == "":
+        return None
+    if first == "":
+        # Suffix range: the last N bytes
+        suffix = int(last)
+        if suffix == 0:
+            return None
+        return max(size - suffix, 0), size - 1
+    start = int(first)
+    end = int(last) if last else size - 1
+    if start >= size or end < start:
+        return None
+    return start, min(end, size - 1)
+
+
+def _etag_matches(header_value: str, etag: str) -> bool:
+    tags = [tag.strip() for tag in header_value.split(",")]
+    return "*" in tags or etag in tags or f"W/{etag}" in tags
+
+
+@router.api_route(PRODUCT_FILES_ROUTE + "/{file_path:path}", methods=["GET", "HEAD"])
+async def get_product_file(file_path: str, request: Request, v: Optional[str] = None):
+    """Serve a product file with ETag, conditional and range request support"""
+    index = get_product_file_index()
+    path = index.resolve(file_path)
+    if path is None:
+        raise HTTPException(status_code=404, detail=f"Product file not found: {file_path}")
+
+    # Hashing only happens when the file changed, but keep it off the event loop
+    file_version = await run_in_threadpool(index.version_of, path)
+
+    headers = {
+        "etag": file_version.etag,
+        "accept-ranges": "bytes",
+        "cache-control": IMMUTABLE_CACHE_CONTROL if v == file_version.version else REVALIDATE_CACHE_CONTROL,
+    }
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, file_version.etag):
+        return Response(status_code=304, headers=headers)
+
+    size = file_version.size
+    start, end, status_code = 0, size - 1, 200
+
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header and (not if_range or if_range.strip() == file_version.etag):
+        byte_range = _parse_range(range_header, size)
+        if byte_range is None:
+            headers["content-range"] = f"bytes */{size}"
+            return Response(status_code=416, headers=headers)
+        start, end = byte_range
+        status_code = 206
+        headers["content-range"] = f"bytes {start}-{end}/{size}"
+
+    return ProductFileResponse(
+        path=os.fspath(path),
+        start=start,
+        end=end,
+        status_code=status_code,
+        headers=headers,
+        media_type=file_version.media_type,
+        send_body=request.method != "HEAD",
+    )
@@ -1,11 +1,13 @@
 from fastapi import APIRouter, HTTPException
 from fastapi.responses import JSONResponse
-from typing import Optional, Tuple, Dict, Union
+from typing import Optional, Tuple, Dict, List, Union
 import os
 import glob
 import re
 from pathlib import Path
 
+from ..services.region_metadata import get_region_metadata_store, MetadataSection
+
 router = APIRouter()
 
 def _read_coordinates_from_metadata(region_name: str) -> Union[Tuple[float, float, Optional[Dict[str, float]]], Tuple[float, float], None]:
@@ -18,56 +20,17 @@ def _read_coordinates_from_metadata(region_name: str) -> Union[Tuple[float, floa
         - None if coordinates are not found or file doesn't exist.
     """
     try:
-        metadata_file = os.path.join("output", region_name, "metadata.txt")
-        if not os.path.exists(metadata_file):
+        metadata = get_region_metadata_store().load(region_name)
+        if metadata is None:
             return None
 
-        with open(metadata_file, 'r') as f:
-            content = f.read()
-
-        lat = None
-        lng = None
-        bounds: Dict[str, Optional[float]] = {"north": None, "south": None, "east": None, "west": None}
-
-        lines = content.split('\n')
-        for line in lines:
-            line = line.strip()
-            if line.startswith('Center Latitude:') and 'N/A' not in line:
-                try:
-                    lat = float(line.split('Center Latitude:')[1].strip())
-                except (ValueError, IndexError):
-                    pass
-            elif line.startswith('Center Longitude:') and 'N/A' not in line:
-                try:
-                    lng = float(line.split('Center Longitude:')[1].strip())
-                except (ValueError, IndexError):
-                    pass
-            elif line.startswith('North Bound:') and 'N/A' not in line:
-                try:
-                    bounds["north"] = float(line.split('North Bound:')[1].strip())
-                except (ValueError, IndexError):
-                    pass
-            elif line.startswith('South Bound:') and 'N/A' not in line:
-                try:
-                    bounds["south"] = float(line.split('South Bound:')[1].strip())
-                except (ValueError, IndexError):
-                    pass
-            elif line.startswith('East Bound:') and 'N/A' not in line:
-                try:
-                    bounds["east"] = float(line.split('East Bound:')[1].strip())
-                except (ValueError, IndexError):
-                    pass
-            elif line.startswith('West Bound:') and 'N/A' not in line:
-                try:
-                    bounds["west"] = float(line.split('West Bound:')[1].strip())
-                except (ValueError, IndexError):
-                    pass
-
-        if lat is not None and lng is not None:
-            if all(bounds[k] is not None for k in bounds):
-                # All bounds are valid floats
+        center = metadata.center
+        if center is not None:
+            lat, lng = center["lat"], center["lng"]
+            bounds = metadata.bounds
+            if bounds is not None:
                 print(f"  📍 Found cached coordinates and bounds for {region_name}: ({lat}, {lng}), Bounds: {bounds}")
-                return lat, lng, {k: float(v) for k, v in bounds.items() if v is not None} # Ensure type checker is happy
+                return lat, lng, bounds
             else:
                 # Only coordinates found
                 print(f"  📍 Found cached coordinates for {region_name}: ({lat}, {lng}) (no complete bounds)")
@@ -78,8 +41,8 @@ def _read_coordinates_from_metadata(region_name: str) -> Union[Tuple[float, floa
         print(f"  ⚠️  Error reading cached coordinates for {region_name}: {str(e)}")
         return None
 
-def _generate_metadata_content(region: dict) -> str:
-    """Generate metadata content for a region based on its type and available coordinate information."""
+def _generate_metadata_sections(region: dict) -> List[MetadataSection]:
+    """Generate metadata sections for a region based on its type and available coordinate information."""
     from datetime import datetime
     
     region_name = region.get("name", "Unknown")
@@ -96,52 +59,51 @@ def _generate_metadata_content(region: dict) -> str:
         source_type = source
     
     # Start with basic metadata
-    content = f"""# Region Metadata
-# Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-# Source: {source_type}
-
-Region Name: {region_name}
-Source: {source}
-NDVI Enabled: {str(ndvi_enabled).lower()}"""
-    
+    basic_fields = {
+        "Region Name": region_name,
+        "Source": source,
+        "NDVI Enabled": bool(ndvi_enabled),
+    }
     if file_path:
-        content += f"""
-File Path: {file_path}"""
+        basic_fields["File Path"] = file_path
+    sections = [MetadataSection(
+        comments=["Region Metadata", f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", f"Source: {source_type}"],
+        fields=basic_fields,
+    )]
     
     # Add coordinate information if available
     center_lat = region.get("center_lat")
     center_lng = region.get("center_lng")
     
     if center_lat is not None and center_lng is not None:
-        content += f"""
-
-# Coordinate Information (from {source_type})
-Center Latitude: {center_lat}
-Center Longitude: {center_lng}"""
+        coordinate_fields = {
+            "Center Latitude": center_lat,
+            "Center Longitude": center_lng,
+        }
+        sections.append(MetadataSection(comments=[f"Coordinate Information (from {source_type})"], fields=coordinate_fields))
 
         # Add bounds information if available in the region dict
         bounds_info = region.get("bounds")
         if isinstance(bounds_info, dict) and all(k in bounds_info for k in ["north", "south", "east", "west"]):
-            content += f"""
-North Bound: {bounds_info['north']}
-South Bound: {bounds_info['south']}
-East Bound: {bounds_info['east']}
-West Bound: {bounds_info['west']}"""
+            coordinate_fields.update({
+                "North Bound": bounds_info['north'],
+                "South Bound": bounds_info['south'],
+                "East Bound": bounds_info['east'],
+                "West Bound": bounds_info['west'],
+            })
         elif file_path.lower().endswith(('.laz', '.las')):
             # If it's a LAZ file and specific bounds aren't available yet, keep placeholder
-            content += f"""
-
-# Additional Information
-Source CRS: Will be populated during LAZ processing
-Native Bounds: Will be populated during LAZ processing"""
+            sections.append(MetadataSection(comments=["Additional Information"], fields={
+                "Source CRS": "Will be populated during LAZ processing",
+                "Native Bounds": "Will be populated during LAZ processing",
+            }))
     else:
-        content += f"""
-
-# Coordinate Information
-Center Latitude: N/A
-Center Longitude: N/A"""
+        sections.append(MetadataSection(comments=["Coordinate Information"], fields={
+            "Center Latitude": None,
+            "Center Longitude": None,
+        }))
     
-    return content
+    return sections
 
 def isRegionNDVI(region_name: str) -> bool:
     """Check if a region was created with NDVI enabled by reading its metadata.txt file or .settings.json file.
@@ -153,19 +115,10 @@ def isRegionNDVI(region_name: str) -> bool:
         True if the region was created with NDVI enabled, False otherwise
     """
     try:
-        # First, try to read from metadata.txt file (preferred location)
-        metadata_file = os.path.join("output", region_name, "metadata.txt")
-        if os.path.exists(metadata_file):
-            with open(metadata_file, 'r') as f:
-                content = f.read()
-
-            # Look for NDVI Enabled line
-            lines = content.split('\n')
-            for line in lines:
-                line = line.strip()
-                if line.startswith('NDVI Enabled:'):
-                    value = line.split('NDVI Enabled:')[1].strip().lower()
-                    return value == 'true'
+        # First, try the region metadata (preferred location)
+        metadata = get_region_metadata_store().load(region_name)
+        if metadata is not None and metadata.ndvi_enabled is not None:
+            return metadata.ndvi_enabled
         
         # If metadata.txt doesn't exist or doesn't contain NDVI info,
         # check for .settings.json file in input/LAZ directory
@@ -394,34 +347,10 @@ async def list_regions(source: str = None, filter_type: str = None):
                             print(f"  📍 Loaded coordinates for {item}: ({region_info.get('center_lat')}, {region_info.get('center_lng')})")
                         else:
                             # If no coordinates in metadata, try to read source info
-                            try:
-                                with open(metadata_file, 'r') as f:
-                                    content = f.read()
-                                    
-                                # Look for saved place metadata format
-                                if "# Region Created from Saved Place" in content:
-                                    region_info["region_type"] = "saved_place"
-                                    print(f"  🏷️  Identified as saved place region: {item}")
-                                
-                                # Extract coordinates from different metadata formats
-                                for line in content.split('\n'):
-                                    line = line.strip()
-                                    if line.startswith('Center Latitude:') and 'N/A' not in line:
-                                        try:
-                                            region_info["center_lat"] = float(line.split('Center Latitude:')[1].strip())
-                                        except (ValueError, IndexError):
-                                            pass
-                                    elif line.startswith('Center Longitude:') and 'N/A' not in line:
-                                        try:
-                                            region_info["center_lng"] = float(line.split('Center Longitude:')[1].strip())
-                                        except (ValueError, IndexError):
-                                            pass
-                                
-                                if region_info.get("center_lat") and region_info.get("center_lng"):
-                                    print(f"  📍 Extracted coordinates for {item}: ({region_info['center_lat']}, {region_info['center_lng']})")
-                                    
-                            except Exception as e:
-                                print(f"  ⚠️  Error reading metadata for {item}: {e}")
+                            metadata = get_region_metadata_store().load(item)
+                            if metadata is not None and "Region Created from Saved Place" in metadata.comments:
+                                region_info["region_type"] = "saved_place"
+                                print(f"  🏷️  Identified as saved place region: {item}")
                         
                         regions_with_metadata.append(region_info)
                     else:
@@ -478,16 +407,16 @@ async def list_regions(source: str = None, filter_type: str = None):
                 print(f"  📄 Metadata file missing for {region_name} - will create")
             else:
                 # File exists, check if it's an elevation API metadata file (should not be overwritten)
-                with open(metadata_file, 'r') as f:
-                    existing_content = f.read()
+                existing_metadata = get_region_metadata_store().load(region_name)
+                existing_comments = existing_metadata.comments if existing_metadata else []
                 
                 # Check if this is an elevation API metadata file
-                is_elevation_api_metadata = any(marker in existing_content for marker in [
-                    "# Source: Elevation API",
-                    "Buffer Distance (km):",
-                    "# REQUESTED BOUNDS (WGS84 - EPSG:4326)",
-                    "Download ID:"
-                ])
+                is_elevation_api_metadata = existing_metadata is not None and (
+                    "Source: Elevation API" in existing_comments or
+                    "REQUESTED BOUNDS (WGS84 - EPSG:4326)" in existing_comments or
+                    existing_metadata.get("Buffer Distance (km)") is not None or
+                    existing_metadata.get("Download ID") is not None
+                )
                 
                 if is_elevation_api_metadata:
                     print(f"  🔒 Skipping elevation API metadata for {region_name} - preserving detailed bounds info")
@@ -535,12 +464,8 @@ async def list_regions(source: str = None, filter_type: str = None):
             # Only create or update if necessary
             if should_create_metadata or should_update_coordinates:
                 try:
-                    # Generate metadata content based on region type
-                    metadata_content = _generate_metadata_content(region)
-                    
-                    # Write metadata to file
-                    with open(metadata_file, 'w') as f:
-                        f.write(metadata_content)
+                    # Generate metadata based on region type and write metadata.json + metadata.txt
+                    get_region_metadata_store().save(output_dir, _generate_metadata_sections(region))
                     
                     if should_create_metadata:
                         metadata_created_count += 1
@@ -807,34 +732,43 @@ async def create_region(data: dict):
         # Create metadata file in output folder
         metadata_file = output_folder / "metadata.txt"
         
+        region_fields = {
+            "Region Name": safe_region_name,
+            "Display Name": place_name or safe_region_name,
+            "Center Latitude": coordinates['lat'],
+            "Center Longitude": coordinates['lng'],
+        }
+        
         # Handle bounds data if provided
         bounds_info = data.get('bounds', {})
-        bounds_section = ""
         if bounds_info and all(k in bounds_info for k in ['north', 'south', 'east', 'west']):
-            bounds_section = f"""
-North Bound: {bounds_info['north']}
-South Bound: {bounds_info['south']}
-East Bound: {bounds_info['east']}
-West Bound: {bounds_info['west']}"""
+            region_fields.update({
+                "North Bound": bounds_info['north'],
+                "South Bound": bounds_info['south'],
+                "East Bound": bounds_info['east'],
+                "West Bound": bounds_info['west'],
+            })
         
-        metadata_content = f"""# Region Created from Saved Place
-# Created: {data.get('created_at', 'Unknown')}
-# Original Place Name: {place_name or safe_region_name}
-
-Region Name: {safe_region_name}
-Display Name: {place_name or safe_region_name}
-Center Latitude: {coordinates['lat']}
-Center Longitude: {coordinates['lng']}{bounds_section}
-Source: saved_place
-NDVI Enabled: {str(ndvi_enabled).lower()}
-Created: {data.get('created_at', 'Unknown')}
-
-# This region was created by saving a place location
-# You can add elevation data, LAZ files, or satellite imagery to the input folder
-"""
+        region_fields.update({
+            "Source": "saved_place",
+            "NDVI Enabled": bool(ndvi_enabled),
+            "Created": data.get('created_at', 'Unknown'),
+        })
         
-        with open(metadata_file, 'w') as f:
-            f.write(metadata_content)
+        get_region_metadata_store().save(output_folder, [
+            MetadataSection(
+                comments=[
+                    "Region Created from Saved Place",
+                    f"Created: {data.get('created_at', 'Unknown')}",
+                    f"Original Place Name: {place_name or safe_region_name}",
+                ],
+                fields=region_fields,
+            ),
+            MetadataSection(comments=[
+                "This region was created by saving a place location",
+                "You can add elevation data, LAZ files, or satellite imagery to the input folder",
+            ]),
+        ])
         
         print(f"✅ Created region folder structure for: {safe_region_name}")
         print(f"   📁 Input folder: {input_folder}")
@@ -914,7 +848,8 @@ async def get_region_png_files(region_name: str):
                         "preview",          # Preview files
                         "thumbnail",        # Thumbnail files
                         "_raw",            # Raw unprocessed files
-                        "_temp"            # Temporary files
+                        "_temp",           # Temporary files
+                        "_overlays_l"      # Overlay pyramid levels (png_outputs/overlay_pyramid)
                         # Note: _sentinel2_ pattern removed to allow NDVI files
                     ]
                     
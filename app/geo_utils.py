@@ -2,11 +2,12 @@
 Geospatial utilities for reading coordinate information from world files and GeoTIFF files.
 """
 import os
-import base64
 import re
 from typing import Dict, Tuple, Optional
 from osgeo import gdal, osr
 from app.data_acquisition.utils.coordinates import BoundingBox
+from app.services.region_metadata import get_region_metadata_store
+from app.services.product_files import product_file_url
 
 def read_world_file(world_file_path: str) -> Optional[Dict]:
     """
@@ -286,7 +287,7 @@ def get_image_bounds_from_geotiff(tiff_path: str) -> Optional[Dict]:
 
 def get_laz_overlay_data(base_filename: str, processing_type: str, filename_processing_type: str = None) -> Optional[Dict]:
     """
-    Get overlay data for LAZ-processed images (DTM, Hillshade, etc.) including bounds and base64 encoded image.
+    Get overlay data for LAZ-processed images (DTM, Hillshade, etc.) including bounds and a versioned image URL.
     
     Args:
         base_filename: The base name of the LAZ file (e.g., 'OR_WizardIsland', 'FoxIsland')
@@ -560,7 +561,7 @@ def get_laz_overlay_data(base_filename: str, processing_type: str, filename_proc
 
 def get_sentinel2_overlay_data_util(region_name: str, band_name: str) -> Optional[Dict]:
     """
-    Get overlay data for Sentinel-2 images including bounds and base64 encoded image.
+    Get overlay data for Sentinel-2 images including bounds and a versioned image URL.
     
     Args:
         region_name: The region name (e.g., 'region_13_96S_48_33W')
@@ -750,6 +751,34 @@ def _get_optimized_overlay_path(original_png_path: str) -> Optional[str]:
         print(f"❌ Error checking for optimized overlay: {e}")
         return None
 
+def get_overlay_pyramid_levels(png_path: str) -> Optional[list]:
+    """
+    Get the overlay pyramid levels available for a PNG as servable URLs.
+    
+    Args:
+        png_path: Path to a product PNG or its optimized overlay
+        
+    Returns:
+        List of levels (largest first) with width, height and image_url, or None if no pyramid exists
+    """
+    from app.overlay_optimization import load_pyramid_manifest
+    
+    manifest = load_pyramid_manifest(png_path)
+    if not manifest:
+        return None
+    
+    levels = []
+    for level in manifest.get('levels', []):
+        image_url = product_file_url(level['path'])
+        if image_url:
+            levels.append({
+                'level': level['level'],
+                'width': level['width'],
+                'height': level['height'],
+                'image_url': image_url
+            })
+    return levels or None
+
 def _process_overlay_files(png_path: str, tiff_path: str, world_path: str, processing_type: str, base_filename: str, band_name: str = None, region_name: str = None, is_optimized: bool = False) -> Optional[Dict]:
     """
     Common function to process overlay files and extract bounds and image data.
@@ -961,15 +990,17 @@ def _process_overlay_files(png_path: str, tiff_path: str, world_path: str, proce
             print("❌ No coordinate information found")
             return None
             
-        # Read and encode PNG image
-        print("🖼️  Reading and encoding PNG image...")
-        with open(png_path, 'rb') as f:
-            image_data = base64.b64encode(f.read()).decode('utf-8')
+        # Reference the PNG through the versioned product file route instead of inlining it
+        image_url = product_file_url(png_path)
+        if not image_url:
+            print(f"❌ PNG is not servable as a product file: {png_path}")
+            return None
             
         print(f"✅ Successfully prepared overlay data")
         result = {
             'bounds': bounds,
-            'image_data': image_data,
+            'image_url': image_url,
+            'image_path': png_path,
             'processing_type': processing_type,
             'filename': base_filename,
             'is_optimized': is_optimized
@@ -988,6 +1019,9 @@ def _process_overlay_files(png_path: str, tiff_path: str, world_path: str, proce
                 'optimized_for_browser': True,
                 'original_file': png_path.replace('_overlays.png', '.png')
             }
+            pyramid_levels = get_overlay_pyramid_levels(png_path)
+            if pyramid_levels:
+                result['pyramid'] = pyramid_levels
             
         return result
         
@@ -1008,44 +1042,21 @@ def _get_bounds_from_metadata(base_filename: str) -> Optional[Dict]:
         Dictionary with bounds information or None if not found
     """
     try:
-        # Handle both full path and base filename
-        if base_filename.endswith('metadata.txt'):
-            metadata_path = base_filename
-        elif base_filename.startswith('output/'):
-            # Already includes output/ prefix
-            metadata_path = f"{base_filename}/metadata.txt"
-        else:
-            # Base filename only
-            metadata_path = f"output/{base_filename}/metadata.txt"
-        
-        if not os.path.exists(metadata_path):
-            print(f"📄 Metadata file not found: {metadata_path}")
+        metadata = get_region_metadata_store().load(base_filename)
+        if metadata is None:
+            print(f"📄 Metadata file not found for: {base_filename}")
             return None
         
-        print(f"📄 Reading metadata from: {metadata_path}")
-        
-        center_lat = None
-        center_lng = None
-        north_bound = None
-        south_bound = None
-        east_bound = None
-        west_bound = None
-        
-        with open(metadata_path, 'r') as f:
-            for line in f:
-                line = line.strip()
-                if line.startswith('Center Latitude:'):
-                    center_lat = float(line.split(':')[1].strip())
-                elif line.startswith('Center Longitude:'):
-                    center_lng = float(line.split(':')[1].strip())
-                elif line.startswith('North Bound:'):
-                    north_bound = float(line.split(':')[1].strip())
-                elif line.startswith('South Bound:'):
-                    south_bound = float(line.split(':')[1].strip())
-                elif line.startswith('East Bound:'):
-                    east_bound = float(line.split(':')[1].strip())
-                elif line.startswith('West Bound:'):
-                    west_bound = float(line.split(':')[1].strip())
+        print(f"📄 Using metadata from: {metadata.region_dir}")
+        
+        center = metadata.center or {}
+        center_lat = center.get('lat')
+        center_lng = center.get('lng')
+        actual_bounds = metadata.bounds or {}
+        north_bound = actual_bounds.get('north')
+        south_bound = actual_bounds.get('south')
+        east_bound = actual_bounds.get('east')
+        west_bound = actual_bounds.get('west')
         
         # Prefer actual bounds if available, fallback to center + buffer
         if all(bound is not None for bound in [north_bound, south_bound, east_bound, west_bound]):
@@ -1229,7 +1240,7 @@ def find_png_files(base_filename: str, processing_type: str, filename_processing
 def get_image_overlay_data(base_filename: str, processing_type: str, filename_processing_type: str = None) -> Optional[Dict]:
     """
     DEPRECATED: Use get_laz_overlay_data or get_sentinel2_overlay_data instead.
-    Get overlay data for a processed image including bounds and base64 encoded image.
+    Get overlay data for a processed image including bounds and a versioned image URL.
     
     Args:
         base_filename: The base name of the LAZ file (e.g., 'OR_WizardIsland') or region (e.g., 'region_13_96S_48_33W')
@@ -1306,25 +1317,14 @@ def _get_center_from_metadata(base_filename: str) -> Optional[Dict]:
         Dictionary with center coordinates or None if not found
     """
     try:
-        # Look for metadata.txt file in the output directory
-        metadata_path = f"output/{base_filename}/metadata.txt"
-        
-        if not os.path.exists(metadata_path):
-            print(f"📄 Metadata file not found: {metadata_path}")
+        metadata = get_region_metadata_store().load(base_filename)
+        if metadata is None:
+            print(f"📄 Metadata file not found for: {base_filename}")
             return None
         
-        print(f"📄 Reading center from metadata: {metadata_path}")
-        
-        center_lat = None
-        center_lng = None
-        
-        with open(metadata_path, 'r') as f:
-            for line in f:
-                line = line.strip()
-                if line.startswith('Center Latitude:'):
-                    center_lat = float(line.split(':')[1].strip())
-                elif line.startswith('Center Longitude:'):
-                    center_lng = float(line.split(':')[1].strip())
+        center = metadata.center or {}
+        center_lat = center.get('lat')
+        center_lng = center.get('lng')
         
         if center_lat is not None and center_lng is not None:
             return {'lat': center_lat, 'lng': center_lng}
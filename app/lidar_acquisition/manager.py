@@ -12,6 +12,7 @@ from pathlib import Path
 from .providers import get_provider, get_available_providers
 from ..config import get_settings
 from ..processing.raster_generation import RasterGenerator
+from ..services.region_metadata import get_region_metadata_store, MetadataSection
 
 
 class LidarAcquisitionManager:
@@ -117,18 +118,25 @@ class LidarAcquisitionManager:
             bbox = coordinate_converter.create_bounding_box(lat, lng, buffer_km)
             
             metadata_path = region_dir / "metadata.txt"
-            with open(metadata_path, 'w') as f:
-                f.write(f"# REQUESTED BOUNDS (WGS84 - EPSG:4326)\n")
-                f.write(f"# These bounds represent the REQUESTED AREA for LAZ acquisition\n")
-                f.write(f"North Bound: {bbox.north}\n")
-                f.write(f"South Bound: {bbox.south}\n") 
-                f.write(f"East Bound: {bbox.east}\n")
-                f.write(f"West Bound: {bbox.west}\n")
-                f.write(f"Center Lat: {lat}\n")
-                f.write(f"Center Lng: {lng}\n")
-                f.write(f"Buffer (km): {buffer_km}\n")
-                f.write(f"Data Type: LAZ (LiDAR point cloud)\n")
-                f.write(f"# Generated by LidarAcquisitionManager.acquire_lidar_data()\n")
+            get_region_metadata_store().save(region_dir, [
+                MetadataSection(
+                    comments=[
+                        "REQUESTED BOUNDS (WGS84 - EPSG:4326)",
+                        "These bounds represent the REQUESTED AREA for LAZ acquisition",
+                    ],
+                    fields={
+                        "North Bound": bbox.north,
+                        "South Bound": bbox.south,
+                        "East Bound": bbox.east,
+                        "West Bound": bbox.west,
+                        "Center Lat": lat,
+                        "Center Lng": lng,
+                        "Buffer (km)": buffer_km,
+                        "Data Type": "LAZ (LiDAR point cloud)",
+                    },
+                ),
+                MetadataSection(comments=["Generated by LidarAcquisitionManager.acquire_lidar_data()"]),
+            ])
             
             if progress_callback:
                 await progress_callback({
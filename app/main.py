@@ -7,7 +7,6 @@ import os
 import glob
 import base64
 import asyncio
-import json
 import math
 from datetime import datetime
 from typing import Optional, List, Dict, Any
@@ -22,6 +21,7 @@ from .processing import laz_to_dem, dtm, dsm, chm, hillshade, hillshade_315_45_0
 from .data_acquisition import DataAcquisitionManager
 from .lidar_acquisition import LidarAcquisitionManager
 from .config import get_settings, validate_api_keys, get_data_source_config
+from .services.progress_hub import get_progress_hub
 
 # Get application settings
 settings = get_settings()
@@ -43,43 +43,36 @@ lidar_manager = LidarAcquisitionManager(
 
 # WebSocket connection manager for progress updates
 class ConnectionManager:
+    """Adapter over the shared progress hub, which owns sockets and fan-out."""
+
     def __init__(self):
-        self.active_connections: List[WebSocket] = []
-        self.active_downloads: Dict[str, Any] = {}  # Store active download tasks
+        self.hub = get_progress_hub()
+
+    @property
+    def active_connections(self) -> List[WebSocket]:
+        return list(self.hub.subscribers)
+
+    @property
+    def active_downloads(self) -> Dict[str, Any]:
+        return self.hub.active_downloads
 
     async def connect(self, websocket: WebSocket):
-        await websocket.accept()
-        self.active_connections.append(websocket)
+        await self.hub.connect(websocket)
 
     def disconnect(self, websocket: WebSocket):
-        if websocket in self.active_connections:
-            self.active_connections.remove(websocket)
+        self.hub.disconnect(websocket)
 
     async def send_progress_update(self, message: dict):
-        """Send progress update to all connected clients."""
-        for connection in self.active_connections:
-            try:
-                await connection.send_text(json.dumps(message))
-            except:
-                # Remove disconnected clients
-                try:
-                    self.active_connections.remove(connection)
-                except ValueError:
-                    pass
+        """Queue a progress update for every subscribed client."""
+        self.hub.publish(message)
     
     def add_download_task(self, download_id: str, source_instance):
         """Add a download task that can be cancelled."""
-        self.active_downloads[download_id] = source_instance
+        self.hub.add_download_task(download_id, source_instance)
     
     def cancel_download(self, download_id: str):
         """Cancel a specific download task."""
-        if download_id in self.active_downloads:
-            source_instance = self.active_downloads[download_id]
-            if hasattr(source_instance, 'cancel'):
-                source_instance.cancel()
-            del self.active_downloads[download_id]
-            return True
-        return False
+        return self.hub.cancel_download(download_id)
 
 manager = ConnectionManager()
 
@@ -132,6 +125,7 @@ from .endpoints.chat import router as chat_router
 from .endpoints.json_pipelines import router as json_pipelines_router
 from .endpoints.laz_processing import router as laz_router
 from .endpoints.overlays import router as overlays_router
+from .endpoints.product_files import router as product_files_router
 from .endpoints.prompts import router as prompts_router
 from .endpoints.openai_interaction import router as openai_router
 from .endpoints.density_processing import router as density_router
@@ -155,6 +149,7 @@ app.include_router(chat_router)
 app.include_router(json_pipelines_router)
 app.include_router(laz_router)
 app.include_router(overlays_router)
+app.include_router(product_files_router)
 app.include_router(density_router)
 # app.include_router(lidar_router)
 # app.include_router(data_router)
@@ -173,6 +168,12 @@ app.include_router(prompts_router)
 app.include_router(openai_router)
 app.include_router(results.router) # Include the results router
 
+@app.on_event("shutdown")
+async def close_http_client():
+    """Close the pooled data acquisition HTTP connections."""
+    from .data_acquisition.utils.http import get_http_client
+    await get_http_client().close()
+
 # Global exception handlers to ensure proper JSON responses
 @app.exception_handler(ValueError)
 async def value_error_handler(request: Request, exc: ValueError):
@@ -8,13 +8,83 @@ Integrates with the frontend optimization system that uses 25M pixel thresholds.
 """
 
 import os
+import json
 import time
 from pathlib import Path
-from typing import Tuple, Optional, Dict, Any
+from typing import Tuple, Optional, Dict, Any, List
 from PIL import Image, ImageOps
 import numpy as np
 from osgeo import gdal
 
+PYRAMID_MANIFEST_VERSION = 1
+
+# Subfolder (next to the default overlay) holding the extra pyramid levels and the manifest,
+# so gallery and LLM image scans of png_outputs don't pick them up
+PYRAMID_DIRNAME = "overlay_pyramid"
+
+
+def _downsample_2x(data: np.ndarray, valid: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Halve a float32 grid by averaging valid pixels in each 2x2 block."""
+    height, width = data.shape
+    pad_y, pad_x = height % 2, width % 2
+    if pad_y or pad_x:
+        data = np.pad(data, ((0, pad_y), (0, pad_x)), mode='edge')
+        valid = np.pad(valid, ((0, pad_y), (0, pad_x)), mode='constant', constant_values=False)
+    out_h, out_w = data.shape[0] // 2, data.shape[1] // 2
+
+    blocks = np.where(valid, data, 0).reshape(out_h, 2, out_w, 2)
+    counts = valid.reshape(out_h, 2, out_w, 2).sum(axis=(1, 3))
+    sums = blocks.sum(axis=(1, 3), dtype=np.float32)
+    out = np.zeros((out_h, out_w), dtype=np.float32)
+    np.divide(sums, counts, out=out, where=counts > 0)
+    return out, counts > 0
+
+
+def _pyramid_base_path(png_path: str) -> str:
+    """Strip the overlay/level suffix (and pyramid subfolder) from a PNG path to get the product base path."""
+    base = os.path.splitext(png_path)[0]
+    marker = base.rfind('_overlays')
+    base = base[:marker] if marker != -1 else base
+    directory, name = os.path.split(base)
+    if os.path.basename(directory) == PYRAMID_DIRNAME:
+        directory = os.path.dirname(directory)
+    return os.path.join(directory, name)
+
+
+def load_pyramid_manifest(png_path: str) -> Optional[Dict[str, Any]]:
+    """
+    Load the overlay pyramid manifest that belongs to a PNG or overlay PNG, if any
+    
+    Args:
+        png_path: Path to the product PNG or one of its overlay levels
+        
+    Returns:
+        Manifest dictionary with level file paths resolved against the overlay directory, or None
+    """
+    base = _pyramid_base_path(png_path)
+    manifest_path = os.path.join(os.path.dirname(base), PYRAMID_DIRNAME, os.path.basename(base) + "_overlays.json")
+    if not os.path.exists(manifest_path):
+        return None
+    try:
+        with open(manifest_path, 'r') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Could not read overlay pyramid manifest {manifest_path}: {e}")
+        return None
+    overlay_dir = os.path.dirname(base)
+    for level in manifest.get('levels', []):
+        level['path'] = os.path.join(overlay_dir, level['file'])
+    return manifest
+
+
+def select_pyramid_level(manifest: Dict[str, Any], max_dim: int) -> Optional[Dict[str, Any]]:
+    """Pick the smallest pyramid level that still covers ``max_dim`` pixels, else the largest level."""
+    levels = sorted(manifest.get('levels', []), key=lambda level: max(level['width'], level['height']))
+    for level in levels:
+        if max(level['width'], level['height']) >= max_dim:
+            return level
+    return levels[-1] if levels else None
+
 class OverlayOptimizer:
     """Handles automatic generation of browser-friendly overlay versions"""
     
@@ -28,6 +98,9 @@ class OverlayOptimizer:
     AGGRESSIVE_MAX_DIM = 2048   # Aggressive optimization  
     EXTREME_MAX_DIM = 1024      # Extreme optimization
     
+    # Overlay pyramid: the top level fits STANDARD_MAX_DIM, then halves down to this size
+    PYRAMID_MIN_DIM = 256
+    
     def __init__(self):
         self.results = {
             'optimized_files': [],
@@ -138,84 +211,6 @@ class OverlayOptimizer:
         
         return new_width, new_height
     
-    def generate_overlay_png(self, tiff_path: str, target_width: int, target_height: int) -> Optional[str]:
-        """
-        Generate optimized PNG overlay from TIFF
-        
-        Args:
-            tiff_path: Source TIFF path
-            target_width: Target width for optimization
-            target_height: Target height for optimization
-            
-        Returns:
-            Path to generated overlay PNG or None if failed
-        """
-        try:
-            # Generate overlay filename with "_overlays" suffix
-            tiff_dir = os.path.dirname(tiff_path)
-            tiff_basename = os.path.splitext(os.path.basename(tiff_path))[0]
-            overlay_filename = f"{tiff_basename}_overlays.png"
-            overlay_path = os.path.join(tiff_dir, overlay_filename)
-            
-            print(f"🔄 Generating overlay: {overlay_filename}")
-            start_time = time.time()
-            
-            # Open TIFF with GDAL
-            ds = gdal.Open(tiff_path)
-            if ds is None:
-                raise Exception(f"Cannot open TIFF: {tiff_path}")
-            
-            # Get band statistics for proper scaling
-            band = ds.GetRasterBand(1)
-            band.ComputeStatistics(False)
-            min_val, max_val, mean_val, std_val = band.GetStatistics(True, True)
-            
-            print(f"   Data range: {min_val:.0f} to {max_val:.0f}")
-            
-            # Use GDAL to create optimized PNG with scaling and resizing
-            translate_options = [
-                "-of", "PNG",
-                "-ot", "Byte",
-                "-scale", str(min_val), str(max_val), "0", "255",
-                "-outsize", str(target_width), str(target_height),
-                "-r", "cubic",  # High-quality resampling
-                "-co", "WORLDFILE=YES"
-            ]
-            
-            # Perform translation
-            result = gdal.Translate(overlay_path, ds, format="PNG", options=translate_options)
-            
-            if result is not None and os.path.exists(overlay_path):
-                # Get file sizes for comparison
-                original_size_mb = os.path.getsize(tiff_path) / (1024 * 1024)
-                overlay_size_mb = os.path.getsize(overlay_path) / (1024 * 1024)
-                compression_ratio = (1 - overlay_size_mb / original_size_mb) * 100
-                processing_time = time.time() - start_time
-                
-                print(f"   ✅ Overlay generated in {processing_time:.2f}s")
-                print(f"   Size: {original_size_mb:.2f}MB → {overlay_size_mb:.2f}MB ({compression_ratio:.1f}% reduction)")
-                
-                # Copy worldfile with proper naming
-                original_worldfile = os.path.splitext(tiff_path)[0] + ".wld"
-                overlay_worldfile = os.path.splitext(overlay_path)[0] + ".pgw"
-                
-                if os.path.exists(original_worldfile):
-                    import shutil
-                    shutil.copy2(original_worldfile, overlay_worldfile)
-                    print(f"   🌍 Worldfile copied: {os.path.basename(overlay_worldfile)}")
-                
-                ds = None  # Close dataset
-                return overlay_path
-            else:
-                ds = None
-                raise Exception("GDAL translation failed")
-                
-        except Exception as e:
-            error_msg = f"Failed to generate overlay for {os.path.basename(tiff_path)}: {str(e)}"
-            print(f"❌ {error_msg}")
-            self.results['errors'].append(error_msg)
-            return None
-    
     def process_png_for_overlay_optimization(self, png_path: str) -> Optional[str]:
         """
         Process an existing PNG file to create an optimized overlay version
@@ -306,15 +301,153 @@ class OverlayOptimizer:
             self.results['errors'].append(error_msg)
             return None
     
-    def optimize_tiff_to_overlay(self, tiff_path: str) -> Optional[str]:
+    def generate_overlay_pyramid(self, tiff_path: str, analysis: Dict[str, Any], output_dir: Optional[str] = None) -> Optional[Dict[str, Any]]:
         """
-        Main function to check and optimize a TIFF file to overlay PNG
+        Generate a multi-level overlay pyramid from TIFF in one cascaded pass
+        
+        The source is read once into the top level (fitting STANDARD_MAX_DIM with
+        average resampling); every further level is a 2x reduction of the level
+        above it. Display scaling comes from the top level's valid pixels, so no
+        full-resolution statistics pass is needed. The level matching the legacy
+        optimization target is written to ``output_dir`` as ``<name>_overlays.png``;
+        the other levels and the ``<name>_overlays.json`` manifest go to its
+        PYRAMID_DIRNAME subfolder. Level files in the manifest are relative to
+        ``output_dir``.
+        
+        Args:
+            tiff_path: Source TIFF path
+            analysis: Result of should_optimize_image for this TIFF
+            output_dir: Directory for overlay files (defaults to the TIFF's directory)
+            
+        Returns:
+            Pyramid manifest dictionary or None if failed
+        """
+        try:
+            output_dir = output_dir or os.path.dirname(tiff_path)
+            pyramid_dir = os.path.join(output_dir, PYRAMID_DIRNAME)
+            os.makedirs(pyramid_dir, exist_ok=True)
+            tiff_basename = os.path.splitext(os.path.basename(tiff_path))[0]
+            
+            print(f"🔄 Generating overlay pyramid: {tiff_basename}_overlays")
+            start_time = time.time()
+            
+            ds = gdal.Open(tiff_path)
+            if ds is None:
+                raise Exception(f"Cannot open TIFF: {tiff_path}")
+            
+            src_width, src_height = ds.RasterXSize, ds.RasterYSize
+            geotransform = ds.GetGeoTransform()
+            nodata = ds.GetRasterBand(1).GetNoDataValue()
+            
+            # Single read of the source into the top pyramid level
+            scale = min(1.0, self.STANDARD_MAX_DIM / max(src_width, src_height))
+            top_width = max(1, int(round(src_width * scale)))
+            top_height = max(1, int(round(src_height * scale)))
+            top_ds = gdal.Translate(
+                "", ds, format="MEM", outputType=gdal.GDT_Float32,
+                width=top_width, height=top_height, resampleAlg="average"
+            )
+            ds = None
+            if top_ds is None:
+                raise Exception("GDAL translation to top pyramid level failed")
+            data = top_ds.GetRasterBand(1).ReadAsArray().astype(np.float32, copy=False)
+            top_ds = None
+            
+            valid = np.isfinite(data)
+            if nodata is not None:
+                valid &= data != nodata
+            if not valid.any():
+                raise Exception("No valid pixels in source raster")
+            min_val = float(data[valid].min())
+            max_val = float(data[valid].max())
+            value_range = (max_val - min_val) or 1.0
+            print(f"   Data range: {min_val:.0f} to {max_val:.0f}")
+            
+            # Level that replaces the legacy single _overlays.png
+            legacy_max_dim = analysis.get('target_max_dim', self.STANDARD_MAX_DIM)
+            
+            levels: List[Dict[str, Any]] = []
+            legacy_assigned = False
+            level_index = 0
+            while True:
+                height, width = data.shape
+                is_last = max(width, height) <= self.PYRAMID_MIN_DIM or (width == 1 and height == 1)
+                
+                if not legacy_assigned and (max(width, height) <= legacy_max_dim or is_last):
+                    level_filename = f"{tiff_basename}_overlays.png"
+                    legacy_assigned = True
+                else:
+                    level_filename = f"{PYRAMID_DIRNAME}/{tiff_basename}_overlays_L{level_index}.png"
+                level_path = os.path.join(output_dir, level_filename)
+                
+                scaled = np.clip((data - min_val) * (255.0 / value_range), 0, 255)
+                scaled = np.where(valid, scaled, 0).astype(np.uint8)
+                Image.fromarray(scaled, mode='L').save(level_path, 'PNG')
+                
+                # Georeference each level for its own pixel size
+                x_factor = src_width / width
+                y_factor = src_height / height
+                world_path = os.path.splitext(level_path)[0] + ".pgw"
+                with open(world_path, 'w') as f:
+                    f.write(f"{geotransform[1] * x_factor:.10f}\n")
+                    f.write(f"{geotransform[4] * x_factor:.10f}\n")
+                    f.write(f"{geotransform[2] * y_factor:.10f}\n")
+                    f.write(f"{geotransform[5] * y_factor:.10f}\n")
+                    f.write(f"{geotransform[0] + geotransform[1] * x_factor / 2 + geotransform[2] * y_factor / 2:.10f}\n")
+                    f.write(f"{geotransform[3] + geotransform[4] * x_factor / 2 + geotransform[5] * y_factor / 2:.10f}\n")
+                
+                levels.append({
+                    'level': level_index,
+                    'file': level_filename,
+                    'width': width,
+                    'height': height,
+                    'downsample': round(x_factor, 4),
+                    'size_bytes': os.path.getsize(level_path)
+                })
+                
+                if is_last:
+                    break
+                data, valid = _downsample_2x(data, valid)
+                level_index += 1
+            
+            manifest = {
+                'version': PYRAMID_MANIFEST_VERSION,
+                'source': os.path.basename(tiff_path),
+                'source_width': src_width,
+                'source_height': src_height,
+                'scale': {'min': min_val, 'max': max_val},
+                'default_file': f"{tiff_basename}_overlays.png",
+                'levels': levels
+            }
+            manifest_path = os.path.join(pyramid_dir, f"{tiff_basename}_overlays.json")
+            with open(manifest_path, 'w') as f:
+                json.dump(manifest, f, indent=2)
+            
+            processing_time = time.time() - start_time
+            print(f"   ✅ Pyramid with {len(levels)} levels generated in {processing_time:.2f}s")
+            for level in levels:
+                print(f"   L{level['level']}: {level['width']}x{level['height']} → {level['file']}")
+            
+            manifest['manifest_path'] = manifest_path
+            manifest['processing_time'] = processing_time
+            return manifest
+            
+        except Exception as e:
+            error_msg = f"Failed to generate overlay pyramid for {os.path.basename(tiff_path)}: {str(e)}"
+            print(f"❌ {error_msg}")
+            self.results['errors'].append(error_msg)
+            return None
+    
+    def optimize_tiff_to_overlay(self, tiff_path: str, output_dir: Optional[str] = None) -> Optional[str]:
+        """
+        Main function to check and optimize a TIFF file to an overlay pyramid
         
         Args:
             tiff_path: Path to TIFF file
+            output_dir: Directory for overlay files (defaults to the TIFF's directory)
             
         Returns:
-            Path to generated overlay PNG or None if not needed/failed
+            Path to the default overlay PNG or None if not needed/failed
         """
         should_optimize, analysis = self.should_optimize_image(tiff_path)
         
@@ -325,21 +458,18 @@ class OverlayOptimizer:
             })
             return None
         
-        # Generate optimized overlay
-        target_width, target_height = self.calculate_optimal_dimensions(
-            analysis['width'], 
-            analysis['height'], 
-            analysis['optimization_level']
-        )
-        
-        overlay_path = self.generate_overlay_png(tiff_path, target_width, target_height)
+        manifest = self.generate_overlay_pyramid(tiff_path, analysis, output_dir)
+        if not manifest:
+            return None
         
-        if overlay_path:
-            self.results['optimized_files'].append({
-                'original': tiff_path,
-                'overlay': overlay_path,
-                'analysis': analysis
-            })
+        overlay_path = os.path.join(os.path.dirname(os.path.dirname(manifest['manifest_path'])), manifest['default_file'])
+        self.results['optimized_files'].append({
+            'original': tiff_path,
+            'overlay': overlay_path,
+            'manifest': manifest['manifest_path'],
+            'levels': len(manifest['levels']),
+            'analysis': analysis
+        })
         
         return overlay_path
     
@@ -11,6 +11,24 @@ from .dtm import dtm
 
 logger = logging.getLogger(__name__)
 
+# Colour ramps as (fraction of the elevation range, (R, G, B)) stops
+COLOR_RAMPS = {
+    "terrain": [(0.0, (0, 0, 139)), (0.1, (0, 100, 255)), (0.2, (0, 255, 255)), (0.3, (0, 255, 0)),
+                (0.5, (255, 255, 0)), (0.7, (255, 165, 0)), (0.9, (255, 69, 0)), (1.0, (255, 255, 255))],
+    "arch_subtle": [(0.0, (200, 180, 160)), (0.2, (220, 200, 180)), (0.4, (180, 160, 140)),
+                    (0.6, (230, 210, 190)), (0.8, (240, 220, 200)), (1.0, (255, 245, 235))],
+    # 🟣 Gentler elevation-based color ramp with 5 soft color bands
+    # Pale yellow -> orange -> salmon -> red -> light red (ascending elevation zones)
+    "archaeological_gentle": [
+        (0.0, (255, 250, 220)),   # Pale cream/yellow (lowest elevation)
+        (0.25, (255, 228, 181)),  # Soft peach/orange
+        (0.5, (255, 192, 152)),   # Gentle salmon
+        (0.75, (255, 160, 122)),  # Soft coral/light red
+        (1.0, (255, 140, 105))    # Warm light red (highest elevation)
+    ],
+    "grayscale": [(0.0, (0, 0, 0)), (1.0, (255, 255, 255))],
+}
+
 async def process_color_relief(laz_file_path: str, output_dir: str, parameters: Dict[str, Any]) -> Dict[str, Any]:
     """
     Process Color-relief from LAZ file
@@ -102,25 +120,10 @@ def create_color_table(color_table_path: str, min_elevation: float, max_elevatio
     print(f"🎨 Creating color table (ramp: {ramp_name}) for elevation range: {min_elevation:.2f} to {max_elevation:.2f}")
     logger.info(f"Creating color table '{color_table_path}' with ramp '{ramp_name}' for range {min_elevation:.2f}-{max_elevation:.2f}")
 
-    if ramp_name == "terrain":
-        color_stops_config = [(0.0, "0 0 139"), (0.1, "0 100 255"), (0.2, "0 255 255"), (0.3, "0 255 0"), (0.5, "255 255 0"), (0.7, "255 165 0"), (0.9, "255 69 0"), (1.0, "255 255 255")]
-    elif ramp_name == "arch_subtle":
-        color_stops_config = [(0.0, "200 180 160"), (0.2, "220 200 180"), (0.4, "180 160 140"), (0.6, "230 210 190"), (0.8, "240 220 200"), (1.0, "255 245 235")]
-    elif ramp_name == "archaeological_gentle":
-        # 🟣 Gentler elevation-based color ramp with 5 soft color bands
-        # Pale yellow -> orange -> salmon -> red -> light red (ascending elevation zones)
-        color_stops_config = [
-            (0.0, "255 250 220"),   # Pale cream/yellow (lowest elevation)
-            (0.25, "255 228 181"),  # Soft peach/orange
-            (0.5, "255 192 152"),   # Gentle salmon
-            (0.75, "255 160 122"),  # Soft coral/light red
-            (1.0, "255 140 105")    # Warm light red (highest elevation)
-        ]
-    elif ramp_name == "grayscale":
-        color_stops_config = [(0.0, "0 0 0"), (1.0, "255 255 255")]
-    else:
+    if ramp_name not in COLOR_RAMPS:
         logger.error(f"Unknown ramp_name: {ramp_name}")
-        raise ValueError(f"Unknown ramp_name: {ramp_name}. Available: 'terrain', 'arch_subtle', 'archaeological_gentle', 'grayscale'.")
+        raise ValueError(f"Unknown ramp_name: {ramp_name}. Available: {', '.join(repr(name) for name in COLOR_RAMPS)}.")
+    color_stops_config = [(percentage, " ".join(str(c) for c in rgb)) for percentage, rgb in COLOR_RAMPS[ramp_name]]
 
     elevation_range = max_elevation - min_elevation
     if abs(elevation_range) < 1e-6:
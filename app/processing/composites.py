@@ -2,19 +2,172 @@
 import os
 import numpy as np
 import rasterio
-from rasterio.enums import Resampling
+from rasterio.windows import Window
 from PIL import Image, ImageEnhance
 import tempfile
+from contextlib import ExitStack
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
 import time
 import logging
 
 from .dtm import dtm as get_dtm_path # To get/generate DTM
-from .hillshade import generate_hillshade_with_params # To get/generate Hillshade
-from .color_relief import color_relief as get_color_relief_dtm_path # To generate colorized DTM
+from .color_relief import COLOR_RAMPS # Same ramps as the standalone color relief
+from .terrain_derivatives import horn_gradients, hillshade_from_gradients
 
 logger = logging.getLogger(__name__)
 
+# Window size of the streaming blend pass and tile size of the composite GeoTIFFs
+COMPOSITE_BLOCK_SIZE = 512
+
+
+@dataclass(frozen=True)
+class BlendVariant:
+    """Parameters of one colour-relief/hillshade blend rendered from a DTM"""
+    azimuth: float = 315.0
+    altitude: float = 45.0
+    z_factor: float = 1.0
+    blend_factor: float = 0.6 # 0.0 = full hillshade, 1.0 = full color DTM
+    ramp_name: str = "arch_subtle"
+
+
+class CompositeEngine:
+    """
+    Renders DTM-hillshade blends straight from an already-computed DTM
+
+    Colour ramp, hillshade and blend are applied in a single windowed pass
+    that writes tiled RGB GeoTIFFs; no colorized DTM or hillshade files are
+    written. The elevation range is computed once per engine and, within
+    each window, the elevation, gradients, colour ramps and hillshades are
+    shared by every variant that needs them.
+    """
+
+    def __init__(self, dtm_path: str, block_size: int = COMPOSITE_BLOCK_SIZE):
+        self.dtm_path = str(dtm_path)
+        self.block_size = block_size
+        self._elevation_range = None
+
+    def elevation_range(self) -> Tuple[float, float]:
+        """Minimum and maximum valid elevation of the DTM (computed once)"""
+        if self._elevation_range is None:
+            low, high = np.inf, -np.inf
+            with rasterio.open(self.dtm_path) as src:
+                for window in _composite_windows(src.width, src.height, self.block_size):
+                    block = src.read(1, window=window, masked=True)
+                    if block.count():
+                        low, high = min(low, float(block.min())), max(high, float(block.max()))
+            if not np.isfinite(low):
+                raise ValueError(f"DTM {self.dtm_path} has no valid elevations")
+            self._elevation_range = (low, high)
+        return self._elevation_range
+
+    def render(self, outputs: Dict[str, BlendVariant]) -> List[str]:
+        """
+        Write every requested blend in one pass over the DTM
+
+        Args:
+            outputs: Blend variant to render, keyed by output GeoTIFF path
+
+        Returns:
+            List of written output paths
+        """
+        for variant in outputs.values():
+            if variant.ramp_name not in COLOR_RAMPS:
+                raise ValueError(f"Unknown ramp_name: {variant.ramp_name}. Available: {', '.join(repr(name) for name in COLOR_RAMPS)}.")
+
+        with rasterio.open(self.dtm_path) as src, ExitStack() as stack:
+            profile = src.profile.copy()
+            profile.pop('nodata', None)
+            profile.pop('interleave', None) # Not always compatible with LZW + RGB
+            profile.update(
+                driver='GTiff',
+                count=3,
+                dtype='uint8',
+                compress='lzw',
+                tiled=True,
+                blockxsize=self.block_size,
+                blockysize=self.block_size,
+                photometric='RGB'
+            )
+            destinations = {}
+            for output_path in outputs:
+                Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+                destinations[output_path] = stack.enter_context(rasterio.open(output_path, 'w', **profile))
+
+            for window in _composite_windows(src.width, src.height, self.block_size):
+                elevation, dx, dy = self._read_window(src, window)
+                colors, shades = {}, {}
+                for output_path, variant in outputs.items():
+                    if variant.ramp_name not in colors:
+                        colors[variant.ramp_name] = self._colorize(elevation, variant.ramp_name)
+                    light = (variant.azimuth, variant.altitude, variant.z_factor)
+                    if light not in shades:
+                        shades[light] = hillshade_from_gradients(dx, dy, *light)
+                    blended = _blend(colors[variant.ramp_name], shades[light], variant.blend_factor)
+                    destinations[output_path].write(blended, window=window)
+
+        return list(outputs)
+
+    def _read_window(self, src, window: Window) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Read one window of elevation and its gradients
+
+        The window is read with a one-pixel halo so the 3x3 gradients at its
+        edges match those of a whole-raster computation.
+        """
+        row_start, col_start = max(window.row_off - 1, 0), max(window.col_off - 1, 0)
+        row_stop = min(window.row_off + window.height + 1, src.height)
+        col_stop = min(window.col_off + window.width + 1, src.width)
+        halo = Window(col_start, row_start, col_stop - col_start, row_stop - row_start)
+
+        elevation = src.read(1, window=halo, masked=True).astype(np.float64).filled(np.nan)
+        dx, dy = horn_gradients(elevation, abs(src.transform.a), abs(src.transform.e))
+
+        inner = (slice(window.row_off - row_start, window.row_off - row_start + window.height),
+                 slice(window.col_off - col_start, window.col_off - col_start + window.width))
+        return elevation[inner], dx[inner], dy[inner]
+
+    def _colorize(self, elevation: np.ndarray, ramp_name: str) -> np.ndarray:
+        """Interpolate the colour ramp over the elevation range like gdaldem color-relief (black for nodata)"""
+        stops = COLOR_RAMPS[ramp_name]
+        positions = np.array([percentage for percentage, _ in stops])
+        ramp_colors = np.array([rgb for _, rgb in stops], dtype=np.float32)
+
+        rgb = np.zeros((3,) + elevation.shape, dtype=np.float32)
+        valid = np.isfinite(elevation)
+        low, high = self.elevation_range()
+        if high - low < 1e-6:
+            # Flat DTM: a single colour, as in create_color_table
+            flat_color = (128, 128, 128) if ramp_name == "grayscale" else ramp_colors[len(ramp_colors) // 2]
+            rgb[:, valid] = np.asarray(flat_color, dtype=np.float32)[:, None]
+            return rgb
+
+        fraction = (elevation[valid] - low) / (high - low)
+        for band in range(3):
+            rgb[band, valid] = np.interp(fraction, positions, ramp_colors[:, band])
+        return rgb
+
+
+def _composite_windows(width: int, height: int, block_size: int) -> Iterator[Window]:
+    """Row-major windows covering the raster, aligned to the output tiles"""
+    for row in range(0, height, block_size):
+        for col in range(0, width, block_size):
+            yield Window(col, row, min(block_size, width - col), min(block_size, height - row))
+
+
+def _blend(color: np.ndarray, hillshade: np.ndarray, blend_factor: float) -> np.ndarray:
+    """
+    Modulate colour brightness by the hillshade
+
+    Output = Color * (blend_factor + Hillshade_Norm * (1 - blend_factor)), so
+    blend_factor 1.0 keeps the plain colour relief and 0.0 fully shades it.
+    """
+    hillshade_norm = hillshade.astype(np.float32) / 255.0
+    blended = color * (blend_factor + hillshade_norm * (1.0 - blend_factor))
+    return np.clip(blended, 0, 255).astype(np.uint8)
+
+
 def generate_dtm_hillshade_blend(
     laz_input_file: str,
     region_name_for_output: str, # Used for naming and pathing conventions
@@ -23,14 +176,15 @@ def generate_dtm_hillshade_blend(
     hillshade_azimuth: float = 315.0,
     hillshade_altitude: float = 45.0,
     hillshade_z_factor: float = 1.0,
-    hillshade_suffix: str = "standard", # Suffix for the hillshade component
+    hillshade_suffix: str = "standard", # Kept for API compatibility; no separate hillshade file is written
     blend_factor: float = 0.6, # 0.0 = full hillshade, 1.0 = full color DTM
-    # output_resolution_factor: float = 1.0 # Factor to scale output resolution (e.g., 0.5 for half resolution) - Not implemented yet
+    ramp_name: str = "arch_subtle",
 ) -> str:
     """
     Generates a blended DTM and Hillshade composite GeoTIFF.
-    The DTM is first colorized using the standard color_relief logic.
-    This colorized DTM is then blended with a specified hillshade.
+    The DTM is generated (or taken from the cache) once; colour relief,
+    hillshade and blend are then applied in a single windowed pass by
+    CompositeEngine.
     Output paths will follow conventions like:
     output/<region_name_for_output>/lidar/Composites/<input_stem>_DTM{res}m_CSF{csf_res}_HS_az{az}_alt{alt}_z{z}_blend.tif
     """
@@ -44,141 +198,50 @@ def generate_dtm_hillshade_blend(
     # Determine csf_cloth_resolution if None
     actual_csf_cloth_resolution = dtm_csf_cloth_resolution if dtm_csf_cloth_resolution is not None else dtm_resolution
 
-    print(f"Parameters: DTM Res={dtm_resolution}m, CSF Res={actual_csf_cloth_resolution}m, HS Az={hillshade_azimuth}, HS Alt={hillshade_altitude}, HS Z={hillshade_z_factor}, Blend Factor={blend_factor}")
-    logger.info(f"Composite Params: DTM Res={dtm_resolution}m, CSF Res={actual_csf_cloth_resolution}m, HS Az={hillshade_azimuth}, HS Alt={hillshade_altitude}, HS Z={hillshade_z_factor}, Blend Factor={blend_factor}")
-
-    # --- Step 1: Generate Colorized DTM (RGB TIFF) ---
-    # The color_relief function takes the LAZ file as input and generates the DTM internally.
-    # Its output is already an RGB TIFF.
-    # TODO: The current `color_relief.py` does not accept dtm_resolution or csf_cloth_resolution.
-    # It will use the defaults set within the `dtm()` function it calls.
-    # This means the DTM used for color_relief might have a different resolution profile
-    # than the DTM used for the hillshade if different parameters are passed here.
-    # For true consistency, color_relief.py would need to be updated to accept these.
-    # For now, we proceed, and the DTM for color relief will use dtm() defaults or its own logic.
-    print(f"🎨 Step 1: Generating Colorized DTM (RGB) from {laz_input_file}...")
-    logger.info("Generating Colorized DTM for composite.")
+    print(f"Parameters: DTM Res={dtm_resolution}m, CSF Res={actual_csf_cloth_resolution}m, HS Az={hillshade_azimuth}, HS Alt={hillshade_altitude}, HS Z={hillshade_z_factor}, Blend Factor={blend_factor}, Ramp={ramp_name}")
+    logger.info(f"Composite Params: DTM Res={dtm_resolution}m, CSF Res={actual_csf_cloth_resolution}m, HS Az={hillshade_azimuth}, HS Alt={hillshade_altitude}, HS Z={hillshade_z_factor}, Blend Factor={blend_factor}, Ramp={ramp_name}")
+
+    # --- Step 1: Generate or locate the DTM ---
+    print(f"🏔️ Step 1: Generating/retrieving DTM from {laz_input_file}...")
+    logger.info("Generating DTM for composite.")
     try:
-        # Assuming color_relief is called with region_name_for_output so its internal DTM call
-        # also uses this for pathing, ensuring cache hits if DTM was already made by hillshade's DTM call later.
-        # The `color_relief` function expects `region_name` as its second arg.
-        color_dtm_path_str = get_color_relief_dtm_path(laz_input_file, region_name_for_output)
-        color_dtm_path = Path(color_dtm_path_str)
-        if not color_dtm_path.exists():
-            logger.error(f"Colorized DTM not found at {color_dtm_path} after generation call.")
-            raise FileNotFoundError(f"Colorized DTM not found at {color_dtm_path} after generation call.")
+        dtm_path = Path(get_dtm_path(
+            laz_input_file,
+            region_name=region_name_for_output, # For consistent output pathing and cache hits
+            resolution=dtm_resolution,
+            csf_cloth_resolution=dtm_csf_cloth_resolution
+        ))
+        if not dtm_path.exists():
+            logger.error(f"DTM not found at {dtm_path} after generation call.")
+            raise FileNotFoundError(f"DTM not found at {dtm_path} after generation call.")
     except Exception as e:
-        print(f"❌ Error generating colorized DTM: {e}")
-        logger.error(f"Error generating colorized DTM: {e}", exc_info=True)
+        print(f"❌ Error generating DTM: {e}")
+        logger.error(f"Error generating DTM: {e}", exc_info=True)
         raise
-    print(f"✅ Colorized DTM (RGB) path: {color_dtm_path}")
-    logger.info(f"Colorized DTM path: {color_dtm_path}")
+    print(f"✅ DTM path: {dtm_path}")
+    logger.info(f"DTM path: {dtm_path}")
+
+    # --- Step 2: Colour relief, hillshade and blend in one windowed pass ---
+    composite_output_dir = Path("output") / region_name_for_output / "lidar" / "Composites"
+
+    # Construct a descriptive filename for the composite
+    hs_params_suffix = f"HS_az{int(hillshade_azimuth)}_alt{int(hillshade_altitude)}_z{str(hillshade_z_factor).replace('.', 'p')}"
+    blend_filename = f"{input_file_stem}_DTM{dtm_resolution}m_CSF{actual_csf_cloth_resolution}m_{hs_params_suffix}_blend{str(blend_factor).replace('.','p')}.tif"
+    composite_output_path = composite_output_dir / blend_filename
+
+    print(f"🔄 Step 2: Rendering blend from {dtm_path.name}...")
+    print(f"💾 Output composite path: {composite_output_path}")
+    logger.info(f"Saving blended composite to: {composite_output_path}")
 
-    # --- Step 2: Generate Hillshade ---
-    # generate_hillshade_with_params takes the LAZ file as input and specific dtm resolution params
-    print(f"🌄 Step 2: Generating Hillshade from {laz_input_file}...")
-    logger.info("Generating Hillshade for composite.")
     try:
-        hillshade_path_str = generate_hillshade_with_params(
-            input_file=laz_input_file,
+        variant = BlendVariant(
             azimuth=hillshade_azimuth,
             altitude=hillshade_altitude,
             z_factor=hillshade_z_factor,
-            suffix=hillshade_suffix,
-            region_name=region_name_for_output, # For consistent output pathing
-            dtm_resolution=dtm_resolution,
-            dtm_csf_cloth_resolution=actual_csf_cloth_resolution
+            blend_factor=blend_factor,
+            ramp_name=ramp_name
         )
-        hillshade_path = Path(hillshade_path_str)
-        if not hillshade_path.exists():
-            logger.error(f"Hillshade not found at {hillshade_path} after generation call.")
-            raise FileNotFoundError(f"Hillshade not found at {hillshade_path} after generation call.")
-    except Exception as e:
-        print(f"❌ Error generating hillshade: {e}")
-        logger.error(f"Error generating hillshade: {e}", exc_info=True)
-        raise
-    print(f"✅ Hillshade path: {hillshade_path}")
-    logger.info(f"Hillshade path: {hillshade_path}")
-
-    # --- Step 3: Blend Color DTM and Hillshade ---
-    print(f"🔄 Step 3: Blending {color_dtm_path.name} and {hillshade_path.name}...")
-    logger.info(f"Blending {color_dtm_path.name} and {hillshade_path.name}")
-
-    try:
-        with rasterio.open(color_dtm_path) as color_src, rasterio.open(hillshade_path) as hs_src:
-            if color_src.count < 3:
-                msg = f"Colorized DTM {color_dtm_path} is not RGB (has {color_src.count} bands)."
-                logger.error(msg)
-                raise ValueError(msg)
-
-            # Read hillshade and resample to color_dtm's shape/transform if they differ
-            # This ensures pixel-wise operations are aligned.
-            hillshade_data_resampled = hs_src.read(
-                1, # Read first band of hillshade
-                out_shape=(color_src.height, color_src.width), # Match shape of color_dtm
-                resampling=Resampling.bilinear # Use bilinear for continuous data
-            )
-
-            # Normalize hillshade data to 0-1 range for blending
-            hs_min, hs_max = np.min(hillshade_data_resampled), np.max(hillshade_data_resampled)
-            if hs_max == hs_min: # Avoid division by zero if hillshade is flat
-                hillshade_norm = np.full_like(hillshade_data_resampled, 0.5, dtype=np.float32)
-            else:
-                hillshade_norm = (hillshade_data_resampled - hs_min) / (hs_max - hs_min)
-
-            # Prepare output profile based on color_dtm (which is RGB)
-            profile = color_src.profile.copy() # Important to copy
-            profile.update(
-                count=3, # Ensure output is 3-band RGB
-                driver='GTiff',
-                compress='lzw',
-                tiled=True,
-                photometric='RGB' # Explicitly set photometric for RGB
-            )
-            if 'interleave' in profile: # Not always compatible with LZW + RGB
-                del profile['interleave']
-
-
-            # Define output path for the composite
-            composite_output_dir = Path("output") / region_name_for_output / "lidar" / "Composites"
-            composite_output_dir.mkdir(parents=True, exist_ok=True)
-
-            # Construct a descriptive filename for the composite
-            hs_params_suffix = f"HS_az{int(hillshade_azimuth)}_alt{int(hillshade_altitude)}_z{str(hillshade_z_factor).replace('.', 'p')}"
-            blend_filename = f"{input_file_stem}_DTM{dtm_resolution}m_CSF{actual_csf_cloth_resolution}m_{hs_params_suffix}_blend{str(blend_factor).replace('.','p')}.tif"
-            composite_output_path = composite_output_dir / blend_filename
-
-            print(f"💾 Output composite path: {composite_output_path}")
-            logger.info(f"Saving blended composite to: {composite_output_path}")
-
-            with rasterio.open(composite_output_path, 'w', **profile) as dst:
-                for i in range(1, 4): # Iterate R, G, B bands (1, 2, 3)
-                    color_band_data = color_src.read(i).astype(np.float32) # Read as float32 for calculations
-
-                    # Blending: Modulate brightness of color by hillshade
-                    # Formula: Output = Color * ( (1-blend_factor) + blend_factor * Hillshade_Normalized )
-                    # Or: Output = Color * ( (Hillshade_Normalized * weight_hs) + (1 - weight_hs) )
-                    # Let blend_factor control visibility of color_dtm (0.0 = all hillshade brightness, 1.0 = all color_dtm brightness)
-                    # So, if blend_factor = 0.6 (more color):
-                    # color_weight = blend_factor
-                    # shade_effect_on_color = (1-blend_factor) -> how much hillshade modulates the color
-                    # blended_band = color_band_data * ( (1-shade_effect_on_color) + shade_effect_on_color * hillshade_norm )
-                    # blended_band = color_band_data * ( blend_factor + (1-blend_factor) * hillshade_norm)
-
-                    # A common GIS approach: (Color * (1-alpha)) + (Color * Hillshade_norm * alpha)
-                    # where alpha is hillshade transparency (0 = opaque hillshade, 1 = transparent hillshade)
-                    # Let's map blend_factor to hillshade influence:
-                    # hillshade_influence = 1.0 - blend_factor
-                    # So, if blend_factor = 0.6 (color is 60% dominant), hillshade_influence = 0.4
-
-                    # Output = Color * (1 - Hillshade_Influence) + (Color * Hillshade_Norm) * Hillshade_Influence
-                    # Output = Color * blend_factor + Color * Hillshade_Norm * (1 - blend_factor)
-                    # Output = Color * (blend_factor + Hillshade_Norm * (1 - blend_factor))
-
-                    blended_band = color_band_data * (blend_factor + hillshade_norm * (1.0 - blend_factor))
-
-                    blended_band = np.clip(blended_band, 0, 255) # Clip to valid 8-bit range
-                    dst.write(blended_band.astype(np.uint8), i) # Write as uint8
+        CompositeEngine(str(dtm_path)).render({str(composite_output_path): variant})
 
         total_time = time.time() - start_time
         print(f"✅ Composite DTM-Hillshade blend generated successfully in {total_time:.2f}s: {composite_output_path}")
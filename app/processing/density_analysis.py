@@ -10,15 +10,30 @@ from pathlib import Path
 from typing import Dict, Any, Optional, Tuple
 import subprocess
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 
 try:
     import rasterio
     import rasterio.features
+    from rasterio.enums import Resampling
+    from rasterio.warp import reproject
     RASTERIO_AVAILABLE = True
 except ImportError:
     RASTERIO_AVAILABLE = False
 
+try:
+    import pdal
+    PDAL_AVAILABLE = True
+except ImportError:
+    PDAL_AVAILABLE = False
+
+try:
+    from PIL import Image
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
 # Import raster cleaning module
 try:
     from .raster_cleaning import RasterCleaner
@@ -40,8 +55,87 @@ try:
 except ImportError:
     LAZ_CROPPING_AVAILABLE = False
 
+from .terrain_derivatives import (
+    DERIVATIVE_NODATA,
+    aspect_from_gradients,
+    hillshade_from_gradients,
+    horn_gradients,
+    slope_from_gradients,
+)
+
 logger = logging.getLogger(__name__)
 
+# Points per chunk when streaming the LAZ reader for in-process rasterization
+DENSITY_STREAM_CHUNK_SIZE = 1_000_000
+
+# Density colour ramp (points/cell, R, G, B, A), interpolated linearly like gdaldem color-relief
+DENSITY_COLOR_RAMP = [
+    (0, 0, 0, 0, 0),
+    (1, 255, 255, 0, 255),
+    (5, 255, 165, 0, 255),
+    (10, 255, 0, 0, 255),
+    (50, 139, 0, 0, 255),
+    (100, 75, 0, 130, 255),
+]
+
+# Binary mask colours: artifact (0) red, valid (1) green
+MASK_COLORS = np.array([[255, 0, 0, 255], [0, 255, 0, 255]], dtype=np.uint8)
+
+DENSITY_HISTOGRAM_BINS = 20
+
+
+def _read_elevation_grid(path: str) -> Tuple[np.ndarray, Dict[str, Any]]:
+    """Read band 1 of an elevation raster as float64 with NaN for nodata"""
+    with rasterio.open(path) as src:
+        grid = src.read(1, masked=True).astype(np.float64).filled(np.nan)
+        return grid, src.profile.copy()
+
+
+def _canopy_height(
+    dsm_path: str,
+    dtm_grid: np.ndarray,
+    dtm_profile: Dict[str, Any]
+) -> Tuple[np.ndarray, Dict[str, Any], float]:
+    """
+    DSM minus DTM on the DSM grid, resampling the DTM bilinearly if the grids differ
+    
+    Returns:
+        Tuple of (float32 CHM, DSM profile, nodata value)
+    """
+    dsm_grid, dsm_profile = _read_elevation_grid(dsm_path)
+    
+    if dsm_grid.shape == dtm_grid.shape and dsm_profile["transform"] == dtm_profile["transform"]:
+        ground = dtm_grid
+    else:
+        ground = np.full(dsm_grid.shape, np.nan)
+        reproject(
+            dtm_grid, ground,
+            src_transform=dtm_profile["transform"], src_crs=dtm_profile["crs"], src_nodata=np.nan,
+            dst_transform=dsm_profile["transform"], dst_crs=dsm_profile["crs"] or dtm_profile["crs"],
+            dst_nodata=np.nan, resampling=Resampling.bilinear
+        )
+    
+    chm = dsm_grid - ground
+    return np.where(np.isfinite(chm), chm, DERIVATIVE_NODATA).astype(np.float32), dsm_profile, DERIVATIVE_NODATA
+
+
+def _write_derived_raster(output_path: Path, data: np.ndarray, profile: Dict[str, Any], nodata: float):
+    """Write a derived single-band grid as a tiled, compressed GeoTIFF"""
+    profile = profile.copy()
+    profile.update(
+        driver="GTiff",
+        dtype=data.dtype.name,
+        count=1,
+        nodata=nodata,
+        tiled=True,
+        blockxsize=256,
+        blockysize=256,
+        compress="deflate"
+    )
+    with rasterio.open(str(output_path), "w", **profile) as dst:
+        dst.write(data, 1)
+
+
 class DensityAnalyzer:
     """
     Modular density analysis for LAZ files
@@ -112,25 +206,27 @@ class DensityAnalyzer:
             print(f"   Resolution: {self.resolution}m")
             print(f"   NoData value: {self.nodata_value}")
             
-            # Create PDAL pipeline for density analysis
-            pipeline_config = self._create_density_pipeline(
-                str(laz_file_path), 
-                str(output_path)
-            )
-            
-            # Execute PDAL pipeline
-            stats = self._execute_pdal_pipeline(pipeline_config)
-            
-            # Generate PNG visualization
-            png_path = self._generate_density_png(output_path, density_dir, region_name)
-            
-            # Analyze density statistics
-            density_stats = self._analyze_density_statistics(output_path)
-            
-            # Generate binary mask if requested
             mask_results = {}
-            if generate_mask:
-                mask_results = self._generate_binary_mask(output_path, density_dir, region_name)
+            if PDAL_AVAILABLE and RASTERIO_AVAILABLE:
+                # Count, preview, statistics and mask from a single read of the point stream,
+                # keeping the raster in memory between the stages
+                density, profile, stats = self._rasterize_density(str(laz_file_path))
+                self._write_density_raster(density, profile, output_path)
+                png_path = self._render_density_png(density, output_path, density_dir, region_name)
+                density_stats = self._density_statistics(density)
+                if generate_mask:
+                    mask_results = self._write_binary_mask(density, profile, density_dir, region_name)
+            else:
+                # Fall back to the PDAL and GDAL command line tools
+                pipeline_config = self._create_density_pipeline(
+                    str(laz_file_path), 
+                    str(output_path)
+                )
+                stats = self._execute_pdal_pipeline(pipeline_config)
+                png_path = self._generate_density_png(output_path, density_dir, region_name)
+                density_stats = self._analyze_density_statistics(output_path)
+                if generate_mask:
+                    mask_results = self._generate_binary_mask(output_path, density_dir, region_name)
             
             # Clean existing rasters with mask if requested
             cleaning_results = {}
@@ -225,6 +321,126 @@ class DensityAnalyzer:
         # Fallback to filename
         return input_path.stem
     
+    def _rasterize_density(self, input_path: str) -> Tuple[np.ndarray, Dict[str, Any], Dict[str, Any]]:
+        """
+        Count points per cell while streaming the LAZ file through PDAL
+        
+        The grid is anchored at the top-left corner of the header bounds, so
+        the counts never need more memory than the raster itself.
+        
+        Args:
+            input_path: Path to input LAZ file
+            
+        Returns:
+            Tuple of (count raster, rasterio profile, execution statistics)
+        """
+        print(f"🔧 Rasterizing point density in process...")
+        reader = {"type": "readers.las", "filename": input_path}
+        info = next(iter(pdal.Pipeline(json.dumps({"pipeline": [reader]})).quickinfo.values()))
+        bounds = info["bounds"]
+        srs_wkt = (info.get("srs") or {}).get("wkt")
+        
+        minx, maxy = bounds["minx"], bounds["maxy"]
+        width = int((bounds["maxx"] - minx) / self.resolution) + 1
+        height = int((maxy - bounds["miny"]) / self.resolution) + 1
+        counts = np.zeros(width * height, dtype=np.uint32)
+        
+        pipeline = pdal.Pipeline(json.dumps({"pipeline": [reader]}))
+        if hasattr(pipeline, "iterator"):
+            chunks = pipeline.iterator(chunk_size=DENSITY_STREAM_CHUNK_SIZE)
+        else:
+            pipeline.execute()
+            chunks = pipeline.arrays
+        
+        total_points = 0
+        for chunk in chunks:
+            if len(chunk) == 0:
+                continue
+            cols = np.clip(((chunk["X"] - minx) / self.resolution).astype(np.int64), 0, width - 1)
+            rows = np.clip(((maxy - chunk["Y"]) / self.resolution).astype(np.int64), 0, height - 1)
+            cells = rows * width + cols
+            # Points of a chunk are spatially clustered, so bin only the span they touch
+            first = cells.min()
+            binned = np.bincount(cells - first)
+            counts[first:first + binned.size] += binned.astype(np.uint32)
+            total_points += len(chunk)
+        
+        print(f"✅ Rasterized {total_points:,} points into {width} x {height} cells")
+        
+        profile = {
+            "driver": "GTiff",
+            "width": width,
+            "height": height,
+            "count": 1,
+            "dtype": "uint32",
+            "crs": srs_wkt or None,
+            "transform": rasterio.transform.from_origin(minx, maxy, self.resolution, self.resolution),
+            "nodata": self.nodata_value,
+            "tiled": True,
+            "blockxsize": 256,
+            "blockysize": 256,
+            "compress": "lzw",
+            "BIGTIFF": "IF_SAFER"
+        }
+        stats = {"success": True, "returncode": 0, "method": "in_process", "point_count": total_points}
+        return counts.reshape(height, width), profile, stats
+    
+    def _write_density_raster(self, density: np.ndarray, profile: Dict[str, Any], output_path: Path):
+        """Write the in-memory density raster as a tiled, compressed GeoTIFF"""
+        with rasterio.open(str(output_path), "w", **profile) as dst:
+            dst.write(density, 1)
+    
+    def _density_statistics(self, density: np.ndarray) -> Dict[str, Any]:
+        """
+        Statistics and histogram of the cells holding points
+        
+        Args:
+            density: Density count raster
+            
+        Returns:
+            Dictionary with density statistics
+        """
+        valid = density[density != self.nodata_value]
+        if valid.size == 0:
+            return {"error": "No cells with points"}
+        
+        histogram, edges = np.histogram(valid, bins=min(DENSITY_HISTOGRAM_BINS, int(valid.max() - valid.min()) + 1))
+        stats = {
+            "min": float(valid.min()),
+            "max": float(valid.max()),
+            "mean": float(valid.mean()),
+            "stddev": float(valid.std()),
+            "valid_cells": int(valid.size),
+            "total_cells": int(density.size),
+            "histogram": {
+                "bin_edges": [round(float(e), 3) for e in edges],
+                "counts": histogram.tolist()
+            }
+        }
+        print(f"📈 Density statistics: min={stats['min']}, max={stats['max']}, mean={stats['mean']:.2f}")
+        return stats
+    
+    def _render_density_png(self, density: np.ndarray, tiff_path: Path, output_dir: Path, region_name: str) -> Path:
+        """
+        Render the density colour ramp to PNG from the in-memory raster
+        
+        Falls back to gdaldem on the written TIFF when Pillow is not installed.
+        """
+        if not PIL_AVAILABLE:
+            return self._generate_density_png(tiff_path, output_dir, region_name)
+        
+        png_path = output_dir / f"{region_name}_density.png"
+        print(f"🎨 Generating density PNG visualization...")
+        ramp = np.array(DENSITY_COLOR_RAMP, dtype=np.float64)
+        values = density.astype(np.float32)
+        rgba = np.empty(density.shape + (4,), dtype=np.uint8)
+        for channel in range(4):
+            rgba[..., channel] = np.interp(values, ramp[:, 0], ramp[:, channel + 1])
+        rgba[density == self.nodata_value] = 0
+        Image.fromarray(rgba, "RGBA").save(png_path)
+        print(f"✅ PNG visualization generated: {png_path}")
+        return png_path
+    
     def _create_density_pipeline(self, input_path: str, output_path: str) -> Dict[str, Any]:
         """
         Create PDAL pipeline configuration for density analysis
@@ -447,14 +663,40 @@ nv 0 0 0 0"""
             Dictionary with mask results and statistics
         """
         try:
-            print(f"🎭 Generating binary mask from density raster...")
-            print(f"   Threshold: {self.mask_threshold} points/cell")
-            
             # Check if rasterio is available
             if not RASTERIO_AVAILABLE:
                 print(f"⚠️ Rasterio not available - using GDAL fallback for mask generation")
                 return self._generate_binary_mask_gdal(density_tiff_path, output_dir, region_name)
             
+            with rasterio.open(str(density_tiff_path)) as src:
+                data = src.read(1)
+                profile = src.profile.copy()
+            
+            return self._write_binary_mask(data, profile, output_dir, region_name)
+            
+        except Exception as e:
+            return self._mask_error(f"Binary mask generation failed: {str(e)}")
+    
+    def _write_binary_mask(
+        self, 
+        density: np.ndarray, 
+        profile: Dict[str, Any], 
+        output_dir: Path, 
+        region_name: str
+    ) -> Dict[str, Any]:
+        """
+        Threshold a density raster into a binary mask and write it with its PNG
+        
+        Args:
+            density: Density count raster
+            profile: Rasterio profile of the density raster
+            output_dir: Output directory for mask files
+            region_name: Region name for filename
+            
+        Returns:
+            Dictionary with mask results and statistics
+        """
+        try:
             # Create masks subdirectory
             masks_dir = output_dir / "masks"
             masks_dir.mkdir(parents=True, exist_ok=True)
@@ -463,43 +705,44 @@ nv 0 0 0 0"""
             mask_tiff_path = masks_dir / f"{region_name}_valid_mask.tif"
             mask_png_path = masks_dir / f"{region_name}_valid_mask.png"
             
-            # Generate binary mask using rasterio
-            with rasterio.open(str(density_tiff_path)) as src:
-                # Read density data
-                data = src.read(1)
-                profile = src.profile.copy()
-                
-                print(f"   Input data shape: {data.shape}")
-                print(f"   Input data range: {data.min():.1f} - {data.max():.1f}")
-                
-                # Create binary mask: density > threshold = 1 (valid), else 0 (artifact)
-                mask = (data > self.mask_threshold).astype(np.uint8)
-                
-                # Calculate mask statistics
-                total_pixels = data.size
-                valid_pixels = np.sum(mask)
-                artifact_pixels = total_pixels - valid_pixels
-                coverage_percentage = (valid_pixels / total_pixels) * 100 if total_pixels > 0 else 0
-                
-                print(f"   Total pixels: {total_pixels:,}")
-                print(f"   Valid pixels: {valid_pixels:,} ({coverage_percentage:.1f}%)")
-                print(f"   Artifact pixels: {artifact_pixels:,} ({100-coverage_percentage:.1f}%)")
-                
-                # Update profile for binary mask
-                profile.update(
-                    dtype=rasterio.uint8,
-                    count=1,
-                    nodata=None  # Remove nodata for binary mask
-                )
-                
-                # Write binary mask TIFF
-                with rasterio.open(str(mask_tiff_path), "w", **profile) as dst:
-                    dst.write(mask, 1)
-                
-                print(f"✅ Binary mask TIFF saved: {mask_tiff_path}")
+            print(f"🎭 Generating binary mask from density raster...")
+            print(f"   Threshold: {self.mask_threshold} points/cell")
+            print(f"   Input data shape: {density.shape}")
+            print(f"   Input data range: {density.min():.1f} - {density.max():.1f}")
+            
+            # Create binary mask: density > threshold = 1 (valid), else 0 (artifact)
+            mask = (density > self.mask_threshold).astype(np.uint8)
+            
+            # Calculate mask statistics
+            total_pixels = density.size
+            valid_pixels = np.sum(mask)
+            artifact_pixels = total_pixels - valid_pixels
+            coverage_percentage = (valid_pixels / total_pixels) * 100 if total_pixels > 0 else 0
+            
+            print(f"   Total pixels: {total_pixels:,}")
+            print(f"   Valid pixels: {valid_pixels:,} ({coverage_percentage:.1f}%)")
+            print(f"   Artifact pixels: {artifact_pixels:,} ({100-coverage_percentage:.1f}%)")
+            
+            # Update profile for binary mask
+            profile = profile.copy()
+            profile.update(
+                dtype=rasterio.uint8,
+                count=1,
+                nodata=None  # Remove nodata for binary mask
+            )
+            
+            # Write binary mask TIFF
+            with rasterio.open(str(mask_tiff_path), "w", **profile) as dst:
+                dst.write(mask, 1)
+            
+            print(f"✅ Binary mask TIFF saved: {mask_tiff_path}")
             
             # Generate PNG visualization of mask
-            self._generate_mask_png(mask_tiff_path, mask_png_path)
+            if PIL_AVAILABLE:
+                Image.fromarray(MASK_COLORS[mask], "RGBA").save(mask_png_path)
+                print(f"✅ Mask PNG visualization generated: {mask_png_path}")
+            else:
+                self._generate_mask_png(mask_tiff_path, mask_png_path)
             
             # Return results
             mask_results = {
@@ -519,21 +762,24 @@ nv 0 0 0 0"""
             return mask_results
             
         except Exception as e:
-            error_msg = f"Binary mask generation failed: {str(e)}"
-            print(f"❌ {error_msg}")
-            self.logger.error(error_msg, exc_info=True)
-            
-            return {
-                "error": error_msg,
-                "statistics": {
-                    "threshold": self.mask_threshold,
-                    "total_pixels": 0,
-                    "valid_pixels": 0,
-                    "artifact_pixels": 0,
-                    "coverage_percentage": 0.0,
-                    "artifact_percentage": 0.0
-                }
+            return self._mask_error(f"Binary mask generation failed: {str(e)}")
+    
+    def _mask_error(self, error_msg: str) -> Dict[str, Any]:
+        """Mask result reporting a failure"""
+        print(f"❌ {error_msg}")
+        self.logger.error(error_msg, exc_info=True)
+        
+        return {
+            "error": error_msg,
+            "statistics": {
+                "threshold": self.mask_threshold,
+                "total_pixels": 0,
+                "valid_pixels": 0,
+                "artifact_pixels": 0,
+                "coverage_percentage": 0.0,
+                "artifact_percentage": 0.0
             }
+        }
     
     def _generate_binary_mask_gdal(
         self, 
@@ -1108,8 +1354,9 @@ nv 0 0 0 0"""
         """
         Regenerate rasters from clean (cropped) LAZ data using the existing DTM/DSM pipeline
         
-        This method integrates with your existing raster generation pipeline
-        using the clean LAZ as input instead of the original LAZ.
+        The clean LAZ is rasterized once into DTM and DSM (concurrently); CHM,
+        hillshade, slope and aspect are then derived concurrently from those
+        grids in memory instead of each product re-deriving its own surfaces.
         
         Args:
             clean_laz_path: Path to cropped/clean LAZ file
@@ -1130,13 +1377,11 @@ nv 0 0 0 0"""
             # Import your existing processing modules
             try:
                 from app.processing.dtm import dtm
-                from app.processing.dsm import dsm  
-                from app.processing.chm import chm
-                from app.processing.hillshade import hillshade
-                from app.processing.slope import slope
-                from app.processing.aspect import aspect
+                from app.processing.dsm import dsm
                 
-                processing_available = True
+                processing_available = RASTERIO_AVAILABLE
+                if not RASTERIO_AVAILABLE:
+                    print(f"⚠️ rasterio not available - derived rasters cannot be computed")
             except ImportError as e:
                 print(f"⚠️ Some processing modules not available: {e}")
                 processing_available = False
@@ -1145,97 +1390,37 @@ nv 0 0 0 0"""
             processing_errors = []
             
             if processing_available:
-                print(f"🏗️ Generating rasters from clean LAZ using existing pipeline...")
-                
-                # Generate DTM from clean LAZ
-                try:
-                    print(f"   📊 Generating DTM from clean LAZ...")
-                    dtm_path = dtm(clean_laz_path, region_name)
-                    regenerated_rasters.append({
-                        "type": "DTM",
-                        "path": dtm_path,
-                        "status": "success"
-                    })
-                    print(f"   ✅ Clean DTM: {Path(dtm_path).name}")
-                except Exception as e:
-                    error_msg = f"DTM generation failed: {str(e)}"
-                    processing_errors.append(error_msg)
-                    print(f"   ❌ {error_msg}")
+                print(f"🏗️ Rasterizing clean LAZ once into DTM and DSM...")
                 
-                # Generate DSM from clean LAZ
-                try:
-                    print(f"   🏔️ Generating DSM from clean LAZ...")
-                    dsm_path = dsm(clean_laz_path, region_name)
-                    regenerated_rasters.append({
-                        "type": "DSM", 
-                        "path": dsm_path,
-                        "status": "success"
-                    })
-                    print(f"   ✅ Clean DSM: {Path(dsm_path).name}")
-                except Exception as e:
-                    error_msg = f"DSM generation failed: {str(e)}"
-                    processing_errors.append(error_msg)
-                    print(f"   ❌ {error_msg}")
+                with ThreadPoolExecutor(max_workers=2) as executor:
+                    surface_futures = {
+                        "DTM": executor.submit(dtm, clean_laz_path, region_name),
+                        "DSM": executor.submit(dsm, clean_laz_path, region_name),
+                    }
                 
-                # Generate CHM from clean LAZ
-                try:
-                    print(f"   🌳 Generating CHM from clean LAZ...")
-                    chm_path = chm(clean_laz_path, region_name)
-                    regenerated_rasters.append({
-                        "type": "CHM",
-                        "path": chm_path,
-                        "status": "success"
-                    })
-                    print(f"   ✅ Clean CHM: {Path(chm_path).name}")
-                except Exception as e:
-                    error_msg = f"CHM generation failed: {str(e)}"
-                    processing_errors.append(error_msg)
-                    print(f"   ❌ {error_msg}")
+                surface_paths = {}
+                for raster_type, future in surface_futures.items():
+                    try:
+                        raster_path = future.result()
+                        if not raster_path or not os.path.exists(raster_path):
+                            raise FileNotFoundError(f"{raster_type} file not found: {raster_path}")
+                        surface_paths[raster_type] = raster_path
+                        regenerated_rasters.append({
+                            "type": raster_type,
+                            "path": raster_path,
+                            "status": "success"
+                        })
+                        print(f"   ✅ Clean {raster_type}: {Path(raster_path).name}")
+                    except Exception as e:
+                        error_msg = f"{raster_type} generation failed: {str(e)}"
+                        processing_errors.append(error_msg)
+                        print(f"   ❌ {error_msg}")
                 
-                # Generate Hillshade from clean LAZ
-                try:
-                    print(f"   ⛰️ Generating Hillshade from clean LAZ...")
-                    hillshade_path = hillshade(clean_laz_path, region_name)
-                    regenerated_rasters.append({
-                        "type": "Hillshade",
-                        "path": hillshade_path,
-                        "status": "success"
-                    })
-                    print(f"   ✅ Clean Hillshade: {Path(hillshade_path).name}")
-                except Exception as e:
-                    error_msg = f"Hillshade generation failed: {str(e)}"
-                    processing_errors.append(error_msg)
-                    print(f"   ❌ {error_msg}")
-                
-                # Generate Slope from clean LAZ
-                try:
-                    print(f"   📐 Generating Slope from clean LAZ...")
-                    slope_path = slope(clean_laz_path, region_name)
-                    regenerated_rasters.append({
-                        "type": "Slope",
-                        "path": slope_path,
-                        "status": "success"
-                    })
-                    print(f"   ✅ Clean Slope: {Path(slope_path).name}")
-                except Exception as e:
-                    error_msg = f"Slope generation failed: {str(e)}"
-                    processing_errors.append(error_msg)
-                    print(f"   ❌ {error_msg}")
-                
-                # Generate Aspect from clean LAZ
-                try:
-                    print(f"   🧭 Generating Aspect from clean LAZ...")
-                    aspect_path = aspect(clean_laz_path, region_name)
-                    regenerated_rasters.append({
-                        "type": "Aspect",
-                        "path": aspect_path,
-                        "status": "success"
-                    })
-                    print(f"   ✅ Clean Aspect: {Path(aspect_path).name}")
-                except Exception as e:
-                    error_msg = f"Aspect generation failed: {str(e)}"
-                    processing_errors.append(error_msg)
-                    print(f"   ❌ {error_msg}")
+                derived_rasters, derivation_errors = self._derive_clean_rasters(
+                    surface_paths, clean_rasters_dir, region_name
+                )
+                regenerated_rasters.extend(derived_rasters)
+                processing_errors.extend(derivation_errors)
                 
                 successful_rasters = len([r for r in regenerated_rasters if r["status"] == "success"])
                 
@@ -1256,7 +1441,7 @@ nv 0 0 0 0"""
                     "rasters_generated": successful_rasters,
                     "regenerated_rasters": regenerated_rasters,
                     "processing_errors": processing_errors,
-                    "note": "Rasters generated from clean LAZ using existing DTM/DSM pipeline"
+                    "note": "DTM/DSM rasterized once from clean LAZ; CHM, hillshade, slope and aspect derived from them"
                 }
                 
             else:
@@ -1301,6 +1486,69 @@ nv 0 0 0 0"""
                 "regenerated_rasters": []
             }
 
+    def _derive_clean_rasters(
+        self,
+        surface_paths: Dict[str, str],
+        clean_rasters_dir: Path,
+        region_name: str
+    ) -> Tuple[list, list]:
+        """
+        Derive CHM, hillshade, slope and aspect concurrently from the clean DTM/DSM grids
+        
+        The DTM is read once and its gradients computed once; every product is
+        derived from those arrays and written to the clean rasters directory.
+        
+        Args:
+            surface_paths: Clean raster paths keyed by "DTM" and "DSM"
+            clean_rasters_dir: Directory for the derived rasters
+            region_name: Region name used in output filenames
+            
+        Returns:
+            Tuple of (regenerated raster entries, error messages)
+        """
+        if "DTM" not in surface_paths:
+            return [], ["CHM, Hillshade, Slope and Aspect skipped: clean DTM not available"]
+        
+        print(f"🧮 Deriving CHM, Hillshade, Slope and Aspect from in-memory grids...")
+        dtm_grid, dtm_profile = _read_elevation_grid(surface_paths["DTM"])
+        transform = dtm_profile["transform"]
+        dx, dy = horn_gradients(dtm_grid, abs(transform.a), abs(transform.e))
+        
+        derivations = {
+            "Hillshade": lambda: (hillshade_from_gradients(dx, dy), dtm_profile, 0),
+            "Slope": lambda: (slope_from_gradients(dx, dy), dtm_profile, DERIVATIVE_NODATA),
+            "Aspect": lambda: (aspect_from_gradients(dx, dy), dtm_profile, DERIVATIVE_NODATA),
+        }
+        if "DSM" in surface_paths:
+            derivations["CHM"] = lambda: _canopy_height(surface_paths["DSM"], dtm_grid, dtm_profile)
+        
+        def derive(raster_type):
+            data, profile, nodata = derivations[raster_type]()
+            output_path = clean_rasters_dir / f"{region_name}_{raster_type}_clean.tif"
+            _write_derived_raster(output_path, data, profile, nodata)
+            return str(output_path)
+        
+        derived_rasters = []
+        errors = [] if "DSM" in surface_paths else ["CHM skipped: clean DSM not available"]
+        with ThreadPoolExecutor(max_workers=len(derivations)) as executor:
+            futures = {raster_type: executor.submit(derive, raster_type) for raster_type in derivations}
+        
+        for raster_type, future in futures.items():
+            try:
+                raster_path = future.result()
+                derived_rasters.append({
+                    "type": raster_type,
+                    "path": raster_path,
+                    "status": "success"
+                })
+                print(f"   ✅ Clean {raster_type}: {Path(raster_path).name}")
+            except Exception as e:
+                error_msg = f"{raster_type} generation failed: {str(e)}"
+                errors.append(error_msg)
+                print(f"   ❌ {error_msg}")
+        
+        return derived_rasters, errors
+
     def _generate_quality_mode_metadata(
         self,
         initial_result: Dict[str, Any],
@@ -4,9 +4,13 @@ Determines whether LAZ files are uploaded/loaded vs coordinate-generated
 """
 
 import os
+import time
 from pathlib import Path
 from typing import Dict, Any, Optional, List, Tuple
 
+# Bytes read from the start of a file to classify it: the LAS signature and any placeholder comment line
+HEADER_PROBE_SIZE = 512
+
 class LAZClassifier:
     """
     Classifies LAZ files as loaded/uploaded vs coordinate-generated
@@ -23,74 +27,78 @@ class LAZClassifier:
         Returns:
             Tuple of (is_loaded: bool, reason: str)
         """
+        is_loaded, reason, _ = LAZClassifier.classify(laz_file_path)
+        return is_loaded, reason
+    
+    @staticmethod
+    def classify(laz_file_path: str) -> Tuple[bool, str, Optional[os.stat_result]]:
+        """
+        Classify a LAZ file from a single stat call and a single header read
+        
+        Args:
+            laz_file_path: Path to LAZ file
+            
+        Returns:
+            Tuple of (is_loaded: bool, reason: str, stat result or None if the file is missing)
+        """
         try:
             file_path = Path(laz_file_path)
             
             # Check 1: File existence
-            if not file_path.exists():
-                return False, "File does not exist"
+            try:
+                file_stat = file_path.stat()
+            except FileNotFoundError:
+                return False, "File does not exist", None
             
             # Check 2: File size (coordinate-generated files are typically very small or empty)
-            file_size = file_path.stat().st_size
+            file_size = file_stat.st_size
             if file_size < 1024:  # Less than 1KB indicates placeholder/mock file
-                return False, f"File too small ({file_size} bytes) - likely coordinate-generated"
+                return False, f"File too small ({file_size} bytes) - likely coordinate-generated", file_stat
             
-            # Check 3: File content check for placeholder text
+            # The content checks below share one read of the start of the file
             try:
-                with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    first_line = f.readline().strip()
-                    if first_line.startswith('#') and 'placeholder' in first_line.lower():
-                        return False, "Contains placeholder text - coordinate-generated"
-            except:
-                # If we can't read as text, it's likely a real binary LAZ file
-                pass
+                with open(file_path, 'rb') as f:
+                    header = f.read(HEADER_PROBE_SIZE)
+            except OSError:
+                header = b''
             
-            # Check 4: Directory structure patterns
-            path_parts = file_path.parts
+            # Check 3: File content check for placeholder text
+            first_line = header.split(b'\n', 1)[0].decode('utf-8', errors='ignore').strip()
+            if first_line.startswith('#') and 'placeholder' in first_line.lower():
+                return False, "Contains placeholder text - coordinate-generated", file_stat
             
-            # Coordinate-generated files often have predictable naming patterns
+            # Check 4: Coordinate-generated files often have predictable naming patterns
             filename = file_path.name.lower()
             if any(pattern in filename for pattern in ['lidar_', '_temp_', 'mock_', 'placeholder_']):
-                return False, f"Filename pattern indicates coordinate-generated: {filename}"
+                return False, f"Filename pattern indicates coordinate-generated: {filename}", file_stat
             
-            # Check 5: Look for associated processing metadata
-            parent_dir = file_path.parent
-            
-            # Check for upload indicators
+            # Check 5: Check for upload indicators in the directory
             upload_indicators = ['uploaded', 'loaded', 'user_data']
-            if any(indicator in str(parent_dir).lower() for indicator in upload_indicators):
-                return True, "Directory indicates uploaded file"
+            if any(indicator in str(file_path.parent).lower() for indicator in upload_indicators):
+                return True, "Directory indicates uploaded file", file_stat
             
             # Check 6: File age vs coordinate pattern
             # Coordinate-generated files are typically created very recently
-            import time
-            file_age_hours = (time.time() - file_path.stat().st_mtime) / 3600
+            file_age_hours = (time.time() - file_stat.st_mtime) / 3600
             
             if file_age_hours < 0.1 and file_size < 10000:  # Less than 6 minutes old and small
-                return False, f"Recently created small file ({file_age_hours:.1f}h old, {file_size} bytes)"
+                return False, f"Recently created small file ({file_age_hours:.1f}h old, {file_size} bytes)", file_stat
             
             # Check 7: Magic number check for real LAZ files
-            try:
-                with open(file_path, 'rb') as f:
-                    header = f.read(4)
-                    # LAZ files should start with LAS header signature
-                    if len(header) >= 4:
-                        # LAS files start with "LASF"
-                        if header == b'LASF':
-                            return True, "Valid LAZ/LAS header detected - real file"
-                        elif header.startswith(b'#'):
-                            return False, "Text file with # comment - placeholder"
-            except:
-                pass
+            # LAS files start with "LASF"
+            if header[:4] == b'LASF':
+                return True, "Valid LAZ/LAS header detected - real file", file_stat
+            elif header.startswith(b'#'):
+                return False, "Text file with # comment - placeholder", file_stat
             
             # Default: If file is reasonably sized and doesn't match coordinate patterns
             if file_size > 10000:  # > 10KB
-                return True, f"File size ({file_size} bytes) indicates real data"
+                return True, f"File size ({file_size} bytes) indicates real data", file_stat
             
-            return False, "Unable to determine - assuming coordinate-generated"
+            return False, "Unable to determine - assuming coordinate-generated", file_stat
             
         except Exception as e:
-            return False, f"Error during classification: {str(e)}"
+            return False, f"Error during classification: {str(e)}", None
     
     @staticmethod
     def get_loaded_laz_files(directory: str) -> List[Dict[str, Any]]:
@@ -110,17 +118,18 @@ class LAZClassifier:
             if not search_path.exists():
                 return loaded_files
             
-            # Find all LAZ files recursively
-            laz_files = list(search_path.rglob("*.laz")) + list(search_path.rglob("*.LAZ"))
+            # Find all LAZ files recursively in a single walk
+            laz_files = sorted(path for path in search_path.rglob("*") if path.suffix.lower() == ".laz")
             
             for laz_file in laz_files:
-                is_loaded, reason = LAZClassifier.is_loaded_laz(str(laz_file))
+                is_loaded, reason, file_stat = LAZClassifier.classify(str(laz_file))
                 
                 if is_loaded:
                     file_info = {
                         "file_path": str(laz_file),
                         "file_name": laz_file.name,
-                        "file_size": laz_file.stat().st_size,
+                        "file_size": file_stat.st_size,
+                        "modified_time": file_stat.st_mtime,
                         "region_name": LAZClassifier._extract_region_name(str(laz_file)),
                         "classification_reason": reason,
                         "is_loaded": True
@@ -5,6 +5,7 @@ Handles cropping of LAZ point clouds using vector geometries
 
 import os
 import json
+import hashlib
 import logging
 import subprocess
 import tempfile
@@ -13,22 +14,47 @@ from typing import Dict, Any, Optional, List
 
 logger = logging.getLogger(__name__)
 
+# Suffix of the COPC copies used as spatial indexes
+COPC_INDEX_SUFFIX = ".copc.laz"
+
 class LAZCropper:
     """
     Modular LAZ cropping service using PDAL
     Supports cropping by vector geometries (polygons, bounding boxes)
     """
     
-    def __init__(self, output_format: str = "las", compression: bool = True):
+    def __init__(
+        self,
+        output_format: str = "las",
+        compression: bool = True,
+        use_spatial_index: bool = False,
+        index_dir: Optional[str] = None,
+        index_max_mb: Optional[float] = None
+    ):
         """
         Initialize LAZ cropper
         
         Args:
             output_format: Output format ("laz", "las", "ply") (default: "las")
             compression: Enable compression for output (default: True)
+            use_spatial_index: Crop from a COPC copy of the source, built on first use,
+                so only the octree nodes intersecting the crop area are decoded. Building
+                the copy costs a full decode and encode, so only enable it when the same
+                source is cropped repeatedly (default: False)
+            index_dir: Directory holding the COPC copies (default: settings.copc_index_dir)
+            index_max_mb: Size budget of index_dir; least recently used copies are
+                evicted beyond it (default: settings.copc_index_max_mb)
         """
         self.output_format = output_format.lower()
         self.compression = compression
+        self.use_spatial_index = use_spatial_index
+        if use_spatial_index and (index_dir is None or index_max_mb is None):
+            from ..config import get_settings
+            settings = get_settings()
+            index_dir = settings.copc_index_dir if index_dir is None else index_dir
+            index_max_mb = settings.copc_index_max_mb if index_max_mb is None else index_max_mb
+        self.index_dir = Path(index_dir) if index_dir else None
+        self.index_max_bytes = int(index_max_mb * 1024 * 1024) if index_max_mb else None
         self.logger = logging.getLogger(__name__)
         
         # Validate output format
@@ -94,13 +120,11 @@ class LAZCropper:
                 crop_method
             )
             
-            # Execute PDAL pipeline 
+            # Execute PDAL pipeline, collecting the cropped point statistics while writing
             execution_stats = self._execute_pdal_pipeline(pipeline_config)
+            cropped_stats = self._cropped_statistics(str(output_path), execution_stats)
             
-            # Analyze cropped file statistics
-            cropped_stats = self._analyze_cropped_file(str(output_path))
-            
-            # Generate comparison statistics
+            # Original statistics come from the source header
             original_stats = self._analyze_cropped_file(input_laz_path)
             
             print(f"✅ LAZ cropping completed successfully")
@@ -191,11 +215,9 @@ class LAZCropper:
                 str(output_path)
             )
             
-            # Execute PDAL pipeline
+            # Execute PDAL pipeline, collecting the cropped point statistics while writing
             execution_stats = self._execute_pdal_pipeline(pipeline_config)
-            
-            # Analyze results
-            cropped_stats = self._analyze_cropped_file(str(output_path))
+            cropped_stats = self._cropped_statistics(str(output_path), execution_stats)
             original_stats = self._analyze_cropped_file(input_laz_path)
             
             retention_pct = None
@@ -273,33 +295,24 @@ class LAZCropper:
         # Convert polygon file to WKT format if needed
         polygon_wkt = self._convert_polygon_to_wkt(polygon_path)
         
-        pipeline = {
-            "pipeline": [
-                {
-                    "type": "readers.las",
-                    "filename": input_path
-                },
+        # An index can only skip data for inside crops
+        reader = self._source_reader(input_path) if not crop_outside else {"type": "readers.las", "filename": input_path}
+        
+        if reader["type"] == "readers.copc":
+            # The COPC reader clips to the polygon itself, decoding only intersecting nodes
+            reader["polygon"] = polygon_wkt
+            stages = [reader]
+        else:
+            stages = [
+                reader,
                 {
                     "type": "filters.crop",
                     "polygon": polygon_wkt,
                     "outside": crop_outside
                 }
             ]
-        }
         
-        # Add writer stage
-        writer_stage = {
-            "type": f"writers.{self.output_format}",
-            "filename": output_path
-        }
-        
-        # Add compression for LAZ
-        if self.output_format == "laz" and self.compression:
-            writer_stage["compression"] = "laszip"
-        
-        pipeline["pipeline"].append(writer_stage)
-        
-        return pipeline
+        return {"pipeline": stages + self._output_stages(output_path)}
     
     def _create_bbox_crop_pipeline(
         self,
@@ -319,20 +332,25 @@ class LAZCropper:
             PDAL pipeline configuration
         """
         xmin, ymin, xmax, ymax = bbox
+        bounds = f"([{xmin}, {xmax}], [{ymin}, {ymax}])"
         
-        pipeline = {
-            "pipeline": [
-                {
-                    "type": "readers.las",
-                    "filename": input_path
-                },
+        reader = self._source_reader(input_path)
+        if reader["type"] == "readers.copc":
+            reader["bounds"] = bounds
+            stages = [reader]
+        else:
+            stages = [
+                reader,
                 {
                     "type": "filters.crop",
-                    "bounds": f"([{xmin}, {xmax}], [{ymin}, {ymax}])"
+                    "bounds": bounds
                 }
             ]
-        }
         
+        return {"pipeline": stages + self._output_stages(output_path)}
+    
+    def _output_stages(self, output_path: str) -> List[Dict[str, Any]]:
+        """Statistics filter (counted while writing) followed by the writer stage"""
         # Add writer stage
         writer_stage = {
             "type": f"writers.{self.output_format}",
@@ -343,9 +361,80 @@ class LAZCropper:
         if self.output_format == "laz" and self.compression:
             writer_stage["compression"] = "laszip"
         
-        pipeline["pipeline"].append(writer_stage)
+        return [{"type": "filters.stats", "dimensions": "X,Y,Z"}, writer_stage]
+    
+    def _source_reader(self, input_path: str) -> Dict[str, Any]:
+        """
+        Reader stage for the source, going through a COPC copy when indexing is enabled
+        
+        The COPC copy is built once in the index directory (outside the input
+        tree, so it is never picked up as an uploaded file) and reused by later
+        crops for as long as it is newer than the source. If it cannot be built,
+        the source is read directly.
+        
+        Args:
+            input_path: Path to input LAZ file
+            
+        Returns:
+            PDAL reader stage
+        """
+        source = Path(input_path)
+        if source.name.lower().endswith(COPC_INDEX_SUFFIX):
+            return {"type": "readers.copc", "filename": str(source)}
+        if not self.use_spatial_index:
+            return {"type": "readers.las", "filename": str(source)}
         
-        return pipeline
+        index_path = self._index_path(source)
+        if not index_path.exists() or index_path.stat().st_mtime < source.stat().st_mtime:
+            try:
+                self._build_copc_index(source, index_path)
+            except Exception as e:
+                print(f"⚠️ Could not build COPC index, cropping from the source directly: {e}")
+                return {"type": "readers.las", "filename": str(source)}
+        else:
+            print(f"🗂️ Reusing COPC index: {index_path.name}")
+            os.utime(index_path)  # mark as recently used for eviction
+        
+        return {"type": "readers.copc", "filename": str(index_path)}
+    
+    def _index_path(self, source: Path) -> Path:
+        """COPC copy location, keyed by the resolved source path so equal file names do not collide"""
+        digest = hashlib.sha1(str(source.resolve()).encode("utf-8")).hexdigest()[:12]
+        return self.index_dir / f"{digest}_{source.stem}{COPC_INDEX_SUFFIX}"
+    
+    def _build_copc_index(self, source: Path, index_path: Path):
+        """Convert the source to COPC, writing to a temporary file that is renamed into place"""
+        print(f"🗂️ Building COPC index for {source.name}...")
+        index_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = index_path.with_name(f".{index_path.name}.part")
+        try:
+            self._execute_pdal_pipeline({
+                "pipeline": [
+                    {"type": "readers.las", "filename": str(source)},
+                    {"type": "writers.copc", "filename": str(tmp_path)}
+                ]
+            })
+            os.replace(tmp_path, index_path)
+        finally:
+            if tmp_path.exists():
+                tmp_path.unlink()
+        print(f"✅ COPC index ready: {index_path}")
+        self._evict_indexes(keep=index_path)
+    
+    def _evict_indexes(self, keep: Path):
+        """Remove least recently used COPC copies until the index directory fits its budget"""
+        if self.index_max_bytes is None:
+            return
+        indexes = [(p, p.stat()) for p in self.index_dir.glob(f"*{COPC_INDEX_SUFFIX}")]
+        excess = sum(st.st_size for _, st in indexes) - self.index_max_bytes
+        for path, st in sorted(indexes, key=lambda item: item[1].st_mtime):
+            if excess <= 0:
+                break
+            if path == keep:
+                continue
+            path.unlink(missing_ok=True)
+            excess -= st.st_size
+            logger.info(f"Evicted COPC index {path.name}")
     
     def _execute_pdal_pipeline(self, pipeline_config: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -363,10 +452,12 @@ class LAZCropper:
                 json.dump(pipeline_config, f, indent=2)
                 pipeline_file = f.name
             
+            metadata_file = pipeline_file[:-len('.json')] + '.metadata.json'
+            
             print(f"🔧 Executing PDAL cropping pipeline...")
             
             # Execute PDAL command
-            cmd = ['pdal', 'pipeline', pipeline_file]
+            cmd = ['pdal', 'pipeline', pipeline_file, '--metadata', metadata_file]
             result = subprocess.run(
                 cmd,
                 capture_output=True,
@@ -374,8 +465,16 @@ class LAZCropper:
                 timeout=600  # 10 minute timeout for large files
             )
             
-            # Clean up temporary file
+            # Clean up temporary files
             os.unlink(pipeline_file)
+            metadata = {}
+            if os.path.exists(metadata_file):
+                try:
+                    with open(metadata_file, 'r') as f:
+                        metadata = json.load(f)
+                except json.JSONDecodeError:
+                    pass
+                os.unlink(metadata_file)
             
             if result.returncode != 0:
                 raise RuntimeError(f"PDAL cropping execution failed: {result.stderr}")
@@ -386,7 +485,8 @@ class LAZCropper:
                 "success": True,
                 "stdout": result.stdout,
                 "stderr": result.stderr,
-                "returncode": result.returncode
+                "returncode": result.returncode,
+                "metadata": metadata
             }
             
         except subprocess.TimeoutExpired:
@@ -396,7 +496,7 @@ class LAZCropper:
     
     def _analyze_cropped_file(self, laz_file_path: str) -> Dict[str, Any]:
         """
-        Analyze LAZ file statistics
+        Analyze LAZ file statistics from its header, without reading the points
         
         Args:
             laz_file_path: Path to LAZ file
@@ -408,8 +508,8 @@ class LAZCropper:
             if not os.path.exists(laz_file_path):
                 return {"error": "File not found"}
             
-            # Use pdal info to get file statistics
-            cmd = ['pdal', 'info', '--summary', laz_file_path]
+            # pdal info --metadata only reads the header
+            cmd = ['pdal', 'info', '--metadata', laz_file_path]
             result = subprocess.run(cmd, capture_output=True, text=True, timeout=60)
             
             if result.returncode != 0:
@@ -417,13 +517,15 @@ class LAZCropper:
             
             # Parse JSON output
             try:
-                info_data = json.loads(result.stdout)
-                summary = info_data.get('summary', {})
+                metadata = json.loads(result.stdout).get('metadata', {})
                 
                 stats = {
-                    "point_count": summary.get('num_points', 0),
+                    "point_count": metadata.get('count', 0),
                     "file_size_mb": round(os.path.getsize(laz_file_path) / (1024 * 1024), 2),
-                    "bounds": summary.get('bounds', {})
+                    "bounds": {
+                        key: metadata[key] for key in ('minx', 'miny', 'minz', 'maxx', 'maxy', 'maxz')
+                        if key in metadata
+                    }
                 }
                 
                 return stats
@@ -434,6 +536,28 @@ class LAZCropper:
         except Exception as e:
             return {"error": str(e)}
     
+    def _cropped_statistics(self, output_path: str, execution_stats: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Statistics of the cropped points, taken from the filters.stats stage of the crop pipeline
+        
+        Falls back to reading the output header when the pipeline metadata has no statistics.
+        """
+        stats_metadata = _find_stage_metadata(execution_stats.get("metadata", {}), "filters.stats")
+        statistics = {s.get("name"): s for s in (stats_metadata or {}).get("statistic", [])}
+        if "X" not in statistics:
+            return self._analyze_cropped_file(output_path)
+        
+        bounds = {}
+        for dimension in ("X", "Y", "Z"):
+            if dimension in statistics:
+                bounds[f"min{dimension.lower()}"] = statistics[dimension].get("minimum")
+                bounds[f"max{dimension.lower()}"] = statistics[dimension].get("maximum")
+        return {
+            "point_count": statistics["X"].get("count", 0),
+            "file_size_mb": round(os.path.getsize(output_path) / (1024 * 1024), 2) if os.path.exists(output_path) else 0,
+            "bounds": bounds
+        }
+    
     def _convert_polygon_to_wkt(self, polygon_path: str) -> str:
         """
         Convert polygon file to WKT format for PDAL
@@ -480,6 +604,24 @@ class LAZCropper:
             # Return a fallback bounding box that should encompass most data
             return "POLYGON((-180 -90, -180 90, 180 90, 180 -90, -180 -90))"
 
+def _find_stage_metadata(metadata: Any, stage_name: str) -> Optional[Dict[str, Any]]:
+    """Find a stage's entry in PDAL pipeline metadata, whatever the nesting of the PDAL version"""
+    if isinstance(metadata, dict):
+        if metadata.get("type") == stage_name:
+            return metadata
+        for key, value in metadata.items():
+            if key == stage_name:
+                return value[0] if isinstance(value, list) and value else value
+            found = _find_stage_metadata(value, stage_name)
+            if found is not None:
+                return found
+    elif isinstance(metadata, list):
+        for value in metadata:
+            found = _find_stage_metadata(value, stage_name)
+            if found is not None:
+                return found
+    return None
+
 def crop_laz_with_polygon(
     input_laz_path: str,
     polygon_path: str,
@@ -4,9 +4,11 @@ Integrates density analysis into existing LAZ processing workflows
 """
 
 import os
+import json
 import logging
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Callable
 from datetime import datetime
 
 from .density_analysis import DensityAnalyzer
@@ -38,14 +40,25 @@ class LAZDensityService:
     def process_loaded_laz_files(
         self, 
         search_directory: str = "input",
-        output_base_dir: str = "output"
+        output_base_dir: str = "output",
+        max_workers: Optional[int] = None,
+        force: bool = False,
+        progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None
     ) -> Dict[str, Any]:
         """
         Process density analysis for all loaded LAZ files
         
+        Files whose density outputs are newer than the file and were made with
+        the same parameters are skipped. The rest run on a pool of worker
+        processes, one task per file; every file writes to its own output
+        region (see _assign_output_regions).
+        
         Args:
             search_directory: Directory to search for LAZ files
             output_base_dir: Base output directory
+            max_workers: Number of worker processes (defaults to the CPU count)
+            force: Reprocess files whose density outputs are already up to date
+            progress_callback: Called with a progress update after each file
             
         Returns:
             Processing results summary
@@ -64,40 +77,86 @@ class LAZDensityService:
                     "success": True,
                     "files_processed": 0,
                     "files_found": 0,
+                    "successful_count": 0,
+                    "failed_count": 0,
+                    "skipped_count": 0,
                     "results": [],
                     "message": "No loaded LAZ files found"
                 }
             
-            print(f"📁 Found {len(loaded_files)} loaded LAZ files to process")
+            self._assign_output_regions(loaded_files)
             
-            # Process each loaded file
             results = []
-            successful_count = 0
-            
+            pending = []
             for file_info in loaded_files:
-                print(f"\n🔄 Processing: {file_info['file_name']}")
-                
-                result = self.process_single_laz(
-                    file_info['file_path'],
-                    output_base_dir,
-                    file_info['region_name']
-                )
-                
-                result['file_info'] = file_info
-                results.append(result)
-                
-                if result['success']:
-                    successful_count += 1
-                    print(f"✅ Completed: {file_info['file_name']}")
+                metadata_path = self._density_outputs_up_to_date(file_info, output_base_dir)
+                if metadata_path and not force:
+                    results.append({
+                        "success": True,
+                        "skipped": True,
+                        "reason": "Density outputs up to date",
+                        "metadata_path": str(metadata_path),
+                        "region_name": file_info['region_name'],
+                        "file_info": file_info
+                    })
                 else:
-                    print(f"❌ Failed: {file_info['file_name']} - {result.get('error', 'Unknown error')}")
+                    pending.append(file_info)
+            
+            print(f"📁 Found {len(loaded_files)} loaded LAZ files: {len(pending)} to process, "
+                  f"{len(loaded_files) - len(pending)} up to date")
+            
+            successful_count = 0
+            completed = 0
+            if pending:
+                workers = max(1, min(max_workers or os.cpu_count() or 1, len(pending)))
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    futures = {
+                        pool.submit(_process_density_file, self.resolution, self.mask_threshold,
+                                    output_base_dir, file_info): file_info
+                        for file_info in pending
+                    }
+                    for future in as_completed(futures):
+                        file_info = futures[future]
+                        try:
+                            result = future.result()
+                        except Exception as e:
+                            self.logger.error(f"Density worker failed for {file_info['file_name']}: {e}")
+                            result = {
+                                "success": False,
+                                "error": f"Density worker failed: {str(e)}",
+                                "file_path": file_info['file_path'],
+                                "region_name": file_info['region_name']
+                            }
+                        
+                        result['file_info'] = file_info
+                        results.append(result)
+                        completed += 1
+                        
+                        if result['success']:
+                            successful_count += 1
+                            print(f"✅ [{completed}/{len(pending)}] Completed: {file_info['file_name']}")
+                        else:
+                            print(f"❌ [{completed}/{len(pending)}] Failed: {file_info['file_name']} - "
+                                  f"{result.get('error', 'Unknown error')}")
+                        
+                        if progress_callback:
+                            progress_callback({
+                                "type": "density_batch_progress",
+                                "file_name": file_info['file_name'],
+                                "region_name": file_info['region_name'],
+                                "success": result['success'],
+                                "completed": completed,
+                                "total": len(pending),
+                                "progress": round(100 * completed / len(pending), 1)
+                            })
             
             summary = {
                 "success": True,
-                "files_processed": len(loaded_files),
+                "files_processed": len(pending),
                 "files_found": len(loaded_files),
                 "successful_count": successful_count,
-                "failed_count": len(loaded_files) - successful_count,
+                "failed_count": len(pending) - successful_count,
+                "skipped_count": len(loaded_files) - len(pending),
                 "results": results,
                 "timestamp": datetime.now().isoformat()
             }
@@ -106,6 +165,7 @@ class LAZDensityService:
             print(f"   Files found: {summary['files_found']}")
             print(f"   Successfully processed: {summary['successful_count']}")
             print(f"   Failed: {summary['failed_count']}")
+            print(f"   Up to date: {summary['skipped_count']}")
             
             return summary
             
@@ -122,6 +182,67 @@ class LAZDensityService:
                 "results": []
             }
     
+    @staticmethod
+    def _assign_output_regions(loaded_files: List[Dict[str, Any]]):
+        """
+        Give every file its own output region, so no two files share density outputs
+        
+        A file keeps its input folder as region when it is the only file there.
+        Files in the shared upload folder (input/LAZ) or in a folder holding
+        several files are keyed by their stem instead, like process_loaded_laz_file
+        does. The input folder is kept as 'input_region'.
+        
+        Args:
+            loaded_files: Loaded LAZ file infos, updated in place
+        """
+        folder_counts = {}
+        for file_info in loaded_files:
+            folder_counts[file_info['region_name']] = folder_counts.get(file_info['region_name'], 0) + 1
+        
+        taken = {name for name, count in folder_counts.items() if count == 1 and name != "LAZ"}
+        for file_info in loaded_files:
+            folder = file_info.setdefault('input_region', file_info['region_name'])
+            if folder in taken:
+                continue
+            stem = Path(file_info['file_path']).stem
+            region_name = stem if stem not in taken else f"{folder}_{stem}"
+            taken.add(region_name)
+            file_info['region_name'] = region_name
+    
+    def _density_outputs_up_to_date(self, file_info: Dict[str, Any], output_base_dir: str) -> Optional[Path]:
+        """
+        Check whether a file's density outputs are current
+        
+        The metadata JSON is written last, so it marks a completed run; it
+        must belong to this file, be newer than it and record the same
+        resolution and mask threshold.
+        
+        Args:
+            file_info: Loaded LAZ file info from LAZClassifier.get_loaded_laz_files
+            output_base_dir: Base output directory
+            
+        Returns:
+            Path of the metadata JSON if the outputs are up to date, otherwise None
+        """
+        region_name = file_info['region_name']
+        density_dir = Path(output_base_dir) / region_name / "lidar" / "density"
+        metadata_path = density_dir / f"{region_name}_density_metadata.json"
+        try:
+            if metadata_path.stat().st_mtime < file_info['modified_time']:
+                return None
+            with open(metadata_path) as f:
+                metadata = json.load(f)
+        except (OSError, ValueError):
+            return None
+        
+        parameters = metadata.get("parameters", {})
+        if (metadata.get("input", {}).get("file_path") != file_info['file_path']
+                or parameters.get("resolution") != self.resolution
+                or parameters.get("mask_threshold") != self.mask_threshold
+                or not Path(metadata.get("output", {}).get("tiff_path", "")).is_file()):
+            return None
+        return metadata_path
+    
     def process_single_laz(
         self, 
         laz_file_path: str, 
@@ -139,18 +260,37 @@ class LAZDensityService:
         Returns:
             Processing result
         """
-        try:
-            # Verify this is a loaded LAZ file
-            is_loaded, reason = LAZClassifier.is_loaded_laz(laz_file_path)
-            
-            if not is_loaded:
-                return {
-                    "success": False,
-                    "error": f"File not classified as loaded LAZ: {reason}",
-                    "file_path": laz_file_path,
-                    "region_name": region_name
-                }
+        # Verify this is a loaded LAZ file
+        is_loaded, reason = LAZClassifier.is_loaded_laz(laz_file_path)
+        
+        if not is_loaded:
+            return {
+                "success": False,
+                "error": f"File not classified as loaded LAZ: {reason}",
+                "file_path": laz_file_path,
+                "region_name": region_name
+            }
+        
+        return self._analyze_loaded_laz(laz_file_path, output_base_dir, region_name)
+    
+    def _analyze_loaded_laz(
+        self, 
+        laz_file_path: str, 
+        output_base_dir: str, 
+        region_name: str
+    ) -> Dict[str, Any]:
+        """
+        Run density analysis on a file already classified as loaded
+        
+        Args:
+            laz_file_path: Path to LAZ file
+            output_base_dir: Base output directory
+            region_name: Region name for organization
             
+        Returns:
+            Processing result
+        """
+        try:
             # Create output directory for this region
             region_output_dir = Path(output_base_dir) / region_name / "lidar"
             region_output_dir.mkdir(parents=True, exist_ok=True)
@@ -348,6 +488,16 @@ class LAZDensityService:
                 "file_path": laz_file_path
             }
 
+def _process_density_file(
+    resolution: float,
+    mask_threshold: float,
+    output_base_dir: str,
+    file_info: Dict[str, Any]
+) -> Dict[str, Any]:
+    """Worker-process entry point: analyze one loaded LAZ file"""
+    service = LAZDensityService(resolution=resolution, mask_threshold=mask_threshold)
+    return service._analyze_loaded_laz(file_info['file_path'], output_base_dir, file_info['region_name'])
+
 def process_all_loaded_laz_density(resolution: float = 1.0) -> Dict[str, Any]:
     """
     Convenience function to process density for all loaded LAZ files
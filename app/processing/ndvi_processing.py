@@ -9,13 +9,162 @@ NDVI Formula: (NIR - RED) / (NIR + RED)
 
 import os
 import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional, Dict, List, Tuple
+from typing import Any, Callable, Optional, Dict, Iterator, List, Tuple
 from osgeo import gdal
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Edge length (pixels) of the windows NDVI is computed in; matches the output tiling
+NDVI_BLOCK_SIZE = 512
+NDVI_NODATA = -999.0
+NDVI_CREATION_OPTIONS = [
+    'TILED=YES',
+    f'BLOCKXSIZE={NDVI_BLOCK_SIZE}',
+    f'BLOCKYSIZE={NDVI_BLOCK_SIZE}',
+    'COMPRESS=DEFLATE',
+    'PREDICTOR=3',  # floating point predictor
+    'BIGTIFF=IF_SAFER',
+]
+
+# Sentinel-2 L2A scene classification (SCL) values that don't show the ground:
+# no data, saturated/defective, cloud shadow, cloud medium/high probability, thin cirrus, snow
+SCL_INVALID_CLASSES = (0, 1, 3, 8, 9, 10, 11)
+COMPOSITE_METHODS = ('max', 'median')
+
+
+def block_windows(xsize: int, ysize: int, block_size: int = NDVI_BLOCK_SIZE) -> Iterator[Tuple[int, int, int, int]]:
+    """Yield (x, y, width, height) windows covering a raster in row-major order."""
+    for y in range(0, ysize, block_size):
+        for x in range(0, xsize, block_size):
+            yield x, y, min(block_size, xsize - x), min(block_size, ysize - y)
+
+
+def compute_ndvi_block(red: np.ndarray, nir: np.ndarray,
+                       red_nodata: Optional[float] = None, nir_nodata: Optional[float] = None) -> np.ndarray:
+    """
+    NDVI of one block in float32.
+    
+    Pixels that are nodata in either band, or where NIR + RED is zero, are
+    set to NDVI_NODATA; the rest are clipped to [-1, 1].
+    """
+    red = red.astype(np.float32, copy=False)
+    nir = nir.astype(np.float32, copy=False)
+    denominator = nir + red
+    valid = (denominator != 0) & np.isfinite(denominator)
+    if red_nodata is not None:
+        valid &= red != red_nodata
+    if nir_nodata is not None:
+        valid &= nir != nir_nodata
+    
+    ndvi = np.full(red.shape, NDVI_NODATA, dtype=np.float32)
+    np.divide(nir - red, denominator, out=ndvi, where=valid)
+    np.clip(ndvi, -1, 1, out=ndvi, where=valid)
+    return ndvi
+
+
+class NDVIStatistics:
+    """Running statistics of valid NDVI pixels across blocks."""
+    
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+    
+    def update(self, ndvi: np.ndarray):
+        values = ndvi[ndvi != NDVI_NODATA]
+        if values.size == 0:
+            return
+        self.count += values.size
+        self.total += float(values.sum(dtype=np.float64))
+        self.total_sq += float(np.square(values, dtype=np.float64).sum())
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+    
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+    
+    @property
+    def std(self) -> float:
+        if not self.count:
+            return 0.0
+        return float(np.sqrt(max(self.total_sq / self.count - self.mean ** 2, 0.0)))
+    
+    def apply(self, band):
+        """Store the statistics on a GDAL band so readers don't have to rescan it."""
+        if self.count:
+            band.SetStatistics(self.min, self.max, self.mean, self.std)
+
+
+RED_BAND_SUFFIX = '_sentinel2_RED_B04.tif'
+NIR_BAND_SUFFIX = '_sentinel2_NIR_B08.tif'
+# Multi-scene NDVI composite; when a region has one it is the region's NDVI product
+NDVI_COMPOSITE_SUFFIX = '_sentinel2_NDVI_composite.tif'
+
+
+def latest_sentinel2_files(sentinel2_dir: Path) -> Dict[str, Optional[Path]]:
+    """Newest RED band, NIR band and NDVI composite of a region, keyed by suffix, in a single directory scan."""
+    latest = {RED_BAND_SUFFIX: (None, -1.0), NIR_BAND_SUFFIX: (None, -1.0), NDVI_COMPOSITE_SUFFIX: (None, -1.0)}
+    with os.scandir(sentinel2_dir) as entries:
+        for entry in entries:
+            for suffix, (_, newest_mtime) in latest.items():
+                if entry.name.endswith(suffix) and entry.is_file():
+                    mtime = entry.stat().st_mtime
+                    if mtime > newest_mtime:
+                        latest[suffix] = (Path(entry.path), mtime)
+    return {suffix: path for suffix, (path, _) in latest.items()}
+
+
+def latest_band_files(sentinel2_dir: Path) -> Tuple[Optional[Path], Optional[Path]]:
+    """Newest RED and NIR band files of a region, found in a single directory scan."""
+    latest = latest_sentinel2_files(sentinel2_dir)
+    return latest[RED_BAND_SUFFIX], latest[NIR_BAND_SUFFIX]
+
+
+def _file_timestamp(file_path: Path) -> str:
+    # Pattern: {region}_{timestamp}_sentinel2_<product>.tif
+    parts = Path(file_path).name.split('_')
+    return parts[1] if len(parts) >= 2 else "unknown"
+
+
+def region_ndvi_path(sentinel2_dir: Path, region_name: str, red_band_path: Path) -> Tuple[Path, str]:
+    """NDVI output path for a region and the timestamp taken from its RED band file name."""
+    timestamp = _file_timestamp(red_band_path)
+    return sentinel2_dir / f"{region_name}_{timestamp}_sentinel2_NDVI.tif", timestamp
+
+
+def region_ndvi_composite_path(sentinel2_dir: Path, region_name: str, timestamp: str) -> Path:
+    """Path of a region's multi-scene NDVI composite."""
+    return sentinel2_dir / f"{region_name}_{timestamp}{NDVI_COMPOSITE_SUFFIX}"
+
+
+@dataclass
+class NDVIJob:
+    """A region whose NDVI comes from its newest RED and NIR bands, or from its NDVI composite."""
+    region_name: str
+    red_band_path: Optional[str]
+    nir_band_path: Optional[str]
+    ndvi_path: str
+    timestamp: str
+    composite: bool = False
+    
+    def is_up_to_date(self) -> bool:
+        """True if the NDVI output exists and is newer than both input bands (a composite is its own output)."""
+        try:
+            output_mtime = os.path.getmtime(self.ndvi_path)
+        except OSError:
+            return False
+        if self.composite:
+            return True
+        return output_mtime >= max(os.path.getmtime(self.red_band_path), os.path.getmtime(self.nir_band_path))
+
+
 class NDVIProcessor:
     """NDVI calculation processor for Sentinel-2 data."""
     
@@ -28,6 +177,11 @@ class NDVIProcessor:
         """
         Calculate NDVI from RED and NIR band GeoTIFF files.
         
+        The bands are processed in aligned blocks of NDVI_BLOCK_SIZE pixels in
+        float32, so memory use is bounded by the block size rather than the
+        scene size. The output is a tiled, compressed float32 GeoTIFF with
+        band statistics.
+        
         Args:
             red_band_path: Path to RED band (B04) GeoTIFF file
             nir_band_path: Path to NIR band (B08) GeoTIFF file
@@ -36,6 +190,7 @@ class NDVIProcessor:
         Returns:
             True if NDVI calculation was successful, False otherwise
         """
+        tmp_path = f"{output_ndvi_path}.part.tif"
         try:
             print(f"\n🌱 NDVI CALCULATION STARTED")
             print(f"🔴 RED band: {red_band_path}")
@@ -70,69 +225,43 @@ class NDVIProcessor:
                 logger.error("RED and NIR bands have different dimensions")
                 return False
             
-            print(f"📐 Image dimensions: {red_ds.RasterXSize} x {red_ds.RasterYSize}")
+            xsize, ysize = red_ds.RasterXSize, red_ds.RasterYSize
+            print(f"📐 Image dimensions: {xsize} x {ysize}")
             
-            # Read the band data as float arrays
-            print("📊 Reading band data...")
-            red_band = red_ds.GetRasterBand(1).ReadAsArray().astype(float)
-            nir_band = nir_ds.GetRasterBand(1).ReadAsArray().astype(float)
-            
-            print(f"🔢 RED band stats: min={red_band.min():.2f}, max={red_band.max():.2f}, mean={red_band.mean():.2f}")
-            print(f"🔢 NIR band stats: min={nir_band.min():.2f}, max={nir_band.max():.2f}, mean={nir_band.mean():.2f}")
-            
-            # Calculate NDVI using the formula: (NIR - RED) / (NIR + RED)
-            print("🧮 Calculating NDVI...")
-            with np.errstate(divide='ignore', invalid='ignore'):
-                # Calculate NDVI
-                ndvi = (nir_band - red_band) / (nir_band + red_band)
-                
-                # Handle division by zero and invalid values
-                ndvi[ndvi == np.inf] = np.nan
-                ndvi[ndvi == -np.inf] = np.nan
-                
-                # Replace NaN values with -999 (common no-data value)
-                ndvi = np.nan_to_num(ndvi, nan=-999)
-                
-                # Clip NDVI values to valid range [-1, 1]
-                ndvi = np.clip(ndvi, -1, 1)
-            
-            print(f"🌱 NDVI stats: min={ndvi.min():.3f}, max={ndvi.max():.3f}, mean={ndvi.mean():.3f}")
-            
-            # Count valid pixels (excluding no-data)
-            valid_pixels = np.sum(ndvi != -999)
-            total_pixels = ndvi.size
-            print(f"✅ Valid pixels: {valid_pixels:,} / {total_pixels:,} ({100*valid_pixels/total_pixels:.1f}%)")
+            red_band = red_ds.GetRasterBand(1)
+            nir_band = nir_ds.GetRasterBand(1)
+            red_nodata = red_band.GetNoDataValue()
+            nir_nodata = nir_band.GetNoDataValue()
             
             # Create output directory if needed
             os.makedirs(os.path.dirname(output_ndvi_path), exist_ok=True)
             
             # Create the output NDVI image
             print("💾 Creating output NDVI file...")
-            driver = gdal.GetDriverByName('GTiff')
-            out_ds = driver.Create(
-                output_ndvi_path, 
-                red_ds.RasterXSize, 
-                red_ds.RasterYSize, 
-                1, 
-                gdal.GDT_Float32
-            )
-            
-            # Copy geospatial information from input
-            out_ds.SetGeoTransform(red_ds.GetGeoTransform())
-            out_ds.SetProjection(red_ds.GetProjectionRef())
-            
-            # Write the NDVI data
+            out_ds = self._create_ndvi_output(tmp_path, red_ds)
             out_band = out_ds.GetRasterBand(1)
-            out_band.WriteArray(ndvi)
-            out_band.SetNoDataValue(-999)
             
-            # Set band description
-            out_band.SetDescription("NDVI (Normalized Difference Vegetation Index)")
+            # Calculate NDVI block by block using the formula: (NIR - RED) / (NIR + RED)
+            print(f"🧮 Calculating NDVI in {NDVI_BLOCK_SIZE}x{NDVI_BLOCK_SIZE} blocks...")
+            stats = NDVIStatistics()
+            for x, y, width, height in block_windows(xsize, ysize):
+                red = red_band.ReadAsArray(x, y, width, height).astype(np.float32, copy=False)
+                nir = nir_band.ReadAsArray(x, y, width, height).astype(np.float32, copy=False)
+                ndvi = compute_ndvi_block(red, nir, red_nodata, nir_nodata)
+                stats.update(ndvi)
+                out_band.WriteArray(ndvi, x, y)
+            
+            stats.apply(out_band)
+            
+            if stats.count:
+                print(f"🌱 NDVI stats: min={stats.min:.3f}, max={stats.max:.3f}, mean={stats.mean:.3f}")
+            print(f"✅ Valid pixels: {stats.count:,} / {xsize * ysize:,} ({100 * stats.count / (xsize * ysize):.1f}%)")
             
             # Clean up
             red_ds = None
             nir_ds = None
             out_ds = None
+            os.replace(tmp_path, output_ndvi_path)
             
             # Verify output file was created
             if os.path.exists(output_ndvi_path):
@@ -149,6 +278,140 @@ class NDVIProcessor:
             logger.error(f"Error calculating NDVI: {e}")
             print(f"❌ NDVI calculation failed: {e}")
             return False
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+    
+    def _create_ndvi_output(self, path: str, reference_ds):
+        """Create a tiled float32 NDVI GeoTIFF on the grid of ``reference_ds``."""
+        driver = gdal.GetDriverByName('GTiff')
+        out_ds = driver.Create(path, reference_ds.RasterXSize, reference_ds.RasterYSize, 1,
+                               gdal.GDT_Float32, options=NDVI_CREATION_OPTIONS)
+        
+        # Copy geospatial information from input
+        out_ds.SetGeoTransform(reference_ds.GetGeoTransform())
+        out_ds.SetProjection(reference_ds.GetProjectionRef())
+        out_band = out_ds.GetRasterBand(1)
+        out_band.SetNoDataValue(NDVI_NODATA)
+        out_band.SetDescription("NDVI (Normalized Difference Vegetation Index)")
+        return out_ds
+    
+    def _open_aligned(self, path: str, reference_ds, resample_alg: str):
+        """Open a raster, warping it on the fly (VRT) to the grid of ``reference_ds`` if needed."""
+        ds = gdal.Open(path)
+        if ds is None:
+            raise RuntimeError(f"Failed to open {path}")
+        
+        gt = reference_ds.GetGeoTransform()
+        xsize, ysize = reference_ds.RasterXSize, reference_ds.RasterYSize
+        if (ds.RasterXSize, ds.RasterYSize) == (xsize, ysize) and \
+                np.allclose(ds.GetGeoTransform(), gt) and \
+                ds.GetProjectionRef() == reference_ds.GetProjectionRef():
+            return ds
+        
+        bounds = (gt[0], gt[3] + gt[5] * ysize, gt[0] + gt[1] * xsize, gt[3])
+        return gdal.Warp('', ds, format='VRT', outputBounds=bounds, width=xsize, height=ysize,
+                         dstSRS=reference_ds.GetProjectionRef(), resampleAlg=resample_alg)
+    
+    def composite_ndvi(self, scenes: List[Dict[str, str]], output_ndvi_path: str, method: str = 'max') -> bool:
+        """
+        Reduce the NDVI of several Sentinel-2 scenes per pixel into one product.
+        
+        Pixels flagged by a scene's SCL band as cloud, cloud shadow, cirrus,
+        snow or no data are ignored for that scene. ``max`` keeps the highest
+        valid NDVI (a running maximum, so memory does not grow with the number
+        of scenes); ``median`` takes the median of the valid observations,
+        holding one block per scene. Scenes are resampled on the fly to the
+        grid of the first scene.
+        
+        Args:
+            scenes: Dicts with 'red' and 'nir' band paths and an optional 'scl' path,
+                best scene first
+            output_ndvi_path: Path for output NDVI GeoTIFF file
+            method: 'max' or 'median'
+            
+        Returns:
+            True if the composite was written, False otherwise
+        """
+        if method not in COMPOSITE_METHODS:
+            raise ValueError(f"Unknown composite method '{method}', expected one of {COMPOSITE_METHODS}")
+        
+        tmp_path = f"{output_ndvi_path}.part.tif"
+        try:
+            print(f"\n🌱 NDVI COMPOSITE STARTED ({method} of {len(scenes)} scenes)")
+            if not scenes:
+                logger.error("No scenes given for NDVI composite")
+                return False
+            
+            reference_ds = gdal.Open(scenes[0]['red'])
+            if reference_ds is None:
+                logger.error(f"Failed to open reference band: {scenes[0]['red']}")
+                return False
+            xsize, ysize = reference_ds.RasterXSize, reference_ds.RasterYSize
+            print(f"📐 Composite grid: {xsize} x {ysize}")
+            
+            # Keep the datasets referenced for as long as their bands are read
+            datasets = []
+            inputs = []
+            for scene in scenes:
+                red_ds = self._open_aligned(scene['red'], reference_ds, 'bilinear')
+                nir_ds = self._open_aligned(scene['nir'], reference_ds, 'bilinear')
+                scl_ds = self._open_aligned(scene['scl'], reference_ds, 'near') if scene.get('scl') else None
+                datasets.extend([red_ds, nir_ds, scl_ds])
+                red_band, nir_band = red_ds.GetRasterBand(1), nir_ds.GetRasterBand(1)
+                inputs.append((red_band, nir_band, scl_ds.GetRasterBand(1) if scl_ds else None,
+                               red_band.GetNoDataValue(), nir_band.GetNoDataValue()))
+            
+            os.makedirs(os.path.dirname(output_ndvi_path), exist_ok=True)
+            out_ds = self._create_ndvi_output(tmp_path, reference_ds)
+            out_band = out_ds.GetRasterBand(1)
+            
+            stats = NDVIStatistics()
+            for x, y, width, height in block_windows(xsize, ysize):
+                blocks = (self._scene_ndvi_block(scene, x, y, width, height) for scene in inputs)
+                if method == 'max':
+                    ndvi = np.full((height, width), NDVI_NODATA, dtype=np.float32)
+                    for block in blocks:
+                        better = (block != NDVI_NODATA) & ((ndvi == NDVI_NODATA) | (block > ndvi))
+                        ndvi[better] = block[better]
+                else:
+                    stack = np.stack([np.where(block == NDVI_NODATA, np.nan, block) for block in blocks])
+                    observed = np.isfinite(stack).any(axis=0)
+                    ndvi = np.full((height, width), NDVI_NODATA, dtype=np.float32)
+                    ndvi[observed] = np.nanmedian(stack[:, observed], axis=0)
+                stats.update(ndvi)
+                out_band.WriteArray(ndvi, x, y)
+            
+            stats.apply(out_band)
+            out_ds.SetMetadata({'COMPOSITE_METHOD': method, 'SCENE_COUNT': str(len(scenes))})
+            print(f"✅ Valid pixels: {stats.count:,} / {xsize * ysize:,} ({100 * stats.count / (xsize * ysize):.1f}%)")
+            
+            datasets = None
+            reference_ds = None
+            out_ds = None
+            os.replace(tmp_path, output_ndvi_path)
+            print(f"✅ NDVI composite written: {output_ndvi_path}")
+            return True
+            
+        except Exception as e:
+            logger.error(f"Error compositing NDVI: {e}")
+            print(f"❌ NDVI composite failed: {e}")
+            return False
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+    
+    @staticmethod
+    def _scene_ndvi_block(scene, x: int, y: int, width: int, height: int) -> np.ndarray:
+        red_band, nir_band, scl_band, red_nodata, nir_nodata = scene
+        ndvi = compute_ndvi_block(
+            red_band.ReadAsArray(x, y, width, height),
+            nir_band.ReadAsArray(x, y, width, height),
+            red_nodata, nir_nodata
+        )
+        if scl_band is not None:
+            ndvi[np.isin(scl_band.ReadAsArray(x, y, width, height), SCL_INVALID_CLASSES)] = NDVI_NODATA
+        return ndvi
     
     def find_sentinel2_bands(self, data_dir: str, region_name: str) -> Tuple[Optional[str], Optional[str]]:
         """
@@ -169,25 +432,16 @@ class NDVIProcessor:
                 print(f"📂 Sentinel-2 directory not found: {sentinel2_dir}")
                 return None, None
             
-            # Pattern: {region}_{timestamp}_sentinel2_RED_B04.tif and {region}_{timestamp}_sentinel2_NIR_B08.tif
-            red_files = list(sentinel2_dir.glob(f"*_sentinel2_RED_B04.tif"))
-            nir_files = list(sentinel2_dir.glob(f"*_sentinel2_NIR_B08.tif"))
-            
-            print(f"🔍 Found RED band files: {[f.name for f in red_files]}")
-            print(f"🔍 Found NIR band files: {[f.name for f in nir_files]}")
+            red_file, nir_file = latest_band_files(sentinel2_dir)
             
-            if not red_files:
+            if not red_file:
                 print("❌ No RED band (B04) files found")
                 return None, None
             
-            if not nir_files:
+            if not nir_file:
                 print("❌ No NIR band (B08) files found") 
                 return None, None
             
-            # Use the most recent files (sort by modification time)
-            red_file = sorted(red_files, key=lambda x: x.stat().st_mtime)[-1]
-            nir_file = sorted(nir_files, key=lambda x: x.stat().st_mtime)[-1]
-            
             print(f"✅ Selected RED band: {red_file.name}")
             print(f"✅ Selected NIR band: {nir_file.name}")
             
@@ -198,10 +452,31 @@ class NDVIProcessor:
             print(f"❌ Error finding Sentinel-2 bands: {e}")
             return None, None
     
+    def find_ndvi_composite(self, data_dir: str) -> Optional[str]:
+        """
+        Find the newest multi-scene NDVI composite in the Sentinel-2 data directory.
+        
+        Args:
+            data_dir: Base data directory (e.g., "output/3.10S_57.70W")
+            
+        Returns:
+            Path to the composite or None if the region has none
+        """
+        sentinel2_dir = Path(data_dir) / "sentinel2"
+        if not sentinel2_dir.is_dir():
+            return None
+        composite = latest_sentinel2_files(sentinel2_dir)[NDVI_COMPOSITE_SUFFIX]
+        if composite:
+            print(f"✅ Selected NDVI composite: {composite.name}")
+        return str(composite) if composite else None
+    
     def process_region_ndvi(self, region_name: str, base_output_dir: str = "output") -> Optional[Dict]:
         """
         Process NDVI for a specific region automatically.
         
+        A region with a multi-scene NDVI composite uses it as its NDVI product
+        instead of computing a single-scene NDVI.
+        
         Args:
             region_name: Region name (e.g., "3.10S_57.70W")
             base_output_dir: Base output directory
@@ -219,6 +494,16 @@ class NDVIProcessor:
                 print(f"❌ Region data directory not found: {data_dir}")
                 return None
             
+            composite_path = self.find_ndvi_composite(data_dir)
+            if composite_path:
+                return {
+                    "success": True,
+                    "region_name": region_name,
+                    "ndvi_path": composite_path,
+                    "timestamp": _file_timestamp(composite_path),
+                    "composite": True
+                }
+            
             # Find RED and NIR band files
             red_path, nir_path = self.find_sentinel2_bands(data_dir, region_name)
             
@@ -228,18 +513,7 @@ class NDVIProcessor:
             
             # Generate NDVI output filename
             sentinel2_dir = Path(data_dir) / "sentinel2"
-            
-            # Extract timestamp from one of the band files
-            red_filename = Path(red_path).name
-            # Pattern: {region}_{timestamp}_sentinel2_RED_B04.tif
-            parts = red_filename.split('_')
-            if len(parts) >= 2:
-                timestamp = parts[1]  # Extract timestamp
-            else:
-                timestamp = "unknown"
-            
-            ndvi_filename = f"{region_name}_{timestamp}_sentinel2_NDVI.tif"
-            ndvi_output_path = sentinel2_dir / ndvi_filename
+            ndvi_output_path, timestamp = region_ndvi_path(sentinel2_dir, region_name, red_path)
             
             # Calculate NDVI
             success = self.calculate_ndvi(red_path, nir_path, str(ndvi_output_path))
@@ -281,6 +555,47 @@ def process_ndvi_for_region(region_name: str, base_output_dir: str = "output") -
     processor = NDVIProcessor()
     return processor.process_region_ndvi(region_name, base_output_dir)
 
+def scan_ndvi_jobs(base_output_dir: str = "output") -> List[NDVIJob]:
+    """
+    Enumerate every region that has both RED and NIR bands or an NDVI composite, with its NDVI output path.
+    
+    Each region's sentinel2 folder is scanned once. Regions with a composite
+    use it as their NDVI output.
+    
+    Args:
+        base_output_dir: Base output directory
+        
+    Returns:
+        One NDVIJob per region ready for NDVI processing
+    """
+    jobs = []
+    output_path = Path(base_output_dir)
+    
+    if not output_path.exists():
+        print(f"📂 Output directory not found: {base_output_dir}")
+        return []
+    
+    for region_dir in sorted(output_path.iterdir()):
+        sentinel2_dir = region_dir / "sentinel2"
+        if not sentinel2_dir.is_dir():
+            continue
+        
+        latest = latest_sentinel2_files(sentinel2_dir)
+        red_file, nir_file, composite = (latest[RED_BAND_SUFFIX], latest[NIR_BAND_SUFFIX],
+                                         latest[NDVI_COMPOSITE_SUFFIX])
+        if composite:
+            jobs.append(NDVIJob(region_dir.name, str(red_file) if red_file else None,
+                                str(nir_file) if nir_file else None, str(composite),
+                                _file_timestamp(composite), composite=True))
+            continue
+        if not red_file or not nir_file:
+            print(f"⚠️ Region {region_dir.name}: Missing required bands")
+            continue
+        
+        ndvi_path, timestamp = region_ndvi_path(sentinel2_dir, region_dir.name, red_file)
+        jobs.append(NDVIJob(region_dir.name, str(red_file), str(nir_file), str(ndvi_path), timestamp))
+    return jobs
+
 def find_regions_with_sentinel2_data(base_output_dir: str = "output") -> List[str]:
     """
     Find all regions that have Sentinel-2 data available for NDVI processing.
@@ -289,32 +604,12 @@ def find_regions_with_sentinel2_data(base_output_dir: str = "output") -> List[st
         base_output_dir: Base output directory
         
     Returns:
-        List of region names that have both RED and NIR bands
+        List of region names that have both RED and NIR bands or an NDVI composite
     """
     try:
-        regions_with_data = []
-        output_path = Path(base_output_dir)
-        
-        if not output_path.exists():
-            print(f"📂 Output directory not found: {base_output_dir}")
-            return []
-        
-        # Scan all region directories
-        for region_dir in output_path.iterdir():
-            if region_dir.is_dir():
-                region_name = region_dir.name
-                sentinel2_dir = region_dir / "sentinel2"
-                
-                if sentinel2_dir.exists():
-                    # Check for RED and NIR bands
-                    red_files = list(sentinel2_dir.glob("*_sentinel2_RED_B04.tif"))
-                    nir_files = list(sentinel2_dir.glob("*_sentinel2_NIR_B08.tif"))
-                    
-                    if red_files and nir_files:
-                        regions_with_data.append(region_name)
-                        print(f"✅ Region {region_name}: Ready for NDVI processing")
-                    else:
-                        print(f"⚠️ Region {region_name}: Missing required bands")
+        regions_with_data = [job.region_name for job in scan_ndvi_jobs(base_output_dir)]
+        for region_name in regions_with_data:
+            print(f"✅ Region {region_name}: Ready for NDVI processing")
         
         print(f"\n📊 Found {len(regions_with_data)} regions ready for NDVI processing")
         return regions_with_data
@@ -322,3 +617,77 @@ def find_regions_with_sentinel2_data(base_output_dir: str = "output") -> List[st
     except Exception as e:
         logger.error(f"Error scanning for Sentinel-2 data: {e}")
         return []
+
+def _run_ndvi_job(job: NDVIJob) -> Dict[str, Any]:
+    """Compute the NDVI of one job (runs in a worker process)."""
+    success = job.composite or NDVIProcessor().calculate_ndvi(job.red_band_path, job.nir_band_path, job.ndvi_path)
+    if not success:
+        return {"success": False, "region_name": job.region_name, "error": "NDVI calculation failed"}
+    return {
+        "success": True,
+        "region_name": job.region_name,
+        "red_band_path": job.red_band_path,
+        "nir_band_path": job.nir_band_path,
+        "ndvi_path": job.ndvi_path,
+        "timestamp": job.timestamp,
+        "composite": job.composite
+    }
+
+def process_ndvi_batch(base_output_dir: str = "output", max_workers: Optional[int] = None, force: bool = False,
+                       progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+    """
+    Compute NDVI for every region whose output is missing or older than its bands.
+    
+    Regions are enumerated once and processed on a pool of worker processes,
+    one region per task.
+    
+    Args:
+        base_output_dir: Base output directory
+        max_workers: Number of worker processes (defaults to the CPU count)
+        force: Recompute regions whose NDVI is already up to date
+        progress_callback: Called with an aggregate progress update after each region
+        
+    Returns:
+        Dictionary with counts and the per-region results
+    """
+    jobs = scan_ndvi_jobs(base_output_dir)
+    pending = [job for job in jobs if force or not job.is_up_to_date()]
+    summary = {
+        "total_regions": len(jobs),
+        "skipped": len(jobs) - len(pending),
+        "processed": 0,
+        "failed": 0,
+        "results": []
+    }
+    print(f"\n🌱 BATCH NDVI: {len(pending)} regions to process, {summary['skipped']} up to date")
+    if not pending:
+        return summary
+    
+    workers = max(1, min(max_workers or os.cpu_count() or 1, len(pending)))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(_run_ndvi_job, job): job for job in pending}
+        for completed, future in enumerate(as_completed(futures), 1):
+            job = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                logger.error(f"NDVI worker failed for region {job.region_name}: {e}")
+                result = {"success": False, "region_name": job.region_name, "error": str(e)}
+            
+            summary["results"].append(result)
+            summary["processed" if result["success"] else "failed"] += 1
+            print(f"{'✅' if result['success'] else '❌'} [{completed}/{len(pending)}] {job.region_name}")
+            
+            if progress_callback:
+                progress_callback({
+                    "type": "ndvi_batch_progress",
+                    "region_name": job.region_name,
+                    "success": result["success"],
+                    "completed": completed,
+                    "total": len(pending),
+                    "progress": round(100 * completed / len(pending), 1)
+                })
+    
+    print(f"📊 Batch NDVI finished: {summary['processed']} processed, {summary['failed']} failed, "
+          f"{summary['skipped']} skipped")
+    return summary
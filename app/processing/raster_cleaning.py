@@ -6,6 +6,8 @@ Applies binary masks to clean up raster outputs by removing artifacts and edge b
 import os
 import shutil
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Dict, Any, List, Optional, Tuple
 import subprocess
@@ -13,6 +15,8 @@ import tempfile
 
 try:
     import rasterio
+    import rasterio.warp
+    import rasterio.windows
     import numpy as np
     RASTERIO_AVAILABLE = True
 except ImportError:
@@ -20,6 +24,52 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# Edge length (pixels) of the blocks rasters are cleaned in
+CLEANING_BLOCK_SIZE = 512
+
+class AlignedMask:
+    """
+    Binary mask read once and resampled once per target grid
+    
+    Rasters of a region usually share one grid, so cleaning a whole product
+    suite reads and aligns the mask a single time. Rasters on another grid
+    get the mask reprojected to it with nearest-neighbour resampling.
+    """
+    
+    def __init__(self, mask_path: str):
+        with rasterio.open(mask_path) as src:
+            self.data = src.read(1) > 0
+            self.transform = src.transform
+            self.crs = src.crs
+        self._grids: Dict[Tuple, "np.ndarray"] = {}
+        self._lock = threading.Lock()
+    
+    def for_grid(self, transform, crs, width: int, height: int) -> "np.ndarray":
+        """Boolean mask (True = valid) on the given grid"""
+        key = (tuple(transform)[:6], crs.to_wkt() if crs else None, width, height)
+        with self._lock:
+            if key not in self._grids:
+                self._grids[key] = self._align(transform, crs, width, height)
+            return self._grids[key]
+    
+    def _align(self, transform, crs, width: int, height: int) -> "np.ndarray":
+        same_crs = crs is None or self.crs is None or crs == self.crs
+        if same_crs and self.data.shape == (height, width) and self.transform.almost_equals(transform):
+            return self.data
+        
+        print(f"   🔄 Aligning mask to {width}x{height} grid")
+        aligned = np.zeros((height, width), dtype=np.uint8)
+        rasterio.warp.reproject(
+            source=self.data.astype(np.uint8),
+            destination=aligned,
+            src_transform=self.transform,
+            src_crs=self.crs or crs,
+            dst_transform=transform,
+            dst_crs=crs or self.crs,
+            resampling=rasterio.warp.Resampling.nearest
+        )
+        return aligned > 0
+
 class RasterCleaner:
     """
     Modular service for cleaning raster outputs using binary masks
@@ -47,7 +97,8 @@ class RasterCleaner:
         raster_path: str, 
         mask_path: str, 
         output_path: str,
-        method: Optional[str] = None
+        method: Optional[str] = None,
+        aligned_mask: Optional[AlignedMask] = None
     ) -> Dict[str, Any]:
         """
         Clean a single raster using binary mask
@@ -57,6 +108,7 @@ class RasterCleaner:
             mask_path: Path to binary mask file
             output_path: Path for cleaned output raster
             method: Override cleaning method for this operation
+            aligned_mask: Already loaded mask to reuse (python method only)
             
         Returns:
             Dictionary with cleaning results
@@ -80,7 +132,7 @@ class RasterCleaner:
             clean_method = method or self.method
             
             if clean_method == "python" and RASTERIO_AVAILABLE:
-                result = self._clean_with_python(raster_path, mask_path, output_path)
+                result = self._clean_with_python(raster_path, mask_path, output_path, aligned_mask)
             else:
                 result = self._clean_with_gdal(raster_path, mask_path, output_path)
             
@@ -118,15 +170,20 @@ class RasterCleaner:
         self, 
         region_dir: str, 
         mask_path: str,
-        raster_types: Optional[List[str]] = None
+        raster_types: Optional[List[str]] = None,
+        max_workers: Optional[int] = None
     ) -> Dict[str, Any]:
         """
         Clean all rasters in a region using the provided mask
         
+        The mask is loaded once and shared by all rasters, which are cleaned
+        concurrently on a thread pool.
+        
         Args:
             region_dir: Path to region directory (e.g., output/PRGL1260C9597_2014/lidar)
             mask_path: Path to binary mask file
             raster_types: List of raster types to clean (None = all supported types)
+            max_workers: Number of rasters cleaned at the same time (default: up to 4)
             
         Returns:
             Dictionary with batch cleaning results
@@ -163,11 +220,12 @@ class RasterCleaner:
             cleaned_dir = Path(region_dir) / "cleaned"
             cleaned_dir.mkdir(parents=True, exist_ok=True)
             
-            # Clean each raster
-            results = []
-            successful_count = 0
+            # Load the mask once for all rasters
+            aligned_mask = None
+            if self.method == "python" and RASTERIO_AVAILABLE:
+                aligned_mask = AlignedMask(mask_path)
             
-            for raster_info in rasters_to_clean:
+            def clean(raster_info: Dict[str, str]) -> Dict[str, Any]:
                 raster_path = raster_info["path"]
                 raster_name = raster_info["name"]
                 raster_type = raster_info["type"]
@@ -182,7 +240,8 @@ class RasterCleaner:
                 result = self.clean_raster_with_mask(
                     raster_path=raster_path,
                     mask_path=mask_path,
-                    output_path=str(output_path)
+                    output_path=str(output_path),
+                    aligned_mask=aligned_mask
                 )
                 
                 result.update({
@@ -191,14 +250,15 @@ class RasterCleaner:
                     "original_path": raster_path
                 })
                 
-                results.append(result)
-                
-                if result["success"]:
-                    successful_count += 1
-                    
-                    # Copy cleaned raster to png_outputs if it's a visualization type
-                    if raster_type in ["HillshadeRGB", "TintOverlay", "DTM", "DSM"]:
-                        self._update_png_gallery(result, region_dir)
+                # Copy cleaned raster to png_outputs if it's a visualization type
+                if result["success"] and raster_type in ["HillshadeRGB", "TintOverlay", "DTM", "DSM"]:
+                    self._update_png_gallery(result, region_dir)
+                return result
+            
+            workers = max(1, min(max_workers or min(4, os.cpu_count() or 1), len(rasters_to_clean)))
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(clean, rasters_to_clean))
+            successful_count = sum(1 for result in results if result["success"])
             
             summary = {
                 "success": True,
@@ -233,15 +293,20 @@ class RasterCleaner:
         self, 
         raster_path: str, 
         mask_path: str, 
-        output_path: str
+        output_path: str,
+        aligned_mask: Optional[AlignedMask] = None
     ) -> Dict[str, Any]:
         """
         Clean raster using Python/rasterio (preferred method)
         
+        All bands are streamed block by block through the mask, so memory use is
+        bounded by the block size rather than the raster size.
+        
         Args:
             raster_path: Path to input raster
             mask_path: Path to binary mask
             output_path: Path for output raster
+            aligned_mask: Already loaded mask to reuse
             
         Returns:
             Cleaning result dictionary
@@ -249,36 +314,15 @@ class RasterCleaner:
         try:
             print(f"   🐍 Using Python/rasterio for cleaning...")
             
-            # Open mask and raster
-            with rasterio.open(mask_path) as mask_src, rasterio.open(raster_path) as raster_src:
-                # Read data
-                mask_data = mask_src.read(1)
-                raster_data = raster_src.read()
-                
-                print(f"   📊 Raster shape: {raster_data.shape}")
-                print(f"   📊 Mask shape: {mask_data.shape}")
-                
-                # Ensure mask and raster have compatible dimensions
-                if raster_data.shape[1:] != mask_data.shape:
-                    raise ValueError(f"Dimension mismatch: raster {raster_data.shape[1:]} vs mask {mask_data.shape}")
-                
-                # Apply mask to each band
-                cleaned_data = np.zeros_like(raster_data, dtype=raster_data.dtype)
-                valid_pixels_total = 0
+            if aligned_mask is None:
+                aligned_mask = AlignedMask(mask_path)
+            
+            with rasterio.open(raster_path) as raster_src:
+                print(f"   📊 Raster shape: ({raster_src.count}, {raster_src.height}, {raster_src.width})")
                 
-                for band_idx in range(raster_data.shape[0]):
-                    band_data = raster_data[band_idx]
-                    
-                    # Apply mask: multiply by mask (0 or 1)
-                    cleaned_band = band_data * mask_data
-                    
-                    # Set invalid areas to nodata value
-                    cleaned_band = np.where(mask_data > 0, cleaned_band, self.nodata_value)
-                    
-                    cleaned_data[band_idx] = cleaned_band
-                    
-                    # Count valid pixels in this band
-                    valid_pixels_total += np.sum(mask_data > 0)
+                mask_data = aligned_mask.for_grid(
+                    raster_src.transform, raster_src.crs, raster_src.width, raster_src.height
+                )
                 
                 # Update profile for output
                 profile = raster_src.profile.copy()
@@ -286,14 +330,25 @@ class RasterCleaner:
                     'nodata': self.nodata_value,
                     'compress': 'lzw'
                 })
+                if raster_src.width >= CLEANING_BLOCK_SIZE and raster_src.height >= CLEANING_BLOCK_SIZE:
+                    profile.update(tiled=True, blockxsize=CLEANING_BLOCK_SIZE, blockysize=CLEANING_BLOCK_SIZE)
                 
-                # Write cleaned raster
+                # Write cleaned raster block by block; invalid areas become nodata
                 with rasterio.open(output_path, 'w', **profile) as dst:
-                    dst.write(cleaned_data)
+                    for row in range(0, raster_src.height, CLEANING_BLOCK_SIZE):
+                        for col in range(0, raster_src.width, CLEANING_BLOCK_SIZE):
+                            window = rasterio.windows.Window(
+                                col, row,
+                                min(CLEANING_BLOCK_SIZE, raster_src.width - col),
+                                min(CLEANING_BLOCK_SIZE, raster_src.height - row)
+                            )
+                            block = raster_src.read(window=window)
+                            valid = mask_data[row:row + window.height, col:col + window.width]
+                            block[:, ~valid] = self.nodata_value
+                            dst.write(block, window=window)
                 
                 # Calculate statistics
-                total_pixels = mask_data.size * raster_data.shape[0]
-                coverage_percentage = (valid_pixels_total / total_pixels) * 100 if total_pixels > 0 else 0
+                coverage_percentage = (mask_data.sum() / mask_data.size) * 100 if mask_data.size > 0 else 0
                 
                 print(f"   📈 Coverage after cleaning: {coverage_percentage:.1f}%")
                 
@@ -302,8 +357,8 @@ class RasterCleaner:
                     "method": "python",
                     "input_raster": raster_path,
                     "output_raster": output_path,
-                    "bands_processed": raster_data.shape[0],
-                    "coverage_percentage": round(coverage_percentage, 2)
+                    "bands_processed": raster_src.count,
+                    "coverage_percentage": round(float(coverage_percentage), 2)
                 }
                 
         except Exception as e:
@@ -420,7 +475,7 @@ class RasterCleaner:
                 
                 for file_path in matching_files:
                     # Skip already processed cleaned files
-                    if "cleaned" in str(file_path):
+                    if "cleaned" in str(file_path.relative_to(region_path)):
                         continue
                     
                     raster_info = pattern_config["extract_info"](file_path, raster_type)
@@ -0,0 +1,103 @@
+"""
+Terrain derivatives computed directly from in-memory elevation grids
+
+Mirrors the gdaldem hillshade/slope/aspect formulas (Horn's method with
+edge replication) so rasters derived here match the DEMProcessing outputs
+without re-reading or re-deriving the DTM for every product.
+"""
+
+from typing import Tuple
+
+import numpy as np
+
+DERIVATIVE_NODATA = -9999.0
+
+
+def horn_gradients(elevation: np.ndarray, xres: float, yres: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Compute east-west and south-north elevation gradients with Horn's method
+
+    Args:
+        elevation: 2D elevation grid, NaN where there is no data
+        xres: Pixel width in ground units
+        yres: Pixel height in ground units (positive)
+
+    Returns:
+        Tuple of (dz/dx towards east, dz/dy towards south) as float64 grids
+    """
+    z = np.pad(np.asarray(elevation, dtype=np.float64), 1, mode="edge")
+    north, middle, south = z[:-2], z[1:-1], z[2:]
+
+    east = north[:, 2:] + 2 * middle[:, 2:] + south[:, 2:]
+    west = north[:, :-2] + 2 * middle[:, :-2] + south[:, :-2]
+    south_sum = south[:, :-2] + 2 * south[:, 1:-1] + south[:, 2:]
+    north_sum = north[:, :-2] + 2 * north[:, 1:-1] + north[:, 2:]
+
+    return (east - west) / (8.0 * xres), (south_sum - north_sum) / (8.0 * yres)
+
+
+def hillshade_from_gradients(
+    dx: np.ndarray,
+    dy: np.ndarray,
+    azimuth: float = 315.0,
+    altitude: float = 45.0,
+    z_factor: float = 1.0
+) -> np.ndarray:
+    """
+    Shade gradients like gdaldem hillshade: uint8 values 1-255, 0 for nodata
+
+    Args:
+        dx: East-west gradient from horn_gradients
+        dy: South-north gradient from horn_gradients
+        azimuth: Light source azimuth in degrees
+        altitude: Light source altitude in degrees
+        z_factor: Vertical exaggeration
+
+    Returns:
+        uint8 hillshade grid
+    """
+    azimuth_rad = np.radians(azimuth)
+    altitude_rad = np.radians(altitude)
+
+    slope = np.pi / 2 - np.arctan(np.hypot(dx, dy) * z_factor)
+    aspect = np.arctan2(-dy, -dx)
+    shade = (np.sin(altitude_rad) * np.sin(slope)
+             + np.cos(altitude_rad) * np.cos(slope) * np.cos(azimuth_rad - np.pi / 2 - aspect))
+
+    with np.errstate(invalid="ignore"):
+        hillshade = np.where(shade <= 0, 1.0, 1.0 + 254.0 * shade)
+    return np.where(np.isfinite(shade), hillshade, 0).astype(np.uint8)
+
+
+def slope_from_gradients(dx: np.ndarray, dy: np.ndarray) -> np.ndarray:
+    """
+    Slope in degrees, DERIVATIVE_NODATA where the gradient is undefined
+
+    Args:
+        dx: East-west gradient from horn_gradients
+        dy: South-north gradient from horn_gradients
+
+    Returns:
+        float32 slope grid
+    """
+    slope = np.degrees(np.arctan(np.hypot(dx, dy)))
+    return np.where(np.isfinite(slope), slope, DERIVATIVE_NODATA).astype(np.float32)
+
+
+def aspect_from_gradients(dx: np.ndarray, dy: np.ndarray) -> np.ndarray:
+    """
+    Aspect as a compass bearing in degrees; flat cells and nodata are DERIVATIVE_NODATA
+
+    Args:
+        dx: East-west gradient from horn_gradients
+        dy: South-north gradient from horn_gradients
+
+    Returns:
+        float32 aspect grid
+    """
+    angle = np.degrees(np.arctan2(dy, -dx))
+    aspect = np.where(angle > 90.0, 450.0 - angle, 90.0 - angle)
+    aspect = np.where(aspect == 360.0, 0.0, aspect)
+
+    undefined = ~np.isfinite(aspect) | ((dx == 0) & (dy == 0))
+    return np.where(undefined, DERIVATIVE_NODATA, aspect).astype(np.float32)
@@ -19,6 +19,7 @@ from typing import Dict, Any, Tuple, Optional, List
 from pathlib import Path
 import asyncio
 from .sky_view_factor import process_sky_view_factor_tiff
+from ..services.progress_tracking import ProgressTracker, get_stage_timing_history
 
 logger = logging.getLogger(__name__)
 
@@ -1605,6 +1606,17 @@ async def process_chm_tiff(tiff_path: str, output_dir: str, parameters: Dict[str
             "processing_time": time.time() - start_time
         }
 
+def _raster_megapixels(tiff_path: str) -> float:
+    """Raster size in megapixels, used to scale historical stage timings."""
+    try:
+        ds = gdal.Open(tiff_path)
+        megapixels = ds.RasterXSize * ds.RasterYSize / 1e6
+        ds = None
+        return megapixels
+    except Exception:
+        return 0.0
+
+
 async def process_all_raster_products(tiff_path: str, progress_callback=None, request=None) -> Dict[str, Any]:
     """
     Automatically process all raster products from a downloaded elevation TIFF
@@ -1720,15 +1732,33 @@ async def process_all_raster_products(tiff_path: str, progress_callback=None, re
     
     results = {}
     total_tasks = len(processing_tasks)
+
+    # Weight each product by its historical time for a raster of this size so
+    # progress and ETA reflect where the time actually goes
+    timing_history = get_stage_timing_history()
+    megapixels = _raster_megapixels(tiff_path)
+    task_estimates = {
+        task_name: timing_history.estimate(f"raster_{task_name}", megapixels, product=task_name)
+        for task_name, _, _ in processing_tasks
+    }
+    known_estimates = [est for est in task_estimates.values() if est]
+    default_estimate = sum(known_estimates) / len(known_estimates) if known_estimates else 1.0
+    task_weights = {name: est or default_estimate for name, est in task_estimates.items()}
+    products_tracker = ProgressTracker(
+        progress_callback, "raster_products", total=sum(task_weights.values()),
+        message_type="processing_progress", history=timing_history, min_interval=0,
+        # Weights are historical seconds, so they are the expected duration as well
+        expected_seconds=sum(task_weights.values()) if known_estimates else None
+    )
+    completed_weight = 0.0
     
     for i, (task_name, process_func, parameters) in enumerate(processing_tasks):
         try:
-            if progress_callback:
-                await progress_callback({
-                    "type": "processing_progress",
-                    "message": f"Processing {task_name.replace('_', ' ').title()}...",
-                    "progress": int((i / total_tasks) * 100)
-                })
+            products_tracker.update(
+                completed_weight,
+                message=f"Processing {task_name.replace('_', ' ').title()}...",
+                force=True
+            )
             
             print(f"\n📊 Processing {task_name} ({i+1}/{total_tasks})")
             
@@ -1740,8 +1770,12 @@ async def process_all_raster_products(tiff_path: str, progress_callback=None, re
             parameters["region_folder"] = region_folder
             
             # Process the raster product
+            task_start = time.time()
             result = await process_func(tiff_path, task_output_dir, parameters)
             results[task_name] = result
+            if result.get("status") == "success" and megapixels:
+                timing_history.record(f"raster_{task_name}", megapixels, time.time() - task_start, product=task_name)
+            completed_weight += task_weights[task_name]
             
             if result["status"] == "success":
                 print(f"✅ {task_name} completed successfully")
@@ -1929,23 +1963,12 @@ async def process_all_raster_products(tiff_path: str, progress_callback=None, re
                             png_size = os.path.getsize(converted_png) / (1024 * 1024)  # MB
                             print(f"🖼️ PNG created: {os.path.basename(converted_png)} ({png_size:.1f} MB)")
                             
-                            # Generate optimized overlay if needed
+                            # Generate optimized overlay pyramid directly in png_outputs if needed
                             overlay_optimizer = OverlayOptimizer()
-                            overlay_path = overlay_optimizer.optimize_tiff_to_overlay(result["output_file"])
+                            overlay_path = overlay_optimizer.optimize_tiff_to_overlay(result["output_file"], output_dir=png_output_dir)
                             
                             if overlay_path:
-                                # Move overlay to png_outputs directory
-                                overlay_dest = os.path.join(png_output_dir, os.path.basename(overlay_path))
-                                if overlay_path != overlay_dest:
-                                    import shutil
-                                    shutil.move(overlay_path, overlay_dest)
-                                    print(f"📦 Overlay moved to png_outputs: {os.path.basename(overlay_dest)}")
-                                    
-                                    # Also move overlay worldfile if it exists
-                                    overlay_worldfile = os.path.splitext(overlay_path)[0] + ".pgw"
-                                    overlay_worldfile_dest = os.path.splitext(overlay_dest)[0] + ".pgw"
-                                    if os.path.exists(overlay_worldfile):
-                                        shutil.move(overlay_worldfile, overlay_worldfile_dest)
+                                print(f"📦 Overlay pyramid written to png_outputs: {os.path.basename(overlay_path)}")
                                 
                         else:
                             print(f"⚠️ PNG conversion failed for {task_name}: No output file created")
@@ -11,6 +11,8 @@ import tempfile
 from pathlib import Path
 from typing import Dict, Any, Optional, List, Tuple
 
+import numpy as np
+
 try:
     import rasterio
     import rasterio.features
@@ -27,22 +29,28 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# Edge length (pixels) of the tiles a mask is traced in
+VECTORIZE_TILE_SIZE = 2048
+
 class VectorProcessor:
     """
     Modular vector operations for raster-to-vector conversion
     Supports multiple output formats and processing methods
     """
     
-    def __init__(self, simplify_tolerance: float = 0.5, min_area: float = 100.0):
+    def __init__(self, simplify_tolerance: float = 0.5, min_area: float = 100.0, clean_iterations: int = 1):
         """
         Initialize vector processor
         
         Args:
             simplify_tolerance: Tolerance for polygon simplification in meters (default: 0.5)
             min_area: Minimum polygon area to keep in square meters (default: 100.0)
+            clean_iterations: Iterations of 3x3 morphological opening/closing applied to
+                the mask before tracing; 0 disables cleaning (default: 1)
         """
         self.simplify_tolerance = simplify_tolerance
         self.min_area = min_area
+        self.clean_iterations = clean_iterations
         self.logger = logging.getLogger(__name__)
     
     def mask_to_polygon(
@@ -159,34 +167,23 @@ class VectorProcessor:
         print(f"🐍 Using Python/rasterio for polygon conversion...")
         
         import rasterio
-        from rasterio import features
-        from shapely.geometry import shape, Polygon
         
         # Read mask raster
         with rasterio.open(mask_path) as src:
-            mask_data = src.read(1)
+            mask = src.read(1) > 0
             transform = src.transform
             crs = src.crs
-            
-            print(f"   Mask shape: {mask_data.shape}")
-            print(f"   Valid pixels: {(mask_data > 0).sum():,}")
-            
-            # Convert raster to polygons
-            polygons = []
-            for geom, value in features.shapes(
-                mask_data.astype(rasterio.uint8), 
-                mask=(mask_data > 0), 
-                transform=transform
-            ):
-                if value == 1:  # Valid data pixels
-                    poly = shape(geom)
-                    
-                    # Filter by minimum area
-                    if poly.area >= self.min_area:
-                        # Simplify polygon
-                        if self.simplify_tolerance > 0:
-                            poly = poly.simplify(self.simplify_tolerance, preserve_topology=True)
-                        polygons.append(poly)
+        
+        print(f"   Mask shape: {mask.shape}")
+        print(f"   Valid pixels: {mask.sum():,}")
+        
+        # Remove speckle and sub-threshold components before tracing, so the
+        # tracer only ever sees shapes that will be kept
+        pixel_area = abs(transform.a * transform.e - transform.b * transform.d)
+        mask = self._clean_mask(mask, pixel_area)
+        print(f"   Pixels after cleaning: {mask.sum():,}")
+        
+        polygons = self._trace_mask(mask, transform)
         
         print(f"   Generated {len(polygons)} polygons")
         
@@ -228,6 +225,93 @@ class VectorProcessor:
             "polygons_generated": len(polygons)
         }
     
+    def _clean_mask(self, mask: np.ndarray, pixel_area: float) -> np.ndarray:
+        """
+        Morphologically clean a binary mask and drop components smaller than min_area
+        
+        Holes smaller than min_area are filled the same way, so speckle inside
+        valid areas does not turn into rings.
+        
+        Args:
+            mask: Boolean mask
+            pixel_area: Area of one pixel in square map units
+            
+        Returns:
+            Cleaned boolean mask
+        """
+        from scipy import ndimage
+        
+        if self.clean_iterations > 0:
+            # Pad so that closing does not erode valid pixels along the raster edge
+            pad = self.clean_iterations
+            structure = np.ones((3, 3), dtype=bool)
+            padded = np.pad(mask, pad, mode="edge")
+            padded = ndimage.binary_opening(padded, structure, iterations=self.clean_iterations)
+            padded = ndimage.binary_closing(padded, structure, iterations=self.clean_iterations)
+            mask = padded[pad:-pad, pad:-pad]
+        
+        min_pixels = int(np.ceil(self.min_area / pixel_area)) if pixel_area > 0 else 0
+        if min_pixels > 1:
+            mask = _drop_small_components(mask, min_pixels)
+            mask = ~_drop_small_components(~mask, min_pixels)
+        return mask
+    
+    def _trace_mask(self, mask: np.ndarray, transform) -> List:
+        """
+        Trace a cleaned mask into simplified polygons, tile by tile
+        
+        Tracing happens in pixel coordinates, so polygons cut by a tile border
+        share exact vertices and are stitched with a union. Polygons inside a
+        tile are simplified as soon as they are traced; stitched ones after the
+        union.
+        
+        Args:
+            mask: Cleaned boolean mask
+            transform: Affine transform of the mask raster
+            
+        Returns:
+            List of polygons in map coordinates
+        """
+        from rasterio import features
+        from rasterio.transform import Affine
+        from shapely.affinity import affine_transform
+        from shapely.geometry import shape
+        from shapely.ops import unary_union
+        
+        height, width = mask.shape
+        pixel_size = (abs(transform.a) + abs(transform.e)) / 2
+        tolerance = self.simplify_tolerance / pixel_size if pixel_size > 0 else 0
+        
+        def simplified(poly):
+            return poly.simplify(tolerance, preserve_topology=True) if tolerance > 0 else poly
+        
+        polygons, cut_by_tiles = [], []
+        for row in range(0, height, VECTORIZE_TILE_SIZE):
+            for col in range(0, width, VECTORIZE_TILE_SIZE):
+                window = mask[row:row + VECTORIZE_TILE_SIZE, col:col + VECTORIZE_TILE_SIZE]
+                if not window.any():
+                    continue
+                tile_h, tile_w = window.shape
+                for geom, _ in features.shapes(
+                    window.astype(np.uint8), mask=window, transform=Affine.translation(col, row)
+                ):
+                    poly = shape(geom)
+                    minx, miny, maxx, maxy = poly.bounds
+                    if (minx == col and col > 0) or (miny == row and row > 0) or \
+                            (maxx == col + tile_w and col + tile_w < width) or \
+                            (maxy == row + tile_h and row + tile_h < height):
+                        cut_by_tiles.append(poly)
+                    else:
+                        polygons.append(simplified(poly))
+        
+        if cut_by_tiles:
+            stitched = unary_union(cut_by_tiles)
+            parts = getattr(stitched, "geoms", [stitched])
+            polygons.extend(simplified(poly) for poly in parts if not poly.is_empty)
+        
+        matrix = [transform.a, transform.b, transform.d, transform.e, transform.c, transform.f]
+        return [affine_transform(poly, matrix) for poly in polygons]
+    
     def _mask_to_polygon_gdal(
         self,
         mask_path: str,
@@ -406,6 +490,17 @@ class VectorProcessor:
             print(f"⚠️ Statistics analysis failed: {e}")
             return {"error": str(e)}
 
+def _drop_small_components(mask: np.ndarray, min_pixels: int) -> np.ndarray:
+    """Remove 4-connected components of a boolean mask with fewer than min_pixels pixels"""
+    from scipy import ndimage
+    
+    labels, count = ndimage.label(mask)
+    if count == 0:
+        return mask
+    keep = np.bincount(labels.ravel()) >= min_pixels
+    keep[0] = False
+    return keep[labels]
+
 def convert_mask_to_polygon(
     mask_raster_path: str,
     output_dir: str,
@@ -6,8 +6,39 @@ for data processing, caching, and other business logic.
 """
 
 from .laz_metadata_cache import LAZMetadataCache, get_metadata_cache
+from .dem_tile_store import DEMTileStore, StoredTile, get_dem_tile_store
+from .region_metadata import (
+    MetadataSection,
+    RegionMetadata,
+    RegionMetadataStore,
+    get_region_metadata_store,
+)
+from .product_files import (
+    ProductFileIndex,
+    ProductFileVersion,
+    get_product_file_index,
+    product_file_url,
+)
+from .progress_hub import ProgressHub, get_progress_hub
+from .progress_tracking import ProgressTracker, StageTimingHistory, get_stage_timing_history
 
 __all__ = [
     "LAZMetadataCache",
-    "get_metadata_cache"
+    "get_metadata_cache",
+    "DEMTileStore",
+    "StoredTile",
+    "get_dem_tile_store",
+    "MetadataSection",
+    "RegionMetadata",
+    "RegionMetadataStore",
+    "get_region_metadata_store",
+    "ProductFileIndex",
+    "ProductFileVersion",
+    "get_product_file_index",
+    "product_file_url",
+    "ProgressHub",
+    "get_progress_hub",
+    "ProgressTracker",
+    "StageTimingHistory",
+    "get_stage_timing_history"
 ]
@@ -5,8 +5,9 @@ This service provides functionality to download DSM data from Copernicus DEM
 for coordinate-based regions using multiple access methods.
 """
 
-import os
 import json
+import math
+import asyncio
 import requests
 import rasterio
 import numpy as np
@@ -14,11 +15,19 @@ from pathlib import Path
 from typing import Tuple, Optional, Dict, List
 from rasterio.warp import calculate_default_transform, reproject, Resampling
 from rasterio.merge import merge
-import tempfile
+from rasterio.transform import from_origin
+from rasterio.windows import Window
+import rasterio.coords
+from contextlib import ExitStack
 import logging
 
+from .dem_tile_store import get_dem_tile_store
+
 logger = logging.getLogger(__name__)
 
+# Output rows written per pass when merging tiles
+MERGE_STRIP_ROWS = 1024
+
 class CopernicusDSMService:
     """Service for downloading and processing Copernicus DSM data"""
     
@@ -161,9 +170,8 @@ class CopernicusDSMService:
             if not items:
                 return {"success": False, "error": "No DSM tiles found for the specified region"}
             
-            # Download and merge tiles
+            # Fetch tiles through the shared tile store and merge them
             downloaded_files = []
-            temp_files = []
             
             for i, item in enumerate(items):
                 # Get the data asset (usually 'data' or 'elevation')
@@ -179,21 +187,9 @@ class CopernicusDSMService:
                     logger.warning(f"No suitable asset found in item {item.id}")
                     continue
                 
-                asset = item.assets[asset_key]
-                
-                # Download tile to temporary file
-                temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.tif')
-                temp_files.append(temp_file.name)
-                
-                response = requests.get(asset.href, stream=True)
-                response.raise_for_status()
-                
-                with open(temp_file.name, 'wb') as f:
-                    for chunk in response.iter_content(chunk_size=8192):
-                        f.write(chunk)
-                
-                downloaded_files.append(temp_file.name)
-                logger.info(f"Downloaded tile {i+1}/{len(items)}")
+                tile_path = await self._get_tile(collection_id, item, item.assets[asset_key])
+                downloaded_files.append(str(tile_path))
+                logger.info(f"Tile {i+1}/{len(items)} ready")
             
             if not downloaded_files:
                 return {"success": False, "error": "Failed to download any DSM tiles"}
@@ -202,13 +198,6 @@ class CopernicusDSMService:
             output_file = output_dir / f"{region_name}_copernicus_dsm_{resolution}.tif"
             merged_file = await self._merge_and_crop_tiles(downloaded_files, bbox, output_file)
             
-            # Clean up temporary files
-            for temp_file in temp_files:
-                try:
-                    os.unlink(temp_file)
-                except:
-                    pass
-            
             # Generate metadata
             metadata = await self._generate_dsm_metadata(merged_file, bbox, resolution)
             
@@ -251,9 +240,9 @@ class CopernicusDSMService:
             
             logger.info(f"Found {len(items)} DSM tiles via STAC API")
             
-            # Download and process tiles (similar to planetary computer method)
+            # Fetch tiles through the shared tile store (similar to planetary computer method)
+            product = "cop-dem-glo-30" if resolution == "30m" else "cop-dem-glo-90"
             downloaded_files = []
-            temp_files = []
             
             for i, item in enumerate(items):
                 # Find the elevation data asset
@@ -266,21 +255,9 @@ class CopernicusDSMService:
                 if not asset_key:
                     continue
                 
-                asset = item.assets[asset_key]
-                
-                # Download tile
-                temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.tif')
-                temp_files.append(temp_file.name)
-                
-                response = requests.get(asset.href, stream=True)
-                response.raise_for_status()
-                
-                with open(temp_file.name, 'wb') as f:
-                    for chunk in response.iter_content(chunk_size=8192):
-                        f.write(chunk)
-                
-                downloaded_files.append(temp_file.name)
-                logger.info(f"Downloaded tile {i+1}/{len(items)} via STAC API")
+                tile_path = await self._get_tile(product, item, item.assets[asset_key])
+                downloaded_files.append(str(tile_path))
+                logger.info(f"Tile {i+1}/{len(items)} ready via STAC API")
             
             if not downloaded_files:
                 return {"success": False, "error": "Failed to download any DSM tiles"}
@@ -289,13 +266,6 @@ class CopernicusDSMService:
             output_file = output_dir / f"{region_name}_copernicus_dsm_{resolution}.tif"
             merged_file = await self._merge_and_crop_tiles(downloaded_files, bbox, output_file)
             
-            # Clean up
-            for temp_file in temp_files:
-                try:
-                    os.unlink(temp_file)
-                except:
-                    pass
-            
             metadata = await self._generate_dsm_metadata(merged_file, bbox, resolution)
             
             return {
@@ -337,42 +307,40 @@ class CopernicusDSMService:
             logger.error(f"Direct S3 download failed: {str(e)}")
             raise
     
+    async def _get_tile(self, product: str, item, asset) -> Path:
+        """Local path of a DEM tile, downloading it into the shared tile store on a miss"""
+        version = str(item.properties.get("version") or item.properties.get("datetime") or "1")
+        
+        # STAC file:checksum is a multihash; 0x12 0x20 prefixes a SHA-256 digest
+        checksum = (asset.extra_fields or {}).get("file:checksum", "")
+        expected_sha256 = checksum[4:] if checksum.startswith("1220") and len(checksum) == 68 else None
+        
+        async def fetch(path: Path):
+            loop = asyncio.get_event_loop()
+            await loop.run_in_executor(None, self._download_file, asset.href, path)
+        
+        tile = await get_dem_tile_store().get_or_fetch(
+            product, item.id, version, fetch, expected_sha256=expected_sha256
+        )
+        return tile.path
+    
+    def _download_file(self, url: str, path: Path):
+        """Stream a file to disk (run in thread pool)"""
+        response = requests.get(url, stream=True, timeout=300)
+        response.raise_for_status()
+        
+        with open(path, 'wb') as f:
+            for chunk in response.iter_content(chunk_size=1024 * 1024):
+                f.write(chunk)
+    
     async def _merge_and_crop_tiles(self, tile_files: List[str], 
                                   bbox: List[float], 
                                   output_file: Path) -> Path:
         """Merge multiple raster tiles and crop to bounding box"""
         try:
-            # Open all tiles
-            src_files_to_mosaic = []
-            for tile_file in tile_files:
-                src = rasterio.open(tile_file)
-                src_files_to_mosaic.append(src)
-            
-            # Merge tiles
-            mosaic, out_trans = merge(src_files_to_mosaic)
-            
-            # Get the metadata from the first file
-            out_meta = src_files_to_mosaic[0].meta.copy()
-            
-            # Update metadata
-            out_meta.update({
-                "driver": "GTiff",
-                "height": mosaic.shape[1],
-                "width": mosaic.shape[2],
-                "transform": out_trans,
-                "compress": "lzw"
-            })
-            
-            # Write merged raster
-            with rasterio.open(output_file, "w", **out_meta) as dest:
-                dest.write(mosaic)
-            
-            # Close source files
-            for src in src_files_to_mosaic:
-                src.close()
-            
-            # Crop to exact bounding box if needed
-            # (This step can be added if precise cropping is required)
+            # Windowed reads and compression are blocking, keep them off the event loop
+            loop = asyncio.get_event_loop()
+            await loop.run_in_executor(None, self._merge_and_crop_sync, tile_files, bbox, output_file)
             
             logger.info(f"Successfully merged {len(tile_files)} tiles to {output_file}")
             return output_file
@@ -381,6 +349,66 @@ class CopernicusDSMService:
             logger.error(f"Error merging tiles: {str(e)}")
             raise
     
+    def _merge_and_crop_sync(self, tile_files: List[str], bbox: List[float], output_file: Path):
+        """Write the bbox crop of the tile mosaic strip by strip.
+        
+        The output grid is the bbox snapped outwards to the first tile's pixel
+        grid. Each strip of output rows is filled by reading only the
+        intersecting windows of the tiles, so memory scales with the strip
+        size rather than with the tiles' footprint.
+        """
+        with ExitStack() as stack:
+            sources = [stack.enter_context(rasterio.open(tile_file)) for tile_file in tile_files]
+            first = sources[0]
+            res_x, res_y = first.res
+            
+            # Limit the request to the area the tiles actually cover
+            west = max(bbox[0], min(src.bounds.left for src in sources))
+            south = max(bbox[1], min(src.bounds.bottom for src in sources))
+            east = min(bbox[2], max(src.bounds.right for src in sources))
+            north = min(bbox[3], max(src.bounds.top for src in sources))
+            if west >= east or south >= north:
+                raise ValueError(f"Tiles do not intersect bbox {bbox}")
+            
+            # Snap outwards to the tile pixel grid so no resampling is needed
+            # (with a small tolerance so bounds already on the grid don't gain a pixel)
+            origin_x, origin_y = first.bounds.left, first.bounds.top
+            west = origin_x + math.floor((west - origin_x) / res_x + 1e-6) * res_x
+            east = origin_x + math.ceil((east - origin_x) / res_x - 1e-6) * res_x
+            north = origin_y - math.floor((origin_y - north) / res_y + 1e-6) * res_y
+            south = origin_y - math.ceil((origin_y - south) / res_y - 1e-6) * res_y
+            width = int(round((east - west) / res_x))
+            height = int(round((north - south) / res_y))
+            
+            profile = first.profile.copy()
+            profile.update({
+                "driver": "GTiff",
+                "height": height,
+                "width": width,
+                "transform": from_origin(west, north, res_x, res_y),
+                "compress": "lzw",
+                "tiled": True,
+                "blockxsize": 256,
+                "blockysize": 256,
+                "BIGTIFF": "IF_SAFER"
+            })
+            nodata = first.nodata
+            fill = nodata if nodata is not None else 0
+            
+            with rasterio.open(output_file, "w", **profile) as dest:
+                for row_off in range(0, height, MERGE_STRIP_ROWS):
+                    rows = min(MERGE_STRIP_ROWS, height - row_off)
+                    strip_north = north - row_off * res_y
+                    strip_bounds = (west, strip_north - rows * res_y, east, strip_north)
+                    
+                    strip = np.full((first.count, rows, width), fill, dtype=profile["dtype"])
+                    if any(not rasterio.coords.disjoint_bounds(strip_bounds, src.bounds) for src in sources):
+                        data, _ = merge(sources, bounds=strip_bounds, res=(res_x, res_y), nodata=nodata)
+                        h, w = min(rows, data.shape[1]), min(width, data.shape[2])
+                        strip[:, :h, :w] = data[:, :h, :w]
+                    
+                    dest.write(strip, window=Window(0, row_off, width, rows))
+    
     async def _generate_dsm_metadata(self, dsm_file: Path, 
                                    bbox: List[float], 
                                    resolution: str) -> Dict:
@@ -0,0 +1,239 @@
+"""
+Shared local store for DEM source tiles.
+
+Copernicus DEM is distributed as fixed 1°x1° tiles, so neighbouring regions
+keep needing the same files. Tiles are kept under the data directory and
+indexed in SQLite by product, tile ID and product version together with their
+size and SHA-256, so a repeat acquisition in the same area reads from disk
+only. A stored tile is only served when its size still matches the index,
+and an expected checksum can be enforced when a tile is populated. Downloads
+go to a temporary file that is renamed into place, and concurrent requests
+for the same tile wait for the first one instead of fetching it again. Least
+recently used tiles are evicted once the store exceeds its size budget.
+"""
+
+import asyncio
+import hashlib
+import os
+import sqlite3
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, Optional, Tuple, Union
+import logging
+
+logger = logging.getLogger(__name__)
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+TileFetcher = Callable[[Path], Awaitable[None]]
+
+
+@dataclass(frozen=True)
+class StoredTile:
+    """A tile available in the local store."""
+    product: str
+    tile_id: str
+    version: str
+    path: Path
+    size: int
+    sha256: str
+
+
+def _sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class DEMTileStore:
+    """Content-verified, size-bounded store of DEM tiles shared by all acquisitions."""
+
+    def __init__(self, root: Union[str, Path] = "data/dem_tiles", max_size_mb: Optional[float] = 20480):
+        """Initialize the tile store.
+
+        Args:
+            root: Directory holding the tiles and their index
+            max_size_mb: Size budget; least recently used tiles are evicted beyond it
+        """
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.db_path = self.root / "tiles.db"
+        self.max_bytes = int(max_size_mb * 1024 * 1024) if max_size_mb else None
+        self._locks: Dict[Tuple[str, str, str], asyncio.Lock] = {}
+        self._init_database()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _init_database(self):
+        """Initialize SQLite database for the tile index."""
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS tiles (
+                    product TEXT,
+                    tile_id TEXT,
+                    version TEXT,
+                    file_name TEXT,
+                    file_size INTEGER,
+                    sha256 TEXT,
+                    created REAL,
+                    last_accessed REAL,
+                    PRIMARY KEY (product, tile_id, version)
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_tiles_last_accessed ON tiles(last_accessed)")
+
+    def _tile_path(self, product: str, tile_id: str, version: str, suffix: str = ".tif") -> Path:
+        safe_version = "".join(c if c.isalnum() or c in "-_." else "_" for c in version)
+        return self.root / product / safe_version / f"{tile_id}{suffix}"
+
+    def get(self, product: str, tile_id: str, version: str) -> Optional[StoredTile]:
+        """Look up a stored tile, dropping it if its file no longer matches the index.
+
+        Returns:
+            StoredTile if the tile is available locally, None otherwise
+        """
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT * FROM tiles WHERE product = ? AND tile_id = ? AND version = ?",
+                (product, tile_id, version)
+            ).fetchone()
+            if row is None:
+                return None
+
+            path = self.root / row["file_name"]
+            try:
+                intact = path.stat().st_size == row["file_size"]
+            except OSError:
+                intact = False
+            if not intact:
+                logger.warning(f"Stored tile {tile_id} ({version}) is missing or truncated, dropping it")
+                conn.execute(
+                    "DELETE FROM tiles WHERE product = ? AND tile_id = ? AND version = ?",
+                    (product, tile_id, version)
+                )
+                path.unlink(missing_ok=True)
+                return None
+
+            conn.execute(
+                "UPDATE tiles SET last_accessed = ? WHERE product = ? AND tile_id = ? AND version = ?",
+                (time.time(), product, tile_id, version)
+            )
+        return StoredTile(product, tile_id, version, path, row["file_size"], row["sha256"])
+
+    async def get_or_fetch(self, product: str, tile_id: str, version: str, fetch: TileFetcher,
+                           expected_sha256: Optional[str] = None, suffix: str = ".tif") -> StoredTile:
+        """Return a stored tile, populating the store with ``fetch`` on a miss.
+
+        Args:
+            product: Product identifier (e.g. "cop-dem-glo-30")
+            tile_id: Tile identifier within the product
+            version: Product version the tile belongs to
+            fetch: Coroutine writing the tile to the path it is given
+            expected_sha256: Reject the fetched tile unless it has this checksum
+            suffix: File extension of the tile
+
+        Returns:
+            StoredTile with the local path of the tile
+        """
+        key = (product, tile_id, version)
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            loop = asyncio.get_event_loop()
+            tile = await loop.run_in_executor(None, self.get, product, tile_id, version)
+            if tile is not None:
+                logger.info(f"Tile store hit: {tile_id} ({version})")
+                return tile
+
+            path = self._tile_path(product, tile_id, version, suffix)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_name = tempfile.mkstemp(dir=str(path.parent), prefix=f".{tile_id}.", suffix=".part")
+            os.close(fd)
+            tmp_path = Path(tmp_name)
+            try:
+                await fetch(tmp_path)
+                return await loop.run_in_executor(
+                    None, self._commit, product, tile_id, version, tmp_path, path, expected_sha256
+                )
+            finally:
+                tmp_path.unlink(missing_ok=True)
+                self._locks.pop(key, None)
+
+    def _commit(self, product: str, tile_id: str, version: str, tmp_path: Path, path: Path,
+                expected_sha256: Optional[str]) -> StoredTile:
+        """Verify a fetched tile, move it into place and index it."""
+        size = tmp_path.stat().st_size
+        if size == 0:
+            raise ValueError(f"Fetched tile {tile_id} is empty")
+        digest = _sha256(tmp_path)
+        if expected_sha256 and digest != expected_sha256.lower():
+            raise ValueError(f"Checksum mismatch for tile {tile_id}: expected {expected_sha256}, got {digest}")
+
+        os.replace(tmp_path, path)
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO tiles VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (product, tile_id, version, path.relative_to(self.root).as_posix(), size, digest, now, now)
+            )
+            self._evict(conn, keep=(product, tile_id, version))
+        logger.info(f"Stored tile {tile_id} ({version}, {size / (1024 * 1024):.1f} MB)")
+        return StoredTile(product, tile_id, version, path, size, digest)
+
+    def _evict(self, conn: sqlite3.Connection, keep: Tuple[str, str, str]):
+        """Remove least recently used tiles until the store fits its budget."""
+        if self.max_bytes is None:
+            return
+        excess = conn.execute("SELECT COALESCE(SUM(file_size), 0) FROM tiles").fetchone()[0] - self.max_bytes
+        if excess <= 0:
+            return
+        rows = conn.execute(
+            "SELECT product, tile_id, version, file_name, file_size FROM tiles ORDER BY last_accessed ASC"
+        ).fetchall()
+        for row in rows:
+            if excess <= 0:
+                break
+            if (row["product"], row["tile_id"], row["version"]) == keep:
+                continue
+            conn.execute(
+                "DELETE FROM tiles WHERE product = ? AND tile_id = ? AND version = ?",
+                (row["product"], row["tile_id"], row["version"])
+            )
+            (self.root / row["file_name"]).unlink(missing_ok=True)
+            excess -= row["file_size"]
+            logger.info(f"Evicted tile {row['tile_id']} ({row['version']}) from the tile store")
+
+    def get_stats(self) -> Dict[str, float]:
+        """Number of stored tiles and their total size."""
+        with self._connect() as conn:
+            count, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(file_size), 0) FROM tiles").fetchone()
+        return {
+            "tiles": count,
+            "total_size_mb": total / (1024 * 1024),
+            "max_size_mb": self.max_bytes / (1024 * 1024) if self.max_bytes else None
+        }
+
+
+# Global tile store instance
+_store_instance = None
+
+
+def get_dem_tile_store() -> DEMTileStore:
+    """Get the global DEM tile store instance.
+
+    Returns:
+        DEMTileStore instance
+    """
+    global _store_instance
+    if _store_instance is None:
+        from ..config import get_settings
+        settings = get_settings()
+        _store_instance = DEMTileStore(settings.dem_tile_store_dir, settings.dem_tile_store_max_mb)
+    return _store_instance
@@ -0,0 +1,119 @@
+"""
+Versioned product files for overlay serving.
+
+Overlay APIs hand out URLs to product files under the output directory rather
+than embedding base64 image data in JSON. Each URL carries a version derived
+from the file's content hash, so browsers can cache it as immutable and the
+file route can answer conditional requests with a strong ETag. Content hashes
+are computed once per (size, mtime) and kept in process memory.
+"""
+
+import hashlib
+import mimetypes
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional, Union
+from urllib.parse import quote
+import logging
+
+logger = logging.getLogger(__name__)
+
+PRODUCT_FILES_ROUTE = "/api/products/files"
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+@dataclass(frozen=True)
+class ProductFileVersion:
+    """Content version of a product file."""
+    path: Path
+    size: int
+    mtime_ns: int
+    digest: str
+
+    @property
+    def etag(self) -> str:
+        return f'"{self.digest}"'
+
+    @property
+    def version(self) -> str:
+        return self.digest[:16]
+
+    @property
+    def media_type(self) -> str:
+        return mimetypes.guess_type(self.path.name)[0] or "application/octet-stream"
+
+
+class ProductFileIndex:
+    """Resolves product file paths under the output root and tracks their content versions."""
+
+    def __init__(self, output_dir: Union[str, Path] = "output"):
+        self.output_dir = Path(output_dir)
+        self._versions: Dict[Path, ProductFileVersion] = {}
+        self._lock = threading.Lock()
+
+    def resolve(self, relative_path: str) -> Optional[Path]:
+        """Resolve a URL path to a file under the output root, rejecting traversal."""
+        root = self.output_dir.resolve()
+        candidate = (root / relative_path).resolve()
+        if candidate != root and root not in candidate.parents:
+            return None
+        if not candidate.is_file():
+            return None
+        return candidate
+
+    def version_of(self, path: Union[str, Path]) -> ProductFileVersion:
+        """Return the content version of a file, hashing it only when it changed."""
+        path = Path(path).resolve()
+        stat = path.stat()
+        with self._lock:
+            cached = self._versions.get(path)
+        if cached and cached.size == stat.st_size and cached.mtime_ns == stat.st_mtime_ns:
+            return cached
+
+        hasher = hashlib.blake2b(digest_size=20)
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+                hasher.update(chunk)
+
+        version = ProductFileVersion(
+            path=path,
+            size=stat.st_size,
+            mtime_ns=stat.st_mtime_ns,
+            digest=hasher.hexdigest(),
+        )
+        with self._lock:
+            self._versions[path] = version
+        return version
+
+    def url_for(self, path: Union[str, Path]) -> Optional[str]:
+        """Build the versioned product URL for a file under the output root."""
+        try:
+            resolved = Path(path).resolve()
+            relative = resolved.relative_to(self.output_dir.resolve())
+            version = self.version_of(resolved)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Cannot build product URL for {path}: {e}")
+            return None
+        return f"{PRODUCT_FILES_ROUTE}/{quote(relative.as_posix())}?v={version.version}"
+
+
+# Global index instance
+_index_instance = None
+
+
+def get_product_file_index() -> ProductFileIndex:
+    """Get the global product file index instance.
+
+    Returns:
+        ProductFileIndex instance
+    """
+    global _index_instance
+    if _index_instance is None:
+        _index_instance = ProductFileIndex()
+    return _index_instance
+
+
+def product_file_url(path: Union[str, Path]) -> Optional[str]:
+    """Versioned URL for a product file, or None if it is not servable."""
+    return get_product_file_index().url_for(path)
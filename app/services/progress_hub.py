@@ -0,0 +1,258 @@
+"""
+WebSocket progress hub.
+
+Progress messages are published to topics derived from the message itself
+(``job:<id>``, ``download:<id>``, ``region:<name>``) and fanned out to the
+sockets subscribed to them. Publishing never awaits a socket: each subscriber
+owns a bounded outbox drained by its own sender task, so one slow client can
+no longer stall progress reporting for everyone else. Progress messages that
+are superseded before they are sent (e.g. ``download_progress`` for the same
+download and band) are coalesced so only the latest value is delivered.
+Sockets that stop accepting data or stop answering heartbeats are dropped.
+"""
+
+import asyncio
+import itertools
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+import logging
+
+from fastapi import WebSocket
+
+logger = logging.getLogger(__name__)
+
+ALL_TOPICS = "*"
+
+# Message fields that identify what a message is about, and their topic prefix
+TOPIC_FIELDS = (
+    ("job_id", "job"),
+    ("download_id", "download"),
+    ("region_name", "region"),
+    ("region", "region"),
+)
+
+# Message types where only the latest value per key matters
+COALESCED_TYPES = {
+    "progress",
+    "download_progress",
+    "raster_generation_progress",
+    "raster_processing",
+}
+
+# Fields that distinguish independent progress streams within one topic
+COALESCE_KEY_FIELDS = ("processingType", "source", "band", "product")
+
+DEFAULT_QUEUE_SIZE = 256
+DEFAULT_SEND_TIMEOUT = 10.0
+DEFAULT_HEARTBEAT_INTERVAL = 20.0
+
+
+def message_topics(message: Dict[str, Any]) -> Set[str]:
+    """Topics a message is published to, derived from its identifying fields."""
+    topics = set()
+    for field_name, prefix in TOPIC_FIELDS:
+        value = message.get(field_name)
+        if isinstance(value, (str, int)) and value != "":
+            topics.add(f"{prefix}:{value}")
+    return topics
+
+
+def coalesce_key(message: Dict[str, Any]) -> Optional[Tuple]:
+    """Key under which a newer message supersedes an older queued one, or None."""
+    message_type = message.get("type")
+    if message_type not in COALESCED_TYPES:
+        return None
+    identity = tuple(str(message.get(f)) for f, _ in TOPIC_FIELDS)
+    stream = tuple(str(message.get(f)) for f in COALESCE_KEY_FIELDS)
+    return (message_type,) + identity + stream
+
+
+class ProgressSubscriber:
+    """A connected socket with its topic subscriptions and outbox."""
+
+    def __init__(self, websocket: WebSocket, max_queue: int, topics: Optional[Iterable[str]] = None):
+        self.websocket = websocket
+        self.topics: Set[str] = set(topics) if topics else {ALL_TOPICS}
+        self.max_queue = max_queue
+        self.outbox: "OrderedDict[Any, str]" = OrderedDict()
+        self.ready = asyncio.Event()
+        self.last_seen = time.monotonic()
+        self.dropped = 0
+        self.coalesced = 0
+        self.task: Optional[asyncio.Task] = None
+        self._sequence = itertools.count()
+
+    def wants(self, topics: Set[str]) -> bool:
+        # Messages without a topic are general notifications for everyone
+        return ALL_TOPICS in self.topics or not topics or bool(self.topics & topics)
+
+    def enqueue(self, payload: str, key: Optional[Tuple] = None) -> None:
+        if key is not None and key in self.outbox:
+            # Replace the stale value and move it behind anything queued since
+            del self.outbox[key]
+            self.coalesced += 1
+        elif len(self.outbox) >= self.max_queue:
+            self._evict()
+        if key is None:
+            key = ("seq", next(self._sequence))
+        self.outbox[key] = payload
+        self.ready.set()
+
+    def _evict(self) -> None:
+        # Prefer dropping a progress value, which a later one will replace anyway
+        for queued_key in self.outbox:
+            if queued_key[0] != "seq":
+                del self.outbox[queued_key]
+                break
+        else:
+            self.outbox.popitem(last=False)
+        self.dropped += 1
+        if self.dropped == 1 or self.dropped % 100 == 0:
+            logger.warning(f"Progress subscriber is falling behind, dropped {self.dropped} message(s)")
+
+
+class ProgressHub:
+    """Topic-based progress fan-out with per-subscriber backpressure."""
+
+    def __init__(
+        self,
+        max_queue: int = DEFAULT_QUEUE_SIZE,
+        send_timeout: float = DEFAULT_SEND_TIMEOUT,
+        heartbeat_interval: float = DEFAULT_HEARTBEAT_INTERVAL,
+    ):
+        self.max_queue = max_queue
+        self.send_timeout = send_timeout
+        self.heartbeat_interval = heartbeat_interval
+        self.subscribers: Dict[WebSocket, ProgressSubscriber] = {}
+        self.active_downloads: Dict[str, Any] = {}
+        self._heartbeat_task: Optional[asyncio.Task] = None
+
+    async def connect(self, websocket: WebSocket, topics: Optional[Iterable[str]] = None) -> ProgressSubscriber:
+        """Accept a socket and start its sender task."""
+        await websocket.accept()
+        subscriber = ProgressSubscriber(websocket, self.max_queue, topics)
+        subscriber.task = asyncio.create_task(self._sender(subscriber))
+        self.subscribers[websocket] = subscriber
+        self._ensure_heartbeat()
+        return subscriber
+
+    def disconnect(self, websocket: WebSocket) -> None:
+        subscriber = self.subscribers.pop(websocket, None)
+        if subscriber and subscriber.task and subscriber.task is not asyncio.current_task():
+            subscriber.task.cancel()
+
+    def subscribe(self, websocket: WebSocket, topics: Iterable[str]) -> None:
+        subscriber = self.subscribers.get(websocket)
+        if subscriber is None:
+            return
+        topics = set(topics)
+        if ALL_TOPICS not in topics:
+            # An explicit subscription replaces the default of everything
+            subscriber.topics.discard(ALL_TOPICS)
+        subscriber.topics |= topics
+
+    def unsubscribe(self, websocket: WebSocket, topics: Iterable[str]) -> None:
+        subscriber = self.subscribers.get(websocket)
+        if subscriber is not None:
+            subscriber.topics -= set(topics)
+
+    def touch(self, websocket: WebSocket) -> None:
+        """Record client activity, used for heartbeat liveness."""
+        subscriber = self.subscribers.get(websocket)
+        if subscriber is not None:
+            subscriber.last_seen = time.monotonic()
+
+    def publish(self, message: Dict[str, Any]) -> int:
+        """Queue a message for every interested subscriber without awaiting any socket.
+
+        Returns:
+            Number of subscribers the message was queued for
+        """
+        payload = json.dumps(message, default=str)
+        topics = message_topics(message)
+        key = coalesce_key(message)
+        delivered = 0
+        for subscriber in list(self.subscribers.values()):
+            if subscriber.wants(topics):
+                subscriber.enqueue(payload, key)
+                delivered += 1
+        return delivered
+
+    def send_to(self, websocket: WebSocket, message: Dict[str, Any]) -> None:
+        """Queue a message for a single socket, behind anything already queued for it."""
+        subscriber = self.subscribers.get(websocket)
+        if subscriber is not None:
+            subscriber.enqueue(json.dumps(message, default=str))
+
+    async def send_progress_update(self, message: Dict[str, Any]) -> None:
+        self.publish(message)
+
+    def add_download_task(self, download_id: str, source_instance) -> None:
+        """Register a download that can be cancelled from any socket."""
+        self.active_downloads[download_id] = source_instance
+
+    def cancel_download(self, download_id: str) -> bool:
+        source_instance = self.active_downloads.pop(download_id, None)
+        if source_instance is None:
+            return False
+        if hasattr(source_instance, 'cancel'):
+            source_instance.cancel()
+        return True
+
+    async def _sender(self, subscriber: ProgressSubscriber) -> None:
+        websocket = subscriber.websocket
+        try:
+            while True:
+                await subscriber.ready.wait()
+                while subscriber.outbox:
+                    _, payload = subscriber.outbox.popitem(last=False)
+                    await asyncio.wait_for(websocket.send_text(payload), timeout=self.send_timeout)
+                subscriber.ready.clear()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.info(f"Dropping progress subscriber: {type(e).__name__}: {e}")
+            self.disconnect(websocket)
+            try:
+                await websocket.close()
+            except Exception:
+                pass
+
+    def _ensure_heartbeat(self) -> None:
+        if self.heartbeat_interval and (self._heartbeat_task is None or self._heartbeat_task.done()):
+            self._heartbeat_task = asyncio.create_task(self._heartbeat())
+
+    async def _heartbeat(self) -> None:
+        # Clients answer heartbeats with a pong; three missed intervals means the socket is gone
+        stale_after = self.heartbeat_interval * 3
+        while self.subscribers:
+            await asyncio.sleep(self.heartbeat_interval)
+            now = time.monotonic()
+            for websocket, subscriber in list(self.subscribers.items()):
+                if now - subscriber.last_seen > stale_after:
+                    logger.info("Dropping progress subscriber: heartbeat timed out")
+                    self.disconnect(websocket)
+                    try:
+                        await websocket.close()
+                    except Exception:
+                        pass
+                else:
+                    subscriber.enqueue(json.dumps({"type": "heartbeat", "timestamp": time.time()}), ("heartbeat",))
+
+
+# Global hub instance
+_hub_instance = None
+
+
+def get_progress_hub() -> ProgressHub:
+    """Get the global progress hub instance.
+
+    Returns:
+        ProgressHub instance
+    """
+    global _hub_instance
+    if _hub_instance is None:
+        _hub_instance = ProgressHub()
+    return _hub_instance
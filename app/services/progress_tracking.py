@@ -0,0 +1,278 @@
+"""
+Progress instrumentation with historical ETA estimates.
+
+A ``ProgressTracker`` turns measured work (points read by a PDAL stage, blocks
+written by a raster kernel, bytes received by a download) into throttled
+``progress_callback`` messages that carry an ``eta_seconds`` estimate. Trackers
+may be updated from worker threads; updates are marshalled back onto the event
+loop that created the tracker.
+
+Completed stages are recorded in ``StageTimingHistory`` (SQLite, in the cache
+directory) as seconds per unit of work, keyed by stage, product and a log2 size
+bucket. Before any work has been measured the ETA comes from that history;
+once work is flowing it blends towards the observed rate.
+"""
+
+import asyncio
+import math
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Union
+import logging
+
+logger = logging.getLogger(__name__)
+
+HISTORY_SAMPLES = 20
+
+
+def _size_bucket(units: float) -> int:
+    return int(math.log2(units)) if units >= 1 else 0
+
+
+class StageTimingHistory:
+    """Persistent per-stage timings used to estimate how long work will take."""
+
+    def __init__(self, cache_dir: Union[str, Path] = "data/cache"):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.db_path = self.cache_dir / "stage_timings.db"
+        self._lock = threading.Lock()
+        self._init_database()
+
+    def _init_database(self):
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS stage_timings (
+                    stage TEXT NOT NULL,
+                    product TEXT NOT NULL,
+                    size_bucket INTEGER NOT NULL,
+                    units REAL NOT NULL,
+                    seconds REAL NOT NULL,
+                    recorded_at REAL NOT NULL
+                )
+            """)
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_stage_product
+                ON stage_timings(stage, product, recorded_at)
+            """)
+
+    def record(self, stage: str, units: float, seconds: float, product: str = "") -> None:
+        """Record that ``units`` of work in a stage took ``seconds``."""
+        if units <= 0 or seconds <= 0:
+            return
+        try:
+            with self._lock, sqlite3.connect(self.db_path) as conn:
+                conn.execute(
+                    "INSERT INTO stage_timings VALUES (?, ?, ?, ?, ?, ?)",
+                    (stage, product or "", _size_bucket(units), float(units), float(seconds), time.time()),
+                )
+        except sqlite3.Error as e:
+            logger.warning(f"Could not record stage timing for {stage}: {e}")
+
+    def seconds_per_unit(self, stage: str, units: Optional[float] = None, product: str = "") -> Optional[float]:
+        """Historical throughput for a stage, preferring samples of a similar size."""
+        try:
+            with self._lock, sqlite3.connect(self.db_path) as conn:
+                rows = conn.execute(
+                    "SELECT size_bucket, units, seconds FROM stage_timings "
+                    "WHERE stage = ? AND product = ? ORDER BY recorded_at DESC LIMIT ?",
+                    (stage, product or "", HISTORY_SAMPLES),
+                ).fetchall()
+                if not rows and product:
+                    rows = conn.execute(
+                        "SELECT size_bucket, units, seconds FROM stage_timings "
+                        "WHERE stage = ? ORDER BY recorded_at DESC LIMIT ?",
+                        (stage, HISTORY_SAMPLES),
+                    ).fetchall()
+        except sqlite3.Error as e:
+            logger.warning(f"Could not read stage timings for {stage}: {e}")
+            return None
+
+        if units:
+            same_size = [r for r in rows if r[0] == _size_bucket(units)]
+            rows = same_size or rows
+        total_units = sum(r[1] for r in rows)
+        if total_units <= 0:
+            return None
+        return sum(r[2] for r in rows) / total_units
+
+    def estimate(self, stage: str, units: float, product: str = "") -> Optional[float]:
+        """Estimated seconds for ``units`` of work, or None without history."""
+        rate = self.seconds_per_unit(stage, units, product)
+        return rate * units if rate is not None else None
+
+
+class ProgressTracker:
+    """Reports measured progress of one stage through an async progress callback.
+
+    Progress within the stage is mapped onto ``[start, end]`` of the overall
+    progress bar. ``expected_seconds`` overrides the history-based estimate
+    for callers that already know it. Messages are throttled to one per
+    ``min_interval`` seconds unless forced or the stage finishes.
+    """
+
+    def __init__(
+        self,
+        progress_callback: Optional[Callable],
+        stage: str,
+        total: Optional[float] = None,
+        start: float = 0,
+        end: float = 100,
+        product: str = "",
+        message_type: str = "download_progress",
+        unit_label: str = "",
+        history: Optional["StageTimingHistory"] = None,
+        min_interval: float = 0.5,
+        extra: Optional[Dict[str, Any]] = None,
+        expected_seconds: Optional[float] = None,
+    ):
+        self.progress_callback = progress_callback
+        self.stage = stage
+        self.total = total
+        self.start = start
+        self.end = end
+        self.product = product
+        self.message_type = message_type
+        self.unit_label = unit_label
+        self.history = history if history is not None else get_stage_timing_history()
+        self.min_interval = min_interval
+        self.extra = extra or {}
+        self.done = 0.0
+        self.started_at = time.monotonic()
+        self._last_emit = 0.0
+        self._lock = threading.Lock()
+        try:
+            self._loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._loop = None
+        if expected_seconds is None and total:
+            expected_seconds = self.history.estimate(stage, total, product)
+        self._expected_seconds = expected_seconds
+
+    @property
+    def fraction(self) -> Optional[float]:
+        if not self.total:
+            return None
+        return min(self.done / self.total, 1.0)
+
+    @property
+    def eta_seconds(self) -> Optional[float]:
+        """Remaining seconds, blending historical and observed throughput."""
+        elapsed = time.monotonic() - self.started_at
+        fraction = self.fraction
+        observed = None
+        if fraction and fraction > 0:
+            observed = elapsed / fraction - elapsed
+        historical = None
+        if self._expected_seconds is not None:
+            historical = max(self._expected_seconds * (1 - (fraction or 0)), 0.0)
+            if fraction is None:
+                historical = max(self._expected_seconds - elapsed, 0.0)
+        if observed is None:
+            return historical
+        if historical is None:
+            return observed
+        # Trust the live rate more as more of the stage has been measured
+        weight = min((fraction or 0) * 4, 1.0)
+        return weight * observed + (1 - weight) * historical
+
+    def update(self, done: float, total: Optional[float] = None, message: Optional[str] = None, force: bool = False) -> None:
+        """Set absolute progress. Safe to call from worker threads."""
+        with self._lock:
+            self.done = done
+            if total:
+                if not self.total and self._expected_seconds is None:
+                    self._expected_seconds = self.history.estimate(self.stage, total, self.product)
+                self.total = total
+            now = time.monotonic()
+            if not force and now - self._last_emit < self.min_interval:
+                return
+            self._last_emit = now
+        self._emit(message)
+
+    def advance(self, amount: float = 1, message: Optional[str] = None) -> None:
+        self.update(self.done + amount, message=message)
+
+    def finish(self, message: Optional[str] = None, record: bool = True) -> float:
+        """Mark the stage complete, record its timing and emit a final update.
+
+        Returns:
+            Seconds the stage took
+        """
+        elapsed = time.monotonic() - self.started_at
+        units = self.total or self.done
+        if record and units:
+            self.history.record(self.stage, units, elapsed, self.product)
+        if self.total is None:
+            self.total = units or None
+        self.done = self.total or self.done
+        self._emit(message)
+        return elapsed
+
+    def build_message(self, message: Optional[str] = None) -> Dict[str, Any]:
+        fraction = self.fraction
+        progress = self.start + (self.end - self.start) * fraction if fraction is not None else self.start
+        eta = self.eta_seconds
+        if message is None:
+            message = self._default_message(fraction, eta)
+        update = {
+            "type": self.message_type,
+            "stage": self.stage,
+            "message": message,
+            "progress": int(progress),
+            "processed": self.done,
+            "total": self.total,
+            "eta_seconds": round(eta, 1) if eta is not None else None,
+        }
+        update.update(self.extra)
+        return update
+
+    def _default_message(self, fraction: Optional[float], eta: Optional[float]) -> str:
+        label = self.stage.replace("_", " ").capitalize()
+        if fraction is None:
+            text = f"{label}: {self.done:,.0f} {self.unit_label}".rstrip()
+        else:
+            text = f"{label}: {fraction * 100:.0f}%"
+        if eta is not None:
+            text += f" (about {eta:.0f}s left)"
+        return text
+
+    def _emit(self, message: Optional[str] = None) -> None:
+        if not self.progress_callback or self._loop is None:
+            return
+        update = self.build_message(message)
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self._loop:
+            self._loop.create_task(self._deliver(update))
+        elif not self._loop.is_closed():
+            asyncio.run_coroutine_threadsafe(self._deliver(update), self._loop)
+
+    async def _deliver(self, update: Dict[str, Any]) -> None:
+        try:
+            result = self.progress_callback(update)
+            if asyncio.iscoroutine(result):
+                await result
+        except Exception as e:
+            logger.warning(f"Progress callback failed for {self.stage}: {e}")
+
+
+# Global history instance
+_history_instance = None
+
+
+def get_stage_timing_history() -> StageTimingHistory:
+    """Get the global stage timing history instance.
+
+    Returns:
+        StageTimingHistory instance
+    """
+    global _history_instance
+    if _history_instance is None:
+        from ..config import get_settings
+        _history_instance = StageTimingHistory(get_settings().cache_dir)
+    return _history_instance
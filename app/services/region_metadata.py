@@ -0,0 +1,305 @@
+"""
+Structured region metadata store.
+
+Each region keeps its metadata in ``output/<region>/metadata.json``. The legacy
+``metadata.txt`` file is rendered from the structured record on every write so
+existing tools and users that read the text file keep working. Parsed records
+are held in an in-process cache that is invalidated by file mtime/size, so the
+many readers (world file generation, overlay bounds, region listing, NDVI
+checks) no longer re-parse the same file for every request.
+"""
+
+import json
+import os
+import tempfile
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+import logging
+
+logger = logging.getLogger(__name__)
+
+METADATA_JSON = "metadata.json"
+METADATA_TXT = "metadata.txt"
+FORMAT_VERSION = 1
+
+# Field labels used across the different metadata writers
+BOUND_LABELS = {
+    "north": "North Bound",
+    "south": "South Bound",
+    "east": "East Bound",
+    "west": "West Bound",
+}
+CENTER_LAT_LABELS = ("Center Latitude", "Center Lat")
+CENTER_LNG_LABELS = ("Center Longitude", "Center Lng")
+NDVI_LABEL = "NDVI Enabled"
+
+
+@dataclass
+class MetadataSection:
+    """A block of metadata: leading comment lines followed by ``Label: value`` fields."""
+    comments: List[str] = field(default_factory=list)
+    fields: Dict[str, Any] = field(default_factory=dict)
+
+
+def _to_float(value: Any) -> Optional[float]:
+    """Convert a metadata value to float, treating 'N/A' and blanks as missing."""
+    if value is None or isinstance(value, bool):
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _format_value(value: Any) -> str:
+    if value is None:
+        return "N/A"
+    if isinstance(value, bool):
+        return str(value).lower()
+    return str(value)
+
+
+@dataclass
+class RegionMetadata:
+    """Parsed metadata for a single region."""
+    region_dir: Path
+    sections: List[MetadataSection] = field(default_factory=list)
+    updated: Optional[str] = None
+
+    def get(self, label: str, default: Any = None) -> Any:
+        """Return the first value recorded under ``label``."""
+        for section in self.sections:
+            if label in section.fields:
+                return section.fields[label]
+        return default
+
+    def get_float(self, *labels: str) -> Optional[float]:
+        """Return the first numeric value found under any of ``labels``."""
+        for label in labels:
+            value = _to_float(self.get(label))
+            if value is not None:
+                return value
+        return None
+
+    @property
+    def comments(self) -> List[str]:
+        return [c for section in self.sections for c in section.comments]
+
+    @property
+    def bounds(self) -> Optional[Dict[str, float]]:
+        """WGS84 bounds as a north/south/east/west dict, or None if incomplete."""
+        bounds = {key: self.get_float(label) for key, label in BOUND_LABELS.items()}
+        if any(v is None for v in bounds.values()):
+            return None
+        return bounds
+
+    @property
+    def center(self) -> Optional[Dict[str, float]]:
+        """Recorded center point as a lat/lng dict, or None if missing."""
+        lat = self.get_float(*CENTER_LAT_LABELS)
+        lng = self.get_float(*CENTER_LNG_LABELS)
+        if lat is None or lng is None:
+            return None
+        return {"lat": lat, "lng": lng}
+
+    @property
+    def ndvi_enabled(self) -> Optional[bool]:
+        """NDVI flag, or None when the metadata does not record it."""
+        value = self.get(NDVI_LABEL)
+        if value is None:
+            return None
+        if isinstance(value, bool):
+            return value
+        return str(value).strip().lower() == "true"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "format_version": FORMAT_VERSION,
+            "region_name": self.region_dir.name,
+            "updated": self.updated,
+            "sections": [
+                {"comments": list(s.comments), "fields": dict(s.fields)} for s in self.sections
+            ],
+        }
+
+    def render_text(self) -> str:
+        """Render the legacy ``metadata.txt`` representation."""
+        blocks = []
+        for section in self.sections:
+            lines = [f"# {c}" if c else "#" for c in section.comments]
+            lines.extend(f"{label}: {_format_value(value)}" for label, value in section.fields.items())
+            if lines:
+                blocks.append("\n".join(lines))
+        return "\n\n".join(blocks) + "\n"
+
+
+def parse_metadata_text(text: str) -> List[MetadataSection]:
+    """Parse a free-form ``metadata.txt`` into sections.
+
+    Blank lines start a new section, ``#`` lines are comments and
+    ``Label: value`` lines are fields. Values are kept as strings.
+    """
+    sections: List[MetadataSection] = []
+    current = MetadataSection()
+
+    for raw_line in text.splitlines():
+        line = raw_line.strip()
+        if not line:
+            if current.comments or current.fields:
+                sections.append(current)
+                current = MetadataSection()
+            continue
+        if line.startswith("#"):
+            # A comment after fields opens a new section
+            if current.fields:
+                sections.append(current)
+                current = MetadataSection()
+            current.comments.append(line[1:].strip())
+            continue
+        if ":" in line:
+            label, value = line.split(":", 1)
+            label = label.strip()
+            if label not in current.fields:
+                current.fields[label] = value.strip()
+
+    if current.comments or current.fields:
+        sections.append(current)
+    return sections
+
+
+def _atomic_write(path: Path, content: str) -> None:
+    fd, tmp_path = tempfile.mkstemp(dir=str(path.parent), prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+    except Exception:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def _file_signature(path: Path) -> Optional[Tuple[int, int]]:
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class RegionMetadataStore:
+    """Read/write access to region metadata with an mtime-validated cache."""
+
+    def __init__(self, output_dir: Union[str, Path] = "output"):
+        self.output_dir = Path(output_dir)
+        self._cache: Dict[Path, Tuple[Tuple, RegionMetadata]] = {}
+        self._lock = threading.Lock()
+
+    def resolve_region_dir(self, region: Union[str, Path]) -> Path:
+        """Resolve a region name, region directory or metadata file path to its directory."""
+        path = Path(region)
+        if path.name in (METADATA_TXT, METADATA_JSON):
+            return path.parent
+        if len(path.parts) > 1 or path.is_absolute():
+            return path
+        return self.output_dir / path
+
+    def load(self, region: Union[str, Path]) -> Optional[RegionMetadata]:
+        """Return the parsed metadata for a region, or None if it has none."""
+        region_dir = self.resolve_region_dir(region)
+        json_path = region_dir / METADATA_JSON
+        txt_path = region_dir / METADATA_TXT
+        json_sig = _file_signature(json_path)
+        txt_sig = _file_signature(txt_path)
+        if json_sig is None and txt_sig is None:
+            return None
+
+        signature = (json_sig, txt_sig)
+        with self._lock:
+            cached = self._cache.get(region_dir)
+            if cached and cached[0] == signature:
+                return cached[1]
+
+        metadata = None
+        # The JSON record is authoritative unless metadata.txt was edited after it
+        if json_sig is not None and (txt_sig is None or json_sig[0] >= txt_sig[0]):
+            metadata = self._read_json(region_dir, json_path)
+        if metadata is None and txt_sig is not None:
+            metadata = self._read_text(region_dir, txt_path)
+        if metadata is None:
+            return None
+
+        with self._lock:
+            self._cache[region_dir] = (signature, metadata)
+        return metadata
+
+    def save(self, region: Union[str, Path], sections: List[MetadataSection]) -> RegionMetadata:
+        """Write a region's metadata as JSON and regenerate ``metadata.txt`` from it."""
+        region_dir = self.resolve_region_dir(region)
+        region_dir.mkdir(parents=True, exist_ok=True)
+        metadata = RegionMetadata(
+            region_dir=region_dir,
+            sections=sections,
+            updated=datetime.now().isoformat(timespec="seconds"),
+        )
+
+        # Text first so the JSON mtime is never older than the text it describes
+        _atomic_write(region_dir / METADATA_TXT, metadata.render_text())
+        _atomic_write(region_dir / METADATA_JSON, json.dumps(metadata.to_dict(), indent=2))
+
+        signature = (_file_signature(region_dir / METADATA_JSON), _file_signature(region_dir / METADATA_TXT))
+        with self._lock:
+            self._cache[region_dir] = (signature, metadata)
+        logger.info(f"Saved region metadata: {region_dir / METADATA_JSON}")
+        return metadata
+
+    def invalidate(self, region: Optional[Union[str, Path]] = None) -> None:
+        """Drop cached entries for one region, or all regions."""
+        with self._lock:
+            if region is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(self.resolve_region_dir(region), None)
+
+    def _read_json(self, region_dir: Path, path: Path) -> Optional[RegionMetadata]:
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+            sections = [
+                MetadataSection(comments=list(s.get("comments", [])), fields=dict(s.get("fields", {})))
+                for s in data.get("sections", [])
+            ]
+            return RegionMetadata(region_dir=region_dir, sections=sections, updated=data.get("updated"))
+        except Exception as e:
+            logger.warning(f"Could not read {path}: {e}")
+            return None
+
+    def _read_text(self, region_dir: Path, path: Path) -> Optional[RegionMetadata]:
+        try:
+            with open(path, "r") as f:
+                sections = parse_metadata_text(f.read())
+            return RegionMetadata(region_dir=region_dir, sections=sections)
+        except Exception as e:
+            logger.warning(f"Could not read {path}: {e}")
+            return None
+
+
+# Global store instance
+_store_instance = None
+
+
+def get_region_metadata_store() -> RegionMetadataStore:
+    """Get the global region metadata store instance.
+
+    Returns:
+        RegionMetadataStore instance
+    """
+    global _store_instance
+    if _store_instance is None:
+        _store_instance = RegionMetadataStore()
+    return _store_instance
@@ -427,7 +427,8 @@ window.OverlayManager = {
 
       const overlayData = await response.json();
       
-      if (!overlayData.bounds || !overlayData.image_data) {
+      const imageDataUrl = Utils.overlayImageUrl(overlayData);
+      if (!overlayData.bounds || !imageDataUrl) {
         throw new Error('Invalid overlay data received from server');
       }
 
@@ -440,11 +441,8 @@ window.OverlayManager = {
       // Log detailed coordinate information
       Utils.log('info', `Retrieved ${bandType} overlay data for ${regionName} - Bounds: N:${overlayData.bounds.north}, S:${overlayData.bounds.south}, E:${overlayData.bounds.east}, W:${overlayData.bounds.west}`);
 
-      // Create image data URL from base64
-      const imageDataUrl = `data:image/png;base64,${overlayData.image_data}`;
-
       // Enhanced logging for debugging
-      Utils.log('info', `Creating ${bandType} satellite overlay with image data length: ${overlayData.image_data.length} chars`);
+      Utils.log('info', `Creating ${bandType} satellite overlay from ${overlayData.image_url ? overlayData.image_url : 'inline image data'}`);
       Utils.log('info', `Satellite overlay bounds: [[${bounds[0][0]}, ${bounds[0][1]}], [${bounds[1][0]}, ${bounds[1][1]}]]`);
 
       // Create new satellite overlay using the actual bounds and image data
@@ -226,7 +226,8 @@ window.ProcessingManager = {
         overlayData = await overlays().getOverlayData(processingType, displayIdentifier);
       }
       
-      if (!overlayData || !overlayData.image_data) {
+      const imageDataUrl = Utils.overlayImageUrl(overlayData);
+      if (!imageDataUrl) {
         Utils.log('warn', `No image data in overlay response for ${processingType}`);
         return;
       }
@@ -240,9 +241,6 @@ window.ProcessingManager = {
         return;
       }
 
-      // Create base64 data URL for the image
-      const imageDataUrl = `data:image/png;base64,${overlayData.image_data}`;
-      
       // Get the processing type display name
       const displayName = this.getProcessingDisplayName(processingType);
       
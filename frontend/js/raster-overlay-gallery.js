@@ -72,10 +72,11 @@ class RasterOverlayGallery {
                         console.log('Fetching overlay data for processing type:', processingType);
                         const data = await overlays().getRasterOverlayData(regionName, processingType);
                         console.log('Overlay data received for', processingType, ':', data ? 'SUCCESS' : 'FAILED');
-                        if (data && data.image_data) {
+                        const imageUrl = Utils.overlayImageUrl(data);
+                        if (imageUrl) {
                             const item = {
                                 id: processingType,
-                                imageUrl: `data:image/png;base64,${data.image_data}`,
+                                imageUrl: imageUrl,
                                 title: pngFile.display_name || this.getProcessingDisplayName(processingType),
                                 subtitle: `${pngFile.file_size_mb} MB`,
                                 status: 'ready'
@@ -171,9 +172,9 @@ class RasterOverlayGallery {
         } else if (window.OverlayManager?.addImageOverlay) {
             try {
                 const data = await overlays().getRasterOverlayData(this.regionName, processingType);
-                if (data && data.bounds && data.image_data) {
+                const imageUrl = Utils.overlayImageUrl(data);
+                if (data && data.bounds && imageUrl) {
                     const bounds = [[data.bounds.south, data.bounds.west], [data.bounds.north, data.bounds.east]];
-                    const imageUrl = `data:image/png;base64,${data.image_data}`;
                     const key = `LIDAR_RASTER_${this.regionName}_${processingType}`;
                     window.OverlayManager.addImageOverlay(key, imageUrl, bounds);
                 }
@@ -58,12 +58,13 @@ class SatelliteOverlayGallery {
             console.log(`🛰️ Loading band: ${band}, regionBand: ${regionBand}`);
             try {
                 const data = await satellite().getSentinel2Overlay(regionBand);
-                if (data && data.image_data) {
+                const imageUrl = Utils.overlayImageUrl(data);
+                if (imageUrl) {
                     console.log(`✅ Successfully loaded band ${band}`);
                     const title = this.getBandDisplayName(band);
                     items.push({
                         id: regionBand,
-                        imageUrl: `data:image/png;base64,${data.image_data}`,
+                        imageUrl: imageUrl,
                         title: title,
                         subtitle: regionName,
                         status: 'ready',
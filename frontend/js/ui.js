@@ -1258,7 +1258,7 @@ window.UIManager = {
       console.log('RasterOverlayGallery found, preparing items');
       const items = availableRasters.map(r => ({
         id: r.processingType,
-        imageUrl: `data:image/png;base64,${r.overlayData.image_data}`,
+        imageUrl: Utils.overlayImageUrl(r.overlayData),
         title: r.display,
         status: 'ready'
       }));
@@ -1419,12 +1419,12 @@ window.UIManager = {
         }
       }
       
-      if (data && data.success && data.bounds && data.image_data) {
+      const imageUrl = Utils.overlayImageUrl(data);
+      if (data && data.success && data.bounds && imageUrl) {
         const bounds = [
           [data.bounds.south, data.bounds.west], 
           [data.bounds.north, data.bounds.east]
         ];
-        const imageUrl = `data:image/png;base64,${data.image_data}`;
         const overlayKey = `LIDAR_RASTER_${regionName}_${processingType}`;
         
         // Add overlay using OverlayManager
@@ -112,6 +112,26 @@ window.Utils = {
     );
   },
 
+  /**
+   * Get the image URL for an overlay API response
+   * Picks the smallest overlay pyramid level that covers the device's screen,
+   * then the versioned product file URL, then inline base64 data
+   * @param {Object} overlayData - Overlay API response
+   * @returns {string|null} Image URL usable as an <img> or Leaflet overlay source
+   */
+  overlayImageUrl(overlayData) {
+    if (!overlayData) return null;
+    if (Array.isArray(overlayData.pyramid) && overlayData.pyramid.length) {
+      const screenDim = Math.max(window.screen.width, window.screen.height) * (window.devicePixelRatio || 1);
+      const levels = [...overlayData.pyramid].sort((a, b) => Math.max(a.width, a.height) - Math.max(b.width, b.height));
+      const level = levels.find(l => Math.max(l.width, l.height) >= screenDim) || levels[levels.length - 1];
+      return level.image_url;
+    }
+    if (overlayData.image_url) return overlayData.image_url;
+    if (overlayData.image_data) return `data:image/png;base64,${overlayData.image_data}`;
+    return null;
+  },
+
   /**
    * Deep clone an object
    * @param {Object} obj - Object to clone
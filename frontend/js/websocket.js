@@ -109,6 +109,13 @@ window.WebSocketManager = {
       case 'ndvi_conversion_complete':
         this.handleNDVIConversionComplete(data);
         break;
+
+      case 'heartbeat':
+        // Answer so the server keeps this connection alive
+        if (this.socket && this.socket.readyState === WebSocket.OPEN) {
+          this.socket.send(JSON.stringify({ type: 'pong' }));
+        }
+        break;
         
       default:
         Utils.log('warn', `Unknown WebSocket message type: ${type}`, data);
@@ -429,6 +436,22 @@ window.WebSocketManager = {
     }
   },
 
+  /**
+   * Limit progress messages to the given topics (e.g. 'region:NAME', 'download:ID')
+   * @param {string[]} topics - Topics to receive
+   */
+  subscribe(topics) {
+    this.sendMessage({ type: 'subscribe', topics });
+  },
+
+  /**
+   * Stop receiving progress messages for the given topics
+   * @param {string[]} topics - Topics to drop
+   */
+  unsubscribe(topics) {
+    this.sendMessage({ type: 'unsubscribe', topics });
+  },
+
   /**
    * Close WebSocket connection
    */